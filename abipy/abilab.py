@@ -229,7 +229,7 @@ def abifile_subclass_from_filename(filename: str) -> ClassVar:
     """
     Returns the appropriate class associated to the given filename.
     """
-    if os.path.basename(filename) == Flow.PICKLE_FNAME:
+    if os.path.basename(filename) in (Flow.PICKLE_FNAME, Flow.STORE_FNAME):
         return Flow
 
     from abipy.tools.text import rreplace
@@ -10,6 +10,7 @@ import os
 import inspect
 import itertools
 import json
+import threading
 import numpy as np
 import pandas as pd
 
@@ -24,12 +25,143 @@ from abipy.tools.iotools import make_executable
 from abipy.core.structure import Structure
 from abipy.core.mixins import NotebookWriter
 from abipy.tools.numtools import sort_and_groupby
+from abipy.tools.parallel import pool_nprocs_pmode
 from abipy.tools import duck
 from abipy.tools.typing import Figure
 from abipy.tools.plotting import (plot_xy_with_hue, add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt,
     rotate_ticklabels, set_visible, ConvergenceAnalyzer)
 
 
+class OpenFileHandles:
+    """
+    Bounded set of files opened by :class:`LazyAbiFile` proxies.
+    If more than `maxsize` files are open, the least recently used one is closed.
+    The proxy reopens the file transparently the next time one of its attributes is accessed.
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        """
+        Args:
+            maxsize: Max number of files open at the same time. None for no limit.
+        """
+        self.maxsize = maxsize
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def touch(self, proxy: LazyAbiFile) -> None:
+        """Register `proxy` as the most recently used file. Close the oldest files if needed."""
+        with self._lock:
+            self._lru[id(proxy)] = proxy
+            self._lru.move_to_end(id(proxy))
+            while self.maxsize is not None and len(self._lru) > max(self.maxsize, 1):
+                _, old = self._lru.popitem(last=False)
+                old._close_handle()
+
+    def discard(self, proxy: LazyAbiFile) -> None:
+        """Remove `proxy` from the set of open files."""
+        with self._lock:
+            self._lru.pop(id(proxy), None)
+
+
+class LazyAbiFile:
+    """
+    Proxy for a file supported by abiopen. The file is opened the first time an attribute
+    that is not available in the proxy is accessed so that building a robot with many files is cheap.
+    The number of files open at the same time can be bounded with :class:`OpenFileHandles`.
+
+    .. note::
+
+        Objects obtained from the file (e.g. the netcdf reader) may become invalid
+        when the file is closed by the :class:`OpenFileHandles` instance.
+    """
+
+    def __init__(self, filepath: str, handles: OpenFileHandles | None = None):
+        """
+        Args:
+            filepath: Path to the file.
+            handles: :class:`OpenFileHandles` shared by the proxies. None if the number of open files is not bounded.
+        """
+        self._filepath = os.path.abspath(os.path.expanduser(str(filepath)))
+        self._handles = handles
+        self._abifile = None
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return "<%s, %s, is_open: %s>" % (self.__class__.__name__, self.relpath, self.is_open)
+
+    def __getattr__(self, name):
+        # Avoid infinite recursion if the instance is not initialized e.g. unpickling.
+        if name.startswith("__") or name in ("_filepath", "_handles", "_abifile", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.open(), name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def filepath(self) -> str:
+        """Absolute path of the file."""
+        return self._filepath
+
+    @property
+    def relpath(self) -> str:
+        """Relative path."""
+        try:
+            return os.path.relpath(self.filepath)
+        except OSError:
+            return self.filepath
+
+    @property
+    def basename(self) -> str:
+        """Basename of the file."""
+        return os.path.basename(self.filepath)
+
+    @property
+    def is_open(self) -> bool:
+        """True if the underlying file is open."""
+        return self._abifile is not None
+
+    def open(self):
+        """Return the underlying AbiPy file. Open it if needed."""
+        with self._lock:
+            abifile = self._abifile
+            if abifile is None:
+                from abipy.abilab import abiopen
+                abifile = abiopen(self._filepath)
+                if abifile is None:
+                    raise ValueError("abiopen does not support file: %s" % self._filepath)
+                self._abifile = abifile
+
+        if self._handles is not None: self._handles.touch(self)
+        return abifile
+
+    def _close_handle(self) -> None:
+        """Close the underlying file. It will be reopened if needed."""
+        with self._lock:
+            abifile, self._abifile = self._abifile, None
+            if abifile is not None: abifile.close()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        if self._handles is not None: self._handles.discard(self)
+        self._close_handle()
+
+
+def _abiopen_or_exc(filepath: str) -> tuple:
+    """Open filepath with abiopen. Return (abifile, None) on success else (None, exception)."""
+    from abipy.abilab import abiopen
+    try:
+        return abiopen(filepath), None
+    except Exception as exc:
+        return None, exc
+
+
 class Robot(NotebookWriter):
     """
     This is the base class from which all Robot subclasses should derive.
@@ -90,7 +222,8 @@ class Robot(NotebookWriter):
                          str(cls.get_supported_extensions()))
 
     @classmethod
-    def from_dir(cls, top: str, walk: bool = True, abspath: bool = False) -> Robot:
+    def from_dir(cls, top: str, walk: bool = True, abspath: bool = False,
+                 nprocs: int = 1, lazy: bool = False, max_open_files: int | None = None) -> Robot:
         """
         Build a robot by scanning all files located within directory `top`.
         This method should be invoked with a concrete robot class, for example:
@@ -101,29 +234,36 @@ class Robot(NotebookWriter):
             top: Root directory
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            nprocs, lazy, max_open_files: Options used to open the files. See `_open_filepaths`.
         """
-        new = cls(*cls._open_files_in_dir(top, walk))
+        new = cls._from_items(cls._open_files_in_dir(top, walk, nprocs=nprocs, lazy=lazy,
+                                                     max_open_files=max_open_files))
         if not abspath: new.trim_paths(start=top)
         return new
 
     @classmethod
-    def from_dirs(cls, dirpaths: list[str], walk: bool = True, abspath: bool = False) -> Robot:
+    def from_dirs(cls, dirpaths: list[str], walk: bool = True, abspath: bool = False,
+                  nprocs: int = 1, lazy: bool = False, max_open_files: int | None = None) -> Robot:
         """
         Similar to `from_dir` but accepts a list of directories instead of a single directory.
 
         Args:
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            nprocs, lazy, max_open_files: Options used to open the files. See `_open_filepaths`.
         """
-        items = []
+        filepaths = []
         for top in list_strings(dirpaths):
-            items.extend(cls._open_files_in_dir(top, walk))
-        new = cls(*items)
+            filepaths.extend(cls._find_files_in_dir(top, walk))
+        items = cls._open_filepaths(filepaths, nprocs=nprocs, lazy=lazy, max_open_files=max_open_files,
+                                    raise_exc=True)
+        new = cls._from_items([(abifile.filepath, abifile) for _, abifile in items])
         if not abspath: new.trim_paths(start=os.getcwd())
         return new
 
     @classmethod
-    def from_dir_glob(cls, pattern: str, walk: bool = True, abspath: bool = False) -> Robot:
+    def from_dir_glob(cls, pattern: str, walk: bool = True, abspath: bool = False,
+                      nprocs: int = 1, lazy: bool = False, max_open_files: int | None = None) -> Robot:
         """
         This class method builds a robot by scanning all files located within the directories
         matching `pattern` as implemented by glob.glob
@@ -135,38 +275,95 @@ class Robot(NotebookWriter):
             pattern: Pattern string.
             walk: if True, directories inside `top` are included as well.
             abspath: True if paths in index should be absolute. Default: Relative to getcwd().
+            nprocs, lazy, max_open_files: Options used to open the files. See `_open_filepaths`.
         """
         import glob
-        items = []
+        filepaths = []
         for top in filter(os.path.isdir, glob.iglob(pattern)):
-            items += cls._open_files_in_dir(top, walk=walk)
-        new = cls(*items)
+            filepaths.extend(cls._find_files_in_dir(top, walk=walk))
+        items = cls._open_filepaths(filepaths, nprocs=nprocs, lazy=lazy, max_open_files=max_open_files,
+                                    raise_exc=True)
+        new = cls._from_items([(abifile.filepath, abifile) for _, abifile in items])
         if not abspath: new.trim_paths(start=os.getcwd())
         return new
 
     @classmethod
-    def _open_files_in_dir(cls, top: str, walk: bool) -> list:
+    def _find_files_in_dir(cls, top: str, walk: bool) -> list[str]:
         """
-        Open files in directory tree starting from `top`. Return list of Abinit files.
+        Return list with the paths of the files handled by the robot in the directory tree starting from `top`.
         """
         if not os.path.isdir(top):
             raise ValueError("%s: no such directory" % str(top))
-        from abipy.abilab import abiopen
-        items = []
+        filepaths = []
         if walk:
             for dirpath, dirnames, filenames in os.walk(top):
                 filenames = sorted([f for f in filenames if cls.class_handles_filename(f)])
-                for f in filenames:
-                    abifile = abiopen(os.path.join(dirpath, f))
-                    if abifile is not None: items.append((abifile.filepath, abifile))
+                filepaths.extend(os.path.join(dirpath, f) for f in filenames)
         else:
             filenames = [f for f in os.listdir(top) if cls.class_handles_filename(f)]
-            for f in filenames:
-                abifile = abiopen(os.path.join(top, f))
-                if abifile is not None: items.append((abifile.filepath, abifile))
+            filepaths.extend(os.path.join(top, f) for f in filenames)
+
+        return filepaths
+
+    @classmethod
+    def _open_files_in_dir(cls, top: str, walk: bool, nprocs: int = 1, lazy: bool = False,
+                           max_open_files: int | None = None) -> list:
+        """
+        Open files in directory tree starting from `top`. Return list of (filepath, abifile) tuples.
+        """
+        items = cls._open_filepaths(cls._find_files_in_dir(top, walk), nprocs=nprocs, lazy=lazy,
+                                    max_open_files=max_open_files, raise_exc=True)
+        return [(abifile.filepath, abifile) for _, abifile in items]
+
+    @staticmethod
+    def _open_filepaths(filepaths: list[str], nprocs: int = 1, lazy: bool = False,
+                        max_open_files: int | None = None, raise_exc: bool = False) -> list:
+        """
+        Open a list of files. Return list of (index, abifile) tuples where index is the position
+        of the file in `filepaths`. Files that cannot be opened are ignored.
+
+        Args:
+            filepaths: List of paths.
+            nprocs: Number of threads used to open the files. None to use all the procs.
+                Useful on parallel filesystems where opening the file and reading the header is dominated by latency.
+            lazy: True to return :class:`LazyAbiFile` proxies. Files are opened when an attribute is accessed.
+            max_open_files: Max number of files kept open at the same time by the lazy proxies.
+                Least recently used files are closed and reopened on demand. None for no limit.
+            raise_exc: True to raise the exception if a file cannot be opened. Else print the error.
+        """
+        if lazy:
+            handles = OpenFileHandles(maxsize=max_open_files)
+            return [(i, LazyAbiFile(f, handles=handles)) for i, f in enumerate(filepaths)]
+
+        if nprocs == 1 or len(filepaths) <= 1:
+            outs = [_abiopen_or_exc(f) for f in filepaths]
+        else:
+            p = pool_nprocs_pmode(nprocs if nprocs is None else min(nprocs, len(filepaths)), pmode="threads")
+            with p.pool_cls(p.nprocs) as pool:
+                outs = pool.map(_abiopen_or_exc, filepaths)
+
+        items = []
+        for i, (f, (abifile, exc)) in enumerate(zip(filepaths, outs)):
+            if exc is not None:
+                if raise_exc: raise exc
+                cprint("Exception while opening file: `%s`" % str(f), "red")
+                cprint(exc, "red")
+            elif abifile is not None:
+                items.append((i, abifile))
 
         return items
 
+    @classmethod
+    def _from_items(cls, items: list) -> Robot:
+        """
+        Build a robot from a list of (label, abifile) tuples with files opened by the robot.
+        The files are closed when the robot is closed.
+        """
+        new = cls(*items)
+        for _, abifile in items:
+            new._do_close[abifile.filepath] = True
+        return new
+
     @classmethod
     def class_handles_filename(cls, filename: str) -> bool:
         """
@@ -180,31 +377,26 @@ class Robot(NotebookWriter):
                 filename.endswith("." + cls.EXT))  # This for .abo
 
     @classmethod
-    def from_files(cls, filenames, labels=None, abspath=False) -> Robot:
+    def from_files(cls, filenames, labels=None, abspath=False,
+                   nprocs: int = 1, lazy: bool = False, max_open_files: int | None = None) -> Robot:
         """
         Build a Robot from a list of `filenames`.
         If labels is None, labels are automatically generated from absolute paths.
 
         Args:
             abspath: True if paths in index should be absolute. Default: Relative to `top`.
+            nprocs: Number of threads used to open the files. None to use all the procs.
+            lazy: True to open the files only when needed. See :class:`LazyAbiFile`.
+            max_open_files: Max number of files open at the same time in lazy mode. None for no limit.
         """
         filenames = list_strings(filenames)
-        from abipy.abilab import abiopen
         filenames = [f for f in filenames if cls.class_handles_filename(f)]
         items = []
-        for i, f in enumerate(filenames):
-            try:
-                abifile = abiopen(f)
-            except Exception as exc:
-                cprint("Exception while opening file: `%s`" % str(f), "red")
-                cprint(exc, "red")
-                abifile = None
+        for i, abifile in cls._open_filepaths(filenames, nprocs=nprocs, lazy=lazy, max_open_files=max_open_files):
+            label = abifile.filepath if labels is None else labels[i]
+            items.append((label, abifile))
 
-            if abifile is not None:
-                label = abifile.filepath if labels is None else labels[i]
-                items.append((label, abifile))
-
-        new = cls(*items)
+        new = cls._from_items(items)
         if labels is None and not abspath: new.trim_paths(start=None)
         return new
 
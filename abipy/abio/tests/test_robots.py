@@ -6,7 +6,7 @@ import abipy.data as abidata
 import abipy.abilab as abilab
 
 from abipy.core.testing import AbipyTest
-from abipy.abio.robots import Robot
+from abipy.abio.robots import Robot, LazyAbiFile, OpenFileHandles
 
 
 class RobotTest(AbipyTest):
@@ -36,3 +36,44 @@ class RobotTest(AbipyTest):
 
         if self.has_nbformat():
             assert robot.get_baserobot_code_cells()
+
+    def test_open_files(self):
+        """Testing parallel and lazy opening of files in robots."""
+        filepaths = [abidata.ref_file("si_scf_GSR.nc"), abidata.ref_file("si_nscf_GSR.nc")]
+        with abilab.GsrRobot.from_files(filepaths) as robot:
+            ref_energies = [gsr.energy for gsr in robot.abifiles]
+
+        with abilab.GsrRobot.from_files(filepaths, nprocs=2, abspath=True) as robot:
+            assert robot.labels == filepaths
+            assert [gsr.energy for gsr in robot.abifiles] == ref_energies
+            abifiles = robot.abifiles
+        # Files opened by the robot are closed.
+        assert all(not gsr.reader.rootgrp.isopen() for gsr in abifiles)
+
+        with abilab.GsrRobot.from_dir(os.path.dirname(filepaths[0]), nprocs=2, lazy=True) as robot:
+            assert len(robot) == 2 and all(isinstance(f, LazyAbiFile) for f in robot.abifiles)
+            assert not any(f.is_open for f in robot.abifiles)
+
+        # Lazy mode with at most one file open at the same time.
+        with abilab.GsrRobot.from_files(filepaths, lazy=True, max_open_files=1) as robot:
+            gsr0, gsr1 = robot.abifiles
+            repr(gsr0); str(robot)
+            assert gsr0.basename == "si_scf_GSR.nc" and not gsr0.is_open
+            assert gsr0.energy == ref_energies[0] and gsr0.is_open
+            assert gsr1.energy == ref_energies[1]
+            assert gsr1.is_open and not gsr0.is_open
+            # Reopen file.
+            assert gsr0.structure.formula == "Si2"
+            assert gsr0.is_open and not gsr1.is_open
+            df = robot.get_dataframe()
+            assert len(df) == 2
+            assert len(gsr0._handles) == 1
+        assert not gsr0.is_open and not gsr1.is_open
+
+        handles = OpenFileHandles(maxsize=None)
+        with LazyAbiFile(filepaths[0], handles=handles) as lazy:
+            assert lazy.energy == ref_energies[0]
+            assert len(handles) == 1
+            with self.assertRaises(AttributeError):
+                lazy.foobar
+        assert len(handles) == 0
@@ -13,6 +13,7 @@ from abipy.tools import duck
 
 __all__ = [
     "GSphere",
+    "GSphereFFT",
 ]
 
 
@@ -36,9 +37,15 @@ class GSphere(collections.abc.Sequence):
         self.npw = self.gvecs.shape[0]
 
         self.istwfk = istwfk
-        if istwfk != 1:
+        if istwfk not in (1, 2):
             raise NotImplementedError("istwfk %d is not implemented" % self.istwfk)
 
+        # Tables used to map the G-vectors onto the FFT mesh. Indexed by mesh.shape.
+        self._fft_indices = {}
+        self._rfft_indices = {}
+        # GSphereFFT objects indexed by mesh.shape.
+        self._fft_engines = {}
+
     @property
     def gvecs(self) -> np.ndarray:
         """|numpy-array| with the G-vectors in reduced coordinates."""
@@ -148,13 +155,64 @@ class GSphere(collections.abc.Sequence):
     #  """Returns the number of divisions of the FFT box enclosing the sphere."""
     #  #return ndivs
 
+    def get_fft_indices(self, mesh) -> tuple:
+        """
+        Return tuple (idx, idx_minus) where idx gives the indices of the G-vectors of the sphere
+        in the flattened FFT mesh (C-order). idx_minus gives the indices of -G if istwfk == 2 else None.
+        """
+        key = tuple(mesh.shape)
+        if key not in self._fft_indices:
+            n1, n2, n3 = mesh.shape
+            g = self.gvecs % mesh.shape
+            idx = (g[:, 0] * n2 + g[:, 1]) * n3 + g[:, 2]
+            idx_minus = None
+            if self.istwfk == 2:
+                g = (-self.gvecs) % mesh.shape
+                idx_minus = (g[:, 0] * n2 + g[:, 1]) * n3 + g[:, 2]
+            self._fft_indices[key] = (idx, idx_minus)
+
+        return self._fft_indices[key]
+
+    def get_fft_engine(self, mesh) -> GSphereFFT:
+        """
+        Return :class:`GSphereFFT` object used to transform arrays between the sphere and the FFT mesh.
+        The object is cached so that the workspace is reused by the next calls.
+        """
+        key = tuple(mesh.shape)
+        if key not in self._fft_engines:
+            self._fft_engines[key] = GSphereFFT(self, mesh)
+
+        return self._fft_engines[key]
+
+    def get_rfft_indices(self, mesh) -> tuple:
+        """
+        Tables used to insert the coefficients of a real function (istwfk == 2) in the
+        half FFT mesh of shape [n1, n2, n3 // 2 + 1] used by the real-to-complex FFTs.
+
+        Return tuple (ipw, idx, ipw_minus, idx_minus): the coefficients ipw are stored
+        at the indices idx while the complex conjugate of the coefficients ipw_minus are stored
+        at the indices idx_minus (-G vectors).
+        """
+        key = tuple(mesh.shape)
+        if key not in self._rfft_indices:
+            n1, n2, n3 = mesh.shape
+            nh = n3 // 2 + 1
+            tables = []
+            for g in (self.gvecs % mesh.shape, (-self.gvecs) % mesh.shape):
+                ipw = np.nonzero(g[:, 2] < nh)[0]
+                g = g[ipw]
+                tables.extend([ipw, (g[:, 0] * n2 + g[:, 1]) * nh + g[:, 2]])
+            self._rfft_indices[key] = tuple(tables)
+
+        return self._rfft_indices[key]
+
     def tofftmesh(self, mesh, arr_on_sphere) -> np.ndarray:
         """
         Insert the array ``arr_on_sphere`` given on the sphere inside the FFT mesh.
 
         Args:
-            mesh:
-            arr_on_sphere:
+            mesh: |Mesh3D| object.
+            arr_on_sphere: Array of shape [..., npw].
         """
         arr_on_sphere = np.atleast_2d(arr_on_sphere)
         ishape = arr_on_sphere.shape
@@ -163,25 +221,12 @@ class GSphere(collections.abc.Sequence):
 
         arr_on_mesh = np.zeros((s0,) + mesh.shape, dtype=arr_on_sphere.dtype)
 
-        if self.istwfk == 1:
-            #do ipw=1,npw
-            #  i1=kg_k(1,ipw); if(i1<0)i1=i1+n1; i1=i1+1
-            #  i2=kg_k(2,ipw); if(i2<0)i2=i2+n2; i2=i2+1
-            #  i3=kg_k(3,ipw); if(i3<0)i3=i3+n3; i3=i3+1
-            #end do
-
-            n1, n2, n3 = mesh.shape
-            for sph_idx, gvec in enumerate(self.gvecs):
-                i1 = gvec[0]
-                if i1 < 0: i1 = i1 + n1
-                i2 = gvec[1]
-                if i2 < 0: i2 = i2 + n2
-                i3 = gvec[2]
-                if i3 < 0: i3 = i3 + n3
-                arr_on_mesh[..., i1, i2, i3] = arr_on_sphere[..., sph_idx]
-
-        else:
-            raise NotImplementedError("istwfk = %s not implemented" % self.istwfk)
+        idx, idx_minus = self.get_fft_indices(mesh)
+        flat = arr_on_mesh.reshape(s0, -1)
+        if idx_minus is not None:
+            # istwfk == 2: f(-G) = f(G)^*
+            flat[:, idx_minus] = arr_on_sphere.reshape(s0, -1).conj()
+        flat[:, idx] = arr_on_sphere.reshape(s0, -1)
 
         if s0 == 1:
             # Reinstate input shape
@@ -195,30 +240,10 @@ class GSphere(collections.abc.Sequence):
         """
         indim = arr_on_mesh.ndim
         arr_on_mesh = mesh.reshape(arr_on_mesh)
-        ishape = arr_on_mesh.shape
-        s0 = ishape[0]
-
-        arr_on_sphere = np.empty((s0,) + (self.npw,), dtype=arr_on_mesh.dtype)
-
-        if self.istwfk == 1:
-            #do ig=1,npwout
-            #  i1=kg_kout(1,ig); if (i1<0) i1=i1+n1; i1=i1+1
-            #  i2=kg_kout(2,ig); if (i2<0) i2=i2+n2; i2=i2+1
-            #  i3=kg_kout(3,ig); if (i3<0) i3=i3+n3; i3=i3+1
-            #end do
-            n1, n2, n3 = mesh.shape
-
-            for sph_idx, gvec in enumerate(self.gvecs):
-                i1 = gvec[0]
-                if i1 < 0: i1 = i1 + n1
-                i2 = gvec[1]
-                if i2 < 0: i2 = i2 + n2
-                i3 = gvec[2]
-                if i3 < 0: i3 = i3 + n3
-                arr_on_sphere[..., sph_idx] = arr_on_mesh[..., i1, i2, i3]
+        s0 = arr_on_mesh.shape[0]
 
-        else:
-            raise NotImplementedError("istwfk %s is not implemented" % self.istwfk)
+        idx, _ = self.get_fft_indices(mesh)
+        arr_on_sphere = arr_on_mesh.reshape(s0, -1)[:, idx]
 
         if s0 == 1 and indim == 1:
             # Reinstate input shape
@@ -254,6 +279,126 @@ class GSphere(collections.abc.Sequence):
     #    return new
 
 
+class GSphereFFT:
+    """
+    Batched FFTs between the G-sphere and the real space FFT mesh.
+
+    The transforms are performed in batches using a workspace on the FFT mesh that is allocated once
+    and reused. Only the entries of the G-sphere are written in the workspace so that
+    the other entries stay zero and the array does not need to be reinitialized.
+    Real-to-complex FFTs are used if the function is real in real space (istwfk == 2).
+
+    .. example::
+
+        engine = GSphereFFT(gsphere, mesh)
+        ur_block = engine.g2r(ug_block)
+        same_ug = engine.r2g(ur_block)
+    """
+
+    def __init__(self, gsphere: GSphere, mesh, max_nbytes: int = 2 ** 28):
+        """
+        Args:
+            gsphere: |GSphere| object.
+            mesh: |Mesh3D| object.
+            max_nbytes: Max memory in bytes used for the workspace and the output of the FFTs in a batch.
+        """
+        self.gsphere, self.mesh = gsphere, mesh
+        self.use_rfft = gsphere.istwfk == 2
+        n1, n2, n3 = mesh.shape
+        self.box_shape = (n1, n2, n3 // 2 + 1) if self.use_rfft else tuple(mesh.shape)
+        self.batch_size = max(1, max_nbytes // (32 * int(np.prod(self.box_shape))))
+        self._workspace = None
+
+    def __str__(self):
+        return self.to_string()
+
+    def to_string(self, verbose: int = 0) -> str:
+        """String representation."""
+        return "%s: npw: %d, mesh: %s, use_rfft: %s, batch_size: %d" % (
+            self.__class__.__name__, self.gsphere.npw, self.mesh.shape, self.use_rfft, self.batch_size)
+
+    def _get_workspace(self, nb: int) -> np.ndarray:
+        """Return [nb, nfft] view of the workspace. Zeros are only set when the array is allocated."""
+        if self._workspace is None or len(self._workspace) < nb:
+            self._workspace = np.zeros((min(nb, self.batch_size), int(np.prod(self.box_shape))), dtype=complex)
+        return self._workspace[:nb]
+
+    def g2r(self, ug) -> np.ndarray:
+        """
+        Transform the array ``ug`` with shape [..., npw] given on the G-sphere to real space.
+        Return array of shape [..., n1, n2, n3]. The array is real if istwfk == 2.
+        """
+        ug = np.asarray(ug)
+        lead_shape = ug.shape[:-1]
+        ug = ug.reshape(-1, self.gsphere.npw)
+        ntrans = len(ug)
+        out = np.empty((ntrans,) + tuple(self.mesh.shape), dtype=float if self.use_rfft else complex)
+
+        if self.use_rfft:
+            ipw, idx, ipw_minus, idx_minus = self.gsphere.get_rfft_indices(self.mesh)
+        else:
+            idx, _ = self.gsphere.get_fft_indices(self.mesh)
+
+        for start in range(0, ntrans, self.batch_size):
+            chunk = ug[start:start + self.batch_size]
+            nb = len(chunk)
+            work = self._get_workspace(nb)
+            if self.use_rfft:
+                work[:, idx_minus] = chunk[:, ipw_minus].conj()
+                work[:, idx] = chunk[:, ipw]
+            else:
+                work[:, idx] = chunk
+            self._transform(work.reshape((nb,) + self.box_shape), out[start:start + nb],
+                            self.mesh.irfft_g2r if self.use_rfft else self.mesh.fft_g2r)
+
+        return out.reshape(lead_shape + tuple(self.mesh.shape))
+
+    def _transform(self, arr, out, func) -> None:
+        """
+        Apply the FFT `func` to the batch `arr` and store the results in `out`.
+        A single call is used for multithreaded FFTs, else the batch is transformed one array at a time
+        as this is more cache-friendly.
+        """
+        if self.mesh.fft_workers > 1:
+            out[...] = func(arr)
+        else:
+            for i in range(len(arr)):
+                out[i] = func(arr[i:i + 1])[0]
+
+    def r2g(self, ur) -> np.ndarray:
+        """
+        Transform the array ``ur`` with shape [..., n1, n2, n3] given in real space to the G-sphere.
+        Return complex array of shape [..., npw].
+        """
+        ur = np.asarray(ur)
+        lead_shape = ur.shape[:-3]
+        ur = self.mesh.reshape(ur)
+        ntrans = len(ur)
+        out = np.empty((ntrans, self.gsphere.npw), dtype=complex)
+
+        if self.use_rfft:
+            ipw, idx, ipw_minus, idx_minus = self.gsphere.get_rfft_indices(self.mesh)
+        else:
+            idx, _ = self.gsphere.get_fft_indices(self.mesh)
+
+        # Note that the workspace used in g2r cannot be used here as its entries outside the sphere must be zero.
+        buf = np.empty((min(ntrans, self.batch_size),) + self.box_shape, dtype=complex)
+        for start in range(0, ntrans, self.batch_size):
+            chunk = ur[start:start + self.batch_size]
+            nb = len(chunk)
+            fg = buf[:nb]
+            if self.use_rfft:
+                self._transform(chunk.real, fg, self.mesh.rfft_r2g)
+                fg = fg.reshape(nb, -1)
+                out[start:start + nb, ipw_minus] = fg[:, idx_minus].conj()
+                out[start:start + nb, ipw] = fg[:, idx]
+            else:
+                self._transform(chunk, fg, self.mesh.fft_r2g)
+                out[start:start + nb] = fg.reshape(nb, -1)[:, idx]
+
+        return out.reshape(lead_shape + (self.gsphere.npw,))
+
+
 #def kpg_sphere(lattice, kcoords, ecut):
 #    """
 #    Set up the list of G vectors inside a sphere out to $ (1/2)*(2*\pi*(k+G))^2=ecut $
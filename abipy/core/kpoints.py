@@ -79,7 +79,7 @@ def set_spglib_tols(symprec, angle_tolerance):
 def is_integer(x, atol=None):
     """
     True if all x is integer within the absolute tolerance atol.
-    Use _ATOL_KDIFF is atol is None.
+    Use _ATOL_KDIFF if atol is None.
 
     >>> assert is_integer([1., 2.])
     >>> assert is_integer(1.01, atol=0.011)
@@ -93,7 +93,7 @@ def is_integer(x, atol=None):
 def issamek(k1, k2, atol=None):
     """
     True if k1 and k2 are equal modulo a lattice vector.
-    Use _ATOL_KDIFF is atol is None.
+    Use _ATOL_KDIFF if atol is None.
 
     >>> assert issamek([1, 1, 1], [0, 0, 0])
     >>> assert issamek([1.1, 1, 1], [0, 0, 0], atol=0.1)
@@ -228,21 +228,21 @@ def map_grid2ibz(structure, ibz, ngkpt, shifts, has_timrev, pbc=False):
         raise ValueError("Multiple shifts are not supported!")
 
     # Extract rotations in reciprocal space (FM part).
-    symrec_fm = [o.rot_g for o in abispg.fm_symmops]
-
+    symrec_fm = np.array([o.rot_g for o in abispg.fm_symmops])
+
+    # Points of the grid are snapped to integer coordinates so that we can use
+    # the flat index of the grid point as hash key.
+    # Compute S k_ibz and TS k_ibz for all the points in the IBZ at once: [nibz, nsym, 3]
+    gp_ibz = np.array(np.rint(np.reshape(ibz, (-1, 3)) * ngkpt), dtype=int)
+    rot_gp = np.einsum("sij,kj->ksi", symrec_fm, gp_ibz)
+    if has_timrev:
+        rot_gp = np.concatenate((rot_gp, -rot_gp), axis=1)
+
+    # Points are processed in order of increasing ik_ibz as in the sequential version.
+    gp_bz = (rot_gp % ngkpt).reshape(-1, 3)
+    ik_ibz = np.repeat(np.arange(len(gp_ibz)), rot_gp.shape[1])
     bzgrid2ibz = -np.ones(ngkpt, dtype=int)
-
-    for ik_ibz, kibz in enumerate(ibz):
-        gp_ibz = np.array(np.rint(kibz * ngkpt), dtype=int)
-        for rot in symrec_fm:
-            # Compute S k_ibz.
-            rot_gp = np.matmul(rot, gp_ibz)
-            gp_bz = rot_gp % ngkpt
-            bzgrid2ibz[gp_bz[0], gp_bz[1], gp_bz[2]] = ik_ibz
-            if has_timrev:
-                # Compute TS k_ibz.
-                gp_bz = (-rot_gp) % ngkpt
-                bzgrid2ibz[gp_bz[0], gp_bz[1], gp_bz[2]] = ik_ibz
+    bzgrid2ibz[gp_bz[:, 0], gp_bz[:, 1], gp_bz[:, 2]] = ik_ibz
     if pbc:
         # Add periodic replicas.
         bzgrid2ibz = add_periodic_replicas(bzgrid2ibz)
@@ -306,6 +306,72 @@ def kptopt2str(kptopt, verbose=0):
     return t[0] if verbose == 0 else t[0] + "\n" + t[1]
 
 
+def _wrap_to_unit_cell(frac_coords) -> np.ndarray:
+    """Wrap reduced coordinates in the [0, 1[ interval."""
+    frac_coords = np.asarray(frac_coords, dtype=float)
+    frac_coords = frac_coords - np.floor(frac_coords)
+    # Handle rounding errors e.g. -1e-20 % 1 --> 1.0
+    frac_coords[frac_coords >= 1.0] = 0.0
+    return frac_coords
+
+
+def find_kpoint_images(kpoints, ref_kpoints, symrecs, has_timrev, atol=None) -> tuple:
+    """
+    Vectorized search of the symmetry operation connecting ``kpoints`` to ``ref_kpoints``
+    i.e. ``k = T S k_ref + G0``. All the reference points are rotated at once and the images
+    are matched with a KD-tree with periodic boundary conditions so that the cost
+    scales as (nk + nref * nsym) * log(nref * nsym) instead of nk * nref * nsym.
+
+    If more than one image matches, the first one in the order (ik_ref, tsign, isym) is selected
+    with tsign in (1, -1). This is the same order used by the sequential algorithm.
+
+    Args:
+        kpoints: [nk, 3] array with reduced coordinates.
+        ref_kpoints: [nref, 3] array with the reference points in reduced coordinates.
+        symrecs: [nsym, 3, 3] array with symmetry operations in reciprocal space.
+        has_timrev: True if time-reversal can be used.
+        atol: Absolute tolerance for the components of k - T S k_ref - G0. Use _ATOL_KDIFF if atol is None.
+
+    Return:
+        (ik_ref, tsign, isym, g0) arrays. ik_ref[i] is -1 if the i-th point does not have any image.
+    """
+    from scipy.spatial import cKDTree
+    if atol is None: atol = _ATOL_KDIFF
+
+    kpoints = np.reshape(np.asarray(kpoints, dtype=float), (-1, 3))
+    ref_kpoints = np.reshape(np.asarray(ref_kpoints, dtype=float), (-1, 3))
+    symrecs = np.reshape(np.asarray(symrecs), (-1, 3, 3))
+    tsigns = np.array((1, -1) if has_timrev else (1,))
+    nsym, nts, nk = len(symrecs), len(tsigns), len(kpoints)
+
+    ik_ref = -np.ones(nk, dtype=int)
+    tsign = np.zeros(nk, dtype=int)
+    isym = -np.ones(nk, dtype=int)
+    g0 = np.zeros((nk, 3), dtype=int)
+    if nk == 0 or len(ref_kpoints) == 0:
+        return ik_ref, tsign, isym, g0
+
+    # Images T S k_ref with shape [nref, nts, nsym, 3] --> flat index = (ik_ref * nts + its) * nsym + isym
+    krots = tsigns[None, :, None, None] * np.einsum("sij,kj->ksi", symrecs, ref_kpoints)[:, None]
+    krots = krots.reshape(-1, 3)
+
+    # Use the max norm so that atol is the tolerance on each component.
+    tree = cKDTree(_wrap_to_unit_cell(krots), boxsize=1.0)
+    matches = tree.query_ball_point(_wrap_to_unit_cell(kpoints), r=atol, p=np.inf)
+
+    found = np.array([len(m) > 0 for m in matches], dtype=bool)
+    if not np.any(found):
+        return ik_ref, tsign, isym, g0
+
+    iflat = np.array([min(m) for m in matches if m], dtype=int)
+    ik_ref[found], rest = np.divmod(iflat, nts * nsym)
+    its, isym[found] = np.divmod(rest, nsym)
+    tsign[found] = tsigns[its]
+    g0[found] = np.rint(kpoints[found] - krots[iflat]).astype(int)
+
+    return ik_ref, tsign, isym, g0
+
+
 def map_kpoints(other_kpoints, other_lattice, ref_lattice, ref_kpoints, ref_symrecs, has_timrev):
     """
     Build mapping between a list of k-points in reduced coordinates (``other_kpoints``)
@@ -337,33 +403,22 @@ def map_kpoints(other_kpoints, other_lattice, ref_lattice, ref_kpoints, ref_symr
 
             kpt_other = TS kpt_ref + G0
     """
-    ref_gprimd_inv = np.inv(np.asarray(ref_lattice).T)
+    ref_gprimd_inv = np.linalg.inv(np.asarray(ref_lattice).T)
     other_gprimd = np.asarray(other_lattice).T
     other_kpoints = np.asarray(other_kpoints).reshape((-1, 3))
     ref_kpoints = np.asarray(ref_kpoints).reshape((-1, 3))
-    o2r_map = len(other_kpoints) * [None]
 
-    tsigns = (1, -1) if has_timrev else (1,)
-    kmap = collections.namedtuple("kmap", "ik_ref, tsign, isym, g0")
+    # Get other k-points in reduced coordinates in the reference lattice.
+    okpts_red = np.matmul(other_kpoints, np.matmul(ref_gprimd_inv, other_gprimd).T)
 
-    for ik_oth, okpt in enumerate(other_kpoints):
-        # Get other k-point in reduced coordinates in the reference lattice.
-        okpt_red = np.matmul(ref_gprimd_inv, np.matmul(other_gprimd, okpt))
-
-        # k_other = TS k_ref + G0
-        found = False
-        for ik_ref, kref in enumerate(ref_kpoints):
-            if found: break
-            for tsign in tsigns:
-                for isym, symrec in enumerate(ref_symrecs):
-                    krot = tsign * np.matmul(symrec, kref)
-                    if issamek(okpt_red, krot):
-                        g0 = np.rint(okpt_red - krot)
-                        o2r_map[ik_oth] = kmap(ik_ref, tsign, isym, g0)
-                        found = True
-                        break
+    # k_other = TS k_ref + G0
+    ik_ref, tsign, isym, g0 = find_kpoint_images(okpts_red, ref_kpoints, ref_symrecs, has_timrev)
 
-        return o2r_map, o2r_map.count(None)
+    kmap = collections.namedtuple("kmap", "ik_ref, tsign, isym, g0")
+    o2r_map = [kmap(int(ik_ref[i]), int(tsign[i]), int(isym[i]), g0[i]) if ik_ref[i] != -1 else None
+               for i in range(len(other_kpoints))]
+
+    return o2r_map, o2r_map.count(None)
 
 
 #def find_irred_kpoints_kmesh(structure, kfrac_coords):
@@ -463,41 +518,28 @@ def find_irred_kpoints_generic(structure, kfrac_coords, verbose=1):
     Return:
         irred_map: Index of the i-th irreducible k-point in the input kfrac_coords array.
 
-    .. warning::
+    .. note::
 
-        In the worst case, the algorithm scales as nkpt ** 2 * nsym.
-        hence this routine should be used only if ``kfrac_coords`` represents
-        e.g. a path in the Brillouin zone or an arbitrary set of points.
+        The images of all the k-points are computed at once and matched with a KD-tree
+        hence the algorithm scales as nkpt * nsym * log(nkpt * nsym).
     """
     start = time.time()
-    print("Removing redundant k-points. This is gonna take a while... ")
-
-    # Wrap points in [0,1[ interval.
-    uc_kcoords = np.reshape(kfrac_coords, (-1, 3)) % 1
-
-    irred_map = collections.deque()
-    irred_map.append(0)
-    kpts2irred = collections.deque()
-    kpts2irred.append((0, 0, +1))
-
-    for ik, kk in enumerate(uc_kcoords[1:]):
-        ik += 1
-        found = False
-        for ik_irr in irred_map:
-            kirr = kfrac_coords[ik_irr]
-            for isym, symmop in enumerate(structure.abi_spacegroup):
-                krot = symmop.rotate_k(kirr)
-                if issamek(krot, kk):
-                    found = True
-                    #kpts2irred[ik] = (ik_irr, isym, symmops.time_sign)
-                    break
-
-        if not found:
-            irred_map.append(ik)
-
-    print("Completed in", time.time() - start, "[s]")
+    kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
+    nkpt = len(kfrac_coords)
+
+    # Rotation matrices in reciprocal space including the time-reversal sign.
+    symrecs = np.array([symmop.rot_g * symmop.time_sign for symmop in structure.abi_spacegroup])
+
+    # Symmetry-equivalent points form equivalence classes and the irreducible points are the ones
+    # with the smallest index in their class (same result as the sequential algorithm in which
+    # the i-th point is added to the list if it is not the image of a previous irreducible point).
+    # For each k-point, find the smallest index j such that k_i = S k_j + G0.
+    ik_min = find_kpoint_images(kfrac_coords, kfrac_coords, symrecs, has_timrev=False)[0]
+    irred_map = np.nonzero(ik_min == np.arange(nkpt))[0]
+
     if verbose:
-        print("Entered with ", len(uc_kcoords), "k-points")
+        print("Removing redundant k-points completed in", time.time() - start, "[s]")
+        print("Entered with ", nkpt, "k-points")
         print("Found ", len(irred_map), "irred k-points")
 
     return dict2namedtuple(irred_map=np.array(irred_map, dtype=int))
@@ -1210,7 +1252,7 @@ class KpointList(collections.abc.Sequence):
         Args:
             qpt: q-point in fractional coordinate or :class:`Kpoint` instance.
             atol_kdiff: Tolerance used to compare k-points.
-                Use _ATOL_KDIFF is atol is None.
+                Use _ATOL_KDIFF if atol is None.
         """
         if atol_kdiff is None: atol_kdiff = _ATOL_KDIFF
         if isinstance(qpt, Kpoint):
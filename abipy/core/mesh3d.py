@@ -2,13 +2,23 @@
 """This module contains the class defining Uniform 3D meshes."""
 from __future__ import annotations
 
+import os
 import numpy as np
 
 #from itertools import product as iproduct
 from monty.functools import lazy_property
 #from numpy.random import random
-from numpy.fft import fftn, ifftn, fftshift, ifftshift, fftfreq
+from numpy.fft import fftshift, ifftshift, fftfreq
 from abipy.tools import duck
+from abipy.tools.parallel import get_max_nprocs
+
+try:
+    # Use pyFFTW if available. Plans are cached and reused by the interface.
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft as _fft
+    pyfftw.interfaces.cache.enable()
+except ImportError:
+    import scipy.fft as _fft
 
 
 __all__ = [
@@ -16,6 +26,31 @@ __all__ = [
 ]
 
 
+# Number of threads used for the FFTs. Can be changed with the ABIPY_FFT_WORKERS env variable or set_fft_workers.
+_FFT_WORKERS = int(os.environ.get("ABIPY_FFT_WORKERS", 1))
+
+
+def get_fft_workers() -> int:
+    """
+    Return the number of threads used for the FFTs.
+    """
+    return _FFT_WORKERS
+
+
+def set_fft_workers(nworkers: int | None) -> int:
+    """
+    Set the number of threads used for the FFTs.
+    If nworkers is None, the max number of procs that can be used by AbiPy is used.
+    """
+    global _FFT_WORKERS
+    if nworkers is None:
+        _FFT_WORKERS = get_max_nprocs()
+    else:
+        _FFT_WORKERS = max(1, int(nworkers))
+
+    return _FFT_WORKERS
+
+
 class Mesh3D:
     r"""
     Descriptor-class for uniform 3D meshes.
@@ -191,6 +226,11 @@ class Mesh3D:
         #shape = extra_dims + self.shape)
         return np.reshape(arr, (-1,) + self.shape)
 
+    @property
+    def fft_workers(self) -> int:
+        """Number of threads used for the FFTs. See set_fft_workers."""
+        return _FFT_WORKERS
+
     def fft_r2g(self, fr, shift_fg=False) -> np.ndarray:
         """
         FFT of array ``fr`` given in real space.
@@ -203,19 +243,19 @@ class Mesh3D:
 
         elif ndim == 3:
             assert self.size == np.prod(shape[-3:])
-            fg = fftn(fr)
+            fg = _fft.fftn(fr, norm="forward", workers=self.fft_workers)
             if shift_fg: fg = fftshift(fg)
 
         elif ndim > 3:
             assert self.size == np.prod(shape[-3:])
-            axes = np.arange(ndim)[-3:]
-            fg = fftn(fr, axes=axes)
+            axes = tuple(range(ndim - 3, ndim))
+            fg = _fft.fftn(fr, axes=axes, norm="forward", workers=self.fft_workers)
             if shift_fg: fg = fftshift(fg, axes=axes)
 
         else:
             raise NotImplementedError("ndim < 3 are not supported")
 
-        return fg / self.size
+        return fg
 
     def fft_g2r(self, fg, fg_ishifted=False) -> np.ndarray:
         """
@@ -230,18 +270,34 @@ class Mesh3D:
         if ndim == 3:
             assert self.size == np.prod(shape[-3:])
             if fg_ishifted: fg = ifftshift(fg)
-            fr = ifftn(fg)
+            fr = _fft.ifftn(fg, norm="forward", workers=self.fft_workers)
 
         elif ndim > 3:
             assert self.size == np.prod(shape[-3:])
-            axes = np.arange(ndim)[-3:]
+            axes = tuple(range(ndim - 3, ndim))
             if fg_ishifted: fg = ifftshift(fg, axes=axes)
-            fr = ifftn(fg, axes=axes)
+            fr = _fft.ifftn(fg, axes=axes, norm="forward", workers=self.fft_workers)
 
         else:
             raise NotImplementedError("ndim < 3 are not supported")
 
-        return fr * self.size
+        return fr
+
+    def rfft_r2g(self, fr) -> np.ndarray:
+        """
+        Real-to-complex FFT of the real array ``fr`` with shape [..., nx, ny, nz].
+        Return array with shape [..., nx, ny, nz // 2 + 1] with the G-vectors along z
+        in [0, nz // 2]. The other half is given by f(-G) = f(G)^*.
+        """
+        assert fr.ndim >= 3 and self.size == np.prod(fr.shape[-3:])
+        return _fft.rfftn(fr, axes=(-3, -2, -1), norm="forward", workers=self.fft_workers)
+
+    def irfft_g2r(self, fg) -> np.ndarray:
+        """
+        Complex-to-real FFT of the array ``fg`` with shape [..., nx, ny, nz // 2 + 1]
+        i.e. the inverse of ``rfft_r2g``. Return real array with shape [..., nx, ny, nz].
+        """
+        return _fft.irfftn(fg, s=self.shape, axes=(-3, -2, -1), norm="forward", workers=self.fft_workers)
 
     #def fourier_interp(self, data, new_mesh, inspace="r"):
     #    """
@@ -6,18 +6,18 @@ For the theoretical background see :cite:`Euwema1969,Koelling1986,Pickett1988,Ma
 from __future__ import annotations
 
 import abc
-import itertools
 import pickle
 import numpy as np
 import scipy
 import time
 
-from collections import deque, OrderedDict
+from collections import OrderedDict
 #from typing import
 from monty.termcolor import cprint
 from monty.collections import dict2namedtuple
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt
-from abipy.tools.numtools import gaussian, find_degs_sk
+from abipy.tools.numtools import broadened_dos, find_degs_sk
+from abipy.tools.diskcache import DiskCache, hash_key
 from abipy.core.kpoints import Kpath
 from abipy.core.symmetries import mati3inv
 
@@ -38,6 +38,40 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
     # Disable cache
     use_cache = True
 
+    # Persistent cache shared by all the instances. None if disabled. See enable_disk_cache.
+    disk_cache = None
+
+    @classmethod
+    def enable_disk_cache(cls, topdir=None, max_nbytes=1024 ** 3) -> DiskCache:
+        """
+        Activate the persistent cache for interpolated energies and DOS.
+        Results are stored in npz format and keyed by a hash of the input data so that they
+        can be reused across python sessions.
+
+        Args:
+            topdir: Top-level directory of the cache. If None, $ABIPY_CACHE_DIR or ~/.abinit/abipy/cache is used.
+            max_nbytes: Max size of the cache in bytes. Least recently used entries are removed first.
+        """
+        ElectronInterpolator.disk_cache = DiskCache("skw", topdir=topdir, max_nbytes=max_nbytes)
+        return ElectronInterpolator.disk_cache
+
+    @classmethod
+    def disable_disk_cache(cls, clear=False) -> None:
+        """Deactivate the persistent cache. Remove all the entries if `clear`."""
+        if clear and ElectronInterpolator.disk_cache is not None:
+            ElectronInterpolator.disk_cache.clear()
+        ElectronInterpolator.disk_cache = None
+
+    def _get_disk_key(self, *args) -> str | None:
+        """
+        Return the key used to store results in the persistent cache.
+        None if the cache is disabled or the object does not provide `content_hash`.
+        """
+        if self.disk_cache is None or not self.use_cache: return None
+        content_hash = getattr(self, "content_hash", None)
+        if content_hash is None: return None
+        return hash_key(content_hash, *args)
+
     @classmethod
     def pickle_load(cls, filepath: str):
         """Loads the object from a pickle file."""
@@ -196,6 +230,10 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         Returns:
             (mesh, values, integral)
         """
+        disk_key = self._get_disk_key("edos", kmesh, is_shift, method, step, width, wmesh)
+        if disk_key is not None and (d := self.disk_cache.load_arrays(disk_key)) is not None:
+            return dict2namedtuple(mesh=d["mesh"], values=d["values"], integral=d["integral"])
+
         k = self.get_sampling(kmesh, is_shift)
 
         # Interpolate eigenvalues in the IBZ.
@@ -209,12 +247,10 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         nw = len(wmesh)
         values = np.zeros((self.nsppol, nw))
 
-        # TODO: Write cython version.
         if method == "gaussian":
             for spin in range(self.nsppol):
-                for ik, wtk in enumerate(k.weights):
-                    for band in range(self.nband):
-                        values[spin] += wtk * gaussian(wmesh, width, center=eigens[spin, ik, band])
+                values[spin] = broadened_dos(wmesh, eigens[spin], width,
+                                             weights=np.broadcast_to(k.weights[:, None], eigens[spin].shape))
 
             # Compute IDOS
             try :
@@ -227,6 +263,9 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
         else:
             raise ValueError("Method %s is not supported" % method)
 
+        if disk_key is not None:
+            self.disk_cache.save_arrays(disk_key, mesh=wmesh, values=values, integral=integral)
+
         return dict2namedtuple(mesh=wmesh, values=values, integral=integral)
         #return ElectronDos(wmesh, values, integral, is_shift, method, step, width)
 
@@ -665,7 +704,38 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
             gradient and hessian are set to None if not computed.
         """
         start = time.time()
+        kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
+
+        disk_key = self._get_disk_key("interp_kpts", kfrac_coords, dk1, dk2)
+        if disk_key is not None and (d := self.disk_cache.load_arrays(disk_key)) is not None:
+            return dict2namedtuple(eigens=d["eigens"], dedk=d.get("dedk"), dedk2=d.get("dedk2"))
+
+        new_eigens, dedk, dedk2 = self.eval_kpts(kfrac_coords, dk1=dk1, dk2=dk2)
 
+        if disk_key is not None:
+            self.disk_cache.save_arrays(disk_key, eigens=new_eigens, dedk=dedk, dedk2=dedk2)
+
+        if self.verbose:
+            print("Interpolation completed in %.3f (s)" % (time.time() - start))
+
+        return dict2namedtuple(eigens=new_eigens, dedk=dedk, dedk2=dedk2)
+
+    def eval_kpts(self, kfrac_coords, dk1=False, dk2=False, chunksize=None) -> tuple:
+        """
+        Interpolate eigenvalues for all spins and bands on a set of k-points.
+        This is the reference implementation based on `eval_sk` that loops over k-points.
+        Subclasses may provide a batched version.
+
+        Args:
+            kfrac_coords: [nk, 3] array with k-points in reduced coordinates.
+            dk1 (bool): True if gradient is wanted.
+            dk2 (bool): True to compute 2nd order derivatives.
+            chunksize: Ignored in the reference implementation.
+
+        Return:
+            (eigens[nsppol, nk, nband], dedk[nsppol, nk, nband, 3], dedk2[nsppol, nk, nband, 3, 3])
+            dedk and dedk2 are set to None if not computed.
+        """
         kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
         new_nkpt = len(kfrac_coords)
         new_eigens = np.empty((self.nsppol, new_nkpt, self.nband))
@@ -680,10 +750,7 @@ class ElectronInterpolator(metaclass=abc.ABCMeta):
                 if dk2: der2 = dedk2[spin, ik]
                 new_eigens[spin, ik] = self.eval_sk(spin, newk, der1=der1, der2=der2)
 
-        if self.verbose:
-            print("Interpolation completed in %.3f (s)" % (time.time() - start))
-
-        return dict2namedtuple(eigens=new_eigens, dedk=dedk, dedk2=dedk2)
+        return new_eigens, dedk, dedk2
 
     def interp_kpts_and_enforce_degs(self, kfrac_coords, ref_eigens, atol=1e-4):
         """
@@ -723,8 +790,42 @@ class SkwInterpolator(ElectronInterpolator):
     but the same object can be used to interpolate other quantities. Just set the first dimension to 1.
     """
 
+    # Max memory in bytes used for the star functions when interpolating blocks of k-points.
+    max_chunk_nbytes = 256 * 1024 ** 2
+
+    @staticmethod
+    def get_content_hash(lpratio, kpts, eigens, fermie, nelect, cell, symrel, has_timrev, filter_params=None) -> str:
+        """
+        Return string with the hash of the input data. Used as key for the persistent cache.
+        """
+        return hash_key("SkwInterpolator", int(lpratio), np.asarray(kpts, dtype=float), np.asarray(eigens),
+                        float(fermie), float(nelect), [np.asarray(c) for c in cell],
+                        np.asarray(symrel, dtype=int), bool(has_timrev), filter_params)
+
+    @classmethod
+    def from_disk_cache(cls, lpratio, kpts, eigens, fermie, nelect, cell, symrel, has_timrev,
+                        filter_params=None, verbose=1, nprocs=1) -> SkwInterpolator:
+        """
+        Same signature as the constructor. Return the interpolator stored in the persistent cache
+        if available, else build a new object and save it in the cache.
+        Equivalent to the constructor if the persistent cache is disabled.
+        """
+        args = (lpratio, kpts, eigens, fermie, nelect, cell, symrel, has_timrev)
+        if cls.disk_cache is None:
+            return cls(*args, filter_params=filter_params, verbose=verbose, nprocs=nprocs)
+
+        key = cls.get_content_hash(*args, filter_params=filter_params)
+        new = cls.disk_cache.load_object(key)
+        if new is not None and isinstance(new, cls):
+            new.verbose, new.nprocs = verbose, nprocs
+            return new
+
+        new = cls(*args, filter_params=filter_params, verbose=verbose, nprocs=nprocs)
+        cls.disk_cache.save_object(key, new)
+        return new
+
     def __init__(self, lpratio, kpts, eigens, fermie, nelect, cell, symrel, has_timrev,
-                 filter_params=None, verbose=1):
+                 filter_params=None, verbose=1, nprocs=1):
         """
         Args:
             lpratio: Ratio between the number of star-functions and the number of ab-initio k-points.
@@ -743,8 +844,12 @@ class SkwInterpolator(ElectronInterpolator):
             filter_params: List with parameters used to filter high-frequency components (Eq 9 of PhysRevB.61.1639)
                 First item gives rcut, second item sigma. Ignored if None.
             verbose: Verbosity level.
+            nprocs: Number of threads used to generate the star functions. None to use all the available procs.
         """
         self.verbose = verbose
+        self.nprocs = nprocs
+        self.content_hash = self.get_content_hash(lpratio, kpts, eigens, fermie, nelect, cell, symrel,
+                                                  has_timrev, filter_params=filter_params)
         self.cell = cell
         lattice = self.cell[0]
         self.original_fermie = fermie
@@ -790,7 +895,9 @@ class SkwInterpolator(ElectronInterpolator):
                 break
             else:
                 print("rmax: ", rmax," was not large enough to find", nrwant, "R-star points.")
-                rmax *= 2
+                # The number of stars scales with the volume of the sphere.
+                fact = 1.1 * (nrwant / max(self.nr, 1)) ** (1/3.)
+                rmax = np.maximum(rmax + 1, np.ceil(rmax * fact).astype(int))
                 print("Will try again with enlarged rmax:", rmax)
 
         print("Using:", self.nr, "star-functions. nstars/nk:", self.nr / self.nkpt)
@@ -802,9 +909,7 @@ class SkwInterpolator(ElectronInterpolator):
 
         # Construct star functions for the ab-initio k-points.
         nsppol, nband, nkpt, nr = self.nsppol, self.nband, self.nkpt, self.nr
-        self.skr = np.empty((nkpt, nr), dtype=complex)
-        for ik, kpt in enumerate(kpts):
-            self.skr[ik] = self.get_stark(kpt)
+        self.skr = self.get_stark_kpts(kpts)[0]
 
         # Build H(k,k') matrix (Hermitian)
         hmat = np.empty((nkpt-1, nkpt-1), dtype=complex)
@@ -871,9 +976,10 @@ class SkwInterpolator(ElectronInterpolator):
 
         # Compare ab-initio data with interpolated results.
         mae = 0.0
+        skw_eigens = self.eval_kpts(kpts)[0]
         for spin in range(nsppol):
             for ik, kpt in enumerate(kpts):
-                skw_eb = self.eval_sk(spin, kpt)
+                skw_eb = skw_eigens[spin, ik]
                 mae += np.abs(eigens[spin, ik] - skw_eb).sum()
                 if self.verbose >= 10:
                     # print interpolated eigenvales
@@ -944,7 +1050,7 @@ class SkwInterpolator(ElectronInterpolator):
                     value = np.matmul(self.coefs[spin, :, :], skr_dk2[ii,jj])
                     if not self.iscomplexobj: value = value.real
                     der2[:, ii, jj] = value
-                    if ii != jj: der2[jj, ii] = der2[ii, jj]
+                    if ii != jj: der2[:, jj, ii] = der2[:, ii, jj]
 
         return oeigs
 
@@ -1050,26 +1156,163 @@ class SkwInterpolator(ElectronInterpolator):
             Complex numpy array of shape [3, 3, self.nr] with the 2nd-order derivatives
             of the star function wrt k in reduced coordinates.
         """
-        srk_dk2 = np.zeros((3, 3, self.nr), dtype=complex)
-        raise NotImplementedError()
-        #work = zero
-        #do isym=1,self.ptg_nsym
-        #   sk = two_pi * matmul(transpose(self%ptg_symrel(:,:,isym)), kpt)
-        #   do ir=1,self%nr
-        #     sr = matmul(self%ptg_symrel(:,:,isym), self%rpts(:,ir))
-        #     eiskr = exp(j_dpc * dot_product(sk, self%rpts(:,ir)))
-        #     do jj=1,3
-        #        do ii=1,jj
-        #            work(ii,jj,ir) = work(ii,jj,ir) + eiskr * sr(ii) * sr(jj)
-
-        #work = - work / self.ptg_nsym
-
-        #do jj=1,3
-        #   do ii=1,jj
-        #       srk_dk2(:, ii, jj) = work(ii, jj, :)
-        #       if (ii /= jj) srk_dk2(:,jj,ii) = work(:,ii,jj)
-
-        return srk_dk2
+        return self.get_stark_kpts(kpt, dk2=True)[2][0]
+
+    @property
+    def srpts(self) -> np.ndarray:
+        """
+        [nsym, nr, 3] table with the rotated lattice vectors S R used to build the star functions.
+        Computed once and reused for all k-points. If the point group contains the inversion,
+        only one operation for each (S, -S) pair is stored, see `srpts_has_inversion`.
+        """
+        srpts = getattr(self, "_srpts", None)
+        if srpts is None or srpts.shape[1] != self.nr:
+            # Keep one representative for each (S, -S) pair if the point group is closed under inversion.
+            keys = [tuple(rot.ravel()) for rot in self.ptg_symrel]
+            has_inv = all(tuple(-rot.ravel()) in keys for rot in self.ptg_symrel)
+            rots = self.ptg_symrel
+            if has_inv:
+                seen, rots = set(), []
+                for rot, key in zip(self.ptg_symrel, keys):
+                    if tuple(-rot.ravel()) in seen: continue
+                    seen.add(key)
+                    rots.append(rot)
+                rots = np.array(rots)
+
+            # S R for all symmetries and all R-points: [nsym, 3, 3] x [3, nr] --> [nsym, nr, 3]
+            srpts = np.ascontiguousarray(np.matmul(rots, self.rpts.T).transpose(0, 2, 1), dtype=float)
+            self._srpts, self._srpts_has_inversion = srpts, has_inv
+
+        return srpts
+
+    @property
+    def srpts_has_inversion(self) -> bool:
+        """True if `srpts` contains only one operation for each (S, -S) pair."""
+        self.srpts
+        return self._srpts_has_inversion
+
+    def get_chunksize(self, dk1=False, dk2=False, max_nbytes=None) -> int:
+        """
+        Return the number of k-points that can be treated in a single block
+        so that the star-function workspace does not exceed `max_nbytes`.
+        """
+        max_nbytes = self.max_chunk_nbytes if max_nbytes is None else max_nbytes
+        ncomp = 1 + (3 if dk1 else 0) + (9 if dk2 else 0)
+        # Complex star functions + real phases.
+        nbytes_per_kpt = self.nr * (16 * ncomp + 8)
+        return max(1, int(max_nbytes // nbytes_per_kpt))
+
+    def get_stark_kpts(self, kpts, dk1=False, dk2=False) -> tuple:
+        """
+        Compute the star functions and, optionally, their derivatives wrt k
+        for a set of k-points. Uses the precomputed table `srpts` so that the inner kernel
+        reduces to one [nk, 3] x [3, nr] product per symmetry.
+
+        Args:
+            kpts: [nk, 3] array with k-points in reduced coordinates.
+            dk1 (bool): True if 1st-order derivatives are wanted.
+            dk2 (bool): True if 2nd-order derivatives are wanted.
+
+        Return:
+            (skr[nk, nr], skr_dk1[nk, 3, nr], skr_dk2[nk, 3, 3, nr])
+            skr_dk1 and skr_dk2 are set to None if not computed.
+        """
+        kpts = np.reshape(np.asarray(kpts, dtype=float), (-1, 3))
+        nk, nr = len(kpts), self.nr
+        two_pi_kpts = 2.0 * np.pi * kpts
+        srpts, has_inv = self.srpts, self.srpts_has_inversion
+
+        # exp(i Sk.R) = exp(i k.SR) = cos + i sin. If the point group contains the inversion,
+        # the contributions of (S, -S) are summed analytically and only half of the terms survive:
+        # the star function and all its derivatives are real.
+        re_skr = np.zeros((nk, nr))
+        im_skr = None if has_inv else np.zeros((nk, nr))
+        re_dk1 = None if not dk1 else np.zeros((nk, 3, nr))
+        im_dk1 = None if (not dk1 or has_inv) else np.zeros((nk, 3, nr))
+        re_dk2 = None if not dk2 else np.zeros((nk, 3, 3, nr))
+        im_dk2 = None if (not dk2 or has_inv) else np.zeros((nk, 3, 3, nr))
+
+        for sr in srpts:
+            phase = np.matmul(two_pi_kpts, sr.T)
+            cos_p = np.cos(phase)
+            sin_p = np.sin(phase) if (dk1 or not has_inv) else None
+            re_skr += cos_p
+            if not has_inv: im_skr += sin_p
+
+            if dk1:
+                # d/dk exp(i k.SR) = i SR exp(i k.SR)
+                re_dk1 -= sin_p[:, None, :] * sr.T[None, :, :]
+                if not has_inv: im_dk1 += cos_p[:, None, :] * sr.T[None, :, :]
+
+            if dk2:
+                # d2/dk2 exp(i k.SR) = - SR SR exp(i k.SR)
+                for jj in range(3):
+                    for ii in range(jj + 1):
+                        srr = sr[:, ii] * sr[:, jj]
+                        re_dk2[:, ii, jj] -= cos_p * srr
+                        if not has_inv: im_dk2[:, ii, jj] -= sin_p * srr
+
+        fact = (2.0 if has_inv else 1.0) / self.ptg_nsym
+        skr = fact * (re_skr if im_skr is None else re_skr + 1j * im_skr)
+        skr_dk1, skr_dk2 = None, None
+
+        if dk1:
+            skr_dk1 = fact * (re_dk1 if im_dk1 is None else re_dk1 + 1j * im_dk1)
+        if dk2:
+            for jj in range(3):
+                for ii in range(jj):
+                    re_dk2[:, jj, ii] = re_dk2[:, ii, jj]
+                    if im_dk2 is not None: im_dk2[:, jj, ii] = im_dk2[:, ii, jj]
+            skr_dk2 = fact * (re_dk2 if im_dk2 is None else re_dk2 + 1j * im_dk2)
+
+        return skr, skr_dk1, skr_dk2
+
+    def eval_kpts(self, kfrac_coords, dk1=False, dk2=False, chunksize=None) -> tuple:
+        """
+        Batched interpolation of eigenvalues for all spins and bands on a set of k-points.
+        Optionally compute gradients and Hessian matrices.
+        K-points are processed in blocks of `chunksize` points to bound the memory
+        required by the star functions and results are obtained with matrix-matrix products.
+
+        Args:
+            kfrac_coords: [nk, 3] array with k-points in reduced coordinates.
+            dk1 (bool): True if gradient is wanted.
+            dk2 (bool): True to compute 2nd order derivatives.
+            chunksize: Number of k-points per block. If None, use `get_chunksize`.
+
+        Return:
+            (eigens[nsppol, nk, nband], dedk[nsppol, nk, nband, 3], dedk2[nsppol, nk, nband, 3, 3])
+            dedk and dedk2 are set to None if not computed.
+        """
+        kfrac_coords = np.reshape(kfrac_coords, (-1, 3))
+        nk, nband = len(kfrac_coords), self.nband
+        if chunksize is None: chunksize = self.get_chunksize(dk1=dk1, dk2=dk2)
+
+        dtype = complex if self.iscomplexobj else float
+        new_eigens = np.empty((self.nsppol, nk, nband), dtype=dtype)
+        dedk = None if not dk1 else np.empty((self.nsppol, nk, nband, 3), dtype=dtype)
+        dedk2 = None if not dk2 else np.empty((self.nsppol, nk, nband, 3, 3), dtype=dtype)
+
+        def _set(out, value):
+            out[...] = value if self.iscomplexobj else value.real
+
+        for start in range(0, nk, chunksize):
+            stop = min(start + chunksize, nk)
+            nc = stop - start
+            skr, skr_dk1, skr_dk2 = self.get_stark_kpts(kfrac_coords[start:stop], dk1=dk1, dk2=dk2)
+
+            for spin in range(self.nsppol):
+                # [NB, NR] x [NR, NK] --> [NK, NB]
+                coefs_t = self.coefs[spin].T
+                _set(new_eigens[spin, start:stop], np.matmul(skr, coefs_t))
+                if dk1:
+                    value = np.matmul(np.reshape(skr_dk1, (nc * 3, self.nr)), coefs_t)
+                    _set(dedk[spin, start:stop], np.reshape(value, (nc, 3, nband)).transpose(0, 2, 1))
+                if dk2:
+                    value = np.matmul(np.reshape(skr_dk2, (nc * 9, self.nr)), coefs_t)
+                    _set(dedk2[spin, start:stop], np.reshape(value, (nc, 3, 3, nband)).transpose(0, 3, 1, 2))
+
+        return new_eigens, dedk, dedk2
 
     #def find_stationary_points(self, kmesh, bstart=None, bstop=None, is_shift=None)
     #    k = self.get_sampling(kmesh, is_shift)
@@ -1089,107 +1332,97 @@ class SkwInterpolator(ElectronInterpolator):
 
     #    return results
 
-    def _find_rstar_gen(self, nrwant, rmax) -> tuple:
+    def _find_rstar_gen(self, nrwant, rmax, nprocs=None) -> tuple:
         """
-        Find all lattice points generating the stars inside the supercell defined by `rmax`
+        Find all lattice points generating the stars inside the supercell defined by `rmax`.
+        Only the shells contained in the sphere inscribed in the supercell are considered
+        so that all the stars are complete.
+
+        Each star is identified by the smallest integer key obtained by hashing
+        the rotated vectors S R so that the search is vectorized over the lattice points
+        and only requires one loop over the operations of the point group.
 
         Args:
             nrwant: Number of star-functions required.
             rmax: numpy array with the maximum number of cells along the 3 reduced directions.
+            nprocs: Number of threads used to compute the keys. If None, use `self.nprocs`.
 
         Returns:
             tuple: (rpts, r2vals, ok)
         """
-        msize = (2 * rmax + 1).prod()
-        rtmp = np.empty((msize, 3), dtype=int)
-        r2tmp = np.empty(msize)
+        rmax = np.asarray(rmax, dtype=int)
+        nprocs = getattr(self, "nprocs", 1) if nprocs is None else nprocs
+        msize = int((2 * rmax + 1).prod())
         if self.verbose: print("rmax", rmax, "msize:", msize)
+        timings, nbytes = OrderedDict(), OrderedDict()
 
         start = time.time()
-        for cnt, l in enumerate(itertools.product(range(-rmax[0], rmax[0] + 1),
-                                                  range(-rmax[1], rmax[1] + 1),
-                                                  range(-rmax[2], rmax[2] + 1))):
-            rtmp[cnt] = l
-            r2tmp[cnt] = np.dot(l, np.matmul(self.rmet, l))
-
-        if self.verbose: print("gen points", time.time() - start)
-
+        rtmp = np.indices(2 * rmax + 1).reshape(3, -1).T - rmax
+        r2tmp = np.einsum("ri,ij,rj->r", rtmp, self.rmet, rtmp)
+
+        # Radius of the sphere inscribed in the supercell: shells inside are complete.
+        gmet = np.linalg.inv(self.rmet)
+        r2_safe = np.min(rmax ** 2 / np.diag(gmet)) * (1 + 1e-8)
+        inside = r2tmp <= r2_safe
+        rtmp, r2tmp = rtmp[inside], r2tmp[inside]
+
+        # Sort r2tmp and rtmp. Use stable sort to have a deterministic order.
+        iperm = np.argsort(r2tmp, kind="stable")
+        r2tmp, rtmp = r2tmp[iperm], rtmp[iperm]
+        timings["gen_points"] = time.time() - start
+        nbytes["points"] = rtmp.nbytes + r2tmp.nbytes
+
+        # Find shells.
         start = time.time()
-        # Sort r2tmp and rtmp
-        iperm = np.argsort(r2tmp)
-        r2tmp = r2tmp[iperm]
-        rtmp = rtmp[iperm]
-        #return rtmp, r2tmp, True
-
-        # Find shells
-        r2sh = np.empty(msize, dtype=int)    # Correspondence between R and shell index.
-        shlim = np.empty(msize, dtype=int)   # For each shell, the index of the initial G-vector.
-        nsh = 1
-        r2sh[0] = 0
-        shlim[0] = 0
-        r2_prev = 0.0
-        for ir in range(1, msize):
-            if abs(r2tmp[ir] - r2_prev) > r2tmp[ir] * 1e-8:
-                r2_prev = r2tmp[ir]
-                shlim[nsh] = ir
-                nsh += 1
-            r2sh[ir] = nsh
-        shlim[nsh] = msize
-        if self.verbose:
-            print("nshells", nsh)
-            print("shells", time.time() - start)
+        npts = len(rtmp)
+        is_new_shell = np.abs(np.diff(r2tmp)) > r2tmp[1:] * 1e-8
+        nsh = 1 + int(np.count_nonzero(is_new_shell))
+        timings["shells"] = time.time() - start
 
-        # Find R-points generating the stars.
-        # This is the most CPU critical part. I think it's difficult to do better than this without cython
+        # Find R-points generating the stars. The key of the star is the minimum
+        # over the point group of the integer hash of S R.
         start = time.time()
-        rgen = deque()
-
-        for ish in range(nsh):
-            ss, ee = shlim[ish], shlim[ish + 1]
-            if ss + 1 == ee:
-                rgen.append(rtmp[ss])
-                continue
-
-            if True:
-                # This is faster
-                rs = set([tuple(rtmp[ss])])
-                for ir in range(ss + 1, ee):
-                    rvec = rtmp[ir]
-                    if all(tuple(np.matmul(rot, rvec)) not in rs for rot in self.ptg_symrel):
-                        rs.add(tuple(rvec))
-            else:
-                rs = deque([rtmp[ss]])
-                for ir in range(ss + 1, ee):
-                    for rot in self.ptg_symrel:
-                        rot_r = np.matmul(rot, rtmp[ir])
-                        if any(np.all(rot_r == x) for x in rs): break
-                    else:
-                        # We have new R-point.
-                        #print("Adding new point")
-                        rs.append(rtmp[ir])
-
-            #print(len(rs), rs)
-            rgen.extend(rs)
-        #print(rgen)
-        if self.verbose: print("stars", time.time() - start)
-
-        start = time.time()
-        rgen = np.array(rgen, dtype=int)
+        off = int(np.abs(self.ptg_symrel).sum(axis=2).max() * rmax.max())
+        base = 2 * off + 1
+
+        def _get_star_keys(rr):
+            keys = np.full(len(rr), np.iinfo(np.int64).max, dtype=np.int64)
+            for rot in self.ptg_symrel:
+                srr = np.matmul(rr, rot.T).astype(np.int64) + off
+                np.minimum(keys, (srr[:, 0] * base + srr[:, 1]) * base + srr[:, 2], out=keys)
+            return keys
+
+        if nprocs is None or nprocs == 1 or npts < 10_000:
+            star_keys = _get_star_keys(rtmp)
+        else:
+            from abipy.tools.parallel import pool_nprocs_pmode
+            p = pool_nprocs_pmode(nprocs, pmode="threads")
+            with p.pool_cls(p.nprocs) as pool:
+                star_keys = np.concatenate(pool.map(_get_star_keys, np.array_split(rtmp, p.nprocs)))
+
+        # The first occurrence of each key gives the generator of the star.
+        _, first = np.unique(star_keys, return_index=True)
+        rgen = rtmp[np.sort(first)]
         nstars = len(rgen)
+        timings["stars"] = time.time() - start
+        nbytes["keys"] = star_keys.nbytes
 
         # Store rpts and compute ||R||**2.
         ok = nstars >= nrwant
         nr = min(nstars, nrwant)
         rpts = rgen[:nr].copy()
-        r2vals = np.empty(nr)
-        for ir in range(nr):
-            r2vals[ir] = np.dot(rpts[ir], np.matmul(self.rmet, rpts[ir]))
+        r2vals = np.einsum("ri,ij,rj->r", rpts, self.rmet, rpts)
+
+        self.rstar_info = dict(rmax=rmax.tolist(), msize=msize, npts=npts, nshells=nsh, nstars=nstars,
+                               timings=timings, nbytes=nbytes)
 
         if self.verbose:
+            print("nshells", nsh, "nstars", nstars)
+            for k, v in timings.items():
+                print("%s: %.3f (s)" % (k, v))
+            print("Memory for workspace arrays: %.1f (Mb)" % (sum(nbytes.values()) / 1024 ** 2))
             print("r2max ", rpts[nr-1])
-            print("end ", time.time() - start)
             if self.verbose > 10:
-                print("nstars:", nstars)
                 for r, r2 in zip(rpts, r2vals):
                     print(r, r2)
 
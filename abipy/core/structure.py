@@ -290,7 +290,7 @@ class Structure(pmg_Structure, NotebookWriter):
             # Note that HIST does not follow the etsf-io conventions.
             from abipy.dynamics.hist import HistFile
             with HistFile(filepath) as hist:
-                return hist.structures[-1]
+                return hist.final_structure
 
         elif filepath.endswith(".nc"):
             # Generic netcdf file.
@@ -62,3 +62,54 @@ class TestGSphere(AbipyTest):
                 int_r = mesh.integrate(fr)
                 int_g = fg[...,0,0,0]
                 self.assert_almost_equal(int_r, int_g)
+
+    def test_fft_engine(self):
+        """Batched FFTs between G-sphere and FFT mesh"""
+        lattice = np.eye(3)
+        mesh = Mesh3D((8, 9, 10), lattice)
+        gs = np.arange(-3, 4)
+        gvecs = np.array([(g1, g2, g3) for g1 in gs for g2 in gs for g3 in gs if g1**2 + g2**2 + g3**2 <= 9])
+        rng = np.random.default_rng(1)
+
+        # istwfk 1 with small workspace to test batches.
+        gsphere = GSphere(2, lattice, [0, 0, 0], gvecs, istwfk=1)
+        engine = GSphereFFT(gsphere, mesh, max_nbytes=3 * 32 * mesh.size)
+        repr(engine); str(engine)
+        assert not engine.use_rfft and engine.batch_size == 3
+        ug = rng.random((2, 4, len(gsphere))) + 1j * rng.random((2, 4, len(gsphere)))
+        ur = engine.g2r(ug)
+        assert ur.shape == (2, 4) + mesh.shape
+        for i, j in np.ndindex(2, 4):
+            self.assert_almost_equal(ur[i, j], mesh.fft_g2r(gsphere.tofftmesh(mesh, ug[i, j])))
+        self.assert_almost_equal(engine.r2g(ur), ug)
+        self.assert_almost_equal(gsphere.fromfftmesh(mesh, mesh.fft_r2g(ur[0, 0]))[0], ug[0, 0])
+
+        # istwfk 2: only half of the G-vectors are stored and u(r) is real.
+        half = (gvecs[:, 2] > 0) | ((gvecs[:, 2] == 0) & (gvecs[:, 1] > 0)) | \
+               ((gvecs[:, 2] == 0) & (gvecs[:, 1] == 0) & (gvecs[:, 0] >= 0))
+        gsphere2 = GSphere(2, lattice, [0, 0, 0], gvecs[half], istwfk=2)
+        engine = GSphereFFT(gsphere2, mesh)
+        assert engine.use_rfft
+        ug = rng.random((5, len(gsphere2))) + 1j * rng.random((5, len(gsphere2)))
+        ig0 = gsphere2.index([0, 0, 0])
+        ug[:, ig0] = ug[:, ig0].real
+        ur = engine.g2r(ug)
+        assert ur.shape == (5,) + mesh.shape and not np.iscomplexobj(ur)
+        ref = mesh.fft_g2r(gsphere2.tofftmesh(mesh, ug))
+        self.assert_almost_equal(ref.imag, 0)
+        self.assert_almost_equal(ur, ref.real)
+        self.assert_almost_equal(engine.r2g(ur), ug)
+
+        # The engine is cached in the G-sphere.
+        assert gsphere2.get_fft_engine(mesh) is gsphere2.get_fft_engine(Mesh3D(mesh.shape, lattice))
+
+        # Multithreaded FFTs give the same results.
+        from abipy.core.mesh3d import get_fft_workers, set_fft_workers
+        prev = get_fft_workers()
+        assert prev == mesh.fft_workers
+        assert set_fft_workers(2) == 2
+        try:
+            assert mesh.fft_workers == 2
+            self.assert_almost_equal(GSphereFFT(gsphere2, mesh).g2r(ug), ur)
+        finally:
+            set_fft_workers(prev)
@@ -9,7 +9,8 @@ from pymatgen.core.lattice import Lattice
 from abipy import abilab
 from abipy.core.kpoints import (wrap_to_ws, wrap_to_bz, issamek, Kpoint, KpointList, IrredZone, Kpath, KpointsReader,
     has_timrev_from_kptopt, KSamplingInfo, as_kpoints, rc_list, kmesh_from_mpdivs, map_grid2ibz,
-    set_atol_kdiff, set_spglib_tols, kpath_from_bounds_and_ndivsm, build_segments)  #Ktables,
+    set_atol_kdiff, set_spglib_tols, kpath_from_bounds_and_ndivsm, build_segments, map_kpoints,
+    find_irred_kpoints_generic)  #Ktables,
 from abipy.core.testing import AbipyTest
 
 
@@ -639,6 +640,41 @@ class TestKmappingTools(AbipyTest):
 
         assert not errors
 
+    def test_map_kpoints(self):
+        """Testing map_kpoints and find_irred_kpoints_generic."""
+        abispg = self.mgb2.abi_spacegroup
+        symrecs = [o.rot_g for o in abispg.fm_symmops]
+        lattice = self.mgb2.reciprocal_lattice
+
+        # Map the full grid onto the IBZ and compare with the sequential algorithm.
+        bz2ibz, bz_kpoints = map_grid2ibz(self.mgb2, self.kibz, self.ngkpt, [0, 0, 0], self.has_timrev)
+        bz = np.reshape(bz_kpoints, (-1, 3))[::37] + [1, 0, -2]
+        o2r_map, nmissing = map_kpoints(bz, lattice.matrix, lattice.matrix, self.kibz, symrecs, self.has_timrev)
+        assert nmissing == 0 and len(o2r_map) == len(bz)
+
+        for kbz, kmap in zip(bz, o2r_map):
+            found = None
+            for ik_ref, kref in enumerate(self.kibz):
+                for tsign in (1, -1):
+                    for isym, symrec in enumerate(symrecs):
+                        if issamek(kbz, tsign * np.matmul(symrec, kref)):
+                            found = (ik_ref, tsign, isym)
+                            break
+                    if found: break
+                if found: break
+            assert (kmap.ik_ref, kmap.tsign, kmap.isym) == found
+            self.assert_almost_equal(kbz, kmap.tsign * np.matmul(symrecs[kmap.isym], self.kibz[kmap.ik_ref]) + kmap.g0)
+
+        # Point that is not on the grid.
+        o2r_map, nmissing = map_kpoints([[0.01, 0, 0], [0, 0, 0]], lattice.matrix, lattice.matrix,
+                                        self.kibz, symrecs, self.has_timrev)
+        assert nmissing == 1 and o2r_map[0] is None and o2r_map[1].ik_ref == 0
+
+        # Reducing the full grid must give back the number of points in the IBZ.
+        r = find_irred_kpoints_generic(self.mgb2, bz_kpoints, verbose=0)
+        assert len(r.irred_map) == len(self.kibz)
+        assert r.irred_map[0] == 0
+
     #def test_with_from_structure_with_symrec(self):
     #    """Generate Ktables from a structure with Abinit symmetries."""
     #    self.mgb2 = self.get_abistructure.mgb2("mgb2_kpath_FATBANDS.nc")
@@ -56,15 +56,54 @@ class TestSkwInterpolator(AbipyTest):
         assert res1.dedk.shape == (skw.nsppol, len(new_kcoords), skw.nband, 3)
         # Group velocities at Gamma should be zero by symmetry.
         self.assert_almost_equal(res1.dedk[0, 0], 0.0)
-        #assert 0
-        #res12 = skw.interp_kpts(new_kcoords, dk1=True, dk2=True)
-        #print(res12.dedk2)
+        res12 = skw.interp_kpts(new_kcoords, dk1=True, dk2=True)
+        assert res12.dedk2.shape == (skw.nsppol, len(new_kcoords), skw.nband, 3, 3)
+        self.assert_almost_equal(res12.dedk2, res12.dedk2.transpose(0, 1, 2, 4, 3))
+
+        # Batched engine should reproduce the results obtained with the per-k path.
+        from abipy.core.skw import ElectronInterpolator
+        rand_kcoords = np.random.default_rng(0).random((11, 3))
+        ref_eigens, ref_dedk, _ = ElectronInterpolator.eval_kpts(skw, rand_kcoords, dk1=True)
+        eigens, dedk, dedk2 = skw.eval_kpts(rand_kcoords, dk1=True, dk2=True, chunksize=4)
+        self.assert_almost_equal(eigens, ref_eigens)
+        self.assert_almost_equal(dedk, ref_dedk)
+        assert skw.srpts_has_inversion and len(skw.srpts) == skw.ptg_nsym // 2
+        assert skw.get_chunksize(dk1=True, dk2=True) >= 1
+
+        # Star functions computed with threads should not change.
+        assert skw.rstar_info["nstars"] >= skw.nr
+        rmax = np.array(skw.rstar_info["rmax"]) * 3
+        rpts1, r2vals1, ok1 = skw._find_rstar_gen(2 * skw.nr, rmax, nprocs=1)
+        rpts2, r2vals2, ok2 = skw._find_rstar_gen(2 * skw.nr, rmax, nprocs=2)
+        assert ok1 and ok2
+        self.assert_equal(rpts1, rpts2)
+        self.assert_equal(rpts1[:skw.nr], skw.rpts)
+        assert np.all(np.diff(r2vals1) >= -1e-8)
 
         # Test interpolation routines (high-level API).
         edos = skw.get_edos(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
         #jdos = skw.get_jdos_q0(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
         #nest = skw.get_nesting_at_e0(qpoints, kmesh, e0, width=0.2, is_shift=None)
 
+        # Test persistent cache.
+        try:
+            SkwInterpolator.enable_disk_cache(topdir=self.mkdtemp())
+            edos1 = skw.get_edos(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
+            edos2 = skw.get_edos(kmesh, is_shift=None, method="gaussian", step=0.1, width=0.2, wmesh=None)
+            self.assert_equal(edos1.values, edos2.values)
+            self.assert_almost_equal(edos1.values, edos.values)
+            self.assert_equal(skw.interp_kpts(new_kcoords).eigens, new_eigens)
+            self.assert_equal(skw.interp_kpts(new_kcoords).eigens, new_eigens)
+            assert len(SkwInterpolator.disk_cache) == 2
+
+            args = (lpratio, kcoords, ebands.eigens, ebands.fermie, ebands.nelect, cell, fm_symrel, has_timrev)
+            skw1 = SkwInterpolator.from_disk_cache(*args, verbose=0)
+            skw2 = SkwInterpolator.from_disk_cache(*args, verbose=0)
+            assert skw1 is not skw2 and skw1.content_hash == skw2.content_hash == skw.content_hash
+            self.assert_equal(skw1.coefs, skw2.coefs)
+        finally:
+            SkwInterpolator.disable_disk_cache(clear=True)
+
         # Test pickle
         tmpname = self.get_tmpname(text=True)
         skw.pickle_dump(tmpname)
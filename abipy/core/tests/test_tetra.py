@@ -0,0 +1,62 @@
+"""Tests for core.tetra module"""
+import numpy as np
+
+from abipy.core.testing import AbipyTest
+from abipy.core.tetra import TetraMesh, _tetra_weights
+
+
+class TestTetraMesh(AbipyTest):
+    """Unit tests for TetraMesh."""
+
+    def test_tetra_weights(self):
+        """Testing integration weights of a single tetrahedron."""
+        rng = np.random.default_rng(0)
+        ene = np.sort(rng.uniform(-1, 1, size=(20, 4)), axis=1)
+        mesh = np.linspace(-1.1, 1.1, 2001)
+        w, dw = _tetra_weights(np.repeat(ene, len(mesh), axis=0), np.tile(mesh, len(ene)), False)
+        w, dw = w.reshape(len(ene), -1, 4), dw.reshape(len(ene), -1, 4)
+
+        # Weights are normalized and DOS weights are the derivative of the IDOS weights.
+        self.assert_almost_equal(_tetra_weights(ene, ene[:, 3], False)[0].sum(axis=-1), 1.0)
+        inside = (mesh[None, :] > ene[:, :1]) & (mesh[None, :] < ene[:, 3:])
+        fd = np.gradient(w, mesh, axis=1)
+        assert np.percentile(np.abs(fd - dw)[inside], 99) < 1e-3
+
+        # Degenerate energies.
+        ene = np.array([[0, 0, 0, 0], [0, 0, 1, 1], [0, 1, 1, 1], [0, 0, 0, 1]], dtype=float)
+        w, _ = _tetra_weights(ene, ene[:, 3], True)
+        self.assert_almost_equal(w.sum(axis=-1), 1.0)
+
+    def test_free_electrons(self):
+        """Testing DOS and IDOS of free electrons with the tetrahedron method."""
+        ngkpt = [24, 24, 24]
+        tetra = TetraMesh(ngkpt, np.eye(3))
+        repr(tetra); str(tetra)
+        assert tetra.ntetra == 6 * tetra.nkbz
+
+        kpts = np.reshape(np.indices(ngkpt), (3, -1)).T / ngkpt
+        kpts -= np.rint(kpts)
+        eigens_bz = np.sum(kpts ** 2, axis=1)[:, None]
+
+        mesh = np.linspace(-0.1, 1.0, 1101)
+        r = tetra.get_dos_idos(eigens_bz, mesh)
+        assert r.dos.shape == r.idos.shape == mesh.shape
+        assert np.all(r.idos[mesh < 0] == 0)
+        self.assert_almost_equal(r.idos[-1], 1.0)
+
+        # Compare with the analytic results for e inside the sphere inscribed in the BZ.
+        ie = np.searchsorted(mesh, 0.16)
+        e = mesh[ie]
+        assert abs(r.idos[ie] / (4 / 3 * np.pi * e ** 1.5) - 1) < 0.02
+        assert abs(r.dos[ie] / (2 * np.pi * e ** 0.5) - 1) < 0.02
+
+        # Projected DOS with unit values must give the total DOS.
+        values_bz = np.ones((2, tetra.nkbz, 1))
+        values_bz[1] *= 0.5
+        p = tetra.get_dos_idos(eigens_bz, mesh, values_bz=values_bz, blochl=True, max_nbytes=2 ** 20)
+        assert p.dos.shape == (2, len(mesh))
+        self.assert_almost_equal(p.idos[0], r.idos)
+        self.assert_almost_equal(p.dos[1], 0.5 * r.dos)
+
+        with self.assertRaises(ValueError):
+            tetra.get_dos_idos(eigens_bz, mesh ** 2)
@@ -0,0 +1,246 @@
+# coding: utf-8
+"""
+Linear tetrahedron method for the computation of DOS, IDOS and projected DOS.
+For the theoretical background see :cite:`Blochl1994`.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from monty.collections import dict2namedtuple
+
+
+# Tetrahedra in the subcell sharing the main diagonal 0 --> 7.
+# Corner c corresponds to the displacement ((c >> 2) & 1, (c >> 1) & 1, c & 1).
+_TETRA_CORNERS = np.array([
+    [0, 1, 3, 7],
+    [0, 1, 5, 7],
+    [0, 2, 3, 7],
+    [0, 2, 6, 7],
+    [0, 4, 5, 7],
+    [0, 4, 6, 7],
+], dtype=int)
+
+
+class TetraMesh:
+    """
+    Tetrahedra obtained by dividing each subcell of a homogeneous k-mesh into 6 tetrahedra
+    sharing the shortest main diagonal. Points are indexed in C-order i.e.
+    ik = (i0 * ngkpt[1] + i1) * ngkpt[2] + i2 with k = (i0, i1, i2) / ngkpt + shift.
+
+    .. rubric:: Inheritance Diagram
+    .. inheritance-diagram:: TetraMesh
+    """
+
+    def __init__(self, ngkpt, reciprocal_matrix):
+        """
+        Args:
+            ngkpt: Number of divisions of the k-mesh.
+            reciprocal_matrix: [3, 3] matrix with the reciprocal lattice vectors along the rows.
+        """
+        self.ngkpt = np.asarray(ngkpt, dtype=int)
+        self.nkbz = int(self.ngkpt.prod())
+        gmat = np.asarray(reciprocal_matrix, dtype=float)
+
+        # Find the shortest main diagonal of the subcell.
+        corners = np.array([[(c >> 2) & 1, (c >> 1) & 1, c & 1] for c in range(8)])
+        lengths = [np.linalg.norm(((corners[c ^ 7] - corners[c]) / self.ngkpt) @ gmat) for c in range(4)]
+        self.diag_corner = int(np.argmin(lengths))
+
+        # Vertices of the tetrahedra as displacements wrt the origin of the subcell.
+        disps = corners[_TETRA_CORNERS ^ self.diag_corner]
+
+        n0, n1, n2 = self.ngkpt
+        i0, i1, i2 = np.meshgrid(np.arange(n0), np.arange(n1), np.arange(n2), indexing="ij")
+        origins = np.stack((i0.ravel(), i1.ravel(), i2.ravel()), axis=-1)
+
+        # [nsub, 6, 4, 3] --> [ntetra, 4]
+        pts = (origins[:, None, None, :] + disps[None, :, :, :]) % self.ngkpt
+        self.tetra_vertices = np.reshape((pts[..., 0] * n1 + pts[..., 1]) * n2 + pts[..., 2], (-1, 4))
+        self.ntetra = len(self.tetra_vertices)
+        # All tetrahedra have the same volume.
+        self.tetra_weight = 1.0 / self.ntetra
+
+    def __str__(self):
+        return self.to_string()
+
+    def to_string(self, verbose: int = 0) -> str:
+        """String representation."""
+        return "ngkpt: %s, nkbz: %d, ntetra: %d, diagonal corner: %d" % (
+            self.ngkpt, self.nkbz, self.ntetra, self.diag_corner)
+
+    def get_dos_idos(self, eigens_bz, mesh, values_bz=None, blochl=False, max_nbytes=2 ** 27):
+        """
+        Compute DOS and IDOS on a linear mesh with the linear tetrahedron method.
+
+        Args:
+            eigens_bz: [nkbz, nband] array with the energies in the full BZ (C-order).
+            mesh: Linear mesh.
+            values_bz: Optional array of shape [nsets, nkbz, nband] with the matrix elements
+                used to compute projected DOS/IDOS. Values are interpolated linearly inside the tetrahedra.
+            blochl: True to add Blöchl's correction to the integration weights (only relevant for projections
+                since the correction does not change the number of states).
+            max_nbytes: Max memory in bytes used for the workspace arrays.
+
+        Return:
+            namedtuple with (mesh, dos, idos) where dos and idos have shape [nw],
+            if values_bz is None, else [nsets, nw].
+        """
+        mesh = np.asarray(mesh, dtype=float)
+        nw = len(mesh)
+        step = mesh[1] - mesh[0]
+        if not np.allclose(np.diff(mesh), step, rtol=1e-6, atol=0):
+            raise ValueError("get_dos_idos requires a linear mesh")
+
+        eigens_bz = np.reshape(np.asarray(eigens_bz, dtype=float), (self.nkbz, -1))
+        nband = eigens_bz.shape[1]
+        squeeze = values_bz is None
+        if values_bz is None:
+            values_bz = np.ones((1, self.nkbz, nband))
+        values_bz = np.reshape(values_bz, (-1, self.nkbz, nband))
+        nsets = len(values_bz)
+
+        # Energies and values at the vertices for all (tetra, band): [ntetra * nband, 4]
+        ene = eigens_bz[self.tetra_vertices].transpose(0, 2, 1).reshape(-1, 4)
+        vals = values_bz[:, self.tetra_vertices].transpose(0, 1, 3, 2).reshape(nsets, -1, 4)
+
+        # Sort vertices by energy.
+        perm = np.argsort(ene, axis=1)
+        ene = np.take_along_axis(ene, perm, axis=1)
+        vals = np.take_along_axis(vals, perm[None], axis=2)
+
+        dos = np.zeros((nsets, nw))
+        # IDOS is accumulated in two pieces: values inside [e1, e4] and the
+        # constant contribution for mesh points above e4 (stored as increment in tail).
+        idos = np.zeros((nsets, nw))
+        tail = np.zeros((nsets, nw + 1))
+
+        # Points with e > e4 get the full weight.
+        vol4 = self.tetra_weight / 4
+        full = vol4 * vals.sum(axis=2)
+        first_above = np.clip(np.floor((ene[:, 3] - mesh[0]) / step).astype(int) + 1, 0, nw)
+        for iset in range(nsets):
+            tail[iset] += np.bincount(first_above, weights=full[iset], minlength=nw + 1)
+
+        # Mesh points inside [e1, e4].
+        istart = np.clip(np.ceil((ene[:, 0] - mesh[0]) / step).astype(int), 0, nw)
+        istop = first_above
+        nwin = istop - istart
+        active = np.nonzero(nwin > 0)[0]
+        if len(active):
+            # Sort entries by window length and process them in blocks to limit memory.
+            active = active[np.argsort(nwin[active], kind="stable")]
+            budget = max(1, max_nbytes // (8 * 40))
+            start = 0
+            while start < len(active):
+                # Since nwin is sorted, the block size is limited by its last entry.
+                cost = np.arange(1, len(active) - start + 1) * nwin[active[start:]]
+                chunk = max(1, int(np.searchsorted(cost, budget, side="right")))
+                sel = active[start:start + chunk]
+                start += chunk
+                lmax = nwin[sel].max()
+
+                idx = istart[sel, None] + np.arange(lmax)[None, :]
+                mask = idx < istop[sel, None]
+                # Flatten the (entry, mesh point) pairs inside the windows.
+                rows = np.broadcast_to(np.arange(len(sel))[:, None], mask.shape)[mask]
+                idx = idx[mask]
+                wgt, dwgt = _tetra_weights(ene[sel][rows], mesh[idx], blochl)
+                for iset in range(nsets):
+                    v = vals[iset, sel][rows]
+                    idos[iset] += np.bincount(idx, weights=self.tetra_weight * (wgt * v).sum(axis=-1), minlength=nw)
+                    dos[iset] += np.bincount(idx, weights=self.tetra_weight * (dwgt * v).sum(axis=-1), minlength=nw)
+
+        idos += np.cumsum(tail[:, :nw], axis=1)
+
+        if squeeze:
+            dos, idos = dos[0], idos[0]
+
+        return dict2namedtuple(mesh=mesh, dos=dos, idos=idos)
+
+
+def _tetra_weights(ene, ee, blochl):
+    """
+    Integration weights (IDOS) and their derivative wrt energy (DOS) for the 4 vertices of the tetrahedra
+    for energies `ee` inside [e1, e4]. Weights are normalized to one i.e. the volume of the tetrahedron
+    is not included. See Appendix of :cite:`Blochl1994`.
+
+    Args:
+        ene: [n, 4] array with the sorted energies at the vertices.
+        ee: [n] array with the energies.
+        blochl: True to add Blöchl's correction.
+
+    Return:
+        (w, dw) arrays of shape [n, 4]
+    """
+    n = len(ee)
+    w, dw = np.zeros((n, 4)), np.zeros((n, 4))
+    g, dg = np.zeros(n), np.zeros(n)
+
+    def _get(m):
+        """Extract the energies at the vertices for the points selected by mask m."""
+        ii = np.nonzero(m)[0]
+        e1, e2, e3, e4 = (ene[ii, j] for j in range(4))
+        return ii, ee[ii], e1, e2, e3, e4
+
+    # Case e1 <= e < e2.
+    ii, e, e1, e2, e3, e4 = _get((ee >= ene[:, 0]) & (ee < ene[:, 1]))
+    if len(ii):
+        e21, e31, e41 = e2 - e1, e3 - e1, e4 - e1
+        x = e - e1
+        den = e21 * e31 * e41
+        c, dc = 0.25 * x ** 3 / den, 0.75 * x ** 2 / den
+        s = 1 / e21 + 1 / e31 + 1 / e41
+        w[ii, 0], dw[ii, 0] = c * (4 - x * s), dc * (4 - x * s) - c * s
+        for j, ej1 in ((1, e21), (2, e31), (3, e41)):
+            w[ii, j], dw[ii, j] = c * x / ej1, (dc * x + c) / ej1
+        g[ii], dg[ii] = 3 * x ** 2 / den, 6 * x / den
+
+    # Case e2 <= e < e3.
+    ii, e, e1, e2, e3, e4 = _get((ee >= ene[:, 1]) & (ee < ene[:, 2]))
+    if len(ii):
+        e31, e41, e32, e42 = e3 - e1, e4 - e1, e3 - e2, e4 - e2
+        a, b, cc, d = e - e1, e - e2, e3 - e, e4 - e
+        c1, dc1 = 0.25 * a ** 2 / (e41 * e31), 0.5 * a / (e41 * e31)
+        c2 = 0.25 * a * b * cc / (e41 * e32 * e31)
+        dc2 = 0.25 * (b * cc + a * cc - a * b) / (e41 * e32 * e31)
+        c3 = 0.25 * b ** 2 * d / (e42 * e32 * e41)
+        dc3 = 0.25 * (2 * b * d - b ** 2) / (e42 * e32 * e41)
+        c12, dc12 = c1 + c2, dc1 + dc2
+        c123, dc123 = c12 + c3, dc12 + dc3
+        c23, dc23 = c2 + c3, dc2 + dc3
+        w[ii, 0] = c1 + c12 * cc / e31 + c123 * d / e41
+        dw[ii, 0] = dc1 + dc12 * cc / e31 - c12 / e31 + dc123 * d / e41 - c123 / e41
+        w[ii, 1] = c123 + c23 * cc / e32 + c3 * d / e42
+        dw[ii, 1] = dc123 + dc23 * cc / e32 - c23 / e32 + dc3 * d / e42 - c3 / e42
+        w[ii, 2] = c12 * a / e31 + c23 * b / e32
+        dw[ii, 2] = dc12 * a / e31 + c12 / e31 + dc23 * b / e32 + c23 / e32
+        w[ii, 3] = c123 * a / e41 + c3 * b / e42
+        dw[ii, 3] = dc123 * a / e41 + c123 / e41 + dc3 * b / e42 + c3 / e42
+        fact = (e31 + e42) / (e32 * e42)
+        g[ii] = (3 * (e2 - e1) + 6 * b - 3 * fact * b ** 2) / (e31 * e41)
+        dg[ii] = (6 - 6 * fact * b) / (e31 * e41)
+
+    # Case e3 <= e <= e4.
+    ii, e, e1, e2, e3, e4 = _get((ee >= ene[:, 2]) & (ee <= ene[:, 3]))
+    if len(ii):
+        e41, e42, e43 = e4 - e1, e4 - e2, e4 - e3
+        # Handle degenerate vertices (e3 == e4). In this case y == 0 and weights are 1/4.
+        deg = e43 == 0
+        e41, e42, e43 = [np.where(deg, 1.0, x) for x in (e41, e42, e43)]
+        y = np.where(deg, 0.0, e4 - e)
+        den = e41 * e42 * e43
+        c, dc = 0.25 * y ** 3 / den, -0.75 * y ** 2 / den
+        s = 1 / e41 + 1 / e42 + 1 / e43
+        for j, e4j in ((0, e41), (1, e42), (2, e43)):
+            w[ii, j], dw[ii, j] = 0.25 - c * y / e4j, -(dc * y - c) / e4j
+        w[ii, 3], dw[ii, 3] = 0.25 - c * (4 - y * s), -(dc * (4 - y * s) + c * s)
+        g[ii], dg[ii] = 3 * y ** 2 / den, -6 * y / den
+
+    if blochl:
+        # dw_i = g(e) / 40 sum_j (e_j - e_i)
+        corr = (ene.sum(axis=1)[:, None] - 4 * ene) / 40
+        w += g[:, None] * corr
+        dw += dg[:, None] * corr
+
+    return w, dw
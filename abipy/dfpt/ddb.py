@@ -6,8 +6,12 @@ from __future__ import annotations
 
 import sys
 import os
+import re
+import mmap
+import shutil
 import tempfile
 import itertools
+import logging
 import numpy as np
 import pandas as pd
 import abipy.core.abinit_units as abu
@@ -40,9 +44,14 @@ from abipy.tools.plotting import (add_fig_kwargs, get_ax_fig_plt, get_axarray_fi
 from abipy.tools import duck
 from abipy.tools.typing import Figure
 from abipy.tools.iotools import ExitStackWithFiles
+from abipy.tools.parallel import pool_nprocs_pmode, get_max_nprocs
+from abipy.tools.diskcache import DiskCache, hash_key, hash_file
+from abipy.flowtk.utils import Directory
 from abipy.tools.tensors import DielectricTensor, ZstarTensor, Stress
 from abipy.abio.robots import Robot
 
+logger = logging.getLogger(__name__)
+
 
 SUBSCRIPT_UNICODE = {
                 "0": "₀",
@@ -89,6 +98,232 @@ class AnaddbError(DdbError):
         return "\n".join(lines)
 
 
+_DORD_FROM_TITLE = {
+    "Total energy": 0,
+    "1st derivatives": 1,
+    "2nd derivatives": 2,
+    "3rd derivatives": 3,
+}
+
+# Number of header lines and number of integer indices in each line for the different derivative orders.
+_DORD_NHEAD_NINDS = {0: (1, 0), 1: (1, 2), 2: (2, 4), 3: (4, 6)}
+
+
+class AnaddbCacheEntry:
+    """
+    Results of a previous anaddb run retrieved from the anaddb cache of |DdbFile|.
+    Provides the subset of the |AnaddbTask| API used to access the output files.
+    """
+
+    def __init__(self, path: str):
+        self.workdir = str(path)
+        self.outdir = Directory(os.path.join(self.workdir, "outdata"))
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.workdir)
+
+    outpath_from_ext = AnaddbTask.outpath_from_ext
+    open_phbst = AnaddbTask.open_phbst
+    open_phdos = AnaddbTask.open_phdos
+
+
+class DdbBlock(dict):
+    """
+    Dictionary with the data of a DDB block. Keys: "dord", "qpt", "qpt3", "data".
+    The list of lines stored in "data" is read from file only when the key is accessed
+    and the numerical values are decoded into numpy arrays by ``get_values``.
+    """
+
+    def __init__(self, filepath: str | None, start: int | None, stop: int | None,
+                 stamp: tuple | None = None, **kwargs):
+        """
+        Args:
+            filepath: Path to the DDB file. None if the block lives only in memory.
+            start, stop: Byte offsets of the block in the file.
+            stamp: (size, mtime_ns) of the file when the offsets have been computed.
+                Used to detect files that have been changed after the indexing.
+            kwargs: "dord", "qpt", "qpt3" (and optionally "data") entries.
+        """
+        super().__init__(**kwargs)
+        self.filepath, self.start, self.stop, self.stamp = filepath, start, stop, stamp
+        self._values = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> DdbBlock:
+        """
+        Build an in-memory block from a dictionary with the keys "dord", "qpt", "qpt3", "data".
+        Return d if it is already a |DdbBlock|.
+        """
+        if isinstance(d, cls): return d
+        if "data" not in d:
+            raise ValueError("In-memory DDB block requires `data` entry.")
+        return cls(None, None, None, **d)
+
+    def __missing__(self, key):
+        if key != "data":
+            raise KeyError(key)
+        # Don't use lstrip because we may reuse the lines to write new DDB.
+        lines = [line.rstrip() for line in self._read_text().splitlines() if line and not line.isspace()]
+        dict.__setitem__(self, "data", lines)
+        return lines
+
+    def __setitem__(self, key, value):
+        if key == "data": self._values = None
+        super().__setitem__(key, value)
+
+    def _read_text(self) -> str:
+        """Read the block from file."""
+        if self.filepath is None:
+            raise DdbError("In-memory DDB block does not have `data` entry.")
+        if self.stamp is not None:
+            stat = os.stat(self.filepath)
+            if (stat.st_size, stat.st_mtime_ns) != tuple(self.stamp):
+                raise DdbError("DDB file %s has been modified after the indexing of the blocks.\n"
+                               "Cannot read block at byte offsets: [%s, %s]" % (self.filepath, self.start, self.stop))
+
+        with open(self.filepath, "rb") as fh:
+            fh.seek(self.start)
+            return fh.read(self.stop - self.start).decode()
+
+    def get_values(self) -> tuple:
+        """
+        Decode the numerical entries of the block.
+
+        Return: (inds, values) where inds is a [nelem, ninds] array with the (idir, ipert) indices
+            (Fortran convention) and values is a [nelem] complex array. For the total energy, values has one entry.
+        """
+        if self._values is not None:
+            return self._values
+
+        nhead, ninds = _DORD_NHEAD_NINDS[self["dord"]]
+        if dict.__contains__(self, "data"):
+            lines = self["data"][nhead:]
+        else:
+            lines = [line for line in self._read_text().splitlines() if line and not line.isspace()][nhead:]
+
+        # Python does not support exp format with D
+        text = " ".join(lines).replace("D", "E")
+        if self["dord"] == 0:
+            values = np.array(text.split()[:1], dtype=float).astype(complex)
+            inds = np.empty((1, 0), dtype=int)
+        else:
+            table = np.array(text.split(), dtype=float).reshape(len(lines), ninds + 2)
+            inds = np.rint(table[:, :ninds]).astype(int)
+            values = table[:, ninds] + 1j * table[:, ninds + 1]
+
+        self._values = (inds, values)
+        return self._values
+
+
+def index_ddb_blocks(filepath: str) -> list[dict]:
+    """
+    Scan the DDB file and return list of dictionaries with the position of the blocks in the file.
+    Each dictionary contains the byte offsets "start" and "stop", the derivative order "dord",
+    the q-point(s) "qpt" and "qpt3" and the (stripped) line "qpt_line" with the first q-point.
+    Only the first lines of each block are decoded.
+    """
+    with open(filepath, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # skip until the beginning of the db
+        pos = mm.find(b"Number of data blocks")
+        if pos == -1:
+            raise DdbError("Cannot find `Number of data blocks` in %s" % filepath)
+        pos = mm.find(b"\n", pos) + 1
+
+        # The list of blocks at the end of the file is present only if DDB has been produced by mrgddb
+        end = mm.find(b"List of bloks and their characteristics", pos)
+        end = len(mm) if end == -1 else mm.rfind(b"\n", 0, end) + 1
+
+        # new block --> detect order
+        starts = [m.start() for m in re.compile(rb"^[^\n]*# elements", re.M).finditer(mm, pos, end)]
+        index = []
+        for start, stop in zip(starts, starts[1:] + [end]):
+            head = mm[start:min(stop, start + 4096)].decode()
+            head = [line for line in head.splitlines() if line and not line.isspace()][:4]
+            tokens = head[0].split()
+            dord = _DORD_FROM_TITLE.get(" ".join(tokens[:2]), None)
+            if dord is None:
+                raise RuntimeError("Cannot detect derivative order from string: `%s`" % " ".join(tokens[:2]))
+
+            qpt, qpt3, qpt_line = None, None, None
+            if dord in (2, 3) and len(head) > 1 and head[1].strip().startswith("qpt"):
+                qpt_line = head[1].strip()
+                if dord == 2:
+                    qpt = list(map(float, head[1].split()[1:4]))
+                else:
+                    qpt3 = [list(map(float, head[1].split()[1:4]))]
+                    qpt3.extend(list(map(float, line.split()[:3])) for line in head[2:4])
+
+            index.append(dict(start=start, stop=stop, dord=dord, qpt=qpt, qpt3=qpt3, qpt_line=qpt_line))
+
+    return index
+
+
+def _run_anaddb_job(func, kwargs):
+    """Execute func(**kwargs). Return (result, None) on success else (None, exception)."""
+    try:
+        return func(**kwargs), None
+    except Exception as exc:
+        return None, exc
+
+
+def _close_anaddb_result(res) -> None:
+    """Close the file(s) returned by an anaddb job. Tuples e.g. (phbst_file, phdos_file) are supported."""
+    for obj in (res if isinstance(res, (tuple, list)) else [res]):
+        close = getattr(obj, "close", None)
+        if close is None: continue
+        try:
+            close()
+        except Exception as exc:
+            logger.warning("Exception while closing %s: %s" % (repr(obj), str(exc)))
+
+
+def run_anaddb_jobs(func, kwargs_list: list[dict], mpi_procs: int = 1, nprocs=1,
+                    pmode: str = "threads", verbose: int = 0) -> list:
+    """
+    Execute independent anaddb calculations in parallel and return the list of results
+    in the same order as kwargs_list.
+
+    Args:
+        func: Callable invoking anaddb e.g. ``ddb.anaget_phbst_and_phdos_files``.
+        kwargs_list: List of dictionaries with the keyword arguments passed to func. One job per dict.
+        mpi_procs: Number of MPI processes used by each anaddb run.
+        nprocs: Total number of cores that can be used. Default: 1 i.e. the jobs are executed sequentially.
+            If None, use get_max_nprocs(). The number of concurrent jobs is chosen so that jobs * mpi_procs <= nprocs.
+        pmode: "threads" (default) or "seq" for sequential execution.
+            "processes" requires func and its results to be picklable.
+        verbose: Verbosity level.
+
+    Raises:
+        DdbError with the list of failed jobs once all the jobs are completed.
+        The files returned by the jobs that completed successfully are closed.
+    """
+    kwargs_list = list(kwargs_list)
+    if not kwargs_list: return []
+
+    nprocs = get_max_nprocs() if nprocs is None else nprocs
+    njobs = max(1, min(len(kwargs_list), nprocs // max(mpi_procs, 1)))
+    args = [(func, kwargs) for kwargs in kwargs_list]
+
+    if njobs == 1 or pmode == "seq":
+        outs = [_run_anaddb_job(*a) for a in args]
+    else:
+        p = pool_nprocs_pmode(njobs, pmode=pmode)
+        if verbose:
+            print(f"Executing {len(args)} anaddb jobs with {mpi_procs=} {p.using_msg}")
+        with p.pool_cls(p.nprocs) as pool:
+            outs = pool.starmap(_run_anaddb_job, args)
+
+    errors = [(i, exc) for i, (_, exc) in enumerate(outs) if exc is not None]
+    if errors:
+        for res, exc in outs:
+            if exc is None: _close_anaddb_result(res)
+        lines = ["%d/%d anaddb jobs failed:" % (len(errors), len(outs))]
+        lines.extend("job %d with %s:\n%s" % (i, kwargs_list[i], str(exc)) for i, exc in errors)
+        raise DdbError("\n".join(lines)) from errors[0][1]
+
+    return [res for res, _ in outs]
+
+
 class DdbFile(TextFile, Has_Structure, NotebookWriter):
     """
     This object provides an interface to the DDB_ file produced by ABINIT
@@ -112,6 +347,34 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
     AnaddbError = AnaddbError
 
+    # The index with the position of the blocks is stored in the AbiPy cache directory
+    # if the size of the DDB file is larger than this value. None to disable the cache.
+    index_cache_min_nbytes = 8 * 1024 ** 2
+
+    # Persistent cache with the output files produced by anaddb. None if disabled. See enable_anaddb_cache.
+    anaddb_cache = None
+
+    @classmethod
+    def enable_anaddb_cache(cls, topdir=None, max_nbytes=4 * 1024 ** 3) -> DiskCache:
+        """
+        Activate the persistent cache for the anaddb calculations executed by the `anaget` methods.
+        The output files are keyed by the content of the DDB file and by the anaddb input
+        so that calling the same method twice does not execute anaddb again.
+
+        Args:
+            topdir: Top-level directory of the cache. If None, $ABIPY_CACHE_DIR or ~/.abinit/abipy/cache is used.
+            max_nbytes: Max size of the cache in bytes. Least recently used entries are removed first.
+        """
+        DdbFile.anaddb_cache = DiskCache("anaddb", topdir=topdir, max_nbytes=max_nbytes)
+        return DdbFile.anaddb_cache
+
+    @classmethod
+    def disable_anaddb_cache(cls, clear=False) -> None:
+        """Deactivate the anaddb cache. Remove all the entries if `clear`."""
+        if clear and DdbFile.anaddb_cache is not None:
+            DdbFile.anaddb_cache.clear()
+        DdbFile.anaddb_cache = None
+
     @classmethod
     def from_file(cls, filepath: str) -> DdbFile:
         """Needed for the :class:`TextFile` abstract interface."""
@@ -360,14 +623,11 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         # 2nd derivatives (non-stat.)  - # elements :      36
         # qpt  2.50000000E-01  0.00000000E+00  0.00000000E+00   1.0
 
-        # Since there are multiple occurrences of qpt in the DDB file
-        # we use seen to remove duplicates.
-        self.seek(0)
+        # Since the same q-point can appear in multiple blocks we use seen to remove duplicates.
         tokens, seen = [], set()
-
-        for line in self:
-            line = line.strip()
-            if line.startswith("qpt") and line not in seen:
+        for entry in self.blocks_index:
+            line = entry["qpt_line"]
+            if line is not None and line not in seen:
                 seen.add(line)
                 tokens.append(line.replace("qpt", ""))
 
@@ -379,6 +639,31 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
         return np.reshape(qpoints, (-1, 3))
 
+    @lazy_property
+    def blocks_index(self) -> list[dict]:
+        """
+        List of dictionaries with the position in the file, the derivative order and the q-points of the blocks.
+        See :func:`index_ddb_blocks`. The index is stored in the AbiPy cache directory for large files
+        and reused if the size and the modification time of the file did not change.
+        """
+        stat = os.stat(self.filepath)
+        # Blocks are read lazily at these offsets so we record the state of the file used for the index.
+        self._blocks_stamp = (stat.st_size, stat.st_mtime_ns)
+        if self.index_cache_min_nbytes is None or stat.st_size < self.index_cache_min_nbytes:
+            return index_ddb_blocks(self.filepath)
+
+        cache = DiskCache("ddb_index", max_nbytes=64 * 1024 ** 2)
+        key = hash_key(os.path.abspath(self.filepath), stat.st_size, stat.st_mtime_ns)
+        index = cache.load_object(key)
+        if index is None:
+            index = index_ddb_blocks(self.filepath)
+            try:
+                cache.save_object(key, index)
+            except OSError as exc:
+                cprint("Cannot save DDB index in cache. Exception:\n%s" % str(exc), color="yellow")
+
+        return index
+
     @lazy_property
     def computed_dynmat(self) -> dict:
         """
@@ -396,9 +681,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         dynmat = OrderedDict()
         for block in self.blocks:
             # skip the blocks that are not related to second order derivatives
-            first_line = block["data"][0].strip()
-            if not first_line.startswith("2nd derivatives"):
-                continue
+            if block["dord"] != 2: continue
 
             # Build q-point object.
             qpt = Kpoint(frac_coords=block["qpt"], lattice=self.structure.reciprocal_lattice, weight=None, name=None)
@@ -406,102 +689,30 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             # Build pandas dataframe with df_columns and (idir1, ipert1, idir2, ipert2) as index.
             # Each line in data represents an element of the dynamical matric
             # idir1 ipert1 idir2 ipert2 re_D im_D
-            df_rows, df_index = [], []
-            for line in block["data"]:
-                line = line.strip()
-                if line.startswith("2nd derivatives") or line.startswith("qpt"):
-                    continue
-                try:
-                    toks = line.split()
-                    idir1, ipert1 = p1 = (int(toks[0]), int(toks[1]))
-                    idir2, ipert2 = p2 = (int(toks[2]), int(toks[3]))
-                    toks[4] = toks[4].replace("D", "E")
-                    toks[5] = toks[5].replace("D", "E")
-                    cvalue = float(toks[4]) + 1j*float(toks[5])
-                except Exception as exc:
-                    cprint("exception while parsing line: %s" % line, "red")
-                    raise exc
-
-                df_index.append(p1 + p2)
-                df_rows.append(dict(idir1=idir1, ipert1=ipert1, idir2=idir2, ipert2=ipert2, cvalue=cvalue))
-
-            dynmat[qpt] = pd.DataFrame(df_rows, index=df_index, columns=df_columns)
+            inds, values = block.get_values()
+            df_index = [tuple(p) for p in inds.tolist()]
+            df_data = {k: inds[:, i] for i, k in enumerate(df_columns[:4])}
+            df_data["cvalue"] = values
+            dynmat[qpt] = pd.DataFrame(df_data, index=df_index, columns=df_columns)
 
         return dynmat
 
     @lazy_property
     def blocks(self) -> list:
         """
-        DDB blocks. List of dictionaries, Each dictionary contains the following keys.
+        DDB blocks. List of |DdbBlock| dictionaries, Each dictionary contains the following keys.
         "qpt" with the reduced coordinates of the q-point.
+        "qpt3" with the reduced coordinates of the three q-points (3rd order derivatives).
+        "dord" with the derivative order.
         "data" that is a list of strings with the entries of the dynamical matrix for this q-point.
+        The data is read from file only when needed.
         """
         return self._read_blocks()
 
     def _read_blocks(self) -> list:
-        # skip until the beginning of the db
-        self.seek(0)
-        while "Number of data blocks" not in self._file.readline():
-            pass
-
-        blocks = []
-        block_lines = []
-        qpt = None
-        dord = None
-        qpt3 = None
-
-        for line in self:
-            # skip empty lines
-            if line.isspace():
-                continue
-
-            if "List of bloks and their characteristics" in line:
-                # add last block when we reach the last part of the file.
-                # This line is present only if DDB has been produced by mrgddb
-                if block_lines:
-                    blocks.append({"data": block_lines, "qpt": qpt, "qpt3": qpt3, "dord": dord})
-                    block_lines = []
-                    qpt = None
-                    qpt3 = None
-                break
-
-            # Don't use lstring because we may reuse block_lines to write new DDB.
-            line = line.rstrip()
-
-            # new block --> detect order
-            if "# elements" in line:
-                if block_lines:
-                    blocks.append({"data": block_lines, "qpt": qpt, "qpt3": qpt3, "dord": dord})
-
-                tokens = line.split()
-                num_elements = int(tokens[-1])
-                s = " ".join(tokens[:2])
-                dord = {"Total energy": 0,
-                        "1st derivatives": 1,
-                        "2nd derivatives": 2,
-                        "3rd derivatives": 3}.get(s, None)
-                if dord is None:
-                    raise RuntimeError("Cannot detect derivative order from string: `%s`" % s)
-
-                block_lines = []
-                qpt = None
-                qpt3 = None
-
-            block_lines.append(line)
-            if dord == 2 and "qpt" in line:
-                qpt = list(map(float, line.split()[1:4]))
-
-            # if needed accumulate the qpt coords in qpt3. stop when they reach 3.
-            if dord == 3:
-                if "qpt" in line:
-                    qpt3 = [list(map(float, line.split()[1:4]))]
-                elif qpt3 and len(qpt3) < 3:
-                    qpt3.append(list(map(float, line.split()[:3])))
-
-        if block_lines:
-            blocks.append({"data": block_lines, "qpt": qpt, "qpt3": qpt3, "dord": dord})
-
-        return blocks
+        index = self.blocks_index
+        return [DdbBlock(self.filepath, e["start"], e["stop"], stamp=self._blocks_stamp,
+                         dord=e["dord"], qpt=e["qpt"], qpt3=e["qpt3"]) for e in index]
 
     @property
     def qpoints(self) -> KpointList:
@@ -1277,7 +1488,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
     def anacompare_asr(self, asr_list=(0, 2), chneut_list=(1,), dipdip=1, dipquad=1, quadquad=1,
                        lo_to_splitting="automatic",
                        nqsmall=10, ndivsm=20, dos_method="tetra", ngqpt=None,
-                       verbose=0, mpi_procs=1, pre_label=None) -> PhononBandsPlotter:
+                       verbose=0, mpi_procs=1, nprocs=1, pre_label=None) -> PhononBandsPlotter:
         """
         Invoke anaddb to compute the phonon band structure and the phonon DOS with different
         values of the ``asr`` input variable (acoustic sum rule treatment).
@@ -1301,6 +1512,8 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             ngqpt: Number of divisions for the ab-initio q-mesh in the DDB file. Auto-detected if None (default)
             verbose: Verbosity level.
             mpi_procs: Number of MPI processes used by anaddb.
+            nprocs: Total number of cores used to run the anaddb calculations in parallel.
+                Default: 1 i.e. sequential execution. If None, use get_max_nprocs(). See :func:`run_anaddb_jobs`.
             pre_label: String to prepend to the default label used by the Plotter.
 
         Return:
@@ -1310,13 +1523,16 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         phbands_plotter = PhononBandsPlotter()
 
-        for asr, chneut in itertools.product(asr_list, chneut_list):
-            phbst_file, phdos_file = self.anaget_phbst_and_phdos_files(
-                nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip, dipquad=dipquad, quadquad=quadquad,
-                dos_method=dos_method,
-                lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
-                anaddb_kwargs=None, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+        confs = list(itertools.product(asr_list, chneut_list))
+        kwargs_list = [dict(nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip,
+                            dipquad=dipquad, quadquad=quadquad, dos_method=dos_method,
+                            lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
+                            anaddb_kwargs=None, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+                       for asr, chneut in confs]
+        results = run_anaddb_jobs(self.anaget_phbst_and_phdos_files, kwargs_list,
+                                  mpi_procs=mpi_procs, nprocs=nprocs, verbose=verbose)
 
+        for (asr, chneut), (phbst_file, phdos_file) in zip(confs, results):
             if pre_label is not None:
                 label = "%s (asr: %d, dipdip: %d, chneut: %d)" % (pre_label, asr, dipdip, chneut)
             else:
@@ -1334,7 +1550,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
     def anacompare_dipdip(self, chneut_list=(1,), asr=2, dipquad=1, quadquad=1,
                           lo_to_splitting="automatic", nqsmall=10, ndivsm=20, dos_method="tetra", ngqpt=None,
-                          verbose=0, mpi_procs=1, pre_label=None) -> PhononDosPlotter:
+                          verbose=0, mpi_procs=1, nprocs=1, pre_label=None) -> PhononDosPlotter:
         """
         Invoke anaddb to compute the phonon band structure and the phonon DOS with different
         values of the ``dipdip`` input variable (dipole-dipole treatment).
@@ -1357,6 +1573,8 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             ngqpt: Number of divisions for the ab-initio q-mesh in the DDB file. Auto-detected if None (default)
             verbose: Verbosity level.
             mpi_procs: Number of MPI processes used by anaddb.
+            nprocs: Total number of cores used to run the anaddb calculations in parallel.
+                Default: 1 i.e. sequential execution. If None, use get_max_nprocs(). See :func:`run_anaddb_jobs`.
             pre_label: String to prepen to the default label used by the Plotter.
 
         Return:
@@ -1366,26 +1584,27 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         phbands_plotter = PhononBandsPlotter()
 
-        for dipdip in (0, 1):
-            my_chneut_list = chneut_list if dipdip != 0 else [0]
-            for chneut in my_chneut_list:
-                phbst_file, phdos_file = self.anaget_phbst_and_phdos_files(
-                    nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip, dipquad=dipquad, quadquad=quadquad,
-                    dos_method=dos_method,
-                    lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
-                    anaddb_kwargs=None, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
-
-                if pre_label is not None:
-                    label = "%s (asr: %d, dipdip: %d, chneut: %d)" % (pre_label, asr, dipdip, chneut)
-                else:
-                    label = "asr: %d, dipdip: %d, chneut: %d" % (asr, dipdip, chneut)
+        confs = [(dipdip, chneut) for dipdip in (0, 1) for chneut in (chneut_list if dipdip != 0 else [0])]
+        kwargs_list = [dict(nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip,
+                            dipquad=dipquad, quadquad=quadquad, dos_method=dos_method,
+                            lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
+                            anaddb_kwargs=None, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+                       for dipdip, chneut in confs]
+        results = run_anaddb_jobs(self.anaget_phbst_and_phdos_files, kwargs_list,
+                                  mpi_procs=mpi_procs, nprocs=nprocs, verbose=verbose)
 
-                if phdos_file is not None:
-                    phbands_plotter.add_phbands(label, phbst_file.phbands, phdos=phdos_file.phdos)
-                    phdos_file.close()
-                else:
-                    phbands_plotter.add_phbands(label, phbst_file.phbands)
-                phbst_file.close()
+        for (dipdip, chneut), (phbst_file, phdos_file) in zip(confs, results):
+            if pre_label is not None:
+                label = "%s (asr: %d, dipdip: %d, chneut: %d)" % (pre_label, asr, dipdip, chneut)
+            else:
+                label = "asr: %d, dipdip: %d, chneut: %d" % (asr, dipdip, chneut)
+
+            if phdos_file is not None:
+                phbands_plotter.add_phbands(label, phbst_file.phbands, phdos=phdos_file.phdos)
+                phdos_file.close()
+            else:
+                phbands_plotter.add_phbands(label, phbst_file.phbands)
+            phbst_file.close()
 
         return phbands_plotter
 
@@ -1405,7 +1624,8 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
                 In the later case, the value 0.001 eV is used as gaussian broadening
             ngqpt: Number of divisions for the ab-initio q-mesh in the DDB file. Auto-detected if None (default)
             verbose: Verbosity level.
-            num_cpus: Number of CPUs (threads) used to parallellize the calculation of the DOSes. Autodetected if None.
+            num_cpus: Number of CPUs (threads) used to parallellize the calculation of the DOSes.
+                If None, use get_max_nprocs(). See :func:`run_anaddb_jobs`.
             stream: File-like object used for printing.
 
         Return:
@@ -1415,10 +1635,6 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
                     plotter: |PhononDosPlotter| object.
                         Client code can use ``plotter.gridplot()`` to visualize the results.
         """
-        #num_cpus = get_ncpus() // 2 if num_cpus is None else num_cpus
-        if num_cpus <= 0: num_cpus = 1
-        num_cpus = min(num_cpus, len(nqsmalls))
-
         def do_work(nqsmall):
             phbst_file, phdos_file = self.anaget_phbst_and_phdos_files(
                 nqsmall=nqsmall, ndivsm=1, asr=asr, chneut=chneut, dipdip=dipdip,
@@ -1428,37 +1644,9 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             phdos_file.close()
             return phdos
 
-        if num_cpus == 1:
-            # Sequential version
-            phdoses = [do_work(nqs) for nqs in nqsmalls]
-
-        else:
-            # Threads
-            if verbose:
-                print("Computing %d phonon DOS with %d threads" % (len(nqsmalls), num_cpus))
-            phdoses = [None] * len(nqsmalls)
-
-            def worker():
-                while True:
-                    nqsm, phdos_index = q.get()
-                    phdos = do_work(nqsm)
-                    phdoses[phdos_index] = phdos
-                    q.task_done()
-
-            from threading import Thread
-            from queue import Queue
-
-            q = Queue()
-            for i in range(num_cpus):
-                t = Thread(target=worker)
-                t.daemon = True
-                t.start()
-
-            for i, nqsmall in enumerate(nqsmalls):
-                q.put((nqsmall, i))
-
-            # block until all tasks are done
-            q.join()
+        if num_cpus is not None: num_cpus = max(num_cpus, 1)
+        phdoses = run_anaddb_jobs(do_work, [dict(nqsmall=nqs) for nqs in nqsmalls],
+                                  nprocs=num_cpus, verbose=verbose)
 
         # Compute relative difference wrt last phonon DOS. Be careful because the DOSes may be defined
         # on different frequency meshes ==> spline on the mesh of the last DOS.
@@ -1479,7 +1667,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
     def anacompare_rifcsph(self, rifcsph_list, asr=2, chneut=1, dipdip=1, dipquad=1, quadquad=1,
                            lo_to_splitting="automatic", ndivsm=20,
-                           ngqpt=None, verbose=0, mpi_procs=1) -> PhononBandsPlotter:
+                           ngqpt=None, verbose=0, mpi_procs=1, nprocs=1) -> PhononBandsPlotter:
         """
         Invoke anaddb to compute the phonon band structure and the phonon DOS with different
         values of the ``asr`` input variable (acoustic sum rule treatment).
@@ -1498,6 +1686,8 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             ngqpt: Number of divisions for the ab-initio q-mesh in the DDB file. Auto-detected if None (default)
             verbose: Verbosity level.
             mpi_procs: Number of MPI processes used by anaddb.
+            nprocs: Total number of cores used to run the anaddb calculations in parallel.
+                Default: 1 i.e. sequential execution. If None, use get_max_nprocs(). See :func:`run_anaddb_jobs`.
 
         Return:
             |PhononBandsPlotter| object.
@@ -1506,13 +1696,16 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         """
         phbands_plotter = PhononBandsPlotter()
 
-        for rifcsph in rifcsph_list:
-            phbst_file, _ = self.anaget_phbst_and_phdos_files(
-                nqsmall=0, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip, dipquad=dipquad, quadquad=quadquad,
-                dos_method="tetra", lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
-                anaddb_kwargs={"rifcsph": rifcsph},
-                verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+        kwargs_list = [dict(nqsmall=0, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip,
+                            dipquad=dipquad, quadquad=quadquad, dos_method="tetra",
+                            lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
+                            anaddb_kwargs={"rifcsph": rifcsph},
+                            verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+                       for rifcsph in rifcsph_list]
+        results = run_anaddb_jobs(self.anaget_phbst_and_phdos_files, kwargs_list,
+                                  mpi_procs=mpi_procs, nprocs=nprocs, verbose=verbose)
 
+        for rifcsph, (phbst_file, _) in zip(rifcsph_list, results):
             label = "rifcsph: %f" % rifcsph
             phbands_plotter.add_phbands(label, phbst_file.phbands)
             phbst_file.close()
@@ -1521,7 +1714,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
     def anacompare_quad(self, asr=2, chneut=1, dipdip=1, lo_to_splitting="automatic",
                         nqsmall=0, ndivsm=20, dos_method="tetra", ngqpt=None,
-                        verbose=0, mpi_procs=1) -> PhononBandsPlotter:
+                        verbose=0, mpi_procs=1, nprocs=1) -> PhononBandsPlotter:
         """
         Invoke anaddb to compute the phonon band structure and the phonon DOS by including
         dipole-quadrupole and quadrupole-quadrupole terms in the dynamical matrix
@@ -1544,6 +1737,8 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             ngqpt: Number of divisions for the ab-initio q-mesh in the DDB file. Auto-detected if None (default)
             verbose: Verbosity level.
             mpi_procs: Number of MPI processes used by anaddb.
+            nprocs: Total number of cores used to run the anaddb calculations in parallel.
+                Default: 1 i.e. sequential execution. If None, use get_max_nprocs(). See :func:`run_anaddb_jobs`.
 
         Return:
             |PhononBandsPlotter| object.
@@ -1558,12 +1753,14 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
             dict(dipquad=1, quadquad=1),
         ]
 
-        for conf in confs:
-            phbst_file, phdos_file = self.anaget_phbst_and_phdos_files(
-                nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip, dos_method=dos_method,
-                lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
-                anaddb_kwargs=conf, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+        kwargs_list = [dict(nqsmall=nqsmall, ndivsm=ndivsm, asr=asr, chneut=chneut, dipdip=dipdip,
+                            dos_method=dos_method, lo_to_splitting=lo_to_splitting, ngqpt=ngqpt, qptbounds=None,
+                            anaddb_kwargs=conf, verbose=verbose, mpi_procs=mpi_procs, workdir=None, manager=None)
+                       for conf in confs]
+        results = run_anaddb_jobs(self.anaget_phbst_and_phdos_files, kwargs_list,
+                                  mpi_procs=mpi_procs, nprocs=nprocs, verbose=verbose)
 
+        for conf, (phbst_file, phdos_file) in zip(confs, results):
             label = "asr: %d, chneut: %d, dipdip: %d, dipquad: %d, quadquad: %d " % (
                     asr, dipdip, chneut, conf["dipquad"], conf["quadquad"])
 
@@ -1651,6 +1848,29 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
         return ifcs if not return_input else (ifcs, inp)
 
+    def get_phonon_interpolator(self, asr=2, chneut=1, dipdip=1, ngqpt=None):
+        """
+        Compute the interatomic force constants in-process without invoking anaddb.
+        The object can be used to interpolate phonon bands and DOS for many q-points
+        e.g. in convergence studies.
+
+        Args:
+            asr, chneut, dipdip: Anaddb input variable. See official documentation.
+                Dipole-quadrupole and quadrupole-quadrupole terms are not supported.
+            ngqpt: Number of divisions for the q-mesh in the DDB file. Auto-detected if None (default)
+
+        Returns:
+            :class:`PhononInterpolator` object.
+
+        .. example::
+
+            interp = ddb.get_phonon_interpolator()
+            phbands = interp.get_phbands(ndivsm=20)
+            phdos = interp.get_phdos(nqsmall=20)
+        """
+        from abipy.dfpt.phinterp import PhononInterpolator
+        return PhononInterpolator.from_ddb(self, ngqpt=ngqpt, asr=asr, chneut=chneut, dipdip=dipdip)
+
     def anaget_nlo(self, anaddb_kwargs=None, voigt=True, verbose=0, units="pm/V",
                    mpi_procs=1, workdir=None, manager=None, return_input=False):
         """
@@ -1946,10 +2166,38 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
 
         return raman if not return_input else (raman, inp)
 
+    @property
+    def content_hash(self) -> str:
+        """
+        Hash computed from the content of the DDB file.
+        Recomputed only if the size or the modification time of the file changed.
+        """
+        stat = os.stat(self.filepath)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if getattr(self, "_content_hash", None) is None or self._content_hash[0] != stamp:
+            self._content_hash = (stamp, hash_file(self.filepath))
+        return self._content_hash[1]
+
+    def _get_anaddb_key(self, anaddb_input) -> str | None:
+        """
+        Return the key used to store the results of `anaddb_input` in the anaddb cache.
+        None if the cache is disabled.
+        """
+        if self.anaddb_cache is None: return None
+        return hash_key(self.content_hash, anaddb_input.to_string(sortmode="a"))
+
     def _run_anaddb_task(self, anaddb_input, mpi_procs, workdir, manager, verbose):
         """
         Execute an |AnaddbInput| via the shell. Return |AnaddbTask|.
+        If the anaddb cache is enabled and workdir is None, the results of previous runs
+        are reused and an :class:`AnaddbCacheEntry` is returned.
         """
+        key = self._get_anaddb_key(anaddb_input) if workdir is None else None
+        if key is not None and (path := self.anaddb_cache.get_entry_path(key)) is not None:
+            entry = AnaddbCacheEntry(path)
+            if verbose: print("Reusing anaddb results from cache entry:", entry.workdir)
+            return entry
+
         task = AnaddbTask.temp_shell_task(anaddb_input, ddb_node=self.filepath,
                 mpi_procs=mpi_procs, workdir=workdir, manager=manager)
 
@@ -1964,6 +2212,15 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         if not report.run_completed:
             raise self.AnaddbError(task=task, report=report)
 
+        if key is not None:
+            try:
+                with self.anaddb_cache.new_entry(key) as tmpdir:
+                    shutil.copytree(task.outdir.path, os.path.join(tmpdir, "outdata"))
+                    if os.path.isfile(task.output_file.path):
+                        shutil.copy(task.output_file.path, tmpdir)
+            except OSError as exc:
+                cprint("Cannot save anaddb results in cache. Exception:\n%s" % str(exc), color="yellow")
+
         return task
 
     def write(self, filepath: str, filter_blocks=None) -> None:
@@ -2041,6 +2298,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         Returns:
             bool: True if the block was inserted.
         """
+        data = DdbBlock.from_dict(data)
         dord = data["dord"]
         for i, b in enumerate(self.blocks):
             if dord == b["dord"] and \
@@ -2097,10 +2355,7 @@ class DdbFile(TextFile, Has_Structure, NotebookWriter):
         d = OrderedDict()
 
         for q, dm in dynmat.items():
-            dd = {}
-            for index, row in dm.iterrows():
-                dd[index] = row["cvalue"]
-            d[q] = dd
+            d[q] = dict(zip(dm.index, dm["cvalue"].to_numpy()))
 
         return d
 
@@ -3108,9 +3363,22 @@ class DdbRobot(Robot):
         row_names = row_names if not abspath else self._to_relpaths(row_names)
         return pd.DataFrame(rows, index=row_names, columns=list(rows[0].keys()))
 
-    def anaget_phonon_plotters(self, **kwargs):
+    def _run_anaddb_jobs(self, method_name: str, kwargs: dict, nprocs) -> list:
+        """
+        Call the DdbFile method `method_name` with `kwargs` for all the DDB files in the robot.
+        Return list of results. See :func:`run_anaddb_jobs` for the meaning of nprocs.
+        """
+        def func(ddb):
+            return getattr(ddb, method_name)(**kwargs)
+
+        return run_anaddb_jobs(func, [dict(ddb=ddb) for ddb in self.abifiles],
+                               mpi_procs=kwargs.get("mpi_procs", 1), nprocs=nprocs, verbose=kwargs.get("verbose", 0))
+
+    def anaget_phonon_plotters(self, nprocs=1, **kwargs):
         r"""
         Invoke anaddb to compute phonon bands and DOS using the arguments passed via `kwargs`.
+        The DDB files are processed in parallel using at most `nprocs` cores (default: sequential execution,
+        see :func:`run_anaddb_jobs`).
         Collect results and return `namedtuple` with the following attributes:
 
             phbands_plotter: |PhononBandsPlotter| object.
@@ -3129,10 +3397,10 @@ class DdbRobot(Robot):
 
         phbands_plotter, phdos_plotter = PhononBandsPlotter(), PhononDosPlotter()
 
-        for label, ddb in self.items():
-            # Invoke anaddb to get phonon bands and DOS.
-            phbst_file, phdos_file = ddb.anaget_phbst_and_phdos_files(**kwargs)
+        # Invoke anaddb to get phonon bands and DOS.
+        results = self._run_anaddb_jobs("anaget_phbst_and_phdos_files", kwargs, nprocs)
 
+        for (label, ddb), (phbst_file, phdos_file) in zip(self.items(), results):
             # Phonon frequencies with non analytical contributions, if calculated, are saved in anaddb.nc
             # Those results should be fetched from there and added to the phonon bands.
             # lo_to_splitting in ["automatic", True, False] and defaults to automatic.
@@ -3151,7 +3419,7 @@ class DdbRobot(Robot):
         return dict2namedtuple(phbands_plotter=phbands_plotter, phdos_plotter=phdos_plotter)
 
     def anacompare_elastic(self, ddb_header_keys=None, with_structure=True, with_spglib=True,
-                           with_path=False, manager=None, verbose=0, **kwargs):
+                           with_path=False, manager=None, verbose=0, nprocs=1, **kwargs):
         """
         Compute elastic and piezoelectric properties for all DDBs in the robot and build DataFrame.
 
@@ -3163,15 +3431,18 @@ class DdbRobot(Robot):
             with_path: True to add DDB path to dataframe
             manager: |TaskManager| object. If None, the object is initialized from the configuration file
             verbose: verbosity level. Set it to a value > 0 to get more information
+            nprocs: Total number of cores used to run anaddb in parallel. Default: sequential execution.
+                See :func:`run_anaddb_jobs`.
             kwargs: Keyword arguments passed to `ddb.anaget_elastic`.
 
         Return: DataFrame and list of ElastData objects.
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
         df_list, elastdata_list = [], []
-        for label, ddb in self.items():
-            # Invoke anaddb to compute elastic data.
-            edata = ddb.anaget_elastic(verbose=verbose, manager=manager, **kwargs)
+        # Invoke anaddb to compute elastic data.
+        results = self._run_anaddb_jobs("anaget_elastic", dict(verbose=verbose, manager=manager, **kwargs), nprocs)
+
+        for ddb, edata in zip(self.abifiles, results):
             elastdata_list.append(edata)
 
             # Build daframe with properties derived from the elastic tensor.
@@ -3196,7 +3467,7 @@ class DdbRobot(Robot):
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True),
                                elastdata_list=elastdata_list)
 
-    def anacompare_becs(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_becs(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0, nprocs=1):
         """
         Compute Born effective charges for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -3208,6 +3479,8 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            nprocs: Total number of cores used to run anaddb in parallel. Default: sequential execution.
+                See :func:`run_anaddb_jobs`.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -3216,9 +3489,10 @@ class DdbRobot(Robot):
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
         df_list, becs_list = [], []
-        for label, ddb in self.items():
-            # Invoke anaddb to compute Becs
-            _, becs = ddb.anaget_epsinf_and_becs(chneut=chneut, verbose=verbose)
+        # Invoke anaddb to compute Becs
+        results = self._run_anaddb_jobs("anaget_epsinf_and_becs", dict(chneut=chneut, verbose=verbose), nprocs)
+
+        for ddb, (_, becs) in zip(self.abifiles, results):
             becs_list.append(becs)
             df = becs.get_voigt_dataframe(tol=tol)
 
@@ -3237,7 +3511,8 @@ class DdbRobot(Robot):
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True).sort_values(by="site_index"),
                                becs_list=becs_list)
 
-    def anacompare_epsinf(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_epsinf(self, ddb_header_keys=None, chneut=1, tol=1e-3, with_path=False, verbose=0,
+                          nprocs=1):
         r"""
         Compute (eps^\inf) electronic dielectric tensor for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -3249,6 +3524,8 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            nprocs: Total number of cores used to run anaddb in parallel. Default: sequential execution.
+                See :func:`run_anaddb_jobs`.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -3257,9 +3534,10 @@ class DdbRobot(Robot):
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
         df_list, epsinf_list = [], []
-        for label, ddb in self.items():
-            # Invoke anaddb to compute e_inf
-            einf, _ = ddb.anaget_epsinf_and_becs(chneut=chneut, verbose=verbose)
+        # Invoke anaddb to compute e_inf
+        results = self._run_anaddb_jobs("anaget_epsinf_and_becs", dict(chneut=chneut, verbose=verbose), nprocs)
+
+        for ddb, (einf, _) in zip(self.abifiles, results):
             epsinf_list.append(einf)
             df = einf.get_voigt_dataframe(tol=tol)
 
@@ -3276,7 +3554,8 @@ class DdbRobot(Robot):
         # Concatenate dataframes.
         return dict2namedtuple(df=pd.concat(df_list, ignore_index=True), epsinf_list=epsinf_list)
 
-    def anacompare_eps0(self, ddb_header_keys=None, asr=2, chneut=1, tol=1e-3, with_path=False, verbose=0):
+    def anacompare_eps0(self, ddb_header_keys=None, asr=2, chneut=1, tol=1e-3, with_path=False, verbose=0,
+                        nprocs=1):
         """
         Compute (eps^0) dielectric tensor for all DDBs in the robot and build DataFrame.
         with Voigt indices as columns + metadata. Useful for convergence studies.
@@ -3288,6 +3567,8 @@ class DdbRobot(Robot):
             tol: Elements below this value are set to zero.
             with_path: True to add DDB path to dataframe
             verbose: verbosity level. Set it to a value > 0 to get more information
+            nprocs: Total number of cores used to run anaddb in parallel. Default: sequential execution.
+                See :func:`run_anaddb_jobs`.
 
         Return: ``namedtuple`` with the following attributes::
 
@@ -3297,9 +3578,11 @@ class DdbRobot(Robot):
         """
         ddb_header_keys = [] if ddb_header_keys is None else list_strings(ddb_header_keys)
         df_list, eps0_list, dgen_list = [], [], []
-        for label, ddb in self.items():
-            # Invoke anaddb to compute e_0
-            gen = ddb.anaget_dielectric_tensor_generator(asr=asr, chneut=chneut, dipdip=1, verbose=verbose)
+        # Invoke anaddb to compute e_0
+        results = self._run_anaddb_jobs("anaget_dielectric_tensor_generator",
+                                        dict(asr=asr, chneut=chneut, dipdip=1, verbose=verbose), nprocs)
+
+        for ddb, gen in zip(self.abifiles, results):
             dgen_list.append(gen)
             eps0_list.append(gen.eps0)
             df = gen.eps0.get_voigt_dataframe(tol=tol)
@@ -0,0 +1,612 @@
+# coding: utf-8
+"""
+In-process Fourier interpolation of the dynamical matrix.
+
+The interatomic force constants (IFCs) are computed once from the dynamical matrices stored in the DDB file
+and phonon frequencies and displacements are then obtained for batches of q-points with vectorized NumPy
+without having to run anaddb in a subprocess.
+The algorithm follows the one implemented in anaddb:
+
+    - The dynamical matrices are unfolded from the IBZ to the full ab-initio q-mesh with the symmetries of the crystal.
+    - The acoustic sum rule (ASR) is imposed by correcting the on-site terms with the dynamical matrix at Gamma.
+    - The dipole-dipole part is computed with the Ewald technique (see :cite:`Gonze1997`) and
+      subtracted before computing the IFCs in real space.
+    - The IFCs are multiplied by the Wigner-Seitz weights of the supercell associated to the q-mesh.
+
+Dipole-quadrupole and quadrupole-quadrupole terms are not included.
+"""
+from __future__ import annotations
+
+import itertools
+import numpy as np
+import abipy.core.abinit_units as abu
+
+from monty.string import marquee
+from abipy.core.mixins import Has_Structure
+from abipy.core.structure import Structure
+from abipy.core.kpoints import Kpath, KpointList, kpath_from_bounds_and_ndivsm
+from abipy.dfpt.phonons import PhononBands, PhononDos
+from abipy.dfpt.phtk import NonAnalyticalPh
+from abipy.tools.numtools import broadened_dos
+
+
+__all__ = [
+    "PhononInterpolator",
+]
+
+
+class PhononInterpolator(Has_Structure):
+    """
+    Fourier interpolation of the dynamical matrix computed in-process from the second-order derivatives
+    stored in a DDB file. Provides |PhononBands| and |PhononDos| objects without invoking anaddb.
+
+    .. rubric:: Inheritance Diagram
+    .. inheritance-diagram:: PhononInterpolator
+
+    .. example::
+
+        interp = PhononInterpolator.from_ddb(ddb, asr=2, chneut=1, dipdip=1)
+        phbands = interp.get_phbands(ndivsm=20)
+        phdos = interp.get_phdos(nqsmall=20)
+    """
+
+    def __init__(self, structure: Structure, amu, ngqpt, rvecs, ifc, asr, chneut, dipdip,
+                 zeff=None, epsinf=None, gamma_dynmat=None, ewald_lambda=0.5):
+        """
+        Args:
+            structure: |Structure| object.
+            amu: Atomic masses in amu for each atom in the structure.
+            ngqpt: Divisions of the ab-initio q-mesh.
+            rvecs: (nrpt, 3) array with the lattice vectors in reduced coordinates.
+            ifc: (nrpt, natom, 3, natom, 3) array with the short-range IFCs in Cartesian coordinates (Ha/Bohr^2)
+                already multiplied by the Wigner-Seitz weights.
+            asr, chneut, dipdip: Anaddb input variables used to compute the IFCs.
+            zeff: (natom, 3, 3) array with the Born effective charges used for the dipole-dipole term.
+                The first index is the atom, the second the direction of the displacement,
+                the last one the direction of the electric field.
+            epsinf: (3, 3) array with the electronic dielectric tensor in Cartesian coordinates.
+            gamma_dynmat: (natom, 3, natom, 3) analytic part of the dynamical matrix at Gamma
+                in Cartesian coordinates (Ha/Bohr^2). Used to compute the LO-TO splitting.
+            ewald_lambda: Gaussian parameter (Bohr^-1) of the Ewald summation.
+        """
+        self._structure = structure
+        self.amu = np.asarray(amu, dtype=float)
+        self.ngqpt = np.asarray(ngqpt, dtype=int)
+        self.rvecs = np.asarray(rvecs, dtype=int)
+        self.ifc = np.asarray(ifc)
+        self.asr, self.chneut, self.dipdip = asr, chneut, dipdip
+        self.zeff = zeff
+        self.epsinf = epsinf
+        self.gamma_dynmat = gamma_dynmat
+        self.ewald_lambda = ewald_lambda
+
+        self.natom = len(structure)
+        self.rprimd = structure.lattice.matrix * abu.Ang_Bohr
+        self.volume = abs(np.linalg.det(self.rprimd))
+        self._gvecs = None
+        if self.has_dipdip:
+            self._dyew_q0 = self._get_ewald_dynmat(np.zeros((1, 3)), with_q0=False)[0]
+
+    @classmethod
+    def from_ddb(cls, ddb, ngqpt=None, asr=2, chneut=1, dipdip=1, ewald_lambda=0.5) -> PhononInterpolator:
+        """
+        Build the object from a |DdbFile|.
+
+        Args:
+            ddb: |DdbFile| or filepath.
+            ngqpt: Number of divisions for the q-mesh in the DDB file. Auto-detected if None (default).
+            asr: Acoustic sum rule: 0 to disable, 1 for asymmetric and 2 for symmetric correction.
+            chneut: 1 to impose the charge neutrality on the Born effective charges.
+            dipdip: 1 to treat the dipole-dipole interaction with the Ewald technique.
+                The term is ignored if the DDB does not contain the Born effective charges and
+                the dielectric tensor.
+            ewald_lambda: Gaussian parameter (Bohr^-1) of the Ewald summation.
+        """
+        from abipy.dfpt.ddb import DdbFile
+        if not isinstance(ddb, DdbFile):
+            with DdbFile(ddb) as ddb:
+                return cls.from_ddb(ddb, ngqpt=ngqpt, asr=asr, chneut=chneut, dipdip=dipdip,
+                                    ewald_lambda=ewald_lambda)
+
+        structure = ddb.structure
+        natom = len(structure)
+        ngqpt = np.array(ddb.guessed_ngqpt if ngqpt is None else ngqpt, dtype=int)
+        typat = np.array(ddb.header["typat"], dtype=int).ravel() - 1
+        amu = np.array(ddb.header["amu"])[typat]
+        zion = np.array(ddb.header["zion"], dtype=float).ravel()[typat]
+
+        rprimd = structure.lattice.matrix * abu.Ang_Bohr
+        gprimd = np.linalg.inv(rprimd)
+        volume = abs(np.linalg.det(rprimd))
+
+        # Collect the 2nd order derivatives with (ipert, idir) indices in Fortran notation.
+        # Several blocks may be associated to the same q-point.
+        mpert = natom + 2
+        blocks = {}
+        for qpt, df in ddb.computed_dynmat.items():
+            key = tuple(np.round(qpt.frac_coords, decimals=8))
+            if key not in blocks:
+                blocks[key] = (np.zeros((mpert, 3, mpert, 3), dtype=complex),
+                               np.zeros((mpert, 3, mpert, 3), dtype=bool))
+            mat, mask = blocks[key]
+            idir1, ipert1, idir2, ipert2 = (df[k].to_numpy() for k in ("idir1", "ipert1", "idir2", "ipert2"))
+            ok = (idir1 <= 3) & (idir2 <= 3) & (ipert1 <= mpert) & (ipert2 <= mpert)
+            inds = (ipert1[ok] - 1, idir1[ok] - 1, ipert2[ok] - 1, idir2[ok] - 1)
+            mat[inds] = df["cvalue"].to_numpy()[ok]
+            mask[inds] = True
+
+        spgrp = structure.abi_spacegroup
+        if spgrp is None:
+            from abipy.core.symmetries import AbinitSpaceGroup
+            spgrp = AbinitSpaceGroup.from_structure(structure)
+        symmetries = _get_symmetries(structure, spgrp.symrel, spgrp.tnons)
+
+        # Dynamical matrices in Cartesian coordinates: C = G D_red G^T with G = rprimd^{-1}.
+        # The elements that are not stored in the DDB file are obtained by symmetry.
+        qibz, dyn_ibz = [], []
+        for key, (mat, mask) in blocks.items():
+            if not mask[:natom, :, :natom, :].all():
+                ph_mat, ph_mask = mat[:natom, :, :natom, :], mask[:natom, :, :natom, :]
+                _complete_dynmat(structure, np.array(key), ph_mat, ph_mask, symmetries)
+                if not ph_mask.all(): continue
+            qibz.append(key)
+            dyn_ibz.append(np.einsum("ai,kilj,bj->kalb", gprimd, mat[:natom, :, :natom, :], gprimd))
+
+        gamma_key = next((k for k in blocks if np.allclose(k, 0)), None)
+        if gamma_key is None or gamma_key not in qibz:
+            raise ValueError("Cannot find the dynamical matrix at Gamma in DDB file: %s" % ddb.filepath)
+        qibz = np.array(qibz)
+
+        # Born effective charges and electronic dielectric tensor from the Gamma block.
+        zeff, epsinf = None, None
+        if dipdip:
+            mat, mask = blocks[gamma_key]
+            iefield = natom + 1
+            has_becs = mask[:natom, :, iefield, :].all() or mask[iefield, :, :natom, :].all()
+            has_eps = mask[iefield, :, iefield, :].all()
+            if has_becs and has_eps:
+                bec_red = mat[:natom, :, iefield, :].real
+                if not mask[:natom, :, iefield, :].all():
+                    bec_red = mat[iefield, :, :natom, :].real.transpose(1, 2, 0)
+                # Z = G B rprimd / (2 pi) + zion
+                zeff = np.einsum("ai,kij,jb->kab", gprimd, bec_red, rprimd) / (2 * np.pi)
+                zeff += zion[:, None, None] * np.eye(3)
+                if chneut:
+                    zeff -= zeff.mean(axis=0)
+                eps_red = mat[iefield, :, iefield, :].real
+                epsinf = np.eye(3) - rprimd.T @ eps_red @ rprimd / (np.pi * volume)
+            else:
+                dipdip = 0
+
+        # Unfold the dynamical matrices to the full q-mesh.
+        dynmat = _unfold_dynmat(structure, ngqpt, qibz, np.array(dyn_ibz), symmetries)
+
+        # Acoustic sum rule from the dynamical matrix at Gamma.
+        gamma_dynmat = dynmat[0].copy()
+        asr_corr = _get_asr_correction(gamma_dynmat, asr)
+        for iat in range(natom):
+            dynmat[:, iat, :, iat, :] -= asr_corr[iat]
+            gamma_dynmat[iat, :, iat, :] -= asr_corr[iat]
+
+        new = cls(structure, amu, ngqpt, np.zeros((0, 3)), np.zeros((0, natom, 3, natom, 3)),
+                  asr, chneut, dipdip, zeff=zeff, epsinf=epsinf, gamma_dynmat=gamma_dynmat.real,
+                  ewald_lambda=ewald_lambda)
+
+        # Subtract the dipole-dipole part and go to real space.
+        qmesh = _get_qmesh(ngqpt)
+        if new.has_dipdip:
+            dynmat -= new._get_ewald_dynmat(qmesh)
+
+        # C(R) = 1/N sum_q D(q) e^{-iqR}
+        ifc_mesh = np.fft.fftn(dynmat.reshape(*ngqpt, natom, 3, natom, 3), axes=(0, 1, 2)) / np.prod(ngqpt)
+        new.rvecs, new.ifc = _get_ws_ifc(structure, ngqpt, ifc_mesh.real)
+
+        return new
+
+    @property
+    def structure(self) -> Structure:
+        """|Structure| object."""
+        return self._structure
+
+    @property
+    def has_dipdip(self) -> bool:
+        """True if the dipole-dipole term is included."""
+        return bool(self.dipdip) and self.zeff is not None and self.epsinf is not None
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+    def to_string(self, verbose: int = 0) -> str:
+        """String representation with verbosity level ``verbose``."""
+        lines = []; app = lines.append
+        app(marquee("Phonon interpolator", mark="="))
+        app("ngqpt: %s, asr: %d, chneut: %d, dipdip: %d" % (self.ngqpt, self.asr, self.chneut, int(self.has_dipdip)))
+        app("Number of lattice vectors: %d" % len(self.rvecs))
+        if verbose:
+            app(self.structure.to_string(verbose=verbose))
+            if self.has_dipdip:
+                app("Electronic dielectric tensor:\n%s" % str(self.epsinf))
+                app("Born effective charges:\n%s" % str(self.zeff))
+
+        return "\n".join(lines)
+
+    def _get_ewald_dynmat(self, qpoints, with_q0=True, qchunk=64) -> np.ndarray:
+        """
+        Dipole-dipole part of the dynamical matrix computed with the reciprocal-space Ewald sum.
+        The Gaussian parameter is chosen so that the real-space contribution is short-ranged and
+        can be included in the IFCs.
+
+        Args:
+            qpoints: (nq, 3) array with q-points in reduced coordinates.
+            with_q0: True if the term at q=0 is subtracted from the on-site terms (ASR).
+
+        Return: (nq, natom, 3, natom, 3) complex array in Cartesian coordinates (Ha/Bohr^2).
+        """
+        natom = self.natom
+        gprimd = np.linalg.inv(self.rprimd)
+        # Rows are the reciprocal lattice vectors in Bohr^-1.
+        bmat = 2 * np.pi * gprimd.T
+        lam2 = self.ewald_lambda ** 2
+
+        if self._gvecs is None:
+            # Include all G with exp(-(q+G) eps (q+G) / 4 lambda^2) > 1e-12
+            eps_min = np.linalg.eigvalsh(self.epsinf).min()
+            kmax = 2 * self.ewald_lambda * np.sqrt(-np.log(1e-12) / eps_min) + np.linalg.norm(bmat, axis=1).max()
+            nmax = np.ceil(kmax * np.linalg.norm(self.rprimd, axis=1) / (2 * np.pi)).astype(int)
+            gvecs = np.array(list(itertools.product(*[range(-n, n + 1) for n in nmax])))
+            self._gvecs = gvecs[np.linalg.norm(gvecs @ bmat, axis=1) <= kmax]
+
+        qpoints = np.reshape(qpoints, (-1, 3))
+        # Use the image of q in [-1/2, 1/2[ so that the same set of G can be used for all q-points.
+        qpoints = qpoints - np.round(qpoints)
+        tau_cart = self.structure.frac_coords @ self.rprimd
+        fact = 4 * np.pi / self.volume
+
+        dyew = np.empty((len(qpoints), natom, 3, natom, 3), dtype=complex)
+        for start in range(0, len(qpoints), qchunk):
+            qs = qpoints[start:start + qchunk]
+            kvecs = (qs[:, None, :] + self._gvecs[None, :, :]) @ bmat
+            keps = np.einsum("qga,ab,qgb->qg", kvecs, self.epsinf, kvecs)
+            kmask = keps > 1e-12
+            keps[~kmask] = 1.0
+            weight = np.where(kmask, fact * np.exp(-keps / (4 * lam2)) / keps, 0.0)
+            # (K.Z_k)_a e^{i K.tau_k}
+            kz = np.einsum("qgb,kab->qgka", kvecs, self.zeff)
+            kz = kz * np.exp(1j * kvecs @ tau_cart.T)[..., None]
+            kz = kz.reshape(len(qs), len(self._gvecs), 3 * natom)
+            dyew[start:start + qchunk] = np.matmul(
+                (kz * weight[..., None]).transpose(0, 2, 1), kz.conj()).reshape(len(qs), natom, 3, natom, 3)
+
+        if with_q0:
+            q0_corr = self._dyew_q0.sum(axis=2)
+            for iat in range(natom):
+                dyew[:, iat, :, iat, :] -= q0_corr[iat]
+
+        return dyew
+
+    def get_dynmat(self, qpoints) -> np.ndarray:
+        """
+        Interpolate the dynamical matrix at the given q-points.
+
+        Args:
+            qpoints: (nq, 3) array with q-points in reduced coordinates.
+
+        Return: (nq, 3 * natom, 3 * natom) complex array in Cartesian coordinates (Ha/Bohr^2).
+        """
+        qpoints = np.reshape(qpoints, (-1, 3))
+        nq, natom = len(qpoints), self.natom
+        phases = np.exp(2j * np.pi * qpoints @ self.rvecs.T)
+        dynmat = (phases @ self.ifc.reshape(len(self.rvecs), -1)).reshape(nq, natom, 3, natom, 3)
+        if self.has_dipdip:
+            dynmat += self._get_ewald_dynmat(qpoints)
+
+        dynmat = dynmat.reshape(nq, 3 * natom, 3 * natom)
+        # Enforce hermiticity.
+        return 0.5 * (dynmat + dynmat.conj().transpose(0, 2, 1))
+
+    def _diagonalize(self, dynmat) -> tuple:
+        """
+        Diagonalize the dynamical matrices.
+        Return phonon frequencies in eV and displacements in Cartesian coordinates in Angstrom.
+        """
+        mass = np.repeat(self.amu * abu.amu_emass, 3)
+        sqrt_mass = np.sqrt(mass)
+        eigvals, eigvecs = np.linalg.eigh(dynmat / np.outer(sqrt_mass, sqrt_mass))
+        phfreqs = np.sign(eigvals) * np.sqrt(np.abs(eigvals)) * abu.Ha_eV
+        # phdispl_cart[q, nu, :] = e_nu / sqrt(M)
+        phdispl_cart = eigvecs.transpose(0, 2, 1) / sqrt_mass * abu.Bohr_Ang
+
+        return phfreqs, phdispl_cart
+
+    def get_phfreqs_and_displ(self, qpoints, qchunk=512) -> tuple:
+        """
+        Compute phonon frequencies and displacements at the given q-points in batches of ``qchunk`` points.
+
+        Return:
+            phfreqs: (nq, 3 * natom) array with phonon frequencies in eV.
+            phdispl_cart: (nq, 3 * natom, 3 * natom) array with displacements in Cartesian coordinates in Angstrom.
+        """
+        qpoints = np.reshape(qpoints, (-1, 3))
+        nq, nmodes = len(qpoints), 3 * self.natom
+        phfreqs = np.empty((nq, nmodes))
+        phdispl_cart = np.empty((nq, nmodes, nmodes), dtype=complex)
+        for start in range(0, nq, qchunk):
+            stop = start + qchunk
+            phfreqs[start:stop], phdispl_cart[start:stop] = self._diagonalize(self.get_dynmat(qpoints[start:stop]))
+
+        return phfreqs, phdispl_cart
+
+    @property
+    def amu_dict(self) -> dict:
+        """Dictionary mapping the atomic number to the mass in amu."""
+        return {site.specie.Z: m for site, m in zip(self.structure, self.amu)}
+
+    def get_non_anal_ph(self, directions) -> NonAnalyticalPh:
+        """
+        Compute the phonons at Gamma including the non-analytical contribution along the given
+        Cartesian directions. Return :class:`NonAnalyticalPh` object.
+        """
+        if not self.has_dipdip:
+            raise ValueError("Born effective charges and dielectric tensor are needed to compute the LO-TO splitting")
+
+        directions = np.reshape(directions, (-1, 3)).astype(float)
+        natom = self.natom
+        dynmat = np.empty((len(directions), 3 * natom, 3 * natom), dtype=complex)
+        for i, qdir in enumerate(directions):
+            qz = np.einsum("b,kab->ka", qdir, self.zeff).ravel()
+            nonanal = 4 * np.pi / self.volume * np.outer(qz, qz) / (qdir @ self.epsinf @ qdir)
+            dynmat[i] = self.gamma_dynmat.reshape(3 * natom, 3 * natom) + nonanal
+
+        phfreqs, phdispl_cart = self._diagonalize(dynmat)
+
+        return NonAnalyticalPh(self.structure, directions, phfreqs, phdispl_cart, amu=self.amu_dict)
+
+    def get_phbands(self, qpoints=None, ndivsm=20, line_density=None, qptbounds=None,
+                    lo_to_splitting="automatic") -> PhononBands:
+        """
+        Interpolate the phonon band structure.
+
+        Args:
+            qpoints: List of q-points in reduced coordinates. If None, a path is generated with
+                ``ndivsm`` or ``line_density``.
+            ndivsm: Number of division used for the smallest segment of the q-path.
+            line_density: Defines the a density of k-points per reciprocal atom to plot the phonon dispersion.
+                Overrides ndivsm.
+            qptbounds: Boundaries of the path. If None, the path is generated from an internal database
+                depending on the input structure.
+            lo_to_splitting: Allowed values are [True, False, "automatic"].
+                If True, the non-analytical contribution is computed along the segments of the path
+                starting or ending at Gamma. "automatic" activates the LO-TO splitting if the dipole-dipole
+                term is available.
+
+        Return: |PhononBands| object.
+        """
+        structure = self.structure
+        if qpoints is None:
+            if qptbounds is None:
+                qptbounds = structure.calc_kptbounds()
+            if line_density:
+                from abipy.abio.inputs import kpoints_from_line_density
+                qpoints = kpoints_from_line_density(structure, line_density)
+            else:
+                qpoints = kpath_from_bounds_and_ndivsm(qptbounds, ndivsm, structure)
+            qpoints = Kpath(structure.reciprocal_lattice, np.reshape(qpoints, (-1, 3)))
+        else:
+            qpoints = KpointList(structure.reciprocal_lattice, np.reshape(qpoints, (-1, 3)))
+
+        phfreqs, phdispl_cart = self.get_phfreqs_and_displ(qpoints.frac_coords)
+
+        if lo_to_splitting == "automatic":
+            lo_to_splitting = self.has_dipdip
+
+        non_anal_ph = None
+        if lo_to_splitting:
+            # Directions of the segments starting or ending at Gamma as done in AnaddbInput.phbands_and_dos
+            rl = structure.lattice.reciprocal_lattice_crystallographic
+            frac_coords = qpoints.frac_coords
+            directions = []
+            for i, q in enumerate(frac_coords):
+                if not np.allclose(q, 0): continue
+                if i > 0: directions.append(rl.get_cartesian_coords(frac_coords[i - 1]))
+                if i < len(frac_coords) - 1: directions.append(rl.get_cartesian_coords(frac_coords[i + 1]))
+            if directions:
+                non_anal_ph = self.get_non_anal_ph(directions)
+
+        return PhononBands(structure, qpoints, phfreqs, phdispl_cart, non_anal_ph=non_anal_ph,
+                           amu=self.amu_dict, epsinf=self.epsinf, zcart=self.zeff)
+
+    def get_phdos(self, nqsmall=10, ngqpt=None, width=4.e-4, step=1.e-4, qchunk=512) -> PhononDos:
+        """
+        Compute the phonon DOS with gaussian smearing on an homogeneous q-mesh.
+
+        Args:
+            nqsmall: Defines the homogeneous q-mesh used for the DOS. Gives the number of divisions
+                used to sample the smallest lattice vector.
+            ngqpt: Divisions of the q-mesh. Overrides nqsmall.
+            width: Standard deviation (eV) of the gaussian.
+            step: Energy step (eV) of the linear mesh.
+
+        Return: |PhononDos| object with the DOS normalized to 3 * natom.
+        """
+        if ngqpt is None:
+            ngqpt = self.structure.calc_ngkpt(nqsmall)
+        qmesh = _get_qmesh(ngqpt)
+
+        phfreqs = np.empty((len(qmesh), 3 * self.natom))
+        for start in range(0, len(qmesh), qchunk):
+            dynmat = self.get_dynmat(qmesh[start:start + qchunk])
+            phfreqs[start:start + qchunk] = self._diagonalize(dynmat)[0]
+
+        w_min, w_max = phfreqs.min(), phfreqs.max()
+        w_min -= 0.1 * abs(w_min) + 5 * width
+        w_max += 0.1 * abs(w_max) + 5 * width
+        nw = int(1 + (w_max - w_min) / step)
+        mesh = np.linspace(w_min, w_max, num=nw, endpoint=True)
+
+        values = broadened_dos(mesh, phfreqs, width)
+
+        return PhononDos(mesh, values / len(qmesh))
+
+
+def _get_qmesh(ngqpt) -> np.ndarray:
+    """
+    Unshifted q-mesh in reduced coordinates. The last direction is the fastest index
+    so that the points can be reshaped to (ngqpt[0], ngqpt[1], ngqpt[2]).
+    """
+    return np.array(list(itertools.product(*[range(n) for n in ngqpt])), dtype=float) / np.asarray(ngqpt)
+
+
+def _get_asr_correction(gamma_dynmat, asr) -> np.ndarray:
+    """
+    Return (natom, 3, 3) array with the correction for the on-site terms computed from the
+    dynamical matrix at Gamma. asr == 1 gives the asymmetric correction, asr == 2 the symmetric one.
+    """
+    natom = gamma_dynmat.shape[0]
+    if not asr:
+        return np.zeros((natom, 3, 3))
+
+    corr = gamma_dynmat.real.sum(axis=2)
+    if asr == 2:
+        corr = 0.5 * (corr + corr.transpose(0, 2, 1))
+    elif asr != 1:
+        raise ValueError("Invalid value for asr: %s" % str(asr))
+
+    return corr
+
+
+def _get_symmetries(structure, symrel, tnons) -> list:
+    """
+    Return list of (symrel, perm) tuples where perm gives the index of the atom
+    obtained by applying the symmetry {S|t}: x -> S x + t to each atom of the structure.
+    """
+    xred = structure.frac_coords
+    symmetries = []
+    for rot, tau in zip(symrel, tnons):
+        sx = xred @ rot.T + tau
+        diff = sx[:, None, :] - xred[None, :, :]
+        match = np.all(np.abs(diff - np.round(diff)) < 1e-4, axis=-1)
+        if not np.all(match.sum(axis=1) == 1): continue
+        symmetries.append((np.asarray(rot), match.argmax(axis=1)))
+
+    return symmetries
+
+
+def _complete_dynmat(structure, qpt, mat, mask, symmetries, atol=1e-6) -> None:
+    """
+    Use hermiticity and the symmetries of the little group of q to compute the elements of
+    the dynamical matrix in reduced coordinates that are not stored in the DDB file.
+    mat and mask are (natom, 3, natom, 3) arrays that are completed in place.
+    """
+    dxred = structure.frac_coords[None, :, :] - structure.frac_coords[:, None, :]
+    phase = np.exp(2j * np.pi * dxred @ qpt)[:, None, :, None]
+    mat[~mask] = 0
+
+    # For each operation of the little group: D'(Sq) = S^{-T} D(q) S^{-1} with the position-dependent phase.
+    little_group = []
+    for rot, perm in symmetries:
+        rotm1 = np.rint(np.linalg.inv(rot)).astype(int)
+        for time_sign in (1, -1):
+            dq = time_sign * (rotm1.T @ qpt) - qpt
+            if np.all(np.abs(dq - np.round(dq)) < atol):
+                little_group.append((rotm1, perm, time_sign, np.exp(-2j * np.pi * dxred @ (qpt + dq))[:, None, :, None]))
+
+    while not mask.all():
+        nfound = mask.sum()
+        # Hermiticity
+        herm = mask.transpose(2, 3, 0, 1) & ~mask
+        mat[herm] = mat.transpose(2, 3, 0, 1).conj()[herm]
+        mask |= herm
+
+        for rotm1, perm, time_sign, phase_sq in little_group:
+            new = np.empty_like(mat)
+            new[np.ix_(perm, range(3), perm, range(3))] = np.einsum("ia,kilj,jb->kalb", rotm1, mat * phase, rotm1)
+            if time_sign == -1: new = new.conj()
+            new *= phase_sq
+            # An element is known if all the elements entering the linear combination are known.
+            coef = (rotm1 != 0).astype(int)
+            unknown = np.einsum("ia,kilj,jb->kalb", coef, (~mask).astype(int), coef)
+            known = np.zeros_like(mask)
+            known[np.ix_(perm, range(3), perm, range(3))] = unknown == 0
+            known &= ~mask
+            mat[known] = new[known]
+            mask |= known
+
+        if mask.sum() == nfound: break
+
+
+def _unfold_dynmat(structure, ngqpt, qibz, dyn_ibz, symmetries, atol=1e-6) -> np.ndarray:
+    """
+    Use the symmetries of the crystal and time-reversal to reconstruct the dynamical matrices
+    on the full q-mesh from the matrices in the IBZ.
+
+    Return: (nqpt, natom, 3, natom, 3) complex array with the q-points ordered as in :func:`_get_qmesh`.
+    """
+    ngqpt = np.asarray(ngqpt, dtype=int)
+    natom = len(structure)
+    xred = structure.frac_coords
+    rprimd = structure.lattice.matrix * abu.Ang_Bohr
+    gprimd = np.linalg.inv(rprimd)
+
+    nqpt = np.prod(ngqpt)
+    dynmat = np.zeros((nqpt, natom, 3, natom, 3), dtype=complex)
+    found = np.zeros(nqpt, dtype=bool)
+    # e^{i q (tau_k' - tau_k)} to go from the lattice-only phase convention to the one with the positions.
+    dxred = xred[None, :, :] - xred[:, None, :]
+
+    for q, dyn in zip(qibz, dyn_ibz):
+        dyn_pos = dyn * np.exp(2j * np.pi * dxred @ q)[:, None, :, None]
+        for rot, perm in symmetries:
+            # Rotation in Cartesian coordinates and in reciprocal space.
+            rot_cart = rprimd.T @ rot @ gprimd.T
+            symrec = np.linalg.inv(rot).T
+            for time_sign in (1, -1):
+                sq = time_sign * (symrec @ q)
+                iq = sq * ngqpt
+                if np.any(np.abs(iq - np.round(iq)) > atol): continue
+                iq = np.round(iq).astype(int) % ngqpt
+                iq = (iq[0] * ngqpt[1] + iq[1]) * ngqpt[2] + iq[2]
+                if found[iq]: continue
+                new = np.empty_like(dyn_pos)
+                new[np.ix_(perm, range(3), perm, range(3))] = np.einsum("ai,kilj,bj->kalb", rot_cart, dyn_pos, rot_cart)
+                if time_sign == -1: new = new.conj()
+                dynmat[iq] = new * np.exp(-2j * np.pi * dxred @ sq)[:, None, :, None]
+                found[iq] = True
+
+    if not found.all():
+        raise ValueError("The q-points in the DDB file are not enough to reconstruct the q-mesh %s" % str(ngqpt))
+
+    return dynmat
+
+
+def _get_ws_ifc(structure, ngqpt, ifc_mesh, nimg=2, rtol=1e-5) -> tuple:
+    """
+    Multiply the IFCs computed on the supercell by the Wigner-Seitz weights.
+    For each pair of atoms, the lattice vector R is replaced by the periodic images R + T
+    (T being a lattice vector of the supercell) with minimum distance |R + tau_k' - tau_k|.
+    The weights are shared among images at the same distance.
+
+    Return:
+        rvecs: (nrpt, 3) array with lattice vectors in reduced coordinates.
+        ifc: (nrpt, natom, 3, natom, 3) array with the weighted IFCs.
+    """
+    ngqpt = np.asarray(ngqpt, dtype=int)
+    natom = len(structure)
+    rprimd = structure.lattice.matrix * abu.Ang_Bohr
+    xred = structure.frac_coords
+
+    rmesh = np.array(list(itertools.product(*[range(n) for n in ngqpt])))
+    images = np.array(list(itertools.product(range(-nimg, nimg + 1), repeat=3))) * ngqpt
+    # (nr, nimg, 3) lattice vectors
+    rvecs = rmesh[:, None, :] + images[None, :, :]
+    # (nr, nimg, natom, natom) distances |R + tau_k' - tau_k|
+    dxred = xred[None, :, :] - xred[:, None, :]
+    dist = np.linalg.norm((rvecs[:, :, None, None, :] + dxred) @ rprimd, axis=-1)
+    dmin = dist.min(axis=1, keepdims=True)
+    is_ws = dist <= dmin * (1 + rtol) + 1e-8
+    weights = is_ws / is_ws.sum(axis=1, keepdims=True)
+
+    ifc_mesh = ifc_mesh.reshape(len(rmesh), natom, 3, natom, 3)
+    ir, img = np.nonzero(is_ws.any(axis=(2, 3)))
+    ifc = weights[ir, img][:, :, None, :, None] * ifc_mesh[ir]
+
+    return rvecs[ir, img], ifc
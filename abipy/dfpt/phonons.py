@@ -28,7 +28,7 @@ from abipy.core.structure import Structure
 from abipy.abio.robots import Robot
 from abipy.iotools import ETSF_Reader
 from abipy.tools import duck
-from abipy.tools.numtools import gaussian, sort_and_groupby
+from abipy.tools.numtools import sort_and_groupby, broadened_dos
 from abipy.tools.typing import Figure
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt, set_axlims, get_axarray_fig_plt, set_visible,\
     set_ax_xylabels, get_figs_plotly, get_fig_plotly, add_plotly_fig_kwargs, plotlyfigs_to_browser,\
@@ -695,17 +695,13 @@ class PhononBands:
         w_min -= 0.1 * abs(w_min)
         w_max = self.maxfreq
         w_max += 0.1 * abs(w_max)
-        nw = 1 + (w_max - w_min) / step
+        nw = int(1 + (w_max - w_min) / step)
 
         mesh, step = np.linspace(w_min, w_max, num=nw, endpoint=True, retstep=True)
 
-        values = np.zeros(nw)
         if method == "gaussian":
-            for q, qpoint in enumerate(self.qpoints):
-                weight = qpoint.weight
-                for nu in self.branches:
-                    w = self.phfreqs[q, nu]
-                    values += weight * gaussian(mesh, width, center=w)
+            weights = np.broadcast_to(self.qpoints.weights[:, None], self.phfreqs.shape)
+            values = broadened_dos(mesh, self.phfreqs, width, weights=weights)
 
         else:
             raise ValueError("Method %s is not supported" % str(method))
@@ -3378,21 +3374,7 @@ class PhononDos(Function1D):
         Return: |Function1D| object with U(T) + ZPE.
         """
         tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        coth = lambda x: 1.0 / np.tanh(x)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = self.zero_point_energy
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = 0.5 * np.trapz(w * coth(wd2kt) * gw, x=w)
-            #print(vals[it])
-
-        return Function1D(tmesh, vals)
+        return Function1D(tmesh, get_harmonic_thermo([self], tmesh, what="internal_energy")[0])
 
     def get_entropy(self, tstart=5, tstop=300, num=50) -> Function1D:
         """
@@ -3406,20 +3388,7 @@ class PhononDos(Function1D):
         Return: |Function1D| object with S(T).
         """
         tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        coth = lambda x: 1.0 / np.tanh(x)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = 0
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = np.trapz((wd2kt * coth(wd2kt) - np.log(2 * np.sinh(wd2kt))) * gw, x=w)
-
-        return Function1D(tmesh, abu.kb_eVK * vals)
+        return Function1D(tmesh, get_harmonic_thermo([self], tmesh, what="entropy")[0])
 
     def get_free_energy(self, tstart=5, tstop=300, num=50) -> Function1D:
         """
@@ -3433,10 +3402,8 @@ class PhononDos(Function1D):
 
         Return: |Function1D| object with F(T) = U(T) + ZPE - T x S(T)
         """
-        uz = self.get_internal_energy(tstart=tstart, tstop=tstop, num=num)
-        s = self.get_entropy(tstart=tstart, tstop=tstop, num=num)
-
-        return Function1D(uz.mesh, uz.values - s.mesh * s.values)
+        tmesh = np.linspace(tstart, tstop, num=num)
+        return Function1D(tmesh, get_harmonic_thermo([self], tmesh, what="free_energy")[0])
 
     def get_cv(self, tstart=5, tstop=300, num=50) -> Function1D:
         """
@@ -3451,20 +3418,7 @@ class PhononDos(Function1D):
         Return: |Function1D| object with C_v(T).
         """
         tmesh = np.linspace(tstart, tstop, num=num)
-        w, gw = self.mesh[self.iw0:], self.values[self.iw0:]
-        if w[0] < 1e-12:
-            w, gw = self.mesh[self.iw0+1:], self.values[self.iw0+1:]
-        csch2 = lambda x: 1.0 / (np.sinh(x) ** 2)
-
-        vals = np.empty(len(tmesh))
-        for it, temp in enumerate(tmesh):
-            if temp == 0:
-                vals[it] = 0
-            else:
-                wd2kt = w / (2 * abu.kb_eVK * temp)
-                vals[it] = np.trapz(wd2kt ** 2 * csch2(wd2kt) * gw, x=w)
-
-        return Function1D(tmesh, abu.kb_eVK * vals)
+        return Function1D(tmesh, get_harmonic_thermo([self], tmesh, what="cv")[0])
 
     @add_fig_kwargs
     def plot_harmonic_thermo(self, tstart=5, tstop=300, num=50, units="eV", formula_units=None,
@@ -3597,6 +3551,116 @@ class PhononDos(Function1D):
         return self.debye_temp / nsites ** (1 / 3)
 
 
+def _get_thermo_groups(phdoses: list[PhononDos]) -> list[tuple]:
+    """
+    Group the DOSes that can be integrated on the same frequency mesh.
+    Return list of (idos_list, w[nw], gw[len(idos_list), nw]) where w contains the positive frequencies
+    of the mesh shared by the DOSes in idos_list and gw the values.
+    DOSes defined on linear meshes with the same step and aligned points are padded with zeros.
+    Otherwise the DOSes with the same mesh are grouped and each group is integrated on its own mesh.
+    """
+    def positive_part(mesh, values):
+        iw0 = np.searchsorted(mesh, 0.0)
+        if iw0 == len(mesh):
+            raise ValueError("Cannot find zero in energy mesh")
+        if mesh[iw0] < 1e-12: iw0 += 1
+        return mesh[iw0:], values[..., iw0:]
+
+    mesh = phdoses[0].mesh
+    steps = np.array([dos.mesh[1] - dos.mesh[0] for dos in phdoses])
+    step = steps[0]
+    shifts = np.array([(dos.mesh[0] - mesh[0]) / step for dos in phdoses])
+    is_linear = all(np.allclose(np.diff(dos.mesh), step, rtol=1e-8, atol=0) for dos in phdoses)
+
+    if is_linear and np.allclose(shifts, np.rint(shifts), rtol=0, atol=1e-6):
+        shifts = np.rint(shifts).astype(int)
+        start, stop = shifts.min(), max(shift + len(dos.mesh) for shift, dos in zip(shifts, phdoses))
+        w = mesh[0] + step * np.arange(start, stop)
+        gw = np.zeros((len(phdoses), len(w)))
+        for i, (shift, dos) in enumerate(zip(shifts, phdoses)):
+            gw[i, shift - start:shift - start + len(dos.mesh)] = dos.values
+        return [(list(range(len(phdoses))), *positive_part(w, gw))]
+
+    groups = []
+    for idos, dos in enumerate(phdoses):
+        for idos_list, first_mesh in groups:
+            if len(first_mesh) == len(dos.mesh) and np.array_equal(first_mesh, dos.mesh):
+                idos_list.append(idos)
+                break
+        else:
+            groups.append(([idos], dos.mesh))
+
+    return [(idos_list, *positive_part(first_mesh, np.array([phdoses[i].values for i in idos_list])))
+            for idos_list, first_mesh in groups]
+
+
+def get_harmonic_thermo(phdoses: list[PhononDos], tmesh, what="all", max_nbytes: int = 2 ** 27):
+    """
+    Compute thermodynamic properties in the harmonic approximation for a list of phonon DOSes
+    and an array of temperatures. The DOSes defined on the same frequency mesh (or on aligned linear meshes)
+    are grouped so that the integrals for all the temperatures and all the DOSes of the group
+    are computed with matrix products.
+
+    Args:
+        phdoses: List of |PhononDos| objects e.g. DOSes at different volumes.
+        tmesh: Array with the temperatures in Kelvin.
+        what: "internal_energy", "entropy", "free_energy", "cv" to compute a single quantity
+            or "all" to compute all of them.
+        max_nbytes: Max memory in bytes used for the temperature-dependent kernels.
+
+    Return:
+        Numpy array with shape [ndos, nt] if `what` defines a single quantity else ``namedtuple`` with:
+
+            tmesh: Array with the temperatures. Shape (nt).
+            internal_energy: U(T) + ZPE, in eV. Shape (ndos, nt).
+            entropy: S(T), in eV/K. Shape (ndos, nt).
+            free_energy: F(T) = U(T) + ZPE - T x S(T), in eV. Shape (ndos, nt).
+            cv: constant-volume specific heat, in eV/K. Shape (ndos, nt).
+            zpe: zero point energy in eV. Shape (ndos).
+    """
+    names = ("internal_energy", "entropy", "free_energy", "cv")
+    if what != "all" and what not in names:
+        raise ValueError(f"Invalid {what=}, should be in {names} or `all`")
+
+    tmesh = np.atleast_1d(np.asarray(tmesh, dtype=float))
+
+    zpe = np.array([float(dos.zero_point_energy) for dos in phdoses])
+    ndos, nt = len(phdoses), len(tmesh)
+    u, ent, cv = np.empty((ndos, nt)), np.empty((ndos, nt)), np.empty((ndos, nt))
+    u[:, tmesh == 0] = zpe[:, None]
+    ent[:, tmesh == 0] = 0
+    cv[:, tmesh == 0] = 0
+    its = np.flatnonzero(tmesh != 0)
+
+    for idos, w, gw in _get_thermo_groups(phdoses):
+        # Weights of the trapezoidal rule multiplied by the DOS.
+        dw = np.zeros(len(w))
+        if len(w) > 1:
+            d = np.diff(w) / 2
+            dw[:-1] += d
+            dw[1:] += d
+        a_vw = gw * dw
+        idos = np.array(idos)[:, None]
+
+        # x = w / (2 kT). coth, log(2 sinh) and 1/sinh^2 are expressed in terms of exp(-2x) to avoid overflow.
+        tchunk = max(1, int(max_nbytes // (8 * 4 * max(len(w), 1))))
+        for start in range(0, len(its), tchunk):
+            it = its[start:start + tchunk]
+            x = w[None, :] / (2 * abu.kb_eVK * tmesh[it, None])
+            e = np.exp(-2 * x)
+            one_m_e = -np.expm1(-2 * x)
+            x_coth = x * (1 + e) / one_m_e
+            u[idos, it] = a_vw @ (0.5 * w[None, :] * (1 + e) / one_m_e).T
+            ent[idos, it] = abu.kb_eVK * (a_vw @ (x_coth - x - np.log(one_m_e)).T)
+            cv[idos, it] = abu.kb_eVK * (a_vw @ (4 * x ** 2 * e / one_m_e ** 2).T)
+
+    free_energy = u - tmesh[None, :] * ent
+    if what != "all":
+        return dict(internal_energy=u, entropy=ent, free_energy=free_energy, cv=cv)[what]
+
+    return dict2namedtuple(tmesh=tmesh, internal_energy=u, entropy=ent, free_energy=free_energy, cv=cv, zpe=zpe)
+
+
 class PhdosReader(ETSF_Reader):
     """
     This object reads data from the PHDOS.nc file produced by anaddb.
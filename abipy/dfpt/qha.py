@@ -16,7 +16,7 @@ from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt, get_axarray_fig
 from abipy.tools.typing import Figure
 from abipy.electrons.gsr import GsrFile
 from abipy.dfpt.ddb import DdbFile
-from abipy.dfpt.phonons import PhononBandsPlotter, PhononDos, PhdosFile
+from abipy.dfpt.phonons import PhononBandsPlotter, PhononDos, PhdosFile, get_harmonic_thermo
 from abipy.dfpt.gruneisen import GrunsNcFile
 
 
@@ -760,12 +760,8 @@ class QHA(AbstractQHA):
 
         Returns: A numpy array of `num` values of the vibrational contribution to the free energy
         """
-        f = np.zeros((self.nvols, num))
-
-        for i, dos in enumerate(self.doses):
-            f[i] = dos.get_free_energy(tstart, tstop, num).values
-
-        return f
+        tmesh = np.linspace(tstart, tstop, num)
+        return get_harmonic_thermo(self.doses, tmesh, what="free_energy")
 
     def get_thermodynamic_properties(self, tstart=0, tstop=800, num=100):
         """
@@ -786,20 +782,10 @@ class QHA(AbstractQHA):
                 zpe: zero point energy in eV. Shape (nvols).
         """
         tmesh = np.linspace(tstart, tstop, num)
-        cv = np.zeros((self.nvols, num))
-        free_energy = np.zeros((self.nvols, num))
-        entropy = np.zeros((self.nvols, num))
-        internal_energy = np.zeros((self.nvols, num))
-        zpe = np.zeros(self.nvols)
+        thermo = get_harmonic_thermo(self.doses, tmesh)
 
-        for i, d in enumerate(self.doses):
-            cv[i] = d.get_cv(tstart, tstop, num).values
-            free_energy[i] = d.get_free_energy(tstart, tstop, num).values
-            entropy[i] = d.get_entropy(tstart, tstop, num).values
-            zpe[i] = d.zero_point_energy
-
-        return dict2namedtuple(tmesh=tmesh, cv=cv, free_energy=free_energy, entropy=entropy,
-                               zpe=zpe)
+        return dict2namedtuple(tmesh=tmesh, cv=thermo.cv, free_energy=thermo.free_energy, entropy=thermo.entropy,
+                               zpe=thermo.zpe)
 
 
 class QHA3PF(AbstractQHA):
@@ -875,13 +861,12 @@ class QHA3PF(AbstractQHA):
                 zpe: zero point energy in eV. Shape (nvols).
         """
         tmesh = np.linspace(tstart, tstop, num)
-        cv = self._get_thermodynamic_prop("cv", tstart, tstop, num)
-        free_energy = self._get_thermodynamic_prop("free_energy", tstart, tstop, num)
-        entropy = self._get_thermodynamic_prop("entropy", tstart, tstop, num)
+        thermo = get_harmonic_thermo(self.doses, tmesh)
+        cv = self._fit_thermodynamic_prop(thermo.cv)
+        free_energy = self._fit_thermodynamic_prop(thermo.free_energy)
+        entropy = self._fit_thermodynamic_prop(thermo.entropy)
         zpe = np.zeros(self.nvols)
-
-        for i, dos in zip(self.ind_doses, self.doses):
-            zpe[i] = dos.zero_point_energy
+        zpe[self.ind_doses] = thermo.zpe
 
         dos_vols = self.volumes[self.ind_doses]
         missing_vols = self.volumes[self._ind_energy_only]
@@ -898,7 +883,7 @@ class QHA3PF(AbstractQHA):
 
         Args:
             name: name of the property to calculate. Possible values in "internal_energy",
-                "free_energy", "entropy", "c_v".
+                "free_energy", "entropy", "cv".
             tstart: The starting value (in Kelvin) of the temperature mesh.
             tstop: The end value (in Kelvin) of the mesh.
             num: int, optional Number of samples to generate. Default is 100.
@@ -907,20 +892,29 @@ class QHA3PF(AbstractQHA):
             Numpy array with the values of the thermodynamic properties at the different
             volumes with size (nvols, num).
         """
-        prop_doses = np.array([getattr(dos, "get_" + name)(tstart, tstop, num).values for dos in self.doses])
+        tmesh = np.linspace(tstart, tstop, num)
+        return self._fit_thermodynamic_prop(get_harmonic_thermo(self.doses, tmesh, what=name))
 
-        p = np.zeros((self.nvols, num))
+    def _fit_thermodynamic_prop(self, prop_doses):
+        """
+        Fill the values of a thermodynamic property at the volumes without phonon DOS
+        with a polynomial fit of the values computed from the DOSes. All temperatures are fitted at once.
 
-        for i, prop_dos in zip(self.ind_doses, prop_doses):
-            p[i] = prop_dos
+        Args:
+            prop_doses: Numpy array with shape (ndoses, num) with the property computed from the doses.
+
+        Returns:
+            Numpy array with shape (nvols, num).
+        """
+        p = np.zeros((self.nvols, prop_doses.shape[1]))
+        p[self.ind_doses] = prop_doses
 
         dos_vols = self.volumes[self.ind_doses]
         missing_vols = self.volumes[self._ind_energy_only]
 
-        # generate fit objects from the known dos values
-        for i_temp in range(num):
-            fit_params = np.polyfit(dos_vols, prop_doses[:, i_temp], self.fit_degree)
-            p[self._ind_energy_only, i_temp] = np.poly1d(fit_params)(missing_vols)
+        # fit all the temperatures at once. fit_params has shape (fit_degree + 1, num)
+        fit_params = np.polyfit(dos_vols, prop_doses, self.fit_degree)
+        p[self._ind_energy_only] = np.vander(missing_vols, self.fit_degree + 1) @ fit_params
 
         return p
 
@@ -1,12 +1,13 @@
 """Tests for phonons"""
 import os
+import shutil
 import numpy as np
 import abipy.data as abidata
 import abipy.core.abinit_units as abu
 
 from abipy import abilab
 from abipy.core.testing import AbipyTest
-from abipy.dfpt.ddb import DdbFile, DielectricTensorGenerator
+from abipy.dfpt.ddb import DdbFile, DielectricTensorGenerator, get_2nd_ord_block_string
 from abipy.dfpt.anaddbnc import AnaddbNcFile
 from abipy.dfpt.phonons import PhononBands
 
@@ -450,6 +451,190 @@ class DdbTest(AbipyTest):
             assert blocks[3]["dord"] == 3
             assert blocks[3]["qpt3"] == [[0.,] * 3] * 3
 
+    def test_blocks_index(self):
+        """Testing index of DDB blocks and lazy decoding."""
+        from abipy.dfpt.ddb import DdbBlock, index_ddb_blocks
+        filepath = abidata.ref_file("refs/alas_nl_dfpt/AlAs_nl_dte_DDB")
+        index = index_ddb_blocks(filepath)
+        assert [e["dord"] for e in index] == [2, 0, 1, 3]
+        assert index[0]["qpt"] == [0, 0, 0] and index[0]["qpt_line"].startswith("qpt")
+        assert index[3]["qpt3"] == [[0.,] * 3] * 3
+
+        with DdbFile(filepath) as ddb:
+            block = ddb.blocks[0]
+            assert isinstance(block, DdbBlock) and "data" not in block
+            inds, values = block.get_values()
+            assert "data" not in block
+            assert inds.shape == (len(values), 4)
+            assert len(block["data"]) == len(values) + 2
+            toks = block["data"][2].replace("D", "E").split()
+            assert tuple(inds[0]) == tuple(map(int, toks[:4]))
+            self.assert_almost_equal(values[0], float(toks[4]) + 1j * float(toks[5]))
+            d2 = ddb.get_2nd_ord_dict()
+            self.assert_almost_equal(d2[ddb.qpoints[0]][tuple(inds[0])], values[0])
+            inds3, values3 = ddb.blocks[3].get_values()
+            assert inds3.shape == (len(values3), 6)
+            self.assert_almost_equal(ddb.blocks[1].get_values()[1][0], ddb.total_energy.to("Ha"))
+
+        # Blocks inserted in memory are decoded from their lines.
+        znse_path = abidata.ref_file("refs/znse_phonons/ZnSe_hex_qpt_DDB")
+        with DdbFile(znse_path) as ddb, DdbFile(znse_path) as other:
+            d2 = other.get_2nd_ord_dict()
+            ddb.set_2nd_ord_data(d2)
+            assert all(isinstance(b, DdbBlock) for b in ddb.blocks)
+            assert len(ddb.computed_dynmat) == len(other.computed_dynmat) == 121
+            assert len(ddb.get_2nd_ord_dict()) == 121
+            q0 = ddb.qpoints[0]
+            new_block = dict(dord=2, qpt=q0.frac_coords, qpt3=None,
+                             data=get_2nd_ord_block_string(q0.frac_coords, {k: 2 * v for k, v in d2[q0].items()}))
+            assert ddb.insert_block(new_block, replace=True)
+            ddb2 = DdbFile(znse_path)
+            assert ddb2.insert_block(new_block, replace=True)
+            dm = ddb2.computed_dynmat[q0]
+            self.assert_almost_equal(dm["cvalue"].to_numpy(), 2 * other.computed_dynmat[q0]["cvalue"].to_numpy())
+            ddb2.close()
+
+        # Lazy blocks must not be read from a file that has been changed after the indexing.
+        from abipy.dfpt.ddb import DdbError
+        tmp_path = self.get_tmpname(text=True)
+        shutil.copyfile(abidata.ref_file("refs/alas_nl_dfpt/AlAs_nl_dte_DDB"), tmp_path)
+        with DdbFile(tmp_path) as ddb:
+            blocks = ddb.blocks
+            blocks[0].get_values()
+            with open(tmp_path, "at") as fh:
+                fh.write("\n")
+            with self.assertRaises(DdbError):
+                blocks[1].get_values()
+
+        # Store the index in the cache.
+        from abipy.tools.diskcache import DiskCache
+        tmpdir = self.mkdtemp()
+        prev_env = os.environ.get("ABIPY_CACHE_DIR")
+        os.environ["ABIPY_CACHE_DIR"] = tmpdir
+        try:
+            from abipy.tools.context_managers import temporary_change_attributes
+            with temporary_change_attributes(DdbFile, index_cache_min_nbytes=0):
+                with DdbFile(filepath) as ddb:
+                    assert ddb.blocks_index == index
+                assert len(DiskCache("ddb_index")) == 1
+                with DdbFile(filepath) as ddb:
+                    assert ddb.blocks_index == index
+                    assert len(ddb.qpoints) == 1
+                assert len(DiskCache("ddb_index")) == 1
+        finally:
+            if prev_env is None:
+                os.environ.pop("ABIPY_CACHE_DIR")
+            else:
+                os.environ["ABIPY_CACHE_DIR"] = prev_env
+
+    def test_anaddb_cache(self):
+        """Testing the persistent cache for anaddb results."""
+        import shutil
+        from unittest import mock
+        from abipy.flowtk import AnaddbTask
+        from abipy.flowtk.utils import Directory
+        from abipy.dfpt.ddb import AnaddbCacheEntry
+
+        # Fake anaddb run producing the reference files.
+        workdir = self.mkdtemp()
+        outdir = os.path.join(workdir, "outdata")
+        os.mkdir(outdir)
+        for ext in ("out_PHBST.nc", "out_PHDOS.nc", "anaddb.nc"):
+            shutil.copy(abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.%s" % ext), os.path.join(outdir, ext))
+        task = mock.Mock(workdir=workdir, outdir=Directory(outdir))
+        task.output_file.path = os.path.join(workdir, "run.abo")
+        task.get_event_report.return_value.run_completed = True
+        task.outpath_from_ext = lambda ext: AnaddbTask.outpath_from_ext(task, ext)
+        task.open_phbst = lambda: AnaddbTask.open_phbst(task)
+        task.open_phdos = lambda: AnaddbTask.open_phdos(task)
+
+        cache = DdbFile.enable_anaddb_cache(topdir=self.mkdtemp())
+        try:
+            with DdbFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_qpt_DDB")) as ddb:
+                with mock.patch.object(AnaddbTask, "temp_shell_task", return_value=task) as temp_shell_task:
+                    for i in range(2):
+                        with ddb.anaget_phbst_and_phdos_files(nqsmall=4, ndivsm=2, ngqpt=[8, 8, 6]) as g:
+                            assert g[0].phbands.non_anal_ph is not None
+                            assert g[1].phdos is not None
+                    assert temp_shell_task.call_count == 1
+                    assert len(cache) == 1
+
+                    # Different input --> new run.
+                    with ddb.anaget_phbst_and_phdos_files(nqsmall=4, ndivsm=3, ngqpt=[8, 8, 6]):
+                        pass
+                    assert temp_shell_task.call_count == 2 and len(cache) == 2
+
+                    # Explicit workdir --> the cache is not used.
+                    with ddb.anaget_phbst_and_phdos_files(nqsmall=4, ndivsm=2, ngqpt=[8, 8, 6],
+                                                          workdir=self.mkdtemp()):
+                        pass
+                    assert temp_shell_task.call_count == 3
+
+                inp = abilab.AnaddbInput.phbands_and_dos(ddb.structure, ngqpt=[8, 8, 6], ndivsm=2, nqsmall=4)
+                assert ddb._get_anaddb_key(inp) == ddb._get_anaddb_key(inp.deepcopy())
+                entry = AnaddbCacheEntry(cache.get_entry_path(cache.keys()[0]))
+                repr(entry)
+                assert os.path.isfile(entry.outpath_from_ext("anaddb.nc"))
+                with entry.open_phbst() as phbst:
+                    assert phbst.phbands.num_qpoints > 0
+
+            DdbFile.disable_anaddb_cache(clear=True)
+            assert DdbFile.anaddb_cache is None and len(cache) == 0
+        finally:
+            DdbFile.disable_anaddb_cache()
+
+    def test_run_anaddb_jobs(self):
+        """Testing parallel execution of anaddb jobs."""
+        import threading
+        from unittest import mock
+        from abipy.dfpt.ddb import run_anaddb_jobs, DdbError
+        from abipy.dfpt.phonons import PhbstFile
+
+        def func(i):
+            if i == 3: raise RuntimeError("job failed")
+            return i ** 2, threading.get_ident()
+
+        assert run_anaddb_jobs(func, []) == []
+        for nprocs, mpi_procs in [(1, 1), (4, 1), (4, 4), (4, 2)]:
+            results = run_anaddb_jobs(func, [dict(i=i) for i in range(3)], mpi_procs=mpi_procs, nprocs=nprocs)
+            assert [r[0] for r in results] == [0, 1, 4]
+            if nprocs // mpi_procs == 1:
+                assert len(set(r[1] for r in results)) == 1
+
+        with self.assertRaises(DdbError) as ctx:
+            run_anaddb_jobs(func, [dict(i=i) for i in range(5)], nprocs=2)
+        assert "1/5 anaddb jobs failed" in str(ctx.exception)
+        assert isinstance(ctx.exception.__cause__, RuntimeError)
+
+        # Jobs are executed sequentially by default.
+        results = run_anaddb_jobs(func, [dict(i=i) for i in range(3)])
+        assert len(set(r[1] for r in results)) == 1 and results[0][1] == threading.get_ident()
+
+        # The files returned by the successful jobs are closed if a job fails.
+        files = []
+        def open_files(i):
+            if i == 1: raise RuntimeError("job failed")
+            files.append((mock.Mock(), mock.Mock()))
+            return files[-1]
+
+        with self.assertRaises(DdbError):
+            run_anaddb_jobs(open_files, [dict(i=i) for i in range(3)], nprocs=2)
+        assert len(files) == 2
+        for phbst_file, phdos_file in files:
+            phbst_file.close.assert_called_once_with()
+            phdos_file.close.assert_called_once_with()
+
+        # anacompare methods call anaddb once per configuration and keep the order of the input list.
+        phbst_path = abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.out_PHBST.nc")
+        def anaget(**kwargs):
+            return PhbstFile(phbst_path), None
+
+        with DdbFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_qpt_DDB")) as ddb:
+            with mock.patch.object(ddb, "anaget_phbst_and_phdos_files", side_effect=anaget) as m:
+                plotter = ddb.anacompare_rifcsph([0.0, 5.0, 10.0], nprocs=3)
+                assert m.call_count == 3
+                assert list(plotter.phbands_dict.keys()) == ["rifcsph: %f" % r for r in (0.0, 5.0, 10.0)]
+
     def test_ddb_with_quad(self):
         """
         Testing DDB files with dynamical quadrupoles and flexoelectric tensor.
@@ -0,0 +1,91 @@
+"""Tests for the in-process phonon interpolator."""
+import numpy as np
+import abipy.data as abidata
+import abipy.core.abinit_units as abu
+
+from abipy.core.testing import AbipyTest
+from abipy.dfpt.ddb import DdbFile
+from abipy.dfpt.anaddbnc import AnaddbNcFile
+from abipy.dfpt.phonons import PhbstFile, PhdosFile, PhononBands, PhononDos
+from abipy.dfpt.phinterp import PhononInterpolator
+
+
+class PhononInterpolatorTest(AbipyTest):
+
+    def test_znse_against_anaddb(self):
+        """Comparing PhononInterpolator with anaddb results for ZnSe."""
+        # Reference files produced by anaddb with asr 2, chneut 1, dipdip 1, ngqpt 8 8 6
+        ddb_path = abidata.ref_file("refs/znse_phonons/ZnSe_hex_qpt_DDB")
+        with DdbFile(ddb_path) as ddb:
+            interp = ddb.get_phonon_interpolator(asr=2, chneut=1, dipdip=1, ngqpt=[8, 8, 6])
+            repr(interp); str(interp)
+            assert interp.to_string(verbose=2)
+            assert interp.has_dipdip and interp.natom == 4
+
+        with AnaddbNcFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.anaddb.nc")) as ananc:
+            self.assert_almost_equal(interp.epsinf, ananc.epsinf, decimal=4)
+            self.assert_almost_equal(interp.zeff, ananc.reader.read_value("becs_cart"), decimal=3)
+            non_anal_ph = interp.get_non_anal_ph(ananc.reader.read_value("non_analytical_directions"))
+            ref_freqs = ananc.reader.read_value("non_analytical_phonon_modes")
+            assert np.abs(non_anal_ph.phfreqs - ref_freqs).max() * abu.eV_to_cm1 < 0.01
+
+        with PhbstFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.out_PHBST.nc")) as phbst:
+            ref_phbands = phbst.phbands
+
+        phbands = interp.get_phbands(qpoints=ref_phbands.qpoints.frac_coords, lo_to_splitting=False)
+        assert isinstance(phbands, PhononBands)
+        assert phbands.non_anal_ph is None
+        assert np.abs(phbands.phfreqs - ref_phbands.phfreqs).max() * abu.eV_to_cm1 < 0.1
+
+        # Displacements agree up to a phase for non-degenerate modes.
+        iq = 10
+        mass = np.repeat(interp.amu * abu.amu_emass, 3)
+        overlap = np.einsum("ni,i,ni->n", ref_phbands.phdispl_cart[iq].conj(), mass, phbands.phdispl_cart[iq])
+        self.assert_almost_equal(np.abs(overlap) / abu.Bohr_Ang ** 2, 1, decimal=3)
+
+        # Path with LO-TO splitting.
+        phbands = interp.get_phbands(ndivsm=5)
+        assert phbands.non_anal_ph is not None
+        assert len(phbands.non_anal_ph.directions) > 0
+        assert phbands.amu is not None and phbands.epsinf is not None
+
+        # DOS on a q-mesh.
+        phdos = interp.get_phdos(ngqpt=[6, 6, 4])
+        assert isinstance(phdos, PhononDos)
+        self.assert_almost_equal(phdos.integral_value, 3 * interp.natom, decimal=4)
+        with PhdosFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.out_PHDOS.nc")) as phdos_file:
+            assert abs(phdos.mesh[-1] - phdos_file.phdos.mesh[-1]) < 0.005
+
+    def test_alas_qmesh(self):
+        """Testing PhononInterpolator at the q-points of the ab-initio mesh."""
+        ddb_path = abidata.ref_file("refs/alas_phonons/trf2_3_DDB")
+        interp = PhononInterpolator.from_ddb(ddb_path, ngqpt=[4, 4, 4], asr=1, chneut=1, dipdip=1)
+        assert len(interp.rvecs) == len(interp.ifc)
+
+        with PhbstFile(abidata.ref_file("refs/alas_phonons/trf2_5.out_PHBST.nc")) as phbst:
+            ref_phbands = phbst.phbands
+
+        # Gamma, X and L belong to the 4x4x4 mesh so the interpolation must reproduce the DDB.
+        # Other points are not compared as the reference file has been produced with brav 2.
+        qpoints = ref_phbands.qpoints.frac_coords
+        iqs = [0, 20, 40, 50]
+        phfreqs, phdispl_cart = interp.get_phfreqs_and_displ(qpoints[iqs])
+        assert phdispl_cart.shape == (len(iqs), 6, 6)
+        assert np.abs(phfreqs - ref_phbands.phfreqs[iqs]).max() * abu.eV_to_cm1 < 0.02
+
+        # Frequencies are invariant under the symmetries of the crystal.
+        phfreqs, _ = interp.get_phfreqs_and_displ([[0.5, 0.25, 0], [0.5, 0.25, 0.5], [0.25, 0.5, 0.5]])
+        self.assert_almost_equal(phfreqs[1:], [phfreqs[0], phfreqs[0]])
+
+        # The acoustic modes vanish at Gamma.
+        self.assert_almost_equal(interp.get_phfreqs_and_displ([0, 0, 0])[0][0, :3], 0, decimal=6)
+
+        # Without the dipole-dipole term
+        interp = PhononInterpolator.from_ddb(ddb_path, ngqpt=[4, 4, 4], asr=2, dipdip=0)
+        assert not interp.has_dipdip
+        phfreqs, _ = interp.get_phfreqs_and_displ(qpoints[iqs])
+        assert np.abs(phfreqs - ref_phbands.phfreqs[iqs]).max() * abu.eV_to_cm1 < 0.02
+        with self.assertRaises(ValueError):
+            interp.get_non_anal_ph([[1, 0, 0]])
+        with self.assertRaises(ValueError):
+            PhononInterpolator.from_ddb(ddb_path, ngqpt=[8, 8, 8])
@@ -9,7 +9,7 @@ import abipy.core.abinit_units as abu
 
 from abipy import abilab
 from abipy.dfpt.phonons import (PhononBands, PhononDos, PhdosFile, phbands_gridplot,
-        PhononBandsPlotter, PhononDosPlotter, dataframe_from_phbands)
+        PhononBandsPlotter, PhononDosPlotter, dataframe_from_phbands, get_harmonic_thermo)
 from abipy.dfpt.ddb import DdbFile
 from abipy.core.testing import AbipyTest
 
@@ -138,6 +138,14 @@ class PhononBandsTest(AbipyTest):
         with self.assertRaises(ValueError):
             phdos = phbands.get_phdos()
 
+        # Gaussian DOS with fake weights.
+        from abipy.tools.numtools import gaussian
+        for qpoint in phbands.qpoints:
+            qpoint.set_weight(1 / phbands.num_qpoints)
+        phdos = phbands.get_phdos(width=4e-4, step=1e-4)
+        ref_values = sum(gaussian(phdos.mesh, 4e-4, center=w) for w in phbands.phfreqs.ravel()) / phbands.num_qpoints
+        self.assert_almost_equal(phdos.values, ref_values, decimal=5)
+
         # convert to pymatgen object and check that the opposite converted is consistent
         pmg_bands = phbands.to_pymatgen()
         phbands_from_pmg = PhononBands.from_pmg_bs(pmg_bands)
@@ -409,6 +417,29 @@ class PhononDosTest(AbipyTest):
         f = phdos.get_free_energy()
         self.assert_almost_equal(f.values, (u - s.mesh * s.values).values)
 
+        # Batched thermodynamics for several DOSes and temperatures.
+        shifted = PhononDos(phdos.mesh + 5 * (phdos.mesh[1] - phdos.mesh[0]), phdos.values)
+        interp = PhononDos(np.linspace(phdos.mesh[0], phdos.mesh[-1], 3 * len(phdos.mesh)),
+                           phdos.spline(np.linspace(phdos.mesh[0], phdos.mesh[-1], 3 * len(phdos.mesh))))
+        tmesh = np.linspace(0, 300, num=7)
+        thermo = get_harmonic_thermo([phdos, shifted], tmesh)
+        assert thermo.free_energy.shape == (2, 7)
+        self.assert_almost_equal(thermo.zpe[0], phdos.zero_point_energy)
+        self.assert_almost_equal(thermo.internal_energy[0, 0], phdos.zero_point_energy)
+        for i, dos in enumerate([phdos, shifted]):
+            self.assert_almost_equal(thermo.entropy[i, 1:], dos.get_entropy(50, 300, num=6).values)
+            self.assert_almost_equal(thermo.cv[i, 1:], dos.get_cv(50, 300, num=6).values)
+            self.assert_almost_equal(thermo.free_energy[i], dos.get_free_energy(0, 300, num=7).values)
+        cv = get_harmonic_thermo([phdos, interp], tmesh, what="cv")
+        self.assert_almost_equal(cv[1], cv[0], decimal=5)
+        # DOSes on meshes that are not aligned are integrated on their own mesh.
+        thermo = get_harmonic_thermo([interp, phdos, interp], tmesh)
+        for i, dos in enumerate([interp, phdos, interp]):
+            self.assert_almost_equal(thermo.entropy[i, 1:], dos.get_entropy(50, 300, num=6).values)
+            self.assert_almost_equal(thermo.cv[i, 1:], dos.get_cv(50, 300, num=6).values)
+        with self.assertRaises(ValueError):
+            get_harmonic_thermo([phdos], tmesh, what="foo")
+
         self.assert_almost_equal(phdos.debye_temp, 469.01524830328606)
         self.assert_almost_equal(phdos.get_acoustic_debye_temp(len(ncfile.structure)), 372.2576492728813)
 
@@ -7,9 +7,9 @@ import dataclasses
 import warnings
 import json
 import os
+import hashlib
 import numpy as np
 import pandas as pd
-import pymatgen.core.units as units
 
 from pathlib import Path
 from scipy.stats import linregress
@@ -31,7 +31,8 @@ from abipy.tools.iotools import try_files # , file_with_ext_indir
 from abipy.tools.context_managers import Timer
 from abipy.tools.plotting import (set_axlims, add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt, get_color_symbol,
                                   set_ticks_fontsize, set_logscale, linear_fit_ax)
-from abipy.tools.parallel import pool_nprocs_pmode #, get_max_nprocs
+from abipy.tools.parallel import pool_nprocs_pmode, get_max_nprocs
+from abipy.tools.diskcache import DiskCache, hash_key
 from abipy.dynamics.cpx import parse_file_with_blocks, EvpFile
 
 
@@ -76,18 +77,20 @@ def read_structure_postac_ucmats(traj_filepath: PathLike, step_skip: int) -> tup
         tuple with: initial Structure, (nsteps, natom, 3) array with the Cartesian coords,
         (nsteps,3,3) array with cell vectors.
     """
-    from ase.io import read
-    traj = read(traj_filepath, index=":")
-    traj_len = len(traj)
-    structure = Structure.as_structure(traj[0])
-
+    # Read the configurations one by one so that the list of Atoms is never allocated.
+    from ase.io import iread
     pos_tac, ucmats = [], []
-    for it in range(0, traj_len, step_skip):
-        atoms = traj[it]
+    traj_len = 0
+    for it, atoms in enumerate(iread(str(traj_filepath), index=":")):
+        if it == 0: structure = Structure.as_structure(atoms)
+        traj_len += 1
+        if it % step_skip != 0: continue
         pos_tac.append(atoms.positions)
         ucmats.append(atoms.cell.array)
 
-    del traj
+    if traj_len == 0:
+        raise ValueError(f"Empty trajectory in {traj_filepath}")
+
     pos_tac = np.array(pos_tac, dtype=float)
     ucmats = np.array(ucmats, dtype=float)
 
@@ -161,14 +164,44 @@ class MdAnalyzer(HasPickleIO):
     compute the MSQD and plot the results.
     """
 
+    # Persistent cache for MSD arrays shared by all the instances. None if disabled. See enable_disk_cache.
+    disk_cache = None
+
     @classmethod
-    def from_abiml_dir(cls, directory: PathLike, step_skip: int = 1) -> MdAnalyzer:
+    def enable_disk_cache(cls, topdir=None, max_nbytes=4 * 1024 ** 3) -> DiskCache:
+        """
+        Activate the persistent cache for the MSD arrays computed by :class:`Msdtt0`.
+        Arrays are stored in npz format and keyed by the hash of the trajectory and the parameters
+        so that fits with different time windows do not recompute the MSD.
+
+        Args:
+            topdir: Top-level directory of the cache. If None, $ABIPY_CACHE_DIR or ~/.abinit/abipy/cache is used.
+            max_nbytes: Max size of the cache in bytes. Least recently used entries are removed first.
+        """
+        MdAnalyzer.disk_cache = DiskCache("msd", topdir=topdir, max_nbytes=max_nbytes)
+        return MdAnalyzer.disk_cache
+
+    @classmethod
+    def disable_disk_cache(cls, clear=False) -> None:
+        """Deactivate the persistent cache. Remove all the entries if `clear`."""
+        if clear and MdAnalyzer.disk_cache is not None:
+            MdAnalyzer.disk_cache.clear()
+        MdAnalyzer.disk_cache = None
+
+    @classmethod
+    def from_abiml_dir(cls, directory: PathLike, step_skip: int = 1, store_dir=None) -> MdAnalyzer:
         """
         Build an instance from a directory containing an ASE trajectory file and
         a JSON file with the MD parameters as produced by the `abiml.py md` script.
+
+        Args:
+            directory: Directory with the md.traj and md.json files.
+            step_skip: Sampling frequency.
+            store_dir: If not None, the trajectory is converted to a :class:`TrajectoryStore` in this directory
+                (only if the store does not exist or it is older than md.traj)
+                and the positions are memory-mapped instead of being loaded in memory.
         """
         directory = Path(str(directory))
-        structure, pos_tac, ucmats, traj_len = read_structure_postac_ucmats(directory / "md.traj", step_skip)
 
         # Read metadata from the JSON file.
         with open(directory / "md.json", "rt") as fh:
@@ -179,41 +212,92 @@ class MdAnalyzer(HasPickleIO):
         timestep = meta["timestep"] * 1e-3
         loginterval = meta["loginterval"]
         engine = meta["nn_name"]
-        times = (np.arange(0, traj_len) * timestep * loginterval)[::step_skip].copy()
 
         log_path = try_files([directory / "md.aselog", directory / "md.log"])
         from abipy.ml.aseml import AseMdLog
         with AseMdLog(log_path) as log:
             evp_df = log.df.copy()
 
+        if store_dir is not None:
+            from abipy.dynamics.trajstore import TrajectoryStore
+            traj_path, store_dir = directory / "md.traj", Path(str(store_dir))
+            meta_path = store_dir / "meta.json"
+            if not meta_path.exists() or meta_path.stat().st_mtime < traj_path.stat().st_mtime:
+                TrajectoryStore.from_ase_file(traj_path, store_dir)
+            return cls.from_trajstore(store_dir, temperature=temperature, timestep=timestep * loginterval,
+                                      engine=engine, step_skip=step_skip, evp_df=evp_df)
+
+        structure, pos_tac, ucmats, traj_len = read_structure_postac_ucmats(directory / "md.traj", step_skip)
+        times = (np.arange(0, traj_len) * timestep * loginterval)[::step_skip].copy()
+
         return cls(structure, temperature, times, pos_tac, ucmats, engine, evp_df=evp_df)
 
     @classmethod
-    def from_hist_file(cls, hist_filepath: PathLike, step_skip: int=1) -> MdAnalyzer:
+    def from_trajstore(cls, store, temperature=None, timestep=None, engine=None,
+                       step_skip: int = 1, evp_df=None) -> MdAnalyzer:
+        """
+        Build an instance backed by a :class:`TrajectoryStore`. The positions are memory-mapped
+        and step_skip is implemented with a strided view so that no data is copied.
+
+        Args:
+            store: :class:`TrajectoryStore` or path to the directory of the store.
+            temperature: Temperature in Kelvin. If None, read it from the metadata of the store.
+            timestep: Time between two steps of the store in ps. If None, read it from the metadata.
+            engine: String with the MD engine. If None, read it from the metadata.
+            step_skip: Sampling frequency.
+            evp_df: Optional dataframe with energies, volume and pressure.
+        """
+        from abipy.dynamics.trajstore import TrajectoryStore
+        if not isinstance(store, TrajectoryStore):
+            store = TrajectoryStore(store)
+
+        meta = store.meta
+        temperature = meta.get("temperature") if temperature is None else temperature
+        timestep = meta.get("timestep") if timestep is None else timestep
+        engine = meta.get("engine", "unknown") if engine is None else engine
+        if timestep is None:
+            raise ValueError("timestep must be specified if it is not available in the store metadata")
+
+        times = (np.arange(0, store.nt) * timestep)[::step_skip].copy()
+        pos_atc = store.positions[:, ::step_skip]
+        ucmats = store.cells[::step_skip]
+
+        return cls(store.structure, temperature, times, pos_atc, ucmats, engine, pos_order="atc", evp_df=evp_df)
+
+    @classmethod
+    def from_hist_file(cls, hist_filepath: PathLike, step_skip: int=1, temperature=None) -> MdAnalyzer:
         """
         Build an instance from an ABINIT HIST.nc file.
+
+        Args:
+            hist_filepath: Path to the HIST.nc file.
+            step_skip: Sampling frequency.
+            temperature: Temperature in Kelvin. If None, the average of the instantaneous
+                temperature computed from the ionic kinetic energy is used.
         """
+        import abipy.core.abinit_units as abu
         from abipy.dynamics.hist import HistFile
         with HistFile(hist_filepath) as hist:
-            structure = hist.structure.copy()
-            #hist.r.read_dimvalue("time")
-            pos_tac = hist.r.read_value("xcart") * units.bohr_to_ang
-            ucmats = hist.r.read_value("rprimd") * units.bohr_to_ang
-            #temperature = None
-            #evp_df = None
-
-        #times = (np.arange(0, traj_len) * r.timestep * r.loginterval)[::step_skip].copy()
-        if step_skip != 1:
-            ucmats = ucmats[::step_skip].copy()
-            pos_tac = pos_tac[::step_skip].copy()
+            traj = hist.trajectory
+            structure = traj[0].copy()
+            # dtion is in atomic units of time.
+            timestep = float(hist.r.read_value("dtion")) * abu.Time_Sec * 1e12
+            if temperature is None:
+                ekins = np.asarray(hist.r.read_value("ekin"))
+                temperature = float(np.mean(2 * ekins / (3 * traj.natom * abu.kb_HaK)))
+
+        times = (np.arange(0, len(traj)) * timestep)[::step_skip].copy()
+        pos_tac = traj.cart_coords[::step_skip]
+        ucmats = traj.ucmats[::step_skip].copy()
 
-        raise NotImplementedError()
-        #return cls(structure, temperature, times, pos_tac, ucmats, "abinit", evp_df=evp_df)
+        return cls(structure, temperature, times, pos_tac, ucmats, "abinit")
 
     @classmethod
-    def from_vaspruns(cls, filepaths: list) -> MdAnalyzer:
+    def from_vaspruns(cls, filepaths: list, store_dir=None) -> MdAnalyzer:
         """
         Build an instance from a list of Vasprun files (must be ordered in sequence of MD simulation).
+        If store_dir is not None, the structures are written to a :class:`TrajectoryStore` in this directory
+        and the positions are memory-mapped.
         """
         def get_structures(vaspruns):
             # This piece of code is shamelessy taken from
@@ -246,19 +330,28 @@ class MdAnalyzer(HasPickleIO):
 
         s = get_structures(vaspruns)
         step_skip, temperature, timestep = next(s)
+        evp_df = None
+
+        if store_dir is not None:
+            from abipy.dynamics.trajstore import TrajectoryStore
+            # Convert fs to ps.
+            meta = dict(temperature=temperature, timestep=timestep * step_skip * 1e-3, engine="vasp")
+            store = TrajectoryStore.from_structures(s, store_dir, meta=meta)
+            return cls.from_trajstore(store, evp_df=evp_df)
 
-        # Extract Cartesian positions.
-        pos_tac = []
+        # Extract Cartesian positions and lattice vectors.
+        pos_tac, ucmats = [], []
         for i, strc in enumerate(s):
             if i == 0: structure = strc
-            pos_tac.append(strc.coords)
+            pos_tac.append(strc.cart_coords)
+            ucmats.append(strc.lattice.matrix)
 
         nsteps, natom = i + 1, len(structure)
         pos_tac = np.reshape(pos_tac, (nsteps, natom, 3))
-        times = np.arange(0, nsteps) * timestep * step_skip
-        evp_df = None
+        ucmats = np.reshape(ucmats, (nsteps, 3, 3))
+        times = np.arange(0, nsteps) * timestep * step_skip * 1e-3
 
-        return cls(structure, temperature, times, pos_tac, "vasp", evp_df=evp_df)
+        return cls(structure, temperature, times, pos_tac, ucmats, "vasp", evp_df=evp_df)
 
     #@classmethod
     #def from_qe_dir(cls, directory: PathLike, step_skip: int=1):
@@ -410,7 +503,7 @@ class MdAnalyzer(HasPickleIO):
                 ucmats: np.ndarray,
                 engine: str,
                 pos_order: str = "tac",
-                evp_df=None | pd.DataFrame,
+                evp_df: pd.DataFrame | None = None,
                 ):
         """
         Args:
@@ -521,39 +614,65 @@ class MdAnalyzer(HasPickleIO):
     def resample_time(self, start_time: float, new_timestep: float) -> MdAnalyzer:
         """
         Resample the trajectory. Start at time `start_time` and use new timestep `new_timestep`.
+        The positions of the new object are a strided view of the positions of self so that no data is copied
+        (this is important if the positions are memory-mapped from a :class:`TrajectoryStore`).
         """
-        # TODO: This is not true anymore!
         # NB: Cannot change the object in place as SigmaBerend and DiffusionData keep a reference to self.
-        new = self.deepcopy()
+        # A shallow copy is enough as the arrays are replaced by views below and never modified in place.
+        import copy
+        new = copy.copy(self)
 
         old_timestep = new.times[1] - new.times[0]
-        if not (new.times[-1] > start_time > new.times[0]):
+        if not (new.times[-1] > start_time >= new.times[0]):
             raise ValueError(f"Invalid start_time should be between {new.times[0]} and {new.times[-1]})")
 
-        it0 = int(start_time / old_timestep)
-        if it0 != 0:
-            new.pos_atc = new.pos_atc[:,it0:,:]
-            new.times = new.times[it0:] - new.times[it0]
-            if new.lattices is not None:
-                new.lattices = new.lattices[it0:]
-            if self.evp_df is not None:
-                self.evp_df = self.evp_df.iloc[it0:]
-
         if new_timestep < old_timestep:
             raise ValueError(f"Invalid {new_timestep=} should be >= {old_timestep}")
 
-        istep = int(new_timestep / old_timestep)
-        if istep != 1:
-            new.pos_atc = new.pos_atc[:,::istep,:].copy()
-            new.times = new.times[::istep] - new.times[0]
-            if new.lattices is not None:
-                new.lattices = new.lattices[::istep].copy()
-            if self.evp_df is not None:
-                self.evp_df = self.evp_df.iloc[::istep]
+        it0 = int(round(start_time / old_timestep))
+        istep = int(round(new_timestep / old_timestep))
+
+        new.pos_atc = self.pos_atc[:, it0::istep, :]
+        new.times = self.times[it0::istep] - self.times[it0]
+        new.__dict__.pop("content_hash", None)
+        if self.lattices is not None:
+            new.lattices = self.lattices[it0::istep]
+        if self.evp_df is not None:
+            new.evp_df = self.evp_df.iloc[it0::istep]
 
         new.consistency_check()
         return new
 
+    def _get_atoms_view(self, iatoms) -> MdAnalyzer:
+        """
+        Return shallow copy with the positions of the atoms in iatoms only so that the amount
+        of data sent to the worker processes is reduced. The positions are read from disk
+        if pos_atc is memory-mapped. Note that the structure is not changed hence
+        the new object should only be used to compute quantities for these atoms.
+        """
+        import copy
+        new = copy.copy(self)
+        new.pos_atc = np.asarray(self.pos_atc[np.asarray(iatoms)])
+        new.__dict__.pop("content_hash", None)
+        return new
+
+    @lazy_property
+    def content_hash(self) -> str:
+        """
+        Hash of the positions and of the time mesh. Used as key in the persistent cache.
+        """
+        h = hashlib.sha256()
+        # Loop over atoms to avoid copying the full array if pos_atc is a memory-mapped view.
+        for pos_tc in self.pos_atc:
+            h.update(np.ascontiguousarray(pos_tc).tobytes())
+
+        return hash_key(h.hexdigest(), self.pos_atc.shape, self.pos_atc.dtype.str, self.times)
+
+    def _get_disk_key(self, *args) -> str | None:
+        """Return the key used to store results in the persistent cache. None if the cache is disabled."""
+        if self.disk_cache is None: return None
+        return hash_key(self.content_hash, *args)
+
     @property
     def timestep(self) -> float:
         """Timestep in ps."""
@@ -728,7 +847,8 @@ class MdAnalyzer(HasPickleIO):
         label = r"Linear fit: D={:.2E} cm$^2$/s, $r^2$={:.2f}".format(naive_d, fit.rvalue**2)
         return AttrDict(naive_d=naive_d, ts=ts, fit=fit, label=label)
 
-    def get_msdtt0_symbol_tmax(self, symbol: str, tmax: float, atom_inds=None, nprocs=None) -> Msdtt0:
+    def get_msdtt0_symbol_tmax(self, symbol: str, tmax: float, atom_inds=None, nprocs=None,
+                               method: str = "direct") -> Msdtt0:
         r"""
         Calculates the MSD for every possible pair of time points using the formula:
 
@@ -740,13 +860,28 @@ class MdAnalyzer(HasPickleIO):
             symbols:
             tmax:
             atoms_ins
+            method: "direct" to compute the full MSD(t,t0) matrix.
+                "fft" to compute MSD(t) with the FFT. In this case, the rows of MSD(t,t0)
+                are computed on demand (e.g. in get_sigma_berend) and the matrix is never allocated.
         """
         index_tmax, _ = self.get_it_ts(tmax)
         iatoms = self.iatoms_with_symbol(symbol, atom_inds=atom_inds)
-        tac = self.pos_atc[iatoms].transpose(1, 0, 2).copy()
-        arr_tt0 = msd_tt0_from_tac(tac, index_tmax, nprocs=nprocs)
 
-        return Msdtt0(arr_tt0=arr_tt0, mda=self, index_tmax=index_tmax, symbol=symbol)
+        if method == "fft":
+            return Msdtt0(arr_tt0=None, mda=self, index_tmax=index_tmax, symbol=symbol, iatoms=iatoms)
+        if method != "direct":
+            raise ValueError(f"Invalid {method=}")
+
+        disk_key = self._get_disk_key("msd_tt0", index_tmax, iatoms)
+        if disk_key is not None and (d := self.disk_cache.load_arrays(disk_key)) is not None:
+            arr_tt0 = d["arr_tt0"]
+        else:
+            tac = self.pos_atc[iatoms].transpose(1, 0, 2).copy()
+            arr_tt0 = msd_tt0_from_tac(tac, index_tmax, nprocs=nprocs)
+            if disk_key is not None:
+                self.disk_cache.save_arrays(disk_key, arr_tt0=arr_tt0)
+
+        return Msdtt0(arr_tt0=arr_tt0, mda=self, index_tmax=index_tmax, symbol=symbol, iatoms=iatoms)
 
     @add_fig_kwargs
     def plot_sqdt_atoms(self, symbols="all", t0: float = 0.0, atom_inds=None,
@@ -830,7 +965,7 @@ class MdAnalyzer(HasPickleIO):
         return fig
 
     @add_fig_kwargs
-    def plot_sqdt_symbols_tmax(self, symbols, tmax: float, atom_inds=None, nprocs=None,
+    def plot_sqdt_symbols_tmax(self, symbols, tmax: float, atom_inds=None, nprocs=None, method="direct",
                                ax=None, xy_log=None, fontsize=8, xlims=None, **kwargs) -> Figure:
         """
         Plot the square displacement averaged over all atoms of the same specie vs time.
@@ -840,6 +975,7 @@ class MdAnalyzer(HasPickleIO):
             tmax: Max time in ps.
             atom_inds: List of atom indices to include. None to disable filtering.
             nprocs: Number of procs to use.
+            method: "direct" or "fft". See get_msdtt0_symbol_tmax.
             ax: |matplotlib-Axes| or None if a new figure should be created.
             xy_log: None or empty string for linear scale. "x" for log scale on x-axis.
                 "xy" for log scale on x- and y-axis. "x:semilog" for semilog scale on x-axis.
@@ -851,10 +987,7 @@ class MdAnalyzer(HasPickleIO):
         ax, fig, plt = get_ax_fig_plt(ax=ax)
 
         for symbol in self._select_symbols(symbols):
-            iatoms = self.iatoms_with_symbol(symbol, atom_inds=atom_inds)
-            tac = self.pos_atc[iatoms].transpose(1, 0, 2).copy()
-            msd_tt0 = msd_tt0_from_tac(tac, index_tmax, nprocs=nprocs)
-            msd_t = np.mean(msd_tt0, axis=1)
+            msd_t = self.get_msdtt0_symbol_tmax(symbol, tmax, atom_inds=atom_inds, nprocs=nprocs, method=method).msd_t
             t_start = self.nt - index_tmax
             ts = self.times[t_start:] - self.times[t_start]
 
@@ -943,11 +1076,24 @@ class Msdtt0:
         $$MSD(t,t_0) = \frac{1}{N} \sum_{i=1}^{N} (\vec{r}_i(t+t_0) - \vec{r}_i(t_0))^2$$
 
     where $N$ is the number of particles of a particular chemical symbol and $\vec{r}_i(t)$ is the position vector.
+    arr_tt0 is None if the object has been computed with method="fft".
+    In this case, MSD(t) is computed with the FFT and the rows of MSD(t,t0) are computed on demand.
     """
     index_tmax: int
     symbol: str
-    arr_tt0: np.ndarray
+    arr_tt0: np.ndarray | None
     mda: MdAnalyzer
+    iatoms: np.ndarray | None = None
+
+    @property
+    def size_t(self) -> int:
+        """Number of time points in MSD(t)."""
+        return self.index_tmax
+
+    @property
+    def size_t0(self) -> int:
+        """Number of initial times."""
+        return self.mda.nt - self.index_tmax
 
     @property
     def times(self) -> np.ndarray:
@@ -960,7 +1106,32 @@ class Msdtt0:
     @lazy_property
     def msd_t(self) -> np.ndarray:
         """Average of MSD(t,t_0) over t0."""
-        return np.mean(self.arr_tt0, axis=1)
+        if self.arr_tt0 is not None:
+            return np.mean(self.arr_tt0, axis=1)
+
+        disk_key = self.mda._get_disk_key("msd_t", self.size_t, self.iatoms)
+        if disk_key is not None and (d := self.mda.disk_cache.load_arrays(disk_key)) is not None:
+            return d["msd_t"]
+
+        msd_t = msd_t_from_atc(self.mda.pos_atc, self.size_t, iatoms=self.iatoms)
+        if disk_key is not None:
+            self.mda.disk_cache.save_arrays(disk_key, msd_t=msd_t)
+        return msd_t
+
+    def get_msd_tt0_rows(self, its) -> np.ndarray:
+        """Return array of shape (len(its), size_t0) with MSD(t,t0) for the time indices its."""
+        if self.arr_tt0 is not None:
+            return self.arr_tt0[its]
+
+        its = [int(it) for it in its]
+        disk_key = self.mda._get_disk_key("msd_tt0_rows", self.size_t0, self.iatoms, its)
+        if disk_key is not None and (d := self.mda.disk_cache.load_arrays(disk_key)) is not None:
+            return d["rows"]
+
+        rows = msd_tt0_rows_from_atc(self.mda.pos_atc, its, self.size_t0, iatoms=self.iatoms)
+        if disk_key is not None:
+            self.mda.disk_cache.save_arrays(disk_key, rows=rows)
+        return rows
 
     def __str__(self) -> str:
         return self.to_string()
@@ -1032,7 +1203,7 @@ class Msdtt0:
         # choose the time elapsed
         it1, _ = sfind_ind_val(self.times, t1)
         it2, _ = sfind_ind_val(self.times, t2)
-        size_t = self.arr_tt0.shape[0]
+        size_t = self.size_t
 
         if it1 >= it2:
             raise ValueError(f"For input {t1=} and {t2=}, got {it1=} >= {it2=}")
@@ -1041,8 +1212,9 @@ class Msdtt0:
         if it2 >= size_t:
             raise ValueError(f"For input {t2=}, got {it2=} >= {size_t=}")
 
-        block_sizes1, sigmas1, delta_sigmas1 = sigma_berend(nblock_step, tot_block, self.arr_tt0[it1,:])
-        block_sizes2, sigmas2, delta_sigmas2 = sigma_berend(nblock_step, tot_block, self.arr_tt0[it2,:])
+        rows = self.get_msd_tt0_rows([it1, it2])
+        block_sizes1, sigmas1, delta_sigmas1 = sigma_berend(nblock_step, tot_block, rows[0])
+        block_sizes2, sigmas2, delta_sigmas2 = sigma_berend(nblock_step, tot_block, rows[1])
 
         # Build instance from locals dict.
         mda = self.mda
@@ -1067,6 +1239,7 @@ class Msdtt0:
         symbol = self.symbol
         temperature = mda.temperature
         latex_formula = mda.latex_formula
+        composition = mda.structure.composition
         engine = mda.engine
         avg_volume = mda.avg_volume
         ncarriers = len(mda.structure.indices_from_symbol(symbol))
@@ -1086,18 +1259,18 @@ class Msdtt0:
         qDataInBlock = size1 - mDataInBlock*it1
 
         # and find error for anytime.
-        msd_tt0 = self.arr_tt0
-        err_msd = np.zeros(msd_tt0.shape[0], dtype=float)
-        for t in range(msd_tt0.shape[0]):
+        size_t = self.size_t
+        err_msd = np.zeros(size_t, dtype=float)
+        for t in range(size_t):
             err_msd[t] = abs(mSigma * t + qSigma)
 
         # and find error for anytime
-        dataScorrelated = np.zeros(msd_tt0.shape[0], dtype=int)
-        for t in range(msd_tt0.shape[0]):
+        dataScorrelated = np.zeros(size_t, dtype=int)
+        for t in range(size_t):
             dataScorrelated[t] = int(mDataInBlock * t + qDataInBlock)
 
         # average over the initial times.
-        msd_t = np.mean(msd_tt0, axis=1)
+        msd_t = self.msd_t
 
         fit_istart, _ = sfind_ind_val(times, fit_time_start)
         fit_istop, _ = sfind_ind_val(times, fit_time_stop)
@@ -1151,6 +1324,8 @@ class Msdtt0:
 
     @add_fig_kwargs
     def plot_mat(self, cmap="jet", fontsize=8, ax=None, **kwargs) -> Figure:
+        if self.arr_tt0 is None:
+            raise ValueError("MSD(t,t0) matrix is not available. Use method='direct' in get_msdtt0_symbol_tmax")
         ax, fig, plt = get_ax_fig_plt(ax=ax)
         im = ax.matshow(self.arr_tt0, cmap=cmap)
         fig.colorbar(im, ax=ax)
@@ -1252,6 +1427,7 @@ class DiffusionData(HasPickleIO):
     temperature: float
     symbol: str
     latex_formula: str
+    composition: Composition
     avg_volume: float
     ncarriers: int
     block_size1: int
@@ -1298,7 +1474,7 @@ class DiffusionData(HasPickleIO):
         return fig
 
 
-class DiffusionDataList(list):
+class DiffusionDataList(list, HasPickleIO):
     """
     A list of DiffusionData objects.
     """
@@ -1561,14 +1737,69 @@ class MultiMdAnalyzer(HasPickleIO):
         for itemp, mda in enumerate(self):
             yield mda, mda.temperature, self.temp_cmap(float(itemp) / len(self))
 
-    def get_msdtt0_symbol_tmax(self, symbol: str, tmax: float, atom_inds=None, nprocs=None) -> Msdtt0List:
+    def get_msdtt0_symbol_tmax(self, symbol: str, tmax: float, atom_inds=None, nprocs=None,
+                               method: str = "direct") -> Msdtt0List:
         msdtt0_list = Msdtt0List()
         for mda in self:
-            obj = mda.get_msdtt0_symbol_tmax(symbol, tmax, atom_inds=atom_inds, nprocs=nprocs)
+            obj = mda.get_msdtt0_symbol_tmax(symbol, tmax, atom_inds=atom_inds, nprocs=nprocs, method=method)
             msdtt0_list.append(obj)
 
         return msdtt0_list
 
+    def get_diffusion_data_list(self, symbols, tmax: float, t1: float, t2: float,
+                                block_size1, block_size2, fit_time_start: float, fit_time_stop: float,
+                                nblock_step: int = 1, tot_block: int = 1000, atom_inds=None,
+                                nprocs=None, pmode="processes") -> DiffusionDataList:
+        """
+        Compute the diffusion coefficients for all the temperatures and the given symbols.
+        The (temperature, symbol) pairs are distributed over a pool of workers and MSD(t) is computed with the FFT.
+        If the persistent cache has been activated with :meth:`MdAnalyzer.enable_disk_cache`,
+        the MSD arrays are reused when the function is called again with different fit windows.
+
+        Args:
+            symbols: List of chemical symbols to consider. "all" for all symbols in structure.
+            tmax: Max time in ps for MSD(t).
+            t1, t2: Times in ps used to estimate the variance of MSD(t) with the blocking method.
+            block_size1, block_size2: Number of data in block at t1 and t2. Either a number or
+                a list with one value for each temperature.
+            fit_time_start, fit_time_stop: Time window in ps for the linear fit of MSD(t).
+            nblock_step, tot_block: Parameters passed to :meth:`Msdtt0.get_sigma_berend`.
+            atom_inds: List of atom indices to include. None to disable filtering.
+            nprocs: Number of workers. If None, use the max number of procs.
+            pmode: "processes", "threads" or "seq".
+        """
+        symbols = self[0]._select_symbols(symbols)
+        block_sizes1 = [block_size1] * len(self) if np.isscalar(block_size1) else list(block_size1)
+        block_sizes2 = [block_size2] * len(self) if np.isscalar(block_size2) else list(block_size2)
+        if len(block_sizes1) != len(self) or len(block_sizes2) != len(self):
+            raise ValueError(f"block_size1 and block_size2 should have {len(self)} values")
+
+        njobs = len(self) * len(symbols)
+        p = pool_nprocs_pmode(min(njobs, nprocs or get_max_nprocs()), pmode=pmode)
+        from multiprocessing.pool import ThreadPool
+        use_threads = p.pool_cls is ThreadPool
+
+        # Compute the hash in the parent so that the threads do not have to.
+        if use_threads and MdAnalyzer.disk_cache is not None:
+            for mda in self: mda.content_hash
+
+        def iter_args():
+            # Generator so that only the positions of the jobs being dispatched are kept in memory.
+            for mda, bs1, bs2 in zip(self, block_sizes1, block_sizes2):
+                for symbol in symbols:
+                    iatoms = mda.iatoms_with_symbol(symbol, atom_inds=atom_inds)
+                    if not use_threads:
+                        # Send only the positions of this specie to the worker process.
+                        mda, iatoms = mda._get_atoms_view(iatoms), np.arange(len(iatoms))
+                    sigma_kwargs = dict(t1=t1, t2=t2, nblock_step=nblock_step, tot_block=tot_block)
+                    fit_kwargs = dict(block_size1=bs1, block_size2=bs2,
+                                      fit_time_start=fit_time_start, fit_time_stop=fit_time_stop)
+                    yield (mda, symbol, iatoms, tmax, sigma_kwargs, fit_kwargs, MdAnalyzer.disk_cache)
+
+        using_msg = f"Computing diffusion coefficients for {njobs} (temperature, symbol) pairs {p.using_msg}"
+        with p.pool_cls(p.nprocs) as pool, Timer(header=using_msg, footer="") as timer:
+            return DiffusionDataList(pool.imap(_get_diffusion_data, iter_args()))
+
     #def color_itemp(self, itemp: int):
     #    return self.temp_cmap(float(itemp) / len(self))
 
@@ -1627,6 +1858,20 @@ class MultiMdAnalyzer(HasPickleIO):
         return fig
 
 
+def _get_diffusion_data(args: tuple) -> DiffusionData:
+    """
+    Compute the diffusion coefficient for a given temperature and symbol. Used by MultiMdAnalyzer.
+    args is the tuple: (mda, symbol, iatoms, tmax, sigma_kwargs, fit_kwargs, disk_cache)
+    """
+    mda, symbol, iatoms, tmax, sigma_kwargs, fit_kwargs, disk_cache = args
+    # Processes created with spawn do not inherit the class attribute from the parent.
+    MdAnalyzer.disk_cache = disk_cache
+    index_tmax, _ = mda.get_it_ts(tmax)
+    msdtt0 = Msdtt0(arr_tt0=None, mda=mda, index_tmax=index_tmax, symbol=symbol, iatoms=iatoms)
+    sigma = msdtt0.get_sigma_berend(**sigma_kwargs)
+    return msdtt0.get_diffusion_with_sigma(sigma_berend=sigma, **fit_kwargs)
+
+
 def sfind_ind_val(array, value, arr_is_sorted=False) -> tuple:
     if arr_is_sorted:
         # Use Log(N) bisection.
@@ -1692,6 +1937,96 @@ def msd_tt0_from_tac(pos_tac: np.ndarray, size_t: int, nprocs=None) -> np.ndarra
     return msd_tt0
 
 
+def _iter_atom_chunks(pos_atc: np.ndarray, iatoms, nt_read: int, max_nbytes: int):
+    """
+    Yield arrays of shape (nt_read, natom_chunk, 3) with the positions of the atoms in iatoms.
+    Positions are read chunk by chunk so that pos_atc can be a memory-mapped array.
+    The position at the first time step is subtracted to reduce round-off errors.
+    """
+    iatoms = np.arange(pos_atc.shape[0]) if iatoms is None else np.asarray(iatoms)
+    chunk = max(1, int(max_nbytes // (nt_read * 3 * 16 * 4)))
+    for start in range(0, len(iatoms), chunk):
+        pos = np.asarray(pos_atc[np.sort(iatoms[start:start+chunk]), :nt_read], dtype=float)
+        pos = pos - pos[:, :1]
+        yield pos.transpose(1, 0, 2)
+
+
+def msd_t_from_atc(pos_atc: np.ndarray, size_t: int, iatoms=None, max_nbytes: int = 2 ** 28) -> np.ndarray:
+    r"""
+    Compute the MSD averaged over the initial times and the atoms:
+
+        $$MSD(t) = \frac{1}{N N_{t_0}} \sum_{i=1}^{N} \sum_{t_0=0}^{N_{t_0}-1} (\vec{r}_i(t+t_0) - \vec{r}_i(t_0))^2$$
+
+    with $N_{t_0}$ = nt - size_t i.e. the same result as np.mean(msd_tt0_from_tac(...), axis=1)
+    but using the FFT (Wiener-Khinchin theorem) to compute the position autocorrelation.
+    The cost is O(nt log nt) per atom and the MSD(t,t0) matrix is never allocated.
+
+    Args:
+        pos_atc: Cartesian positions with shape (natom, nt, 3). Can be a memory-mapped array.
+        size_t: Number of time points in MSD(t).
+        iatoms: Indices of the atoms to include. None for all atoms.
+        max_nbytes: Max memory in bytes used for the FFT buffers. Used to read the atoms in chunks.
+    """
+    nt = pos_atc.shape[1]
+    if size_t >= nt:
+        raise ValueError(f"{size_t=} must be less than {nt}")
+
+    size_t0 = nt - size_t
+    # Only the positions up to t0 + t = nt - 2 are needed.
+    nt_read = nt - 1
+    nfft = 1 << int(np.ceil(np.log2(nt_read + size_t0)))
+
+    msd_t = np.zeros(size_t)
+    natom = 0
+    for pos in _iter_atom_chunks(pos_atc, iatoms, nt_read, max_nbytes):
+        natom += pos.shape[1]
+        # Autocorrelation: sum_{t0 < size_t0} r(t0) . r(t0 + t)
+        fft_all = np.fft.rfft(pos, n=nfft, axis=0)
+        fft_t0 = np.fft.rfft(pos[:size_t0], n=nfft, axis=0)
+        corr = np.fft.irfft(np.conj(fft_t0) * fft_all, n=nfft, axis=0)[:size_t].sum(axis=(1, 2))
+
+        # sum_{t0 < size_t0} r(t0 + t)^2 from the cumulative sum.
+        sq_t = np.sum(pos ** 2, axis=(1, 2))
+        cumsum = np.concatenate(([0.0], np.cumsum(sq_t)))
+        its = np.arange(size_t)
+        msd_t += cumsum[its + size_t0] - cumsum[its] + cumsum[size_t0] - 2 * corr
+
+    return msd_t / (natom * size_t0)
+
+
+def msd_tt0_rows_from_atc(pos_atc: np.ndarray, its, size_t0: int, iatoms=None,
+                          max_nbytes: int = 2 ** 28) -> np.ndarray:
+    r"""
+    Compute selected rows of the MSD(t,t0) matrix (windowed mode) i.e.
+
+        $$MSD(t,t_0) = \frac{1}{N} \sum_{i=1}^{N} (\vec{r}_i(t+t_0) - \vec{r}_i(t_0))^2$$
+
+    for t in its and t0 in [0, size_t0). Return array of shape (len(its), size_t0).
+    Positions are streamed per chunk of atoms so that pos_atc can be a memory-mapped array.
+
+    Args:
+        pos_atc: Cartesian positions with shape (natom, nt, 3).
+        its: List of time indices.
+        size_t0: Number of initial times.
+        iatoms: Indices of the atoms to include. None for all atoms.
+        max_nbytes: Max memory in bytes used for the buffers.
+    """
+    its = np.atleast_1d(np.asarray(its, dtype=int))
+    nt = pos_atc.shape[1]
+    if np.any(its < 0) or np.any(its + size_t0 > nt):
+        raise ValueError(f"Invalid {its=} for {size_t0=} and {nt=}")
+
+    nt_read = int(its.max()) + size_t0
+    rows = np.zeros((len(its), size_t0))
+    natom = 0
+    for pos in _iter_atom_chunks(pos_atc, iatoms, nt_read, max_nbytes):
+        natom += pos.shape[1]
+        for i, it in enumerate(its):
+            rows[i] += np.sum((pos[it:it+size_t0] - pos[:size_t0]) ** 2, axis=(1, 2))
+
+    return rows / natom
+
+
 def block_mean_var(data, data_mean, n_block) -> tuple[float, float]:
     """
     Perform the block mean and the block variance of data.
@@ -1795,6 +2130,29 @@ class ArrheniusEntry:
                    mpl_style=mpl_style,
                    )
 
+    @classmethod
+    def from_diffusion_data_list(cls, data_list: DiffusionDataList, key, mpl_style=None) -> ArrheniusEntry:
+        """
+        Build an entry from a :class:`DiffusionDataList` with results for the same system and symbol
+        at different temperatures e.g. the output of :meth:`MultiMdAnalyzer.get_diffusion_data_list`.
+        """
+        if not data_list:
+            raise ValueError("Empty list of DiffusionData")
+        symbol, composition = data_list[0].symbol, data_list[0].composition
+        if any(d.symbol != symbol or d.composition != composition for d in data_list):
+            raise ValueError("DiffusionData objects should refer to the same symbol and composition")
+
+        data_list = sorted(data_list, key=lambda d: d.temperature)
+        return cls(key=key,
+                   symbol=symbol,
+                   composition=composition,
+                   temps=np.array([d.temperature for d in data_list]),
+                   diffusions=np.array([d.diffusion_coeff for d in data_list]),
+                   err_diffusions=np.array([d.err_diffusion_coeff for d in data_list]),
+                   volumes=np.array([d.avg_volume for d in data_list]),
+                   mpl_style=mpl_style or {},
+                   )
+
     #def __post_init__(self):
     #    self.latex_formula = latexify(self.formula)
 
@@ -85,8 +85,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
     @lazy_property
     def final_pressure(self) -> float:
         """Final pressure in Gpa."""
-        cart_stress_tensors, pressures = self.r.read_cart_stress_tensors()
-        return pressures[-1]
+        return self.trajectory.pressures[-1]
 
     #@lazy_property
     #def final_max_force(self):
@@ -95,18 +94,14 @@ class HistFile(AbinitNcFile, NotebookWriter):
         """
         Return |AttrDict| with stats on the forces at the given ``step``.
         """
-        # [time, natom, 3]
-        var = self.r.read_variable("fcart")
-        forces = units.ArrayWithUnit(var[step], "Ha bohr^-1").to("eV ang^-1")
-        fmods = np.array([np.linalg.norm(force) for force in forces])
+        return AttrDict({k: v[step] for k, v in self.fstats.items()})
 
-        return AttrDict(
-            fmin=fmods.min(),
-            fmax=fmods.max(),
-            fmean=fmods.mean(),
-            fstd=fmods.std(),
-            drift=np.linalg.norm(forces.sum(axis=0)),
-        )
+    @lazy_property
+    def fstats(self) -> AttrDict:
+        """
+        |AttrDict| with (num_steps) arrays with stats on the forces in eV/Ang. See :meth:`HistTrajectory.get_fstats`.
+        """
+        return self.trajectory.get_fstats()
 
     def to_string(self, verbose=0, title=None) -> str:
         """String representation."""
@@ -130,9 +125,9 @@ class HistFile(AbinitNcFile, NotebookWriter):
         #an.get_percentage_bond_dist_changes(max_radius=3.0)
         app("")
 
-        cart_stress_tensors, pressures = self.r.read_cart_stress_tensors()
-        app("Stress tensor (Cartesian coordinates in GPa):\n%s" % cart_stress_tensors[-1])
-        app("Pressure: %.3f [GPa]" % pressures[-1])
+        traj = self.trajectory
+        app("Stress tensor (Cartesian coordinates in GPa):\n%s" % traj.cart_stress_tensors[-1])
+        app("Pressure: %.3f [GPa]" % traj.pressures[-1])
 
         return "\n".join(lines)
 
@@ -149,17 +144,25 @@ class HistFile(AbinitNcFile, NotebookWriter):
     @property
     def initial_structure(self) -> Structure:
         """The initial |Structure|."""
-        return self.structures[0]
+        return self.trajectory[0]
 
     @property
     def final_structure(self) -> Structure:
         """The |Structure| of the last iteration."""
-        return self.structures[-1]
+        return self.trajectory[-1]
+
+    @lazy_property
+    def trajectory(self) -> HistTrajectory:
+        """
+        :class:`HistTrajectory` with the evolution of the system stored as arrays.
+        Use it instead of `structures` to avoid building one |Structure| per step.
+        """
+        return self.r.read_trajectory()
 
     @lazy_property
     def structures(self) -> list[Structure]:
         """List of |Structure| objects at the different steps."""
-        return self.r.read_all_structures()
+        return list(self.trajectory)
 
     @lazy_property
     def etotals(self) -> np.ndarray:
@@ -212,24 +215,12 @@ class HistFile(AbinitNcFile, NotebookWriter):
             import tempfile
             fd, filepath = tempfile.mkstemp(text=True, suffix="_XDATCAR")
 
-        # int typat[natom], double znucl[npsp]
-        # NB: typat is double in the HIST.nc file
-        typat = self.r.read_value("typat").astype(int)
-        znucl = self.r.read_value("znucl")
-        ntypat = self.r.read_dimvalue("ntypat")
-        num_pseudos = self.r.read_dimvalue("npsp")
-        if num_pseudos != ntypat:
-            raise NotImplementedError("Alchemical mixing is not supported, num_pseudos != ntypat")
-        #print("znucl:", znucl, "\ntypat:", typat)
-
+        traj = self.trajectory
         symb2pos = OrderedDict()
-        symbols_atom = []
-        for iatom, itype in enumerate(typat):
-            itype = itype - 1
-            symbol = Element.from_Z(int(znucl[itype])).symbol
+        symbols_atom = traj.species
+        for iatom, symbol in enumerate(symbols_atom):
             if symbol not in symb2pos: symb2pos[symbol] = []
             symb2pos[symbol].append(iatom)
-            symbols_atom.append(symbol)
 
         if not groupby_type:
             group_ids = np.arange(self.r.natom)
@@ -254,7 +245,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
                 fh.write(" ".join(str(len(p)) for p in symb2pos.values()) + "\n")
 
             # Write atomic positions in reduced coordinates.
-            xred_list = self.r.read_value("xred")
+            xred_list = traj.xred
             if to_unit_cell:
                 xred_list = xred_list % 1
 
@@ -311,7 +302,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             mark = kwargs.pop("marker", None)
             markers = ["o", "^", "v"] if mark is None else 3 * [mark]
             for i, label in enumerate(["a", "b", "c"]):
-                ax.plot(self.steps, [s.lattice.abc[i] for s in self.structures], label=label,
+                ax.plot(self.steps, self.trajectory.abc[:, i], label=label,
                         marker=markers[i], **kwargs)
             ax.set_ylabel("abc (A)")
 
@@ -321,7 +312,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             if marker is None:
                 marker = {"a": "o", "b": "^", "c": "v"}[what]
             label = kwargs.pop("label", what)
-            ax.plot(self.steps, [s.lattice.abc[i] for s in self.structures], label=label,
+            ax.plot(self.steps, self.trajectory.abc[:, i], label=label,
                     marker=marker, **kwargs)
             ax.set_ylabel('%s (A)' % what)
 
@@ -330,7 +321,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             mark = kwargs.pop("marker", None)
             markers = ["o", "^", "v"] if mark is None else 3 * [mark]
             for i, label in enumerate(["alpha", "beta", "gamma"]):
-                ax.plot(self.steps, [s.lattice.angles[i] for s in self.structures], label=label,
+                ax.plot(self.steps, self.trajectory.angles[:, i], label=label,
                         marker=markers[i], **kwargs)
             ax.set_ylabel(r"$\alpha\beta\gamma$ (degree)")
 
@@ -341,32 +332,25 @@ class HistFile(AbinitNcFile, NotebookWriter):
                 marker = {"alpha": "o", "beta": "^", "gamma": "v"}[what]
 
             label = kwargs.pop("label", what)
-            ax.plot(self.steps, [s.lattice.angles[i] for s in self.structures], label=label,
+            ax.plot(self.steps, self.trajectory.angles[:, i], label=label,
                     marker=marker, **kwargs)
             ax.set_ylabel(r"$\%s$ (degree)" % what)
 
         elif what == "volume":
             marker = kwargs.pop("marker", "o")
-            ax.plot(self.steps, [s.lattice.volume for s in self.structures], marker=marker, **kwargs)
+            ax.plot(self.steps, self.trajectory.volumes, marker=marker, **kwargs)
             ax.set_ylabel(r'$V\, (A^3)$')
 
         elif what == "pressure":
-            stress_cart_tensors, pressures = self.r.read_cart_stress_tensors()
+            pressures = self.trajectory.pressures
             marker = kwargs.pop("marker", "o")
             label = kwargs.pop("label", "P")
             ax.plot(self.steps, pressures, label=label, marker=marker, **kwargs)
             ax.set_ylabel('P (GPa)')
 
         elif what == "forces":
-            forces_hist = self.r.read_cart_forces()
-            fmin_steps, fmax_steps, fmean_steps, fstd_steps = [], [], [], []
-            for step in range(self.num_steps):
-                forces = forces_hist[step]
-                fmods = np.sqrt([np.dot(force, force) for force in forces])
-                fmean_steps.append(fmods.mean())
-                fstd_steps.append(fmods.std())
-                fmin_steps.append(fmods.min())
-                fmax_steps.append(fmods.max())
+            fstats = self.fstats
+            fmin_steps, fmax_steps, fmean_steps, fstd_steps = fstats.fmin, fstats.fmax, fstats.fmean, fstats.fstd
 
             mark = kwargs.pop("marker", None)
             markers = ["o", "^", "v", "X"] if mark is None else 4 * [mark]
@@ -411,7 +395,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             mark = kwargs.pop("marker", None)
             markers = [0, 5, 6] if mark is None else 3 * [mark]
             for i, label in enumerate(["a", "b", "c"]):
-                fig.add_scatter(x=self.steps, y=[s.lattice.abc[i] for s in self.structures], mode='lines+markers',
+                fig.add_scatter(x=self.steps, y=self.trajectory.abc[:, i], mode='lines+markers',
                                 name=label, marker_symbol=markers[i], row=ply_row, col=ply_col, **kwargs)
             fig.layout['yaxis%u' % rcd.iax].title.text = "abc (A)"
 
@@ -421,7 +405,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             if marker is None:
                 marker = {"a": 0, "b": 5, "c": 6}[what]
             label = kwargs.pop("label", what)
-            fig.add_scatter(x=self.steps, y=[s.lattice.abc[i] for s in self.structures], mode='lines+markers',
+            fig.add_scatter(x=self.steps, y=self.trajectory.abc[:, i], mode='lines+markers',
                             name=label, marker_symbol=marker, row=ply_row, col=ply_col, **kwargs)
             fig.layout['yaxis%u' % rcd.iax].title.text = '%s (A)' % what
 
@@ -430,7 +414,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             mark = kwargs.pop("marker", None)
             markers = [0, 5, 6] if mark is None else 3 * [mark]
             for i, label in enumerate(["α ", "β ", "ɣ"]):
-                fig.add_scatter(x=self.steps, y=[s.lattice.angles[i] for s in self.structures], mode='lines+markers',
+                fig.add_scatter(x=self.steps, y=self.trajectory.angles[:, i], mode='lines+markers',
                                 name=label, marker_symbol=markers[i], row=ply_row, col=ply_col, **kwargs)
             fig.layout['yaxis%u' % rcd.iax].title.text = "αβɣ (degree)" + "  "
             fig.layout['yaxis%u' % rcd.iax].tickformat = ".3r"
@@ -441,7 +425,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             if marker is None:
                 marker = {"alpha": 0, "beta": 5, "gamma": 6}[what]
             label = kwargs.pop("label", what)
-            fig.add_scatter(x=self.steps, y=[s.lattice.angles[i] for s in self.structures], mode='lines+markers',
+            fig.add_scatter(x=self.steps, y=self.trajectory.angles[:, i], mode='lines+markers',
                             name=label, marker_symbol=marker, row=ply_row, col=ply_col, **kwargs)
             fig.layout['yaxis%u' % rcd.iax].title.text = r"%s (degree)" % latex_greek_2unicode(what)
             fig.layout['yaxis%u' % rcd.iax].tickformat = ".3r"
@@ -449,12 +433,12 @@ class HistFile(AbinitNcFile, NotebookWriter):
         elif what == "volume":
             marker = kwargs.pop("marker", 0)
             label = kwargs.pop("label", "Volume")
-            fig.add_scatter(x=self.steps, y=[s.lattice.volume for s in self.structures], mode='lines+markers',
+            fig.add_scatter(x=self.steps, y=self.trajectory.volumes, mode='lines+markers',
                             name=label, marker_symbol=marker, row=ply_row, col=ply_col, **kwargs)
             fig.layout['yaxis%u' % rcd.iax].title.text = 'V (A³)'
 
         elif what == "pressure":
-            stress_cart_tensors, pressures = self.r.read_cart_stress_tensors()
+            pressures = self.trajectory.pressures
             marker = kwargs.pop("marker", 0)
             label = kwargs.pop("label", "P")
             fig.add_scatter(x=self.steps, y=pressures, mode='lines+markers',
@@ -462,15 +446,8 @@ class HistFile(AbinitNcFile, NotebookWriter):
             fig.layout['yaxis%u' % rcd.iax].title.text = 'P (GPa)'
 
         elif what == "forces":
-            forces_hist = self.r.read_cart_forces()
-            fmin_steps, fmax_steps, fmean_steps, fstd_steps = [], [], [], []
-            for step in range(self.num_steps):
-                forces = forces_hist[step]
-                fmods = np.sqrt([np.dot(force, force) for force in forces])
-                fmean_steps.append(fmods.mean())
-                fstd_steps.append(fmods.std())
-                fmin_steps.append(fmods.min())
-                fmax_steps.append(fmods.max())
+            fstats = self.fstats
+            fmin_steps, fmax_steps, fmean_steps, fstd_steps = fstats.fmin, fstats.fmax, fstats.fmean, fstats.fstd
 
             mark = kwargs.pop("marker", None)
             markers = [0, 5, 6, 4] if mark is None else 4 * [mark]
@@ -624,7 +601,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
         mvtk.plot_structure(self.final_structure, style=style, unit_cell_color=(0, 0, 0), figure=figure)
 
         steps = np.arange(start=0, stop=self.num_steps, step=sampling)
-        xcart_list = self.r.read_value("xcart") * units.bohr_to_ang
+        xcart_list = self.trajectory.cart_coords
         for iatom in range(self.r.natom):
             x, y, z = xcart_list[::sampling, iatom, :].T
             #for i in zip(x, y, z): print(i)
@@ -633,7 +610,7 @@ class HistFile(AbinitNcFile, NotebookWriter):
             mlab.colorbar(trajectory, title='Iteration', orientation='vertical')
 
         if with_forces:
-            fcart_list = self.r.read_cart_forces(unit="eV ang^-1")
+            fcart_list = self.trajectory.cart_forces
             for iatom in range(self.r.natom):
                 x, y, z = xcart_list[::sampling, iatom, :].T
                 u, v, w = fcart_list[::sampling, iatom, :].T
@@ -900,6 +877,111 @@ class HistRobot(Robot):
         return self._write_nb_nbpath(nb, nbpath)
 
 
+class HistTrajectory:
+    """
+    Array-backed view of the trajectory stored in a HIST.nc file.
+    Quantities are stored as |numpy-array| with the step index as first dimension
+    and |Structure| objects are built only when requested via ``traj[step]``.
+
+    .. example::
+
+        traj = hist.trajectory
+        print(traj.volumes, traj.pressures)
+        last_structure = traj[-1]
+    """
+
+    def __init__(self, species, xred, ucmats, cart_forces, cart_stress_tensors, pressures, etotals):
+        """
+        Args:
+            species: List with the chemical symbol of each atom.
+            xred: (num_steps, natom, 3) array with reduced coordinates.
+            ucmats: (num_steps, 3, 3) array with the lattice vectors in Ang.
+            cart_forces: (num_steps, natom, 3) array with Cartesian forces in eV/Ang.
+            cart_stress_tensors: (num_steps, 3, 3) array with Cartesian stress tensors in GPa.
+            pressures: (num_steps) array with pressures in GPa.
+            etotals: (num_steps) array with total energies in eV.
+        """
+        self.species = list(species)
+        self.xred = xred
+        self.ucmats = ucmats
+        self.cart_forces = cart_forces
+        self.cart_stress_tensors = cart_stress_tensors
+        self.pressures = pressures
+        self.etotals = etotals
+        self._structures = {}
+
+    def __len__(self) -> int:
+        return len(self.xred)
+
+    def __repr__(self) -> str:
+        return "<%s: natom: %d, num_steps: %d>" % (self.__class__.__name__, self.natom, len(self))
+
+    def __getitem__(self, step: int) -> Structure:
+        """Return the |Structure| at the given step. Structures are cached."""
+        step = range(len(self))[step]
+        structure = self._structures.get(step)
+        if structure is None:
+            structure = Structure(self.ucmats[step], self.species, self.xred[step],
+                                  site_properties={"cartesian_forces": self.cart_forces[step]})
+            self._structures[step] = structure
+
+        return structure
+
+    def __iter__(self):
+        for step in range(len(self)):
+            yield self[step]
+
+    @property
+    def natom(self) -> int:
+        """Number of atoms."""
+        return len(self.species)
+
+    @lazy_property
+    def cart_coords(self) -> np.ndarray:
+        """(num_steps, natom, 3) array with Cartesian coordinates in Ang."""
+        return np.einsum("tai,tij->taj", self.xred, self.ucmats)
+
+    @lazy_property
+    def abc(self) -> np.ndarray:
+        """(num_steps, 3) array with the lattice parameters in Ang."""
+        return np.linalg.norm(self.ucmats, axis=2)
+
+    @lazy_property
+    def angles(self) -> np.ndarray:
+        """(num_steps, 3) array with the lattice angles (alpha, beta, gamma) in degrees."""
+        abc = self.abc
+        angles = np.empty_like(abc)
+        for i, (j, k) in enumerate(((1, 2), (2, 0), (0, 1))):
+            cos = np.sum(self.ucmats[:, j] * self.ucmats[:, k], axis=1) / (abc[:, j] * abc[:, k])
+            angles[:, i] = np.degrees(np.arccos(np.clip(cos, -1, 1)))
+
+        return angles
+
+    @lazy_property
+    def volumes(self) -> np.ndarray:
+        """(num_steps) array with the unit cell volumes in Ang^3."""
+        return np.abs(np.linalg.det(self.ucmats))
+
+    @lazy_property
+    def fmods(self) -> np.ndarray:
+        """(num_steps, natom) array with the modulus of the Cartesian forces in eV/Ang."""
+        return np.linalg.norm(self.cart_forces, axis=2)
+
+    def get_fstats(self) -> AttrDict:
+        """
+        Return |AttrDict| with (num_steps) arrays with stats on the forces (min, max, mean, std of
+        the modulus of the forces and modulus of the total force (drift)) in eV/Ang.
+        """
+        fmods = self.fmods
+        return AttrDict(
+            fmin=fmods.min(axis=1),
+            fmax=fmods.max(axis=1),
+            fmean=fmods.mean(axis=1),
+            fstd=fmods.std(axis=1),
+            drift=np.linalg.norm(self.cart_forces.sum(axis=1), axis=1),
+        )
+
+
 class HistReader(ETSF_Reader):
     """
     This object reads data from the HIST file.
@@ -919,36 +1001,34 @@ class HistReader(ETSF_Reader):
         """Number of atoms un the unit cell."""
         return self.read_dimvalue("natom")
 
-    def read_all_structures(self) -> list[Structure]:
-        """Return the list of structures at the different iteration steps."""
-        rprimd_list = self.read_value("rprimd")
-        xred_list = self.read_value("xred")
-
+    def read_trajectory(self) -> HistTrajectory:
+        """
+        Read the arrays with the evolution of the system and return a :class:`HistTrajectory`.
+        """
         # Alchemical mixing is not supported.
         num_pseudos = self.read_dimvalue("npsp")
         ntypat = self.read_dimvalue("ntypat")
         if num_pseudos != ntypat:
             raise NotImplementedError("Alchemical mixing is not supported, num_pseudos != ntypat")
 
+        # NB: typat is double in the HIST.nc file
         znucl, typat = self.read_value("znucl"), self.read_value("typat").astype(int)
-        #print(znucl.dtype, typat)
-        cart_forces_step = self.read_cart_forces(unit="eV ang^-1")
-
-        structures = []
-        #print("typat", type(typat))
-        for step in range(self.num_steps):
-            s = Structure.from_abivars(
-                xred=xred_list[step],
-                rprim=rprimd_list[step],
-                acell=3 * [1.0],
-                # FIXME ntypat, typat, znucl are missing!
-                znucl=znucl,
-                typat=typat,
-            )
-            s.add_site_property("cartesian_forces", cart_forces_step[step])
-            structures.append(s)
-
-        return structures
+        species = [Element.from_Z(int(znucl[itype - 1])).symbol for itype in typat]
+        cart_stress_tensors, pressures = self.read_cart_stress_tensors()
+
+        return HistTrajectory(
+            species=species,
+            xred=self.read_value("xred"),
+            ucmats=self.read_value("rprimd") * units.bohr_to_ang,
+            cart_forces=np.asarray(self.read_cart_forces(unit="eV ang^-1")),
+            cart_stress_tensors=cart_stress_tensors,
+            pressures=pressures,
+            etotals=np.asarray(self.read_eterms().etotals),
+        )
+
+    def read_all_structures(self) -> list[Structure]:
+        """Return the list of structures at the different iteration steps."""
+        return list(self.read_trajectory())
 
     def read_eterms(self, unit: str = "eV") -> AttrDict:
         """|AttrDict| with the decomposition of the total energy in units ``unit``"""
@@ -980,17 +1060,7 @@ class HistReader(ETSF_Reader):
         # Abinit stores 6 unique components of this symmetric 3x3 tensor:
         # Given in order (1,1), (2,2), (3,3), (3,2), (3,1), (2,1).
         c = self.read_value("strten")
-        tensors = np.empty((self.num_steps, 3, 3), dtype=float)
-
-        for step in range(self.num_steps):
-            for i in range(3): tensors[step, i, i] = c[step, i]
-            for p, (i, j) in enumerate(((2, 1), (2, 0), (1, 0))):
-                tensors[step, i, j] = c[step, 3+p]
-                tensors[step, j, i] = c[step, 3+p]
-
-        tensors *= abu.HaBohr3_GPa
-        pressures = np.empty(self.num_steps)
-        for step, tensor in enumerate(tensors):
-            pressures[step] = - tensor.trace() / 3
+        tensors = c[:, [[0, 5, 4], [5, 1, 3], [4, 3, 2]]] * abu.HaBohr3_GPa
+        pressures = - np.trace(tensors, axis1=1, axis2=2) / 3
 
         return tensors, pressures
@@ -0,0 +1,127 @@
+"""Tests for analyzer module."""
+import numpy as np
+
+from pymatgen.core.lattice import Lattice
+from abipy.core.structure import Structure
+from abipy.core.testing import AbipyTest
+from abipy.dynamics.analyzer import MdAnalyzer, msd_tt0_from_tac, msd_t_from_atc, msd_tt0_rows_from_atc
+
+
+class MsdTest(AbipyTest):
+
+    def test_msd_fft(self):
+        """Testing MSD computed with the FFT."""
+        rng = np.random.default_rng(0)
+        nt, natom, size_t = 400, 5, 150
+        # Random walk with large offset to test round-off errors.
+        pos_atc = np.cumsum(rng.normal(size=(natom, nt, 3)), axis=1) + 100
+        msd_tt0 = msd_tt0_from_tac(pos_atc.transpose(1, 0, 2).copy(), size_t, nprocs=1)
+
+        self.assert_almost_equal(msd_t_from_atc(pos_atc, size_t, max_nbytes=1), msd_tt0.mean(axis=1))
+        iatoms = [1, 3]
+        self.assert_almost_equal(msd_t_from_atc(pos_atc, size_t, iatoms=iatoms),
+                                 msd_tt0_from_tac(pos_atc[iatoms].transpose(1, 0, 2).copy(), size_t, nprocs=1).mean(axis=1))
+        self.assert_almost_equal(msd_tt0_rows_from_atc(pos_atc, [0, 7, 149], nt - size_t), msd_tt0[[0, 7, 149]])
+
+        with self.assertRaises(ValueError):
+            msd_t_from_atc(pos_atc, nt)
+        with self.assertRaises(ValueError):
+            msd_tt0_rows_from_atc(pos_atc, [size_t + 1], nt - size_t)
+
+        # Use MdAnalyzer API.
+        structure = Structure(Lattice.cubic(10), ["Li", "Li", "O", "Li", "O"], rng.uniform(size=(natom, 3)))
+        times = np.arange(nt) * 0.01
+        ucmats = np.tile(structure.lattice.matrix, (nt, 1, 1))
+        mda = MdAnalyzer(structure, 600, times, pos_atc, ucmats, "test", pos_order="atc")
+
+        direct = mda.get_msdtt0_symbol_tmax("Li", tmax=1.5)
+        fft = mda.get_msdtt0_symbol_tmax("Li", tmax=1.5, method="fft")
+        assert fft.arr_tt0 is None and fft.size_t == direct.arr_tt0.shape[0]
+        self.assert_almost_equal(fft.msd_t, direct.msd_t)
+        self.assert_almost_equal(fft.get_msd_tt0_rows([2, 5]), direct.arr_tt0[[2, 5]])
+
+        sig_direct = direct.get_sigma_berend(t1=0.2, t2=0.5, tot_block=20)
+        sig_fft = fft.get_sigma_berend(t1=0.2, t2=0.5, tot_block=20)
+        self.assert_almost_equal(sig_fft.sigmas1, sig_direct.sigmas1)
+        self.assert_almost_equal(sig_fft.sigmas2, sig_direct.sigmas2)
+
+        with self.assertRaises(ValueError):
+            fft.plot_mat(show=False)
+        with self.assertRaises(ValueError):
+            mda.get_msdtt0_symbol_tmax("Li", tmax=1.5, method="foo")
+
+
+class MdAnalyzerTest(AbipyTest):
+
+    def test_from_hist_file(self):
+        """Testing MdAnalyzer.from_hist_file."""
+        import abipy.data as abidata
+        from abipy.dynamics.hist import HistFile
+        filepath = abidata.ref_file("sic_relax_HIST.nc")
+        mda = MdAnalyzer.from_hist_file(filepath, step_skip=2)
+        assert mda.engine == "abinit" and mda.nt == 4 and mda.natom == 2
+        # Relaxation run --> ionic kinetic energy is zero.
+        assert mda.temperature == 0.0
+        with HistFile(filepath) as hist:
+            self.assert_almost_equal(mda.pos_atc[:, -1], hist.final_structure.cart_coords)
+
+
+class MultiMdAnalyzerTest(AbipyTest):
+
+    def test_diffusion_data_list(self):
+        """Testing parallel computation of diffusion coefficients with persistent cache."""
+        from abipy.dynamics.analyzer import MultiMdAnalyzer, ArrheniusEntry
+        rng = np.random.default_rng(1)
+        nt, natom = 400, 5
+        structure = Structure(Lattice.cubic(10), ["Li", "Li", "O", "Li", "O"], rng.uniform(size=(natom, 3)))
+        times = np.arange(nt) * 0.01
+        ucmats = np.tile(structure.lattice.matrix, (nt, 1, 1))
+        mdas = []
+        for temp in (800, 600):
+            pos_atc = np.cumsum(rng.normal(scale=temp / 600, size=(natom, nt, 3)), axis=1)
+            mdas.append(MdAnalyzer(structure, temp, times, pos_atc, ucmats, "test", pos_order="atc"))
+        multi = MultiMdAnalyzer(mdas)
+
+        kwargs = dict(tmax=1.5, t1=0.2, t2=0.5, block_size1=25, block_size2=25, tot_block=20)
+        ref = multi.get_diffusion_data_list("Li", fit_time_start=0.2, fit_time_stop=1.0, pmode="seq", **kwargs)
+        assert [d.temperature for d in ref] == [600, 800]
+
+        # Only the positions of the specie are sent to the worker processes.
+        view = mdas[0]._get_atoms_view(mdas[0].iatoms_with_symbol("Li"))
+        assert view.pos_atc.shape == (3, nt, 3) and view.content_hash != mdas[0].content_hash
+        ddlist = multi.get_diffusion_data_list("Li", fit_time_start=0.2, fit_time_stop=1.0,
+                                               pmode="processes", nprocs=2, **kwargs)
+        for d, d_ref in zip(ddlist, ref):
+            self.assert_almost_equal(d.diffusion_coeff, d_ref.diffusion_coeff)
+            self.assert_almost_equal(d.msd_t, d_ref.msd_t)
+
+        cache = MdAnalyzer.enable_disk_cache(topdir=self.mkdtemp())
+        try:
+            ddlist = multi.get_diffusion_data_list("Li", fit_time_start=0.2, fit_time_stop=1.0,
+                                                   pmode="threads", nprocs=2, **kwargs)
+            nkeys = len(cache)
+            assert nkeys == 4
+            for d, d_ref in zip(ddlist, ref):
+                self.assert_almost_equal(d.diffusion_coeff, d_ref.diffusion_coeff)
+                self.assert_almost_equal(d.msd_t, d_ref.msd_t)
+
+            # A new fit window reuses the MSD arrays stored in the cache.
+            ddlist = multi.get_diffusion_data_list("Li", fit_time_start=0.3, fit_time_stop=1.2,
+                                                   pmode="threads", **kwargs)
+            assert len(cache) == nkeys
+            for d, d_ref in zip(ddlist, ref):
+                self.assert_almost_equal(d.msd_t, d_ref.msd_t)
+
+            # Resampled trajectories must not use the same entries.
+            new = mdas[0].resample_time(start_time=0.0, new_timestep=0.02)
+            assert new.content_hash != mdas[0].content_hash
+        finally:
+            MdAnalyzer.disable_disk_cache(clear=True)
+
+        entry = ArrheniusEntry.from_diffusion_data_list(ddlist, key="Li")
+        assert entry.symbol == "Li" and list(entry.temps) == [600, 800]
+        assert entry.composition == structure.composition
+
+        with self.assertRaises(ValueError):
+            multi.get_diffusion_data_list("Li", fit_time_start=0.2, fit_time_stop=1.0,
+                                          block_size1=[25], block_size2=25, tmax=1.5, t1=0.2, t2=0.5)
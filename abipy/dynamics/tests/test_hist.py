@@ -1,4 +1,5 @@
 """"Tests for HIST.nc files."""
+import numpy as np
 import abipy.data as abidata
 from abipy import abilab
 from abipy.core.testing import AbipyTest
@@ -53,6 +54,22 @@ class HistFileTest(AbipyTest):
         for i in range(3):
             self.assert_almost_equal(cart_stress_tensors[-1, i, i], 5.01170783E-08 * abu.HaBohr3_GPa)
 
+        # Test array-backed trajectory.
+        traj = hist.trajectory
+        repr(traj)
+        assert len(traj) == hist.num_steps and traj.natom == 2
+        assert traj[-1] is hist.final_structure and traj[0] is traj[-hist.num_steps]
+        self.assert_almost_equal(traj.pressures, pressures)
+        self.assert_almost_equal(traj.cart_stress_tensors, cart_stress_tensors)
+        self.assert_almost_equal(traj.etotals, hist.etotals)
+        for step, structure in enumerate(hist.structures):
+            self.assert_almost_equal(traj.abc[step], structure.lattice.abc)
+            self.assert_almost_equal(traj.angles[step], structure.lattice.angles)
+            self.assert_almost_equal(traj.volumes[step], structure.volume)
+            self.assert_almost_equal(traj.cart_coords[step], structure.cart_coords)
+            fmods = [np.linalg.norm(f) for f in structure.site_properties["cartesian_forces"]]
+            self.assert_almost_equal(hist.get_fstats_dict(step).fmax, max(fmods))
+
         same_structure = abilab.Structure.from_file(abidata.ref_file("sic_relax_HIST.nc"))
         self.assert_almost_equal(same_structure.frac_coords, hist.final_structure.frac_coords)
 
@@ -0,0 +1,85 @@
+"""Tests for trajstore module."""
+import os
+import tempfile
+import numpy as np
+
+from abipy.core.testing import AbipyTest
+from abipy.dynamics.trajstore import TrajectoryStore, TrajectoryStoreWriter
+from abipy.dynamics.analyzer import MdAnalyzer, read_structure_postac_ucmats
+
+
+class TrajectoryStoreTest(AbipyTest):
+
+    def test_ase_conversion(self):
+        """Testing conversion of ASE trajectory to TrajectoryStore."""
+        from ase import Atoms
+        from ase.io import write
+
+        rng = np.random.default_rng(0)
+        nt, natom = 40, 4
+        pos_tac = np.cumsum(rng.normal(scale=0.1, size=(nt, natom, 3)), axis=0) + 1.0
+        images = [Atoms("Li2O2", positions=pos, cell=np.eye(3) * 5, pbc=True) for pos in pos_tac]
+        tmpdir = tempfile.mkdtemp()
+        traj_path = os.path.join(tmpdir, "md.traj")
+        write(traj_path, images)
+
+        structure, pos_step, ucmats, traj_len = read_structure_postac_ucmats(traj_path, step_skip=3)
+        assert traj_len == nt and pos_step.shape == (len(range(0, nt, 3)), natom, 3)
+        self.assert_almost_equal(pos_step, pos_tac[::3])
+
+        from ase.io.trajectory import Trajectory
+        empty_path = os.path.join(tmpdir, "empty.traj")
+        Trajectory(empty_path, "w").close()
+        with self.assertRaises(ValueError):
+            read_structure_postac_ucmats(empty_path, step_skip=1)
+
+        store = TrajectoryStore.from_ase_file(traj_path, os.path.join(tmpdir, "store"),
+                                              meta=dict(temperature=300, timestep=0.002, engine="test"),
+                                              with_velocities=True)
+        repr(store)
+        assert store.natom == natom and store.nt == nt
+        assert store.positions.shape == (natom, nt, 3) and store.cells.shape == (nt, 3, 3)
+        assert isinstance(store.positions, np.memmap)
+        assert store.velocities.shape == (natom, nt, 3) and store.forces is None
+        self.assert_almost_equal(store.positions, pos_tac.transpose(1, 0, 2))
+        assert store.structure.formula == "Li2 O2"
+
+        # MdAnalyzer backed by the store.
+        mda = MdAnalyzer.from_trajstore(store.store_dir, step_skip=2)
+        assert mda.nt == 20 and mda.temperature == 300 and mda.engine == "test"
+        self.assert_almost_equal(mda.timestep, 0.004)
+        assert isinstance(mda.pos_atc, np.memmap)
+        self.assert_almost_equal(mda.pos_atc, pos_tac.transpose(1, 0, 2)[:, ::2])
+
+        new = mda.resample_step(start_at_step=2, take_every=3)
+        assert new is not mda and mda.nt == 20
+        assert new.pos_atc.base is not None
+        self.assert_almost_equal(new.pos_atc, mda.pos_atc[:, 2::3])
+        self.assert_almost_equal(new.times, mda.times[2::3] - mda.times[2])
+
+        with self.assertRaises(ValueError):
+            TrajectoryStore.from_structures([], os.path.join(tmpdir, "empty"))
+
+    def test_writer(self):
+        """Testing TrajectoryStoreWriter."""
+        structure = self.get_structure("Si")
+        tmpdir = tempfile.mkdtemp()
+        store_dir = os.path.join(tmpdir, "store")
+        with TrajectoryStoreWriter(store_dir, structure, dtype=np.float32, meta=dict(timestep=0.001)) as writer:
+            for it in range(5):
+                writer.append(structure.cart_coords + it, structure.lattice.matrix, forces=np.ones((2, 3)) * it)
+            with self.assertRaises(ValueError):
+                writer.append(np.zeros((3, 3)), structure.lattice.matrix)
+
+        store = TrajectoryStore(store_dir)
+        assert store.positions.dtype == np.float32 and store.nt == 5
+        self.assert_almost_equal(store.forces[:, 4], 4)
+        self.assert_almost_equal(store.positions[0, 3], structure.cart_coords[0] + 3, decimal=5)
+        # No temporary directory left.
+        assert os.listdir(tmpdir) == ["store"]
+
+        # Exceptions remove the temporary files.
+        with self.assertRaises(RuntimeError):
+            with TrajectoryStoreWriter(os.path.join(tmpdir, "other"), structure) as writer:
+                raise RuntimeError("foo")
+        assert os.listdir(tmpdir) == ["store"]
@@ -0,0 +1,243 @@
+"""
+Columnar, memory-mapped store for MD trajectories.
+
+The store is a directory with the following files:
+
+      meta.json : natom, nt, initial structure and optional metadata (temperature, timestep, engine...)
+      positions.npy : Cartesian positions in Ang with shape (natom, nt, 3)
+      cells.npy : lattice vectors in Ang with shape (nt, 3, 3)
+      velocities.npy : (optional) velocities with shape (natom, nt, 3)
+      forces.npy : (optional) forces with shape (natom, nt, 3)
+
+Per-atom arrays are stored in atom-major order so that the trajectory of a set of atoms
+is a contiguous block. The arrays are opened with np.load(mmap_mode="r") so
+the data is loaded from disk only when needed.
+"""
+from __future__ import annotations
+
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+
+from pathlib import Path
+from numpy.lib.format import open_memmap
+from abipy.core.structure import Structure
+from abipy.tools.typing import PathLike
+
+
+class TrajectoryStoreWriter:
+    """
+    Write a trajectory to a :class:`TrajectoryStore` one step at a time.
+    Steps are appended to raw files in time-major order and transposed
+    in chunks to atom-major order when the writer is closed so that the memory
+    used is independent of the number of steps.
+
+    .. example::
+
+        with TrajectoryStoreWriter(store_dir, structure) as writer:
+            for atoms in ase.io.iread(filepath):
+                writer.append(atoms.positions, atoms.cell.array)
+    """
+
+    def __init__(self, store_dir: PathLike, structure: Structure, dtype=np.float64, meta: dict | None = None):
+        """
+        Args:
+            store_dir: Directory of the store. Overwritten if it already exists.
+            structure: Initial structure.
+            dtype: Data type used to store the per-atom arrays (np.float64 or np.float32).
+            meta: Optional dictionary with metadata e.g. temperature, timestep...
+        """
+        self.store_dir = Path(str(store_dir))
+        self.structure = structure
+        self.natom = len(structure)
+        self.dtype = np.dtype(dtype)
+        self.meta = {} if meta is None else dict(meta)
+        self.nt = 0
+
+        self.store_dir.parent.mkdir(parents=True, exist_ok=True)
+        self._tmpdir = Path(tempfile.mkdtemp(prefix=".tmp_trajstore_", dir=self.store_dir.parent))
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _write(self, name: str, values, shape: tuple, dtype) -> None:
+        values = np.asarray(values, dtype=dtype)
+        if values.shape != shape:
+            raise ValueError(f"Expecting {name} with shape {shape}, got {values.shape}")
+        if name not in self._files:
+            if self.nt != 0:
+                raise ValueError(f"{name} must be given for all the steps")
+            self._files[name] = open(self._tmpdir / (name + ".raw"), "wb")
+        self._files[name].write(values.tobytes())
+
+    def append(self, positions, cell, velocities=None, forces=None) -> None:
+        """
+        Add one step.
+
+        Args:
+            positions: (natom, 3) array with Cartesian positions in Ang.
+            cell: (3, 3) array with lattice vectors in Ang.
+            velocities: (natom, 3) array with velocities (optional).
+            forces: (natom, 3) array with forces (optional).
+        """
+        self._write("positions", positions, (self.natom, 3), self.dtype)
+        self._write("cells", cell, (3, 3), np.float64)
+        for name, values in (("velocities", velocities), ("forces", forces)):
+            if values is None:
+                if name in self._files:
+                    raise ValueError(f"{name} must be given for all the steps")
+                continue
+            self._write(name, values, (self.natom, 3), self.dtype)
+        self.nt += 1
+
+    def close(self, chunk_nbytes: int = 2 ** 27) -> TrajectoryStore:
+        """
+        Transpose the raw data to the final format and move the store to its final location.
+        Return the :class:`TrajectoryStore`.
+        """
+        for fh in self._files.values(): fh.close()
+        if self.nt == 0:
+            self.abort()
+            raise ValueError("Cannot create a TrajectoryStore without steps")
+
+        # Transpose (nt, natom, 3) --> (natom, nt, 3) in chunks of steps.
+        step_nbytes = self.natom * 3 * self.dtype.itemsize
+        chunk = max(1, chunk_nbytes // step_nbytes)
+        for name in self._files:
+            raw_path = self._tmpdir / (name + ".raw")
+            if name == "cells":
+                tac = np.memmap(raw_path, dtype=np.float64, mode="r", shape=(self.nt, 3, 3))
+                np.save(self._tmpdir / "cells.npy", tac)
+            else:
+                tac = np.memmap(raw_path, dtype=self.dtype, mode="r", shape=(self.nt, self.natom, 3))
+                atc = open_memmap(self._tmpdir / (name + ".npy"), mode="w+", dtype=self.dtype,
+                                  shape=(self.natom, self.nt, 3))
+                for start in range(0, self.nt, chunk):
+                    atc[:, start:start+chunk] = tac[start:start+chunk].transpose(1, 0, 2)
+                atc.flush()
+                del atc
+            del tac
+            os.remove(raw_path)
+
+        meta = dict(self.meta, natom=self.natom, nt=self.nt, structure=self.structure.as_dict())
+        with open(self._tmpdir / "meta.json", "wt") as fh:
+            json.dump(meta, fh)
+
+        if self.store_dir.exists(): shutil.rmtree(self.store_dir)
+        os.rename(self._tmpdir, self.store_dir)
+        self._files = {}
+
+        return TrajectoryStore(self.store_dir)
+
+    def abort(self) -> None:
+        """Remove the temporary files."""
+        for fh in self._files.values(): fh.close()
+        self._files = {}
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+class TrajectoryStore:
+    """
+    Read-only access to a trajectory saved with :class:`TrajectoryStoreWriter`.
+    Arrays are memory-mapped and slicing with steps (e.g. positions[:, ::step_skip])
+    returns views without copying the data.
+    """
+
+    def __init__(self, store_dir: PathLike):
+        self.store_dir = Path(str(store_dir))
+        with open(self.store_dir / "meta.json", "rt") as fh:
+            self.meta = json.load(fh)
+
+        self.natom, self.nt = self.meta["natom"], self.meta["nt"]
+        self.structure = Structure.from_dict(self.meta["structure"])
+
+    def __repr__(self):
+        return "<%s: %s, natom: %d, nt: %d>" % (self.__class__.__name__, self.store_dir, self.natom, self.nt)
+
+    @classmethod
+    def from_ase_file(cls, traj_filepath: PathLike, store_dir: PathLike, dtype=np.float64,
+                      meta: dict | None = None, with_velocities=False, with_forces=False) -> TrajectoryStore:
+        """
+        Convert a trajectory file supported by ASE to a store in a single pass.
+        Only one step is kept in memory at a given time.
+
+        Args:
+            traj_filepath: Trajectory file.
+            store_dir: Directory of the store.
+            dtype: Data type used to store the per-atom arrays.
+            meta: Optional dictionary with metadata.
+            with_velocities: True to store the velocities.
+            with_forces: True to store the forces (requires a calculator attached to the Atoms).
+        """
+        from ase.io import iread
+        writer = None
+        try:
+            for atoms in iread(str(traj_filepath), index=":"):
+                if writer is None:
+                    writer = TrajectoryStoreWriter(store_dir, Structure.as_structure(atoms), dtype=dtype, meta=meta)
+                writer.append(atoms.positions, atoms.cell.array,
+                              velocities=atoms.get_velocities() if with_velocities else None,
+                              forces=atoms.get_forces() if with_forces else None)
+        except Exception:
+            if writer is not None: writer.abort()
+            raise
+
+        if writer is None:
+            raise ValueError(f"Empty trajectory in {traj_filepath}")
+
+        return writer.close()
+
+    @classmethod
+    def from_structures(cls, structures, store_dir: PathLike, dtype=np.float64,
+                        meta: dict | None = None) -> TrajectoryStore:
+        """
+        Build a store from an iterable of pymatgen structures (e.g. a generator).
+        """
+        writer = None
+        try:
+            for structure in structures:
+                if writer is None:
+                    writer = TrajectoryStoreWriter(store_dir, structure, dtype=dtype, meta=meta)
+                writer.append(structure.cart_coords, structure.lattice.matrix)
+        except Exception:
+            if writer is not None: writer.abort()
+            raise
+
+        if writer is None:
+            raise ValueError("Empty list of structures")
+
+        return writer.close()
+
+    def _load(self, name: str) -> np.ndarray | None:
+        path = self.store_dir / (name + ".npy")
+        if not path.exists(): return None
+        return np.load(path, mmap_mode="r")
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Memory-mapped array with the Cartesian positions in Ang. Shape (natom, nt, 3)."""
+        return self._load("positions")
+
+    @property
+    def cells(self) -> np.ndarray:
+        """Memory-mapped array with the lattice vectors in Ang. Shape (nt, 3, 3)."""
+        return self._load("cells")
+
+    @property
+    def velocities(self) -> np.ndarray | None:
+        """Memory-mapped array with the velocities. Shape (natom, nt, 3). None if not available."""
+        return self._load("velocities")
+
+    @property
+    def forces(self) -> np.ndarray | None:
+        """Memory-mapped array with the forces. Shape (natom, nt, 3). None if not available."""
+        return self._load("forces")
@@ -30,10 +30,11 @@ from abipy.core.mixins import Has_Structure, NotebookWriter
 from abipy.core.kpoints import (Kpoint, KpointList, Kpath, IrredZone, KSamplingInfo, KpointsReaderMixin,
     Ktables, has_timrev_from_kptopt, map_grid2ibz, kmesh_from_mpdivs)
 from abipy.core.structure import Structure
+from abipy.core.tetra import TetraMesh
 from abipy.iotools import ETSF_Reader
 from abipy.tools import duck
 from abipy.tools.typing import Figure
-from abipy.tools.numtools import gaussian
+from abipy.tools.numtools import gaussian, broadened_dos
 from abipy.tools.decorators import memoized_method
 from abipy.tools.context_managers import Timer
 from abipy.tools.plotting import (set_axlims, add_fig_kwargs, get_ax_fig_plt, get_axarray_fig_plt,
@@ -1848,8 +1849,11 @@ class ElectronBands(Has_Structure):
 
         Args:
             method: String defining the method for the computation of the DOS.
+                "gaussian" for gaussian broadening, "tetra" (or "tetrahedron") for the linear tetrahedron method,
+                "tetra_blochl" to include Blöchl's correction. The tetrahedron method requires
+                eigenvalues in the IBZ computed on a Gamma-centered k-mesh.
             step: Energy step (eV) of the linear mesh.
-            width: Standard deviation (eV) of the gaussian.
+            width: Standard deviation (eV) of the gaussian. Not used by the tetrahedron method.
 
         Returns: |ElectronDos| object.
         """
@@ -1862,15 +1866,26 @@ class ElectronBands(Has_Structure):
         nw = int(1 + (e_max - e_min) / step)
         mesh, step = np.linspace(e_min, e_max, num=nw, endpoint=True, retstep=True)
 
-        # TODO: Write cython version.
-        dos = np.zeros((self.nsppol, nw))
+        dos, idos = np.zeros((self.nsppol, nw)), None
         if method == "gaussian":
+            wtk = np.asarray(self.kpoints.weights, dtype=float)
             for spin in self.spins:
-                for k, kpoint in enumerate(self.kpoints):
-                    weight = kpoint.weight
-                    for band in range(self.nband_sk[spin,k]):
-                        e = self.eigens[spin,k,band]
-                        dos[spin] += weight * gaussian(mesh, width, center=e)
+                # Exclude bands beyond nband_sk.
+                mask = np.arange(self.mband)[None, :] < self.nband_sk[spin][:, None]
+                eigens_kb = np.asarray(self.eigens[spin])
+                dos[spin] = broadened_dos(mesh, eigens_kb[mask], width,
+                                          weights=np.broadcast_to(wtk[:, None], mask.shape)[mask])
+
+        elif method in ("tetra", "tetrahedron", "tetra_blochl"):
+            # Unfold the eigenvalues in the full BZ and use the linear tetrahedron method.
+            r = self.get_bz2ibz_bz_points(require_gamma_centered=True)
+            tetra = TetraMesh(r.ngkpt, self.structure.reciprocal_lattice.matrix)
+            nband = self.nband_sk.min()
+            idos = np.zeros((self.nsppol, nw))
+            for spin in self.spins:
+                eigens_bz = np.asarray(self.eigens[spin])[r.bz2ibz, :nband]
+                res = tetra.get_dos_idos(eigens_bz, mesh, blochl=method == "tetra_blochl")
+                dos[spin], idos[spin] = res.dos, res.idos
 
         else:
             raise NotImplementedError(f"{method=} is not supported")
@@ -1880,7 +1895,7 @@ class ElectronBands(Has_Structure):
         #if self.smearing["occopt"] == 1:
         #    print("using fermie from GSR")
         #    fermie = self.fermie
-        edos = ElectronDos(mesh, dos, self.nelect, fermie=fermie)
+        edos = ElectronDos(mesh, dos, self.nelect, fermie=fermie, spin_idos=idos)
         #print("ebands.fermie", self.fermie, "edos.fermie", edos.fermie)
         return edos
 
@@ -1897,7 +1912,7 @@ class ElectronBands(Has_Structure):
         """
         edos_plotter = ElectronDosPlotter()
         for width in widths:
-            edos = self.get_edos(method="gaussian", step=0.1, width=width)
+            edos = self.get_edos(method="gaussian", step=step, width=width)
             edos_plotter.add_edos(r"$\sigma = %s$ (eV)" % width, edos)
 
         return edos_plotter
@@ -3346,9 +3361,10 @@ class ElectronBands(Has_Structure):
         from abipy.core.skw import SkwInterpolator
         cell = (self.structure.lattice.matrix, self.structure.frac_coords, self.structure.atomic_numbers)
 
-        skw = SkwInterpolator(lpratio, self.kpoints.frac_coords, self.eigens[:,:,bstart:bstop], self.fermie, self.nelect,
-                              cell, fm_symrel, self.has_timrev,
-                              filter_params=filter_params, verbose=verbose)
+        # Reuse previous results if the persistent cache is enabled (see ElectronInterpolator.enable_disk_cache).
+        skw = SkwInterpolator.from_disk_cache(lpratio, self.kpoints.frac_coords, self.eigens[:,:,bstart:bstop],
+                                              self.fermie, self.nelect, cell, fm_symrel, self.has_timrev,
+                                              filter_params=filter_params, verbose=verbose)
 
         # Generate k-points for interpolation.
         if knames is not None:
@@ -5362,20 +5378,45 @@ class Bands3D(Has_Structure):
             |numpy-array| with scalars in unit cell. shape is **always**: (nsppol, nband, nkbz)
         """
         # Symmetrize scalars unit cell grid: e_{TSk} = e_{k}
-        ucdata_sbk = np.empty((self.nsppol, self.nband, len(self.uc2ibz)))
-
         if inshape == "skb":
             scalars = np.reshape(scalars, (self.nsppol, len(self.ibz), self.nband))
-            for ikuc, ik_ibz in enumerate(self.uc2ibz):
-                ucdata_sbk[:, :, ikuc] = scalars[:, ik_ibz, :]
+            ucdata_sbk = scalars[:, self.uc2ibz, :].transpose(0, 2, 1)
         elif inshape == "sbk":
             scalars = np.reshape(scalars, (self.nsppol, self.nband, len(self.ibz)))
-            for ikuc, ik_ibz in enumerate(self.uc2ibz):
-                ucdata_sbk[:, :, ikuc] = scalars[:, :, ik_ibz]
+            ucdata_sbk = scalars[:, :, self.uc2ibz]
         else:
             raise ValueError("Wrong inshape: %s" % str(inshape))
 
-        return ucdata_sbk
+        return np.array(ucdata_sbk, dtype=float)
+
+    def get_edos(self, nelect=None, method="gaussian", step=0.05, width=0.1) -> ElectronDos:
+        """
+        Compute the electronic DOS on a linear mesh from the eigenvalues in the IBZ.
+
+        Args:
+            nelect: Number of electrons in the unit cell. Used to compute the IDOS-based Fermi level
+                if not None, else ``self.fermie`` is used.
+            method: String defining the method for the computation of the DOS.
+            step: Energy step (eV) of the linear mesh.
+            width: Standard deviation (eV) of the gaussian.
+
+        Returns: |ElectronDos| object.
+        """
+        if method != "gaussian":
+            raise NotImplementedError(f"{method=} is not supported")
+
+        epad = 3.0 * width
+        e_min, e_max = self.eigens.min() - epad, self.eigens.max() + epad
+        nw = int(1 + (e_max - e_min) / step)
+        mesh, step = np.linspace(e_min, e_max, num=nw, endpoint=True, retstep=True)
+
+        wtk = np.asarray(self.ibz.weights, dtype=float)
+        dos = np.empty((self.nsppol, nw))
+        for spin in self.spins:
+            dos[spin] = broadened_dos(mesh, self.eigens[spin], width,
+                                      weights=np.broadcast_to(wtk[:, None], self.eigens[spin].shape))
+
+        return ElectronDos(mesh, dos, nelect, fermie=self.fermie if nelect is None else None)
 
     #def add_ucell_vectors(self, name, vectors, inshape="skb"):
     #    self.ucell_vectors[name] = np.reshape(vectors, self.ucdata + (3,))
@@ -13,8 +13,9 @@ from monty.string import marquee
 from pymatgen.core.periodic_table import Element
 from abipy.core.mixins import AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, NotebookWriter
 from abipy.core.structure import Structure
+from abipy.core.tetra import TetraMesh
 from abipy.electrons.ebands import ElectronBands, ElectronsReader
-from abipy.tools.numtools import gaussian
+from abipy.tools.numtools import broadened_dos
 from abipy.tools.typing import Figure
 from abipy.tools.plotting import (set_axlims, get_axarray_fig_plt, add_fig_kwargs, get_figs_plotly,
     add_plotly_fig_kwargs, PlotlyRowColDesc, plotly_set_lims)
@@ -22,8 +23,7 @@ from abipy.tools.plotting import (set_axlims, get_axarray_fig_plt, add_fig_kwarg
 
 def gaussians_dos(dos, mesh, width, values, energies, weights):
     assert len(dos) == len(mesh) and len(values) == len(energies) == len(weights)
-    for vw, e, w in zip(values * weights, energies, weights):
-        dos += vw * gaussian(mesh, width, center=e)
+    dos += broadened_dos(mesh, energies, width, weights=values * weights)
     return dos
 
 
@@ -1996,17 +1996,19 @@ class FatBandsFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, N
         pawt1dos_al = np.zeros((self.natom, self.lsize, self.nsppol, nw))
 
         if method == "gaussian":
+            wtk = np.asarray(kpoints.weights, dtype=float)
             for spin in range(self.nsppol):
-                for k, kpoint in enumerate(kpoints):
-                    weight = kpoint.weight
-                    for band in range(nband_sk[spin, k]):
-                        gs = gaussian(mesh, width, center=eigens[spin,k,band])
-                        for iatom in range(self.natom):
-                            if not self.has_atom[iatom]: continue
-                            for l in range(min(self.lmax_atom[iatom] + 1, mylsize)):
-                                totdos_al[iatom, l, spin] += weight * gs * wal_sbk[iatom, l, spin, band, k]
-                                paw1dos_al[iatom, l, spin] += weight * gs * paw1_wal_sbk[iatom, l, spin, band, k]
-                                pawt1dos_al[iatom, l, spin] += weight * gs * pawt1_wal_sbk[iatom, l, spin, band, k]
+                # Select (band, k) entries with band < nband_sk. Arrays are in (band, k) order.
+                mask = np.arange(self.mband)[:, None] < nband_sk[spin][None, :]
+                ene_bk = np.asarray(eigens[spin]).T[mask]
+                wtk_bk = np.broadcast_to(wtk[None, :], mask.shape)[mask]
+                for iatom in range(self.natom):
+                    if not self.has_atom[iatom]: continue
+                    lsize = min(self.lmax_atom[iatom] + 1, mylsize)
+                    for out, w_al in zip((totdos_al, paw1dos_al, pawt1dos_al), (wal_sbk, paw1_wal_sbk, pawt1_wal_sbk)):
+                        # All l-channels at once: weights have shape [lsize, nbk].
+                        wvals = w_al[iatom, :lsize, spin][:, mask] * wtk_bk[None, :]
+                        out[iatom, :lsize, spin] += broadened_dos(mesh, ene_bk, width, weights=wvals)
 
         else:
             raise ValueError("Method %s is not supported" % method)
@@ -2260,18 +2262,37 @@ class _DosIntegrator(object):
         symbols_lso = OrderedDict()
         if self.method == "gaussian":
 
+            wtk = np.asarray(ebands.kpoints.weights, dtype=float)
             for symbol in fbfile.symbols:
                 lmax = fbfile.lmax_symbol[symbol]
                 wlsbk = fbfile.get_wl_symbol(symbol)
                 lso = np.zeros((fbfile.lsize, fbfile.nsppol, len(self.mesh)))
                 for spin in range(fbfile.nsppol):
-                    for k, kpoint in enumerate(ebands.kpoints):
-                        weight = kpoint.weight
-                        for band in range(ebands.nband_sk[spin, k]):
-                            e = ebands.eigens[spin, k, band]
-                            for l in range(lmax + 1):
-                                lso[l, spin] += wlsbk[l, spin, band, k] *\
-                                                weight * gaussian(self.mesh, self.width, center=e)
+                    # Select (band, k) entries with band < nband_sk. Arrays are in (band, k) order.
+                    mask = np.arange(ebands.mband)[:, None] < ebands.nband_sk[spin][None, :]
+                    ene_bk = np.asarray(ebands.eigens[spin]).T[mask]
+                    wvals = wlsbk[:lmax + 1, spin][:, mask] * np.broadcast_to(wtk[None, :], mask.shape)[mask]
+                    lso[:lmax + 1, spin] = broadened_dos(self.mesh, ene_bk, self.width, weights=wvals)
+
+                symbols_lso[symbol] = lso
+
+        elif self.method in ("tetra", "tetrahedron", "tetra_blochl"):
+            # Unfold eigenvalues and l-projections in the full BZ.
+            # Note that the projections summed over the atoms of the same type are invariant under symmetry.
+            r = ebands.get_bz2ibz_bz_points(require_gamma_centered=True)
+            tetra = TetraMesh(r.ngkpt, ebands.structure.reciprocal_lattice.matrix)
+            nband = ebands.nband_sk.min()
+            for symbol in fbfile.symbols:
+                lmax = fbfile.lmax_symbol[symbol]
+                wlsbk = fbfile.get_wl_symbol(symbol)
+                lso = np.zeros((fbfile.lsize, fbfile.nsppol, len(self.mesh)))
+                for spin in range(fbfile.nsppol):
+                    eigens_bz = np.asarray(ebands.eigens[spin])[r.bz2ibz, :nband]
+                    values_bz = wlsbk[:lmax + 1, spin, :nband][:, :, r.bz2ibz].transpose(0, 2, 1)
+                    res = tetra.get_dos_idos(eigens_bz, self.mesh, values_bz=values_bz,
+                                             blochl=self.method == "tetra_blochl")
+                    lso[:lmax + 1, spin] = res.dos
+
                 symbols_lso[symbol] = lso
 
         else:
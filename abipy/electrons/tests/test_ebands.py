@@ -281,7 +281,14 @@ class ElectronBandsTest(AbipyTest):
         assert si_ebands_kmesh.get_collinear_mag() == 0
 
         with self.assertRaises(NotImplementedError):
-            si_ebands_kmesh.get_edos(method="tetrahedron")
+            si_ebands_kmesh.get_edos(method="foobar")
+
+        # Tetrahedron method: IDOS is computed directly and the number of states is exact.
+        tetra_edos = si_ebands_kmesh.get_edos(method="tetra", step=0.05)
+        self.assert_almost_equal(tetra_edos.tot_idos.values[-1], 2 * si_ebands_kmesh.mband)
+        assert tetra_edos.tot_idos.values[0] == 0
+        blochl_edos = si_ebands_kmesh.get_edos(method="tetra_blochl", step=0.05)
+        self.assert_almost_equal(blochl_edos.tot_idos.values[-1], 2 * si_ebands_kmesh.mband)
 
         edos_kwargs = dict(step=0.1, width=0.2)
         si_edos = si_ebands_kmesh.get_edos(**edos_kwargs)
@@ -519,6 +526,9 @@ class ElectronBandsTest(AbipyTest):
             eb3d = ebands.get_ebands3d()
             repr(eb3d); str(eb3d)
             assert eb3d.to_string(verbose=2)
+            edos3d = eb3d.get_edos(step=0.05, width=0.1)
+            edos = ebands.get_edos(step=0.05, width=0.1)
+            self.assert_almost_equal(edos3d.tot_dos.integral_value, edos.tot_dos.integral_value, decimal=4)
 
             if self.has_ifermi():
                 # Test interface with ifermi package.
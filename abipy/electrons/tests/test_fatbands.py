@@ -1,5 +1,6 @@
 """Tests for electrons.bse module"""
 import itertools
+import numpy as np
 import abipy.data as abidata
 
 from abipy import abilab
@@ -53,6 +54,16 @@ class TestElectronFatbands(AbipyTest):
         assert fbnc_kmesh.ebands.kpoints.is_ibz
         assert fbnc_kmesh.ebands.has_metallic_scheme
 
+        # PJDOS with the tetrahedron method should integrate to the same number of states as the gaussian one.
+        from abipy.electrons.fatbands import _DosIntegrator
+        gauss_intg = _DosIntegrator(fbnc_kmesh, "gaussian", 0.05, 0.1)
+        tetra_intg = _DosIntegrator(fbnc_kmesh, "tetra", 0.05, 0.1)
+        for symbol in fbnc_kmesh.symbols:
+            gauss_lso, tetra_lso = gauss_intg.symbols_lso[symbol], tetra_intg.symbols_lso[symbol]
+            assert tetra_lso.shape == gauss_lso.shape
+            self.assert_almost_equal(np.trapz(tetra_lso, x=tetra_intg.mesh),
+                                     np.trapz(gauss_lso, x=gauss_intg.mesh), decimal=2)
+
         if self.has_matplotlib():
             assert fbnc_kmesh.plot_pjdos_typeview(tight_layout=True, show=False)
             assert fbnc_kmesh.plot_pjdos_lview(tight_layout=True, stacked=True, show=False)
@@ -167,6 +167,43 @@ class GstoreFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands): #
                 raise ValueError("when kfilter == 'none' all the entries in gvals should have been written!")
 
 
+class _KpointTable:
+    """
+    Lookup table mapping reduced coordinates to indices.
+    Coordinates are rounded to a grid with spacing 1 / scale and wrapped
+    to the [0, 1[ interval hence points that differ by a reciprocal lattice vector have the same key.
+    Keys are stored in a sorted array so that many points can be found at once with np.searchsorted.
+    """
+
+    def __init__(self, frac_coords, scale: int = 10 ** 6):
+        self.scale = scale
+        keys = self.get_keys(frac_coords)
+        # Use stable sort so that the first index is found in case of duplicated points.
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self._sorted_keys)
+
+    def get_keys(self, frac_coords) -> np.ndarray:
+        """Return array of int64 keys from the reduced coordinates."""
+        scale = self.scale
+        ints = np.rint(np.reshape(frac_coords, (-1, 3)) * scale).astype(np.int64) % scale
+        return (ints[:, 0] * scale + ints[:, 1]) * scale + ints[:, 2]
+
+    def find(self, frac_coords) -> np.ndarray:
+        """
+        Return the indices of the points with reduced coordinates ``frac_coords``.
+        -1 if the point is not in the table.
+        """
+        keys = self.get_keys(frac_coords)
+        if len(self) == 0:
+            return -np.ones(len(keys), dtype=int)
+        pos = np.searchsorted(self._sorted_keys, keys)
+        pos[pos == len(self)] = 0
+        return np.where(self._sorted_keys[pos] == keys, self._order[pos], -1)
+
+
 @dataclasses.dataclass(kw_only=True)
 class Gqk:
     """
@@ -277,6 +314,14 @@ class Gqk:
 
         return df
 
+    @lazy_property
+    def abs_g2(self) -> np.ndarray:
+        """
+        |g(k,q)|^2 with shape (glob_nq, glob_nk, natom3, m_kq, n_k).
+        Computed only once from gvals if the GSTORE stores complex g.
+        """
+        return self.g2 if self.g2 is not None else np.abs(self.gvals) ** 2
+
     def get_g2q_interpolator_kpoint(self, kpoint, method="linear", check_mesh=1):
         """
         """
@@ -294,8 +339,7 @@ class Gqk:
         nx, ny, nz = ngqpt
 
         # (glob_nq, glob_nk, natom3, m_kq, n_k)
-        g2 = self.g2 if self.g2 is not None else np.abs(self.gvals) ** 2
-        g2_qph_mn = g2[:,ik_g]
+        g2_qph_mn = self.abs_g2[:,ik_g]
 
         # Insert g2 in g2_grid
         g2_grid = np.empty((nb, nb, natom3, nx, ny, nz))
@@ -313,18 +357,36 @@ class Gqk:
         Args:
             what="g2" for |g(k,q)|^2, "g" for g(k,q)
         """
-        # Find the internal indices of (qpoint, kpoint)
-        iq_g, qpoint = self.gstore.r.find_iq_glob_qpoint(qpoint, self.spin)
-        ik_g, kpoint = self.gstore.r.find_ik_glob_kpoint(kpoint, self.spin)
+        return self.get_g_qpts_kpts([qpoint], [kpoint], what)[0]
+
+    def get_g_qpts_kpts(self, qpoints, kpoints, what) -> np.ndarray:
+        """
+        Return numpy array with e-ph matrix elements for a list of (qpoint, kpoint) pairs
+        with shape (npairs, natom3, m_kq, n_k). Matrix elements are extracted with a single gather.
+
+        Args:
+            qpoints: List of q-points in reduced coordinates.
+            kpoints: List of k-points in reduced coordinates. Same length as qpoints.
+            what="g2" for |g(k,q)|^2, "g" for g(k,q)
+        """
+        qpoints, kpoints = np.reshape(qpoints, (-1, 3)), np.reshape(kpoints, (-1, 3))
+        if len(qpoints) != len(kpoints):
+            raise ValueError(f"qpoints and kpoints should have same length while {len(qpoints)=}, {len(kpoints)=}")
+
         if what == "g2":
-            g2 = self.g2 if self.g2 is not None else np.abs(self.gvals) ** 2
-            return g2[iq_g, ik_g]
-        if what == "g":
+            gvals = self.abs_g2
+        elif what == "g":
             if self.cplex != 2:
                 raise ValueError("Gstore file stores g2 instead of complex g")
-            return self.gvals[iq_g, ik_g]
+            gvals = self.gvals
+        else:
+            raise ValueError(f"Invalid {what=}")
 
-        raise ValueError(f"Invalid {what=}")
+        # Find the internal indices of (qpoint, kpoint)
+        iq_g = self.gstore.r.find_iq_glob_qpoints(qpoints, self.spin)
+        ik_g = self.gstore.r.find_ik_glob_kpoints(kpoints, self.spin)
+
+        return gvals[iq_g, ik_g]
 
     def get_gdf_at_qpt_kpt(self, qpoint, kpoint, what="g2") -> pd.DataFrame:
         """
@@ -444,27 +506,58 @@ class GstoreReader(BaseEphReader):
         self.kglob2bz = self.read_value("gstore_kglob2bz")
         self.kglob2bz -= 1
 
+        # Lookup tables for q/k-points in the global arrays. See _get_glob_table.
+        self._glob_tables = {}
+
+    def _get_glob_table(self, qk: str, spin: int) -> _KpointTable:
+        """
+        Lookup table for the q/k-points in the global gvals array of the given spin.
+        Tables are built once and cached.
+        """
+        key = (qk, spin)
+        if key not in self._glob_tables:
+            if qk == "q":
+                glob2bz, points_bz = self.qglob2bz[spin, :self.glob_spin_nq[spin]], self.qbz
+            else:
+                glob2bz, points_bz = self.kglob2bz[spin, :self.glob_nk_spin[spin]], self.kbz
+            self._glob_tables[key] = _KpointTable(points_bz[glob2bz])
+
+        return self._glob_tables[key]
+
+    def _find_glob_points(self, qk: str, points, spin: int) -> np.ndarray:
+        """Find the internal indices of q/k-points. Raise ValueError if one of the points is not found."""
+        points = np.reshape(points, (-1, 3))
+        inds = self._get_glob_table(qk, spin).find(points)
+        if np.any(inds == -1):
+            missing = points[inds == -1]
+            raise ValueError(f"Cannot find {len(missing)} {qk}-points in GSTORE.nc. First missing point: {missing[0]}")
+        return inds
+
     def find_iq_glob_qpoint(self, qpoint, spin: int):
         """
         Find the internal index of the qpoint needed to access the gvals array.
         """
         qpoint = np.asarray(qpoint)
-        for iq_g, iq_bz in enumerate(self.qglob2bz[spin]):
-            if np.allclose(qpoint, self.qbz[iq_bz]):
-                #print(f"Found {qpoint = } with index {iq_g = }")
-                return iq_g, qpoint
-
-        raise ValueError(f"Cannot find {qpoint = } in GSTORE.nc")
+        return self._find_glob_points("q", qpoint, spin)[0], qpoint
 
     def find_ik_glob_kpoint(self, kpoint, spin: int):
         """Find the internal indices of the kpoint needed to access the gvals array."""
         kpoint = np.asarray(kpoint)
-        for ik_g, ik_bz in enumerate(self.kglob2bz[spin]):
-            if np.allclose(kpoint, self.kbz[ik_bz]):
-                #print(f"Found {kpoint = } with index {ik_g = }")
-                return ik_g, kpoint
+        return self._find_glob_points("k", kpoint, spin)[0], kpoint
 
-        raise ValueError(f"Cannot find {kpoint = } in GSTORE.nc")
+    def find_iq_glob_qpoints(self, qpoints, spin: int) -> np.ndarray:
+        """
+        Find the internal indices of a list of qpoints needed to access the gvals array.
+        Points are compared modulo a reciprocal lattice vector.
+        """
+        return self._find_glob_points("q", qpoints, spin)
+
+    def find_ik_glob_kpoints(self, kpoints, spin: int) -> np.ndarray:
+        """
+        Find the internal indices of a list of kpoints needed to access the gvals array.
+        Points are compared modulo a reciprocal lattice vector.
+        """
+        return self._find_glob_points("k", kpoints, spin)
 
     # TODO: This fix to read groups should be imported in pymatgen.
     @lazy_property
@@ -0,0 +1,24 @@
+"""Tests for gstore module."""
+import numpy as np
+
+from abipy.core.testing import AbipyTest
+from abipy.eph.gstore import _KpointTable
+
+
+class GstoreTest(AbipyTest):
+
+    def test_kpoint_table(self):
+        """Testing lookup table for k-points."""
+        ngkpt = np.array([4, 4, 3])
+        kpts = np.reshape(np.indices(ngkpt), (3, -1)).T / ngkpt
+        kpts -= np.rint(kpts)
+        table = _KpointTable(kpts)
+        assert len(table) == len(kpts)
+
+        # Points are found modulo G and with rounding errors.
+        rng = np.random.default_rng(1)
+        inds = rng.permutation(len(kpts))
+        others = kpts[inds] + rng.integers(-2, 3, size=(len(kpts), 3)) + 1e-9
+        self.assert_equal(table.find(others), inds)
+        self.assert_equal(table.find([[0.1, 0, 0], [0, 0, -1], [0.1, 0, 0]]), [-1, 0, -1])
+        assert np.all(_KpointTable(np.empty((0, 3))).find(kpts) == -1)
@@ -9,6 +9,8 @@ import sys
 import os.path
 import datetime
 import collections
+import hashlib
+import threading
 import ruamel.yaml as yaml
 import abc
 import logging
@@ -24,7 +26,7 @@ from monty.json import MontyDecoder, MSONable
 from pymatgen.core.structure import Structure
 from abipy.tools.serialization import pmg_serialize
 from abipy.tools.iotools import yaml_safe_load, yaml_unsafe_load
-from .abiinspect import YamlTokenizer
+from .abiinspect import YamlTokenizer, YamlDoc
 
 logger = logging.getLogger(__name__)
 
@@ -433,68 +435,237 @@ class EventsParserError(Exception):
     """Base class for the exceptions raised by :class:`EventsParser`."""
 
 
+class _ParserState:
+    """
+    State of the parser for a given file. Stores the position after the last YAML document
+    that has been processed so that the next scan can restart from this point.
+    """
+
+    # Number of bytes at the beginning of the file used to detect files that have been replaced.
+    HEAD_NBYTES = 256
+
+    # Number of bytes before offset whose hash is used to detect files that have been rewritten.
+    TAIL_NBYTES = 4096
+
+    def __init__(self):
+        self.offset = 0
+        self.linepos = 0
+        self.head = b""
+        self.tail_hash = None
+        self.file_id = None
+        self.size_mtime = None
+        self.ctime_ns = None
+        self.events = []
+        self.run_completed, self.start_datetime, self.end_datetime = False, None, None
+
+
 class EventsParser:
     """
     Parses the output or the log file produced by ABINIT and extract the list of events.
+
+    If ``incremental`` is True, the parser stores the position of the last YAML document
+    found in the file as well as the list of events so that the next call to ``parse``
+    only needs to scan the bytes appended to the file in the meantime.
+    The state is shared by all the instances and is automatically reset
+    if the file is truncated, replaced or rewritten (the bytes before the last position
+    or the first bytes of the file changed, the modification time went backwards).
     """
     Error = EventsParserError
 
+    # Max number of files whose state is kept in memory (LRU).
+    max_incremental_states = 2048
+
+    _incremental_states = collections.OrderedDict()
+    _incremental_lock = threading.Lock()
+
+    def __init__(self, incremental: bool = False):
+        self.incremental = incremental
+
     def parse(self, filename: str, verbose: int = 0) -> EventReport:
         """
         Parse the given file. Return :class:`EventReport`.
         """
-        run_completed, start_datetime, end_datetime = False, None, None
         filename = os.path.abspath(filename)
-        report = EventReport(filename)
 
+        if not self.incremental:
+            state = _ParserState()
+            with self._open(filename) as fh:
+                self._scan(fh, state, verbose)
+
+        else:
+            with self._incremental_lock:
+                state = self._incremental_states.pop(filename, None)
+
+            try:
+                state = self._update_state(filename, state, verbose)
+            finally:
+                with self._incremental_lock:
+                    if state is not None:
+                        self._incremental_states[filename] = state
+                    while len(self._incremental_states) > self.max_incremental_states:
+                        self._incremental_states.popitem(last=False)
+
+        report = EventReport(filename, events=state.events)
+        report.set_run_completed(state.run_completed, state.start_datetime, state.end_datetime)
+        return report
+
+    @classmethod
+    def clear_incremental_states(cls, filename: str | None = None) -> None:
+        """
+        Remove the states of the incremental parser.
+        If filename is not None, only the state associated to this file is removed.
+        """
+        with cls._incremental_lock:
+            if filename is None:
+                cls._incremental_states.clear()
+            else:
+                cls._incremental_states.pop(os.path.abspath(filename), None)
+
+    def _update_state(self, filename: str, state: _ParserState | None, verbose: int) -> _ParserState:
+        """
+        Scan the bytes appended to filename after the last call. Return the new state.
+        """
+        with self._open(filename) as fh:
+            stat = os.fstat(fh.fileno())
+            file_id, size_mtime = (stat.st_dev, stat.st_ino), (stat.st_size, stat.st_mtime_ns)
+
+            if (state is not None and state.file_id == file_id and state.size_mtime == size_mtime and
+                state.ctime_ns == stat.st_ctime_ns):
+                # File did not change.
+                return state
+
+            if state is not None:
+                # Invalidate the state if the file has been replaced, truncated or rewritten.
+                # ctime changes without mtime changes signal that the mtime has been restored (e.g. cp -p).
+                old_size, old_mtime = state.size_mtime
+                if (state.file_id != file_id or stat.st_size < state.offset or stat.st_mtime_ns < old_mtime or
+                    (stat.st_ctime_ns != state.ctime_ns and stat.st_mtime_ns == old_mtime) or
+                    fh.read(len(state.head)) != state.head or self._get_tail_hash(fh, state.offset) != state.tail_hash):
+                    state = None
+
+            if state is None:
+                state = _ParserState()
+                fh.seek(0)
+                state.head = fh.read(_ParserState.HEAD_NBYTES)
+                state.file_id = file_id
+
+            fh.seek(state.offset)
+            self._scan(fh, state, verbose)
+            state.tail_hash = self._get_tail_hash(fh, state.offset)
+            # Use the values obtained before reading so that we don't miss data written in the meantime.
+            state.size_mtime, state.ctime_ns = size_mtime, stat.st_ctime_ns
+
+        return state
+
+    @staticmethod
+    def _get_tail_hash(fh, offset: int) -> str:
+        """Hash of the last TAIL_NBYTES bytes before offset."""
+        start = max(0, offset - _ParserState.TAIL_NBYTES)
+        fh.seek(start)
+        return hashlib.sha1(fh.read(offset - start)).hexdigest()
+
+    @staticmethod
+    def _open(filename: str):
+        """Open filename in binary mode."""
+        try:
+            return open(filename, "rb")
+        except IOError:
+            # Let YamlTokenizer print the error file (if any) and raise.
+            YamlTokenizer(filename)
+            raise
+
+    def _scan(self, fh, state: _ParserState, verbose: int) -> None:
+        """
+        Extract the YAML documents from the binary file fh positioned at state.offset and update state.
+        state.offset and state.linepos are set to the position after the last document
+        so that documents that are still being written will be scanned again.
+
+        .. warning::
+
+            Assume that the YAML document are closed explicitely with the sentinel '...'
+        """
+        # This is the same algorithm used in YamlTokenizer.next.
+        in_doc, lines, doc_tag = None, [], None
+        offset, linepos = state.offset, state.linepos
+
+        for raw_line in fh:
+            linepos += 1
+            offset += len(raw_line)
+            line = raw_line.decode("utf-8", "replace")
+
+            if line.startswith("---"):
+                # Include only lines in the form:
+                #  "--- !tag"
+                #  "---"
+                # Other lines are spurious.
+                in_doc = False
+                l = line[3:].strip().lstrip()
+
+                if l.startswith("!"):
+                    # "--- !tag"
+                    doc_tag = l
+                    in_doc = True
+                elif not l:
+                    #  "---"
+                    in_doc = True
+                    doc_tag = None
+
+                if in_doc:
+                    lineno = linepos
+
+            if in_doc:
+                lines.append(line)
+
+            if in_doc and line.startswith("..."):
+                self._process_doc(YamlDoc(text="".join(lines), lineno=lineno, tag=doc_tag), state, verbose)
+                in_doc, lines, doc_tag = None, [], None
+                state.offset, state.linepos = offset, linepos
+
+    def _process_doc(self, doc: YamlDoc, state: _ParserState, verbose: int) -> None:
+        """Build the event from the YAML document and add it to state."""
         w = WildCard("*Error|*Warning|*Comment|*Bug|*ERROR|*WARNING|*COMMENT|*BUG")
         #import warnings
         #warnings.simplefilter('ignore', yaml.error.UnsafeLoaderWarning)
 
-        with YamlTokenizer(filename) as tokens:
-            for doc in tokens:
-                if w.match(doc.tag):
-                    #print("got doc.tag", doc.tag,"--")
-                    try:
-                        doc.text  = doc.text.replace('\n    \n', '\n')
-                        #print(doc.text)
-                        # OLD VERSION
-                        #event = yaml.load(doc.text)   # Can't use ruamel safe_load!
-
-                        #event = yaml_safe_load(doc.text)   # Can't use ruamel safe_load!
-                        event = yaml_unsafe_load(doc.text)   # Can't use ruamel safe_load!
-                        # FIXME: This new (recommend) API does not reproduce yaml.load behavior. bug in ruamel?
-                        #event = yaml.YAML(typ='unsafe', pure=True).load(dox.text)
-                        #print(event.yaml_tag, type(event))
-                    except Exception:
-                        #raise
-                        # Wrong YAML doc. Check tha doc tag and instantiate the proper event.
-                        message = "In EventsParser.parse(): Malformatted YAML document at line: %d\n" % doc.lineno
-                        message += doc.text
-
-                        # This call is very expensive when we have many exceptions due to malformatted YAML docs.
-                        if verbose:
-                            message += "Traceback:\n %s" % straceback()
-
-                        if "error" in doc.tag.lower():
-                            print("It seems an error. doc.tag:", doc.tag)
-                            event = AbinitYamlError(message=message, src_file=__file__, src_line=0)
-                        else:
-                            event = AbinitYamlWarning(message=message, src_file=__file__, src_line=0)
-
-                    event.lineno = doc.lineno
-                    report.append(event)
-
-                # Check whether the calculation completed.
-                if doc.tag == "!FinalSummary":
-                    #print(doc)
-                    run_completed = True
-                    d = doc.as_dict()
-                    #print(d)
-                    start_datetime, end_datetime = d["start_datetime"], d["end_datetime"]
-
-        report.set_run_completed(run_completed, start_datetime, end_datetime)
-        return report
+        if w.match(doc.tag):
+            #print("got doc.tag", doc.tag,"--")
+            try:
+                doc.text  = doc.text.replace('\n    \n', '\n')
+                #print(doc.text)
+                # OLD VERSION
+                #event = yaml.load(doc.text)   # Can't use ruamel safe_load!
+
+                #event = yaml_safe_load(doc.text)   # Can't use ruamel safe_load!
+                event = yaml_unsafe_load(doc.text)   # Can't use ruamel safe_load!
+                # FIXME: This new (recommend) API does not reproduce yaml.load behavior. bug in ruamel?
+                #event = yaml.YAML(typ='unsafe', pure=True).load(dox.text)
+                #print(event.yaml_tag, type(event))
+            except Exception:
+                #raise
+                # Wrong YAML doc. Check tha doc tag and instantiate the proper event.
+                message = "In EventsParser.parse(): Malformatted YAML document at line: %d\n" % doc.lineno
+                message += doc.text
+
+                # This call is very expensive when we have many exceptions due to malformatted YAML docs.
+                if verbose:
+                    message += "Traceback:\n %s" % straceback()
+
+                if "error" in doc.tag.lower():
+                    print("It seems an error. doc.tag:", doc.tag)
+                    event = AbinitYamlError(message=message, src_file=__file__, src_line=0)
+                else:
+                    event = AbinitYamlWarning(message=message, src_file=__file__, src_line=0)
+
+            event.lineno = doc.lineno
+            state.events.append(event)
+
+        # Check whether the calculation completed.
+        if doc.tag == "!FinalSummary":
+            #print(doc)
+            state.run_completed = True
+            d = doc.as_dict()
+            #print(d)
+            state.start_datetime, state.end_datetime = d["start_datetime"], d["end_datetime"]
 
     def report_exception(self, filename, exc) -> EventReport:
         """
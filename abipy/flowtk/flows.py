@@ -18,6 +18,7 @@ import numpy as np
 import pandas as pd
 
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 from typing import Any, Union, Iterator, Generator
 from tabulate import tabulate
@@ -37,6 +38,7 @@ from abipy.tools.typing import Figure, TYPE_CHECKING
 from abipy.core.globals import get_workdir
 from abipy.tools.plotting import add_fig_kwargs, get_ax_fig_plt
 from abipy.tools.printing import print_dataframe
+from abipy.tools.parallel import get_max_nprocs
 from abipy.tools.serialization import mjson_loads
 from abipy.flowtk import wrappers
 from .nodes import Status, Node, NodeError, NodeResults, Dependency, GarbageCollector, check_spectator
@@ -44,6 +46,7 @@ from .tasks import Task, ScfTask, TaskManager, FixQueueCriticalError
 from .utils import File, Directory, Editor
 from .works import NodeContainer, Work, BandStructureWork, PhononWork, BecWork, G0W0Work, QptdmWork, DteWork
 from .events import EventsParser
+from .flowstore import FlowStore
 
 if TYPE_CHECKING:  # needed to avoid circular imports
     from abipy.abio.inputs import AbinitInput
@@ -127,6 +130,12 @@ class Flow(Node, NodeContainer, MSONable):
 
     PICKLE_FNAME = "__AbinitFlow__.pickle"
 
+    # SQLite database used to save the status if use_sqlite_store is True (see FlowStore).
+    STORE_FNAME = "__AbinitFlow__.sqlite"
+
+    # True to save the status in STORE_FNAME. Only the nodes that changed are written.
+    use_sqlite_store = False
+
     Error = FlowError
 
     Results = FlowResults
@@ -327,17 +336,14 @@ class Flow(Node, NodeContainer, MSONable):
         filepath = os.path.expanduser(filepath)
         if os.path.isdir(filepath):
             # Walk through each directory inside path and find the pickle database.
+            # The SQLite database has precedence over the pickle file.
             for dirpath, dirnames, filenames in os.walk(filepath):
-                fnames = [f for f in filenames if f == cls.PICKLE_FNAME]
+                fnames = [f for f in (cls.STORE_FNAME, cls.PICKLE_FNAME) if f in filenames]
                 if fnames:
-                    if len(fnames) == 1:
-                        filepath = os.path.join(dirpath, fnames[0])
-                        break  # Exit os.walk
-                    else:
-                        err_msg = "Found multiple databases:\n %s" % str(fnames)
-                        raise RuntimeError(err_msg)
+                    filepath = os.path.join(dirpath, fnames[0])
+                    break  # Exit os.walk
             else:
-                err_msg = "Cannot find %s inside directory %s" % (cls.PICKLE_FNAME, filepath)
+                err_msg = "Cannot find %s or %s inside directory %s" % (cls.STORE_FNAME, cls.PICKLE_FNAME, filepath)
                 raise ValueError(err_msg)
 
         if remove_lock and os.path.exists(filepath + ".lock"):
@@ -347,8 +353,11 @@ class Flow(Node, NodeContainer, MSONable):
                 pass
 
         with FileLock(filepath):
-            with open(filepath, "rb") as fh:
-                flow = pmg_pickle_load(fh)
+            if os.path.basename(filepath) == cls.STORE_FNAME:
+                flow = FlowStore(filepath).load()
+            else:
+                with open(filepath, "rb") as fh:
+                    flow = pmg_pickle_load(fh)
 
         # Check if versions match.
         if flow.VERSION != cls.VERSION:
@@ -457,6 +466,18 @@ class Flow(Node, NodeContainer, MSONable):
         """The path of the pickle file."""
         return os.path.join(self.workdir, self.PICKLE_FNAME)
 
+    @property
+    def store_file(self) -> str:
+        """The path of the SQLite database used if use_sqlite_store is True."""
+        return os.path.join(self.workdir, self.STORE_FNAME)
+
+    def get_store_journal(self, node_id: int | None = None) -> list[tuple]:
+        """
+        Return list of (time, node_id, node_class, status) tuples with the changes of status
+        saved in the SQLite database. Empty list if the database does not exist.
+        """
+        return FlowStore(self.store_file).get_journal(node_id=node_id)
+
     @property
     def mongo_id(self):
         return self._mongo_id
@@ -824,20 +845,49 @@ class Flow(Node, NodeContainer, MSONable):
 
         return dict2namedtuple(deadlocked=deadlocked, runnables=runnables, running=running)
 
-    def check_status(self, **kwargs) -> None:
+    def check_status(self, **kwargs):
         """
         Check the status of the works in self.
 
+        The files inspected by Task.check_status are stat-ed in parallel with threads and
+        tasks in a terminal status whose files did not change since the previous call are skipped.
+        The log files of the remaining tasks are also parsed in parallel while
+        the status is set sequentially as set_status may trigger callbacks.
+        Return named tuple with timing info.
+
         Args:
             show: True to show the status of the flow.
+            nprocs: Number of threads. Use get_max_nprocs if None.
             kwargs: keyword arguments passed to show_status
         """
+        nprocs = kwargs.pop("nprocs", None)
+        nprocs = get_max_nprocs() if nprocs is None else nprocs
+        start = time.perf_counter()
+
+        tasks = [task for task in self.iflat_tasks() if task.status not in (task.S_OK, task.S_LOCKED)]
+        with ThreadPoolExecutor(max_workers=max(1, nprocs)) as executor:
+            signatures = list(executor.map(lambda task: task.get_status_signature(), tasks))
+            skip_tasks = {task for task, sig in zip(tasks, signatures) if task.can_skip_check_status(sig)}
+            to_check = [(task, sig) for task, sig in zip(tasks, signatures) if task not in skip_tasks]
+            stat_time = time.perf_counter() - start
+            list(executor.map(lambda task_sig: task_sig[0].prefetch_event_report(), to_check))
+
+        parse_time = time.perf_counter() - start - stat_time
+
         for work in self:
-            work.check_status()
+            work.check_status(skip_tasks=skip_tasks)
+
+        for task, sig in to_check:
+            task.set_status_signature(sig)
+
+        timing = dict2namedtuple(num_tasks=len(tasks), num_skipped=len(skip_tasks), nprocs=nprocs,
+                                 stat_time=stat_time, parse_time=parse_time, total_time=time.perf_counter() - start)
 
         if kwargs.pop("show", False):
             self.show_status(**kwargs)
 
+        return timing
+
     @property
     def status(self) -> Status:
         """Gives the status of the Flow."""
@@ -1038,10 +1088,8 @@ class Flow(Node, NodeContainer, MSONable):
                     # the final structure or the structure of the last relaxation step.
                     try:
                         with task.open_hist() as hist:
-                            final_structure = hist.final_structure
-                            stress_cart_tensors, pressures_hist = hist.reader.read_cart_stress_tensors()
-                            forces = hist.reader.read_cart_forces(unit="eV ang^-1")[-1]
-                            push_data("_out", task, final_structure, forces, pressures_hist[-1])
+                            traj = hist.trajectory
+                            push_data("_out", task, traj[-1], traj.cart_forces[-1], traj.pressures[-1])
                     except Exception as exc:
                         cprint("Exception while opening HIST.nc file of task: %s\n%s" % (task, str(exc)), "red")
 
@@ -2000,6 +2048,12 @@ Use the `abirun.py FLOWDIR history` command to print the log files of the differ
 
         protocol = self.pickle_protocol
 
+        if self.use_sqlite_store:
+            # Write only the nodes that changed.
+            with FileLock(self.store_file):
+                FlowStore(self.store_file).dump(self, protocol=protocol)
+            return 0
+
         # Atomic transaction with FileLock.
         with FileLock(self.pickle_file):
             with AtomicFile(self.pickle_file, mode="wb") as fh:
@@ -2007,6 +2061,32 @@ Use the `abirun.py FLOWDIR history` command to print the log files of the differ
 
         return 0
 
+    @classmethod
+    def migrate_pickle_to_store(cls, filepath: str, remove_pickle: bool = False) -> Flow:
+        """
+        Convert the pickle file of an existing flow into the SQLite database.
+        Once the database is created, the flow is always loaded from the database.
+
+        Args:
+            filepath: Pickle file or directory containing the pickle file.
+            remove_pickle: True to remove the pickle file.
+        """
+        filepath = os.path.expanduser(filepath)
+        if os.path.isdir(filepath): filepath = os.path.join(filepath, cls.PICKLE_FNAME)
+
+        with FileLock(filepath):
+            with open(filepath, "rb") as fh:
+                flow = pmg_pickle_load(fh)
+
+        flow.use_sqlite_store = True
+        with FileLock(flow.store_file):
+            FlowStore(flow.store_file).dump(flow, protocol=flow.pickle_protocol)
+
+        if remove_pickle:
+            os.remove(filepath)
+
+        return flow
+
     def pickle_dumps(self, protocol=None):
         """
         Return a string with the pickle representation.
@@ -0,0 +1,291 @@
+# coding: utf-8
+"""
+Journaled SQLite database used to save the status of a |Flow|.
+
+Each node of the flow (the flow itself, works, tasks and file nodes) is pickled separately
+and stored in a row of the `nodes` table. References to other nodes are replaced by
+persistent IDs so that only the rows of the nodes that changed are rewritten when the flow is saved.
+The nodes that changed are detected with a cheap fingerprint (see get_node_fingerprint)
+and with the flag set by Node.set_store_dirty hence only these nodes are pickled.
+Changes that are not detected in this way (e.g. the counters of the queue adapters) are saved
+by the full dump that is performed every `FlowStore.full_dump_every` dumps.
+The changes of the status are appended to the `journal` table.
+
+Note that each node is pickled separately so objects shared by different nodes that are not
+nodes themselves (e.g. the structure of the inputs) are duplicated after a load:
+each node gets its own copy and changes in the copy are not seen by the other nodes.
+"""
+from __future__ import annotations
+
+import os
+import io
+import time
+import hashlib
+import pickle
+import sqlite3
+import logging
+
+from typing import Any
+from abipy.tools.serialization import PmgPickler, PmgUnpickler
+from .nodes import Node
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "FlowStore",
+]
+
+
+class _NodePickler(PmgPickler):
+    """
+    Pickler that replaces the references to |Node| objects with persistent IDs.
+    The nodes found while pickling are stored in `found_nodes`.
+    """
+
+    def __init__(self, file, found_nodes: dict, **kwargs):
+        super().__init__(file, **kwargs)
+        self.found_nodes = found_nodes
+
+    def persistent_id(self, obj: Any):
+        if isinstance(obj, Node):
+            other = self.found_nodes.setdefault(obj.node_id, obj)
+            if other is not obj:
+                raise ValueError("Found two different nodes with the same node_id: %s, %s" % (repr(obj), repr(other)))
+            return "Node", obj.node_id
+
+        return super().persistent_id(obj)
+
+
+class _NodeUnpickler(PmgUnpickler):
+    """
+    Unpickler that resolves the persistent IDs produced by _NodePickler.
+    """
+
+    def __init__(self, file, nodes: dict, **kwargs):
+        super().__init__(file, **kwargs)
+        self.nodes = nodes
+
+    def persistent_load(self, pid):
+        if isinstance(pid, tuple) and pid[0] == "Node":
+            return self.nodes[pid[1]]
+
+        return super().persistent_load(pid)
+
+
+def get_node_fingerprint(node: Node) -> tuple:
+    """
+    Return tuple used to detect the nodes that changed since the last save without pickling them.
+    It consists of the status, the number of records in the history (set_status, corrections, restarts,
+    changes of the input ... add a new record), the number of dependencies and the number of children.
+    """
+    num_children = len(node) if (node.is_work or node.is_flow) else 0
+    return str(node.status), node.history.num_records, len(node.deps), num_children
+
+
+class FlowStore:
+    """
+    SQLite database with the status of a |Flow|.
+
+    Tables::
+
+        meta(key, value): Metadata e.g. the node_id of the flow.
+        nodes(node_id, cls, state, digest, status, mtime): One row per node.
+        journal(id, time, node_id, node_class, status): Append-only log with the changes of status.
+
+    .. example::
+
+        store = FlowStore(flow.store_file)
+        store.dump(flow)
+        same_flow = store.load()
+    """
+
+    # Number of dumps with only_dirty after which a full dump is performed.
+    full_dump_every = 20
+
+    def __init__(self, filepath: str, timeout: float = 60.0):
+        """
+        Args:
+            filepath: Path to the database file. Created if it does not exist.
+            timeout: Seconds to wait for the lock held by another connection.
+        """
+        self.filepath = os.path.abspath(filepath)
+        self.timeout = timeout
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.filepath)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and create the tables if needed."""
+        conn = sqlite3.connect(self.filepath, timeout=self.timeout)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS nodes (
+                node_id INTEGER PRIMARY KEY,
+                cls BLOB NOT NULL,
+                state BLOB NOT NULL,
+                digest TEXT NOT NULL,
+                status TEXT,
+                mtime REAL);
+            CREATE TABLE IF NOT EXISTS journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                time REAL,
+                node_id INTEGER,
+                node_class TEXT,
+                status TEXT);
+        """)
+        return conn
+
+    @property
+    def exists(self) -> bool:
+        """True if the database exists."""
+        return os.path.exists(self.filepath)
+
+    def dump(self, flow, protocol: int = -1, only_dirty: bool = True) -> int:
+        """
+        Save the status of the flow. Return the number of rows that have been written.
+
+        Args:
+            flow: |Flow| object.
+            protocol: Pickle protocol.
+            only_dirty: If True, only the nodes whose fingerprint changed since the last save
+                (see get_node_fingerprint) or that have been marked with set_store_dirty are pickled.
+                If False, all the nodes are pickled, the rows whose digest changed are written and
+                the rows of the nodes that are not present anymore are removed.
+                A full dump is performed anyway every `full_dump_every` dumps.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                # Start transaction with write lock so that concurrent writers are serialized.
+                conn.execute("BEGIN IMMEDIATE")
+                old = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT node_id, digest, status FROM nodes")}
+                row = conn.execute("SELECT value FROM meta WHERE key = 'num_partial_dumps'").fetchone()
+                num_partial_dumps = int(row[0]) + 1 if row is not None else 1
+                if only_dirty and num_partial_dumps >= self.full_dump_every:
+                    only_dirty = False
+                if not only_dirty:
+                    num_partial_dumps = 0
+
+                # Select the nodes to pickle. Other nodes may be found while pickling (e.g. FileNode in dependencies)
+                found_nodes = {node.node_id: node for node in flow.iflat_nodes()}
+                if flow.node_id not in found_nodes: found_nodes[flow.node_id] = flow
+                pickled, statuses, old_fprints, old_flags = {}, {}, {}, {}
+                try:
+                    while True:
+                        todo = [(node_id, node) for node_id, node in list(found_nodes.items()) if node_id not in pickled]
+                        if only_dirty:
+                            todo = [(node_id, node) for node_id, node in todo if self._is_dirty(node, old)]
+                        if not todo: break
+                        for node_id, node in todo:
+                            # The fingerprint is saved in the state so that the nodes are clean after load.
+                            old_fprints[node_id] = getattr(node, "_store_fingerprint", None)
+                            node._store_fingerprint = get_node_fingerprint(node)
+                            old_flags[node_id] = getattr(node, "_store_dirty", False)
+                            node._store_dirty = False
+                            # Get the status before pickling as the status property may change the node.
+                            statuses[node_id] = str(node.status)
+                            pickled[node_id] = self._pickle_node(node, found_nodes, protocol)
+
+                    now = time.time()
+                    nwrite = 0
+                    for node_id, (cls_blob, state_blob, digest) in pickled.items():
+                        node, status = found_nodes[node_id], statuses[node_id]
+                        old_digest, old_status = old.get(node_id, (None, None))
+                        if old_digest == digest: continue
+                        conn.execute("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?)",
+                                     (node_id, cls_blob, state_blob, digest, status, now))
+                        nwrite += 1
+                        if status != old_status:
+                            conn.execute("INSERT INTO journal (time, node_id, node_class, status) VALUES (?, ?, ?, ?)",
+                                         (now, node_id, node.__class__.__name__, status))
+
+                except BaseException:
+                    # The rows have not been written: restore the fingerprints so that the nodes are still dirty.
+                    for node_id, fprint in old_fprints.items():
+                        found_nodes[node_id]._store_fingerprint = fprint
+                        found_nodes[node_id]._store_dirty = old_flags[node_id]
+                    raise
+
+                if not only_dirty:
+                    # Remove nodes that are not present anymore.
+                    # This requires all the nodes reachable from the flow hence it's done only in full mode.
+                    stale = [(nid,) for nid in old if nid not in pickled]
+                    conn.executemany("DELETE FROM nodes WHERE node_id = ?", stale)
+
+                conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("root_node_id", str(flow.node_id)),
+                    ("version", str(flow.VERSION)),
+                    ("num_partial_dumps", str(num_partial_dumps)),
+                ])
+        finally:
+            conn.close()
+
+        logger.debug("Wrote %d/%d nodes to %s", nwrite, len(found_nodes), self.filepath)
+        return nwrite
+
+    @staticmethod
+    def _is_dirty(node: Node, old: dict) -> bool:
+        """True if the node must be saved."""
+        if node.node_id not in old or getattr(node, "_store_dirty", False): return True
+        return getattr(node, "_store_fingerprint", None) != get_node_fingerprint(node)
+
+    @staticmethod
+    def _pickle_node(node: Node, found_nodes: dict, protocol: int) -> tuple:
+        """Return (cls_blob, state_blob, digest) for the given node."""
+        getstate = getattr(node, "__getstate__", None)
+        state = getstate() if getstate is not None else node.__dict__
+
+        strio = io.BytesIO()
+        _NodePickler(strio, found_nodes, protocol=protocol).dump(state)
+        state_blob = strio.getvalue()
+        cls_blob = pickle.dumps(node.__class__, protocol=protocol)
+
+        return cls_blob, state_blob, hashlib.sha1(cls_blob + state_blob).hexdigest()
+
+    def load(self):
+        """Reconstruct the flow from the database."""
+        if not self.exists:
+            raise FileNotFoundError("Cannot find database %s" % self.filepath)
+
+        conn = self._connect()
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            rows = conn.execute("SELECT node_id, cls, state FROM nodes").fetchall()
+        finally:
+            conn.close()
+
+        if "root_node_id" not in meta:
+            raise ValueError("Database %s does not contain a flow" % self.filepath)
+
+        # Allocate all the nodes first so that references among nodes can be resolved.
+        nodes = {}
+        for node_id, cls_blob, _ in rows:
+            cls = pickle.loads(cls_blob)
+            nodes[node_id] = cls.__new__(cls)
+
+        for node_id, _, state_blob in rows:
+            node = nodes[node_id]
+            state = _NodeUnpickler(io.BytesIO(state_blob), nodes).load()
+            setstate = getattr(node, "__setstate__", None)
+            if setstate is not None:
+                setstate(state)
+            else:
+                node.__dict__.update(state)
+
+        return nodes[int(meta["root_node_id"])]
+
+    def get_journal(self, node_id: int | None = None) -> list[tuple]:
+        """
+        Return list of (time, node_id, node_class, status) tuples with the changes of status
+        in chronological order. Select the entries of the given node if node_id is not None.
+        """
+        if not self.exists: return []
+        conn = self._connect()
+        try:
+            query = "SELECT time, node_id, node_class, status FROM journal"
+            if node_id is None:
+                return conn.execute(query + " ORDER BY id").fetchall()
+            return conn.execute(query + " WHERE node_id = ? ORDER BY id", (node_id,)).fetchall()
+        finally:
+            conn.close()
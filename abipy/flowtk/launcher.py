@@ -5,6 +5,7 @@ from __future__ import annotations
 import abc
 import os
 import time
+import asyncio
 import datetime
 import pandas as pd
 import apscheduler
@@ -22,6 +23,7 @@ from monty.functools import lazy_property
 from abipy.tools.iotools import yaml_safe_load, ask_yesno
 from abipy.tools.typing import TYPE_CHECKING
 from .utils import as_bool
+from .qjobs import clear_queue_snapshots
 
 import logging
 logger = logging.getLogger(__name__)
@@ -253,6 +255,178 @@ class PyLauncher:
 
         return tasks_to_run
 
+    async def async_rapidfire(self, max_nlaunch=-1, max_concurrency=16) -> int:
+        """
+        Asyncio version of rapidfire. The tasks that are ready are submitted concurrently
+        in worker threads (at most `max_concurrency` submissions at the same time)
+        and the database is updated at the end. No sleep is performed.
+
+        Args:
+            max_nlaunch: Maximum number of launches. default: no limit.
+            max_concurrency: Maximum number of concurrent submissions.
+
+        Returns:
+            The number of tasks launched.
+        """
+        tasks = await asyncio.to_thread(self.fetch_tasks_to_run)
+        if max_nlaunch > 0: tasks = tasks[:max_nlaunch]
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def start(task):
+            async with semaphore:
+                return await asyncio.to_thread(task.start)
+
+        fired = await asyncio.gather(*(start(task) for task in tasks))
+        num_launched = sum(1 for f in fired if f)
+
+        # Update the database.
+        await asyncio.to_thread(self.flow.pickle_dump)
+
+        return num_launched
+
+
+class FileChangeWatcher:
+    """
+    Wait for changes in a set of directories.
+    Use inotify if the optional `inotify_simple` package is installed (Linux only)
+    else poll the size and the mtime of the files in the directories.
+
+    .. example::
+
+        watcher = FileChangeWatcher()
+        watcher.set_dirpaths([task.workdir for task in running_tasks])
+        changed = await watcher.wait(timeout=60)
+    """
+
+    def __init__(self, poll_interval: float = 0.5, debounce: float = 0.1, use_inotify: bool = True):
+        """
+        Args:
+            poll_interval: Seconds between two scans of the directories when inotify is not available.
+            debounce: Seconds to wait after the first notification so that bursts of changes are grouped.
+            use_inotify: False to use polling even if inotify is available.
+        """
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.dirpaths = []
+        self._signature = None
+
+        # Watch descriptors indexed by path.
+        self._wds = {}
+        self._inotify, self._event, self._loop = None, None, None
+        if use_inotify:
+            try:
+                from inotify_simple import INotify, flags
+                self._inotify = INotify()
+                self._inotify_mask = flags.MODIFY | flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO | flags.DELETE
+            except (ImportError, OSError):
+                pass
+
+    def __repr__(self):
+        return "<%s: mode=%s, num_dirs=%d>" % (self.__class__.__name__, self.mode, len(self.dirpaths))
+
+    @property
+    def mode(self) -> str:
+        """"inotify" or "polling"."""
+        return "polling" if self._inotify is None else "inotify"
+
+    def set_dirpaths(self, dirpaths) -> None:
+        """Set the list of directories to watch."""
+        dirpaths = [p for p in dirpaths if os.path.isdir(p)]
+        new = set(dirpaths)
+
+        if self._inotify is not None:
+            for path in [p for p in self._wds if p not in new]:
+                try:
+                    self._inotify.rm_watch(self._wds.pop(path))
+                except OSError:
+                    # The watch is removed automatically if the directory has been deleted.
+                    pass
+            for path in dirpaths:
+                if path in self._wds: continue
+                try:
+                    self._wds[path] = self._inotify.add_watch(path, self._inotify_mask)
+                except OSError as exc:
+                    logger.warning("Cannot watch %s: %s" % (path, str(exc)))
+
+        elif set(self.dirpaths) != new:
+            self._signature = None
+
+        self.dirpaths = dirpaths
+
+    def get_signature(self) -> dict:
+        """Return dict mapping the path of the files in the directories to (size, mtime_ns)."""
+        sig = {}
+        for dirpath in self.dirpaths:
+            try:
+                with os.scandir(dirpath) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat()
+                            sig[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+        return sig
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until a file in the directories is changed or `timeout` seconds have elapsed.
+        Return True if a change has been detected.
+        """
+        if self._inotify is not None:
+            return await self._wait_inotify(timeout)
+
+        return await self._wait_polling(timeout)
+
+    async def _wait_inotify(self, timeout: float) -> bool:
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+            self._loop.add_reader(self._inotify.fileno(), self._on_inotify_event)
+
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        await asyncio.sleep(self.debounce)
+        self._on_inotify_event()
+        self._event.clear()
+        return True
+
+    def _on_inotify_event(self) -> None:
+        # Consume the events so that the file descriptor is not readable anymore.
+        if self._inotify.read(timeout=0): self._event.set()
+
+    async def _wait_polling(self, timeout: float) -> bool:
+        if self._signature is None:
+            self._signature = await asyncio.to_thread(self.get_signature)
+
+        end = time.monotonic() + timeout
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0: return False
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+            sig = await asyncio.to_thread(self.get_signature)
+            if sig != self._signature:
+                await asyncio.sleep(self.debounce)
+                self._signature = await asyncio.to_thread(self.get_signature)
+                return True
+
+    def close(self) -> None:
+        """Release the resources."""
+        if self._inotify is None: return
+        if self._loop is not None:
+            self._loop.remove_reader(self._inotify.fileno())
+            self._loop, self._event = None, None
+        self._inotify.close()
+        self._inotify = None
+        self._wds = {}
+
 
 class PyFlowSchedulerError(Exception):
     """Exceptions raised by `PyFlowScheduler`."""
@@ -326,6 +500,15 @@ class BaseScheduler(metaclass=abc.ABCMeta):
                 completed successfully. (DEFAULT: "no")
             killjobs_if_errors: "yes" if the scheduler should try to kill all the running jobs
                 before exiting due to an error. (DEFAULT: "yes")
+            use_asyncio: "yes" to use the asyncio event loop instead of the APScheduler callback.
+                The scheduler reacts to changes in the directories of the running tasks (inotify or polling)
+                and the interval specified by weeks, days ... is used as max waiting time. (DEFAULT: "no")
+            max_concurrency: Max number of concurrent submissions/status checks in asyncio mode. (DEFAULT: 16)
+            poll_interval: Seconds between two scans of the directories in asyncio mode
+                if inotify is not available. (DEFAULT: 0.5)
+            min_period: Min number of seconds between two iterations in asyncio mode so that
+                files written continuously by the running tasks (e.g. run.log) do not trigger a new
+                iteration at each change. (DEFAULT: 1/10 of the interval specified by weeks, days ...)
         """
         self.init_kwargs = kwargs.copy()
 
@@ -356,6 +539,11 @@ class BaseScheduler(metaclass=abc.ABCMeta):
         self.fix_qcritical = as_bool(kwargs.pop("fix_qcritical", False))
         self.rmflow = as_bool(kwargs.pop("rmflow", False))
         self.killjobs_if_errors = as_bool(kwargs.pop("killjobs_if_errors", True))
+        self.use_asyncio = as_bool(kwargs.pop("use_asyncio", False))
+        self.max_concurrency = int(kwargs.pop("max_concurrency", 16))
+        self.poll_interval = float(kwargs.pop("poll_interval", 0.5))
+        self.min_period = kwargs.pop("min_period", None)
+        if self.min_period is not None: self.min_period = float(self.min_period)
 
         # TODO: Add abinit_options, anaddb_options, exec_options
 
@@ -376,6 +564,7 @@ class BaseScheduler(metaclass=abc.ABCMeta):
         self.nlaunch = 0
         self.num_reminders = 1
         self.start_time = None
+        self._async_stopped = False
 
         # Used to keep track of the exceptions raised while the scheduler is running
         self.exceptions = deque(maxlen=self.max_num_pyexcs + 10)
@@ -445,6 +634,10 @@ debug: 0 # Debug level. Use 0 for production (int, DEFAULT: 0)
 fix_qcritical: no # "yes" if the launcher should try to fix QCritical Errors (DEFAULT: "no")
 rmflow: no # If "yes", the scheduler will remove the flow directory if the calculation completed successfully. (DEFAULT: "no")
 killjobs_if_errors: yes # "yes" if the scheduler should try to kill all the running jobs before exiting due to an error. (DEFAULT: "yes")
+use_asyncio: no # "yes" to use the asyncio event loop that reacts to file changes instead of polling at fixed intervals. (DEFAULT: "no")
+max_concurrency: 16 # Max number of concurrent submissions/status checks in asyncio mode. (DEFAULT: 16)
+poll_interval: 0.5 # Seconds between two scans of the task directories in asyncio mode if inotify is not available. (DEFAULT: 0.5)
+min_period: 6 # Min number of seconds between two iterations in asyncio mode. (DEFAULT: 1/10 of the scheduler interval)
 """
 
     def __str__(self) -> str:
@@ -471,6 +664,71 @@ killjobs_if_errors: yes # "yes" if the scheduler should try to kill all the runn
     def callback(self):
         """The function that will be executed by the scheduler."""
 
+    @abc.abstractmethod
+    async def async_callback(self):
+        """The coroutine executed by the asyncio event loop. See use_asyncio."""
+
+    @abc.abstractmethod
+    def get_flows(self) -> list[Flow]:
+        """List of flows handled by the scheduler."""
+
+    @property
+    def sched_interval(self) -> float:
+        """Interval in seconds between two iterations of the scheduler."""
+        return datetime.timedelta(**self.sched_options).total_seconds()
+
+    def get_watched_dirs(self) -> list[str]:
+        """
+        Return the list of directories whose changes trigger a new iteration in asyncio mode
+        i.e. the working directories of the tasks that are submitted or running.
+        """
+        dirpaths = []
+        for flow in self.get_flows():
+            for task in flow.iflat_tasks():
+                if task.status in (task.S_SUB, task.S_RUN):
+                    dirpaths.append(task.workdir)
+
+        return dirpaths
+
+    def start_asyncio(self) -> int:
+        """
+        Run the asyncio event loop. Block until shutdown is called.
+        """
+        self._async_stopped = False
+        asyncio.run(self._async_main())
+        return 0
+
+    async def _async_main(self) -> None:
+        """
+        Main loop in asyncio mode: execute async_callback and wait until the files of the running tasks
+        are changed or sched_interval seconds have elapsed.
+        """
+        watcher = FileChangeWatcher(poll_interval=self.poll_interval)
+        logger.info("Starting asyncio scheduler with %s" % repr(watcher))
+        min_period = self.min_period if self.min_period is not None else self.sched_interval / 10
+        try:
+            while not self._async_stopped:
+                start = time.monotonic()
+                await self.async_callback()
+                if self._async_stopped: break
+                watcher.set_dirpaths(self.get_watched_dirs())
+                changed = await watcher.wait(timeout=self.sched_interval)
+                logger.debug("Watcher detected changes: %s" % changed)
+                # The running tasks write their log files continuously: rate-limit the iterations
+                # so that each change does not trigger a new check_status + pickle_dump.
+                remaining = min_period - (time.monotonic() - start)
+                if changed and remaining > 0:
+                    await asyncio.sleep(remaining)
+        finally:
+            watcher.close()
+
+    def _stop_sched(self) -> None:
+        """Stop the APScheduler or the asyncio loop."""
+        if self.use_asyncio:
+            self._async_stopped = True
+        else:
+            self.sched.shutdown(wait=False)
+
     @lazy_property
     def pid(self) -> int:
         """The pid of the process associated to the scheduler."""
@@ -611,6 +869,10 @@ class PyFlowScheduler(BaseScheduler):
         self._pid_file = flow.pid_file
         self._flow = flow
 
+    def get_flows(self) -> list[Flow]:
+        """List of flows handled by the scheduler."""
+        return [] if self.flow is None else [self.flow]
+
     def start(self) -> int:
         """
         Starts the scheduler. Returns 0 if success.
@@ -632,6 +894,8 @@ class PyFlowScheduler(BaseScheduler):
 
         # Start the scheduler loop.
         try:
+            if self.use_asyncio:
+                return self.start_asyncio()
             self.sched.start()
             return 0
 
@@ -653,6 +917,61 @@ class PyFlowScheduler(BaseScheduler):
         flow = self.flow
         if flow is None: return
 
+        max_nlaunch = self._prepare_launch(flow, excs)
+        if max_nlaunch <= 0: return
+
+        # Submit the tasks that are ready.
+        try:
+            nlaunch = PyLauncher(flow).rapidfire(max_nlaunch=max_nlaunch, sleep_time=10)
+            self.nlaunch += nlaunch
+            if nlaunch:
+                cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
+
+        except Exception:
+            excs.append(straceback())
+
+        flow.show_status()
+
+        if excs:
+            logger.critical("*** Scheduler exceptions:\n *** %s" % "\n".join(excs))
+            self.exceptions.extend(excs)
+
+    async def _async_runem_all(self) -> None:
+        """
+        Asyncio version of _runem_all. The status of the flow is checked in a worker thread
+        and the tasks are submitted concurrently.
+        """
+        excs = []
+        flow = self.flow
+        if flow is None: return
+
+        max_nlaunch = await asyncio.to_thread(self._prepare_launch, flow, excs)
+        if max_nlaunch <= 0: return
+
+        try:
+            nlaunch = await PyLauncher(flow).async_rapidfire(max_nlaunch=max_nlaunch,
+                                                             max_concurrency=self.max_concurrency)
+            self.nlaunch += nlaunch
+            if nlaunch:
+                cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
+
+        except Exception:
+            excs.append(straceback())
+
+        flow.show_status()
+
+        if excs:
+            logger.critical("*** Scheduler exceptions:\n *** %s" % "\n".join(excs))
+            self.exceptions.extend(excs)
+
+    def _prepare_launch(self, flow: Flow, excs: list) -> int:
+        """
+        Check the status of the flow, restart unconverged tasks and fix the errors.
+        Return the max number of tasks that can be submitted (<= 0 if no task should be submitted).
+        """
+        # New iteration: the status of the jobs in the queue must be recomputed.
+        clear_queue_snapshots()
+
         if self.use_dynamic_manager:
             # Allow to change the manager at run-time
             from .tasks import TaskManager
@@ -669,13 +988,14 @@ class PyFlowScheduler(BaseScheduler):
             print(f"Too many jobs in the queue: {nqjobs} >= {self.max_njobs_inqueue}.\n",
                   "No job will be submitted.")
             flow.check_status(show=False)
-            return
+            return 0
 
         max_nlaunch = self.max_njobs_inqueue - nqjobs if self.max_nlaunches == -1 else \
                       min(self.max_njobs_inqueue - nqjobs, self.max_nlaunches)
 
         # check status.
-        flow.check_status(show=False)
+        timing = flow.check_status(show=False)
+        logger.info("check_status: %s", timing)
 
         # This check is not perfect, we should make a list of tasks to submit
         # and then select a subset so that we don't exceeed max_ncores_used
@@ -684,32 +1004,18 @@ class PyFlowScheduler(BaseScheduler):
         if self.max_ncores_used is not None and flow.ncores_allocated > self.max_ncores_used:
             print("Cannot exceed max_ncores_used %s" % self.max_ncores_used,
                   ", ncores_allocated:", flow.ncores_allocated)
-            return
+            return 0
 
         # Try to restart unconverged tasks.
         max_nlaunch = self.restart_unconverged(flow, max_nlaunch, excs)
-        if max_nlaunch <= 0: return
+        if max_nlaunch <= 0: return 0
 
         self.try_to_fix_flow(flow)
 
         # Update the pickle file.
         flow.pickle_dump()
 
-        # Submit the tasks that are ready.
-        try:
-            nlaunch = PyLauncher(flow).rapidfire(max_nlaunch=max_nlaunch, sleep_time=10)
-            self.nlaunch += nlaunch
-            if nlaunch:
-                cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
-
-        except Exception:
-            excs.append(straceback())
-
-        flow.show_status()
-
-        if excs:
-            logger.critical("*** Scheduler exceptions:\n *** %s" % "\n".join(excs))
-            self.exceptions.extend(excs)
+        return max_nlaunch
 
     def callback(self):
         """The function that will be executed by the scheduler."""
@@ -723,12 +1029,29 @@ class PyFlowScheduler(BaseScheduler):
             #self.cancel_jobs_if_requested(self.flow)
             self.shutdown(msg="Exception raised in callback!\n" + s)
 
+    async def async_callback(self):
+        """The coroutine executed by the asyncio event loop."""
+        try:
+            await self._async_runem_all()
+            return self._after_runem_all()
+        except Exception:
+            # All exceptions raised here will trigger the shutdown!
+            s = straceback()
+            self.exceptions.append(s)
+            self.shutdown(msg="Exception raised in async_callback!\n" + s)
+
     def _callback(self):
         """The actual callback."""
         if self.debug: print(">>>>> _callback: Number of open file descriptors: %s" % get_open_fds())
 
         self._runem_all()
+        return self._after_runem_all()
 
+    def _after_runem_all(self):
+        """
+        Finalize the flow if all tasks are OK, else send reminders and shutdown the scheduler
+        if something went wrong. Return the number of exceptions.
+        """
         flow = self.flow
         all_ok = flow.all_ok
 
@@ -859,7 +1182,7 @@ class PyFlowScheduler(BaseScheduler):
             #        self.sched.unschedule_job(job)
             #    self.sched.shutdown()
             #else:
-            self.sched.shutdown(wait=False)
+            self._stop_sched()
 
             # Uncomment the line below if shutdown does not work!
             #os.system("kill -9 %d" % os.getpid())
@@ -911,6 +1234,9 @@ class MultiFlowScheduler(BaseScheduler):
         self.sqldb_path = sqldb_path
         self.create_sqldb()
 
+        # Cache with the last record written to the tasks table indexed by node_id.
+        self._task_records = {}
+
     def add_flow(self, flow: Flow, user_message, priority=None) -> None:
         """
         Add a flow to the scheduler.
@@ -942,8 +1268,14 @@ class MultiFlowScheduler(BaseScheduler):
         """
         self.history.append("Started on %s" % time.asctime())
         self.start_time = time.time()
+        if self.use_asyncio:
+            return self.start_asyncio()
         self.sched.start()
 
+    def get_flows(self) -> list[Flow]:
+        """List of flows handled by the scheduler."""
+        return list(self.flows)
+
     # TODO
     #def stop(self):
     #def restart(self):
@@ -956,13 +1288,14 @@ class MultiFlowScheduler(BaseScheduler):
         return con
 
     def create_sqldb(self) -> None:
-        if os.path.exists(self.sqldb_path):
-            return
-
+        """
+        Create the flows table and the tasks table with one row per task.
+        The tasks table and its indexes are added to databases produced by previous versions.
+        """
         with self._lock, self.sql_connect() as con:
             # Create table
             cur = con.cursor()
-            cur.execute("""CREATE TABLE flows (
+            cur.execute("""CREATE TABLE IF NOT EXISTS flows (
                         status TEXT NOT NULL,
                         formula TEXT NOT NULL,
                         workdir TEXT NOT NULL,
@@ -973,6 +1306,7 @@ class MultiFlowScheduler(BaseScheduler):
                         user_message TEXT NOT NULL
                         );
                         """)
+            cur.executescript(_TASKS_TABLE_SQL)
         con.close()
 
     def get_incoming_flows(self) -> list[Flow]:
@@ -996,8 +1330,76 @@ class MultiFlowScheduler(BaseScheduler):
                 cur.executemany("INSERT INTO flows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values)
             con.close()
 
+            self.update_tasks_sqldb(flows)
+
         return flows
 
+    def update_tasks_sqldb(self, flows: list[Flow]) -> int:
+        """
+        Update the rows of the tasks table with the status of the tasks in `flows`.
+        Only the tasks whose record changed since the last call are written and the
+        event report is parsed only for these tasks. Return the number of rows written.
+        """
+        now = datetime.datetime.now()
+        values = []
+        for flow in flows:
+            for task in flow.iflat_tasks():
+                record = _get_task_record(flow, task)
+                if self._task_records.get(task.node_id) == record: continue
+                self._task_records[task.node_id] = record
+                values.append(record + _get_task_events_summary(task) + (now,))
+
+        if not values: return 0
+
+        with self._lock, self.sql_connect() as con:
+            cur = con.cursor()
+            query = "INSERT OR REPLACE INTO tasks VALUES (%s)" % ", ".join("?" * len(_TASKS_COLUMNS))
+            cur.executemany(query, values)
+        con.close()
+
+        return len(values)
+
+    def get_tasks_dataframe(self, flow_id=None, status=None, task_class=None, columns=None) -> pd.DataFrame:
+        """
+        Return DataFrame with the rows of the tasks table. No pickle file is loaded.
+
+        Args:
+            flow_id: Select the tasks of this flow (int or list of ints).
+            status: Select the tasks with this status (string or list of strings e.g. "Error").
+            task_class: Select the tasks of this class (string or list of strings e.g. "ScfTask").
+            columns: List of columns to select. None for all.
+        """
+        where, params = [], []
+        for name, value in (("flow_id", flow_id), ("status", status), ("task_class", task_class)):
+            if value is None: continue
+            values = [value] if isinstance(value, (int, str)) else list(value)
+            where.append("%s IN (%s)" % (name, ",".join("?" * len(values))))
+            params.extend(str(v) if name == "status" else v for v in values)
+
+        query = "SELECT %s FROM tasks" % ("*" if columns is None else ", ".join(columns))
+        if where: query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY flow_id, node_id"
+
+        with self.sql_connect() as con:
+            df = pd.read_sql_query(query, con, params=params)
+        con.close()
+        return df
+
+    def get_tasks_status_summary(self, by="flow_id") -> pd.DataFrame:
+        """
+        Return DataFrame with the number of tasks in each status. Rows are indexed by `by`
+        ("flow_id", "task_class" or "qname"), columns by status.
+        """
+        if by not in ("flow_id", "task_class", "qname"):
+            raise ValueError("Invalid value for by: %s" % str(by))
+
+        query = "SELECT %s, status, COUNT(*) AS num_tasks FROM tasks GROUP BY %s, status" % (by, by)
+        with self.sql_connect() as con:
+            df = pd.read_sql_query(query, con)
+        con.close()
+
+        return df.pivot(index=by, columns="status", values="num_tasks").fillna(0).astype(int)
+
     def get_dataframe(self) -> pd.DataFrame:
         with self.sql_connect() as con:
             df = pd.read_sql_query("SELECT * FROM flows", con)
@@ -1084,10 +1486,121 @@ class MultiFlowScheduler(BaseScheduler):
         if not self.flows: return
         excs = []
 
+        # New iteration: the status of the jobs in the queue must be recomputed.
+        clear_queue_snapshots()
+
         # check status.
         for flow in self.flows:
             flow.check_status(show=False)
 
+        max_nlaunch = self._get_max_nlaunch(excs)
+        if max_nlaunch <= 0:
+            # The status of the tasks has changed even if nothing can be submitted.
+            self.update_flows_and_slqdb()
+            return
+
+        for flow in self.flows:
+            self.try_to_fix_flow(flow)
+            # Update the pickle file.
+            flow.pickle_dump()
+
+        #with self.handle_flow_exceptions:
+
+        for i, flow in enumerate(self.flows):
+            # Submit the tasks that are ready.
+            try:
+                if max_nlaunch > 0:
+                    nlaunch = PyLauncher(flow).rapidfire(max_nlaunch=max_nlaunch, sleep_time=10)
+                    self.nlaunch += nlaunch
+                    max_nlaunch -= nlaunch
+                    if nlaunch:
+                        cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
+
+            except Exception as exc:
+                self.register_flow_exception(i, exc)
+
+        self.handle_flow_exception()
+
+        for flow in self.flows:
+            flow.show_status()
+
+        #if max_nlaunch <= 0: return
+
+        self.update_flows_and_slqdb()
+
+    async def async_callback(self):
+        """The coroutine executed by the asyncio event loop."""
+        try:
+            return await self._async_callback()
+        except Exception:
+            # All exceptions raised here will trigger the shutdown!
+            s = straceback()
+            self.exceptions.append(s)
+            self.shutdown(msg="Exception raised in async_callback!\n" + s)
+
+    async def _async_callback(self):
+        """
+        The actual coroutine executed by the asyncio event loop.
+        The status checks and the persistence of the flows are executed concurrently in worker threads
+        (at most max_concurrency at the same time) and the tasks of each flow are submitted concurrently.
+        """
+        new_flows = self.get_incoming_flows()
+        if new_flows:
+            self.flows.extend(new_flows)
+
+        if not self.flows: return
+        excs = []
+
+        # New iteration: the status of the jobs in the queue must be recomputed.
+        clear_queue_snapshots()
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def run_in_thread(func, *args, **kwargs):
+            async with semaphore:
+                return await asyncio.to_thread(func, *args, **kwargs)
+
+        # check status.
+        await asyncio.gather(*(run_in_thread(flow.check_status, show=False) for flow in self.flows))
+
+        max_nlaunch = self._get_max_nlaunch(excs)
+        if max_nlaunch <= 0:
+            # The status of the tasks has changed even if nothing can be submitted.
+            await asyncio.to_thread(self.update_flows_and_slqdb)
+            return
+
+        def fix_and_dump(flow):
+            self.try_to_fix_flow(flow)
+            flow.pickle_dump()
+
+        await asyncio.gather(*(run_in_thread(fix_and_dump, flow) for flow in self.flows))
+
+        for i, flow in enumerate(self.flows):
+            # Submit the tasks that are ready.
+            try:
+                if max_nlaunch > 0:
+                    nlaunch = await PyLauncher(flow).async_rapidfire(max_nlaunch=max_nlaunch,
+                                                                     max_concurrency=self.max_concurrency)
+                    self.nlaunch += nlaunch
+                    max_nlaunch -= nlaunch
+                    if nlaunch:
+                        cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
+
+            except Exception as exc:
+                self.register_flow_exception(i, exc)
+
+        self.handle_flow_exception()
+
+        for flow in self.flows:
+            flow.show_status()
+
+        await asyncio.to_thread(self.update_flows_and_slqdb)
+
+    def _get_max_nlaunch(self, excs: list) -> int:
+        """
+        Return the max number of tasks that can be submitted (<= 0 if no task should be submitted).
+        Unconverged tasks are restarted.
+        """
         # Here we just count the number of tasks in the flow that are in RUNNING or SUBMITTED status.
         # This logic clearly breaks down if there are multiple schedulers running on the same machine
         # but it's easy to implement without having to contact the resource manager
@@ -1102,7 +1615,7 @@ class MultiFlowScheduler(BaseScheduler):
                   "No job will be submitted.")
             for flow in self.flows:
                 flow.check_status(show=False)
-            return
+            return 0
 
         max_nlaunch = self.max_njobs_inqueue - nqjobs if self.max_nlaunches == -1 else \
                       min(self.max_njobs_inqueue - nqjobs, self.max_nlaunches)
@@ -1115,41 +1628,14 @@ class MultiFlowScheduler(BaseScheduler):
         if self.max_ncores_used is not None and ncores_allocated > self.max_ncores_used:
             print("Cannot exceed max_ncores_used %s" % self.max_ncores_used,
                   ", ncores_allocated:", ncores_allocated)
-            return
+            return 0
 
         # Try to restart unconverged tasks.
         for flow in self.flows:
             max_nlaunch = self.restart_unconverged(flow, max_nlaunch, excs)
-            if max_nlaunch <= 0: return
+            if max_nlaunch <= 0: return 0
 
-        for flow in self.flows:
-            self.try_to_fix_flow(flow)
-            # Update the pickle file.
-            flow.pickle_dump()
-
-        #with self.handle_flow_exceptions:
-
-        for i, flow in enumerate(self.flows):
-            # Submit the tasks that are ready.
-            try:
-                if max_nlaunch > 0:
-                    nlaunch = PyLauncher(flow).rapidfire(max_nlaunch=max_nlaunch, sleep_time=10)
-                    self.nlaunch += nlaunch
-                    max_nlaunch -= nlaunch
-                    if nlaunch:
-                        cprint("[%s] Number of launches: %d" % (time.asctime(), nlaunch), "yellow")
-
-            except Exception as exc:
-                self.register_flow_exception(i, exc)
-
-        self.handle_flow_exception()
-
-        for flow in self.flows:
-            flow.show_status()
-
-        #if max_nlaunch <= 0: return
-
-        self.update_flows_and_slqdb()
+        return max_nlaunch
 
     def update_flows_and_slqdb(self):
 
@@ -1189,16 +1675,109 @@ class MultiFlowScheduler(BaseScheduler):
 
             if self.completed_flows:
                values.extend([(str(flow.status), now, flow.node_id) for flow in self.completed_flows])
-               self.completed_flows = []
 
             if self.errored_flows:
                values.extend([(str(flow.S_ERROR), now, flow.node_id) for flow in self.errored_flows])
-               self.errored_flows = []
 
             cur.executemany(query, values)
 
         con.close()
 
+        # Update the tasks table (only the rows that changed).
+        self.update_tasks_sqldb(self.flows + self.completed_flows + self.errored_flows)
+        self.completed_flows, self.errored_flows = [], []
+
+
+# Columns of the tasks table of the MultiFlowScheduler database.
+_TASKS_COLUMNS = [
+    "node_id", "flow_id", "work_idx", "task_widx", "task_class", "name", "status", "workdir",
+    "queue_id", "qname", "mpi_procs", "omp_threads", "walltime_s",
+    "num_launches", "num_restarts", "num_corrections",
+    "submission_date", "start_date", "end_date", "runtime_s", "queue_time_s",
+    "num_errors", "num_warnings", "num_comments", "last_event", "update_date",
+]
+
+_TASKS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS tasks (
+    node_id INTEGER PRIMARY KEY,
+    flow_id INTEGER NOT NULL,
+    work_idx INTEGER,
+    task_widx INTEGER,
+    task_class TEXT,
+    name TEXT,
+    status TEXT NOT NULL,
+    workdir TEXT,
+    queue_id INTEGER,
+    qname TEXT,
+    mpi_procs INTEGER,
+    omp_threads INTEGER,
+    walltime_s REAL,
+    num_launches INTEGER,
+    num_restarts INTEGER,
+    num_corrections INTEGER,
+    submission_date TIMESTAMP,
+    start_date TIMESTAMP,
+    end_date TIMESTAMP,
+    runtime_s REAL,
+    queue_time_s REAL,
+    num_errors INTEGER,
+    num_warnings INTEGER,
+    num_comments INTEGER,
+    last_event TEXT,
+    update_date TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS tasks_flow_id ON tasks (flow_id, status);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_class ON tasks (task_class, status);
+CREATE INDEX IF NOT EXISTS tasks_queue_id ON tasks (queue_id);
+"""
+
+
+def _get_task_record(flow: Flow, task: Task) -> tuple:
+    """
+    Return tuple with the values of the tasks table for `task` (without event summary and update date).
+    Only attributes that are available without reading files are used.
+    """
+    try:
+        walltime = float(task.manager.qadapter.timelimit)
+    except Exception:
+        walltime = None
+
+    def to_seconds(timedelta):
+        return timedelta.total_seconds() if timedelta else None
+
+    queue_id = task.queue_id
+    dt = task.datetimes
+    return (task.node_id, flow.node_id, task.pos[0], task.pos[1], task.__class__.__name__, task.name,
+            str(task.status), task.workdir, None if queue_id is None else int(queue_id), task.qname,
+            task.mpi_procs, task.omp_threads, walltime,
+            task.num_launches, task.num_restarts, task.num_corrections,
+            dt.submission, dt.start, dt.end,
+            # Elapsed times are stored only when they are fixed so that the record of running tasks does not change.
+            to_seconds(dt.get_runtime()) if dt.end is not None else None,
+            to_seconds(dt.get_time_inqueue()) if dt.start is not None else None)
+
+
+def _get_task_events_summary(task: Task) -> tuple:
+    """
+    Return (num_errors, num_warnings, num_comments, last_event) from the event report of the task.
+    last_event is the last error if any else the last warning.
+    """
+    try:
+        report = task.get_event_report()
+    except Exception:
+        report = None
+
+    if report is None: return (None, None, None, None)
+
+    last_event = None
+    events = report.errors or report.warnings
+    if events:
+        last = events[-1]
+        last_event = "%s: %s" % (last.__class__.__name__, str(last.message).strip()[:500])
+
+    return (report.num_errors, report.num_warnings, report.num_comments, last_event)
+
 
 def print_flowsdb_file(filepath: str) -> None:
     """
@@ -1211,6 +1790,13 @@ def print_flowsdb_file(filepath: str) -> None:
         #print(type(df["upload_date"]))
         print_dataframe(df, title=filepath)
 
+        has_tasks = con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='tasks'").fetchone()
+        if has_tasks:
+            df = pd.read_sql_query("SELECT flow_id, status, COUNT(*) AS num_tasks FROM tasks GROUP BY flow_id, status", con)
+            if len(df):
+                df = df.pivot(index="flow_id", columns="status", values="num_tasks").fillna(0).astype(int)
+                print_dataframe(df, title="Number of tasks grouped by status")
+
 
 def sendmail(subject: str, text: str, mailto: str,
              sender: Optional[str] = None) -> int:
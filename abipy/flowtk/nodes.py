@@ -633,6 +633,15 @@ class Node(metaclass=abc.ABCMeta):
     def set_name(self, name: str) -> None:
         """Set the name of the Node."""
         self._name = name
+        self.set_store_dirty()
+
+    def set_store_dirty(self) -> None:
+        """
+        Mark the node as changed so that it is saved by |FlowStore| even if its fingerprint
+        did not change. Methods that change the node without adding a record to the history
+        or changing the status should call this method.
+        """
+        self._store_dirty = True
 
     @property
     def node_id(self) -> int:
@@ -644,6 +653,7 @@ class Node(metaclass=abc.ABCMeta):
         Set the value of readme_md.
         """
         self.readme_md = str(md_string)
+        self.set_store_dirty()
 
     def set_abipy_meta_json(self, data: dict) -> None:
         """
@@ -652,12 +662,14 @@ class Node(metaclass=abc.ABCMeta):
         self.abipy_meta_json = jsanitize(data, strict=False)
         if not isinstance(self.abipy_meta_json, dict):
             raise TypeError(f"abipy_meta_json should be a dict but got {type(self.abipy_meta_json)}")
+        self.set_store_dirty()
 
     def set_user_message(self, user_message: str) -> None:
         """
         Set the value of user_message
         """
         self._user_message = str(user_message)
+        self.set_store_dirty()
 
     @property
     def user_message(self) -> str:
@@ -927,6 +939,7 @@ class Node(metaclass=abc.ABCMeta):
         """
         assert isinstance(gc, GarbageCollector)
         self._gc = gc
+        self.set_store_dirty()
 
     @property
     def gc(self):
@@ -1277,6 +1290,12 @@ class HistoryRecord:
 class NodeHistory(collections.deque):
     """Logger-like object"""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Total number of records added to the history.
+        # Unlike len(self), this number increases even if maxlen has been reached.
+        self.num_records = len(self)
+
     def __str__(self) -> str:
         return self.to_string()
 
@@ -1306,6 +1325,7 @@ class NodeHistory(collections.deque):
             exc_info = sys.exc_info()
 
         self.append(HistoryRecord(level, "unknown filename", 0, msg, args, exc_info, func="unknown func"))
+        self.num_records += 1
 
 
 class NodeCorrections(list):
@@ -36,7 +36,7 @@ from pymatgen.core.units import Memory, UnitError
 from abipy.tools.iotools import AtomicFile
 from .utils import Condition
 from .launcher import ScriptEditor
-from .qjobs import QueueJob
+from .qjobs import QueueJob, get_queue_snapshot
 from .qutils import any2mb
 
 import logging
@@ -1164,6 +1164,12 @@ limits:
             username: (str) the username of the jobs to count (default is to autodetect)
         """
         if username is None: username = getpass.getuser()
+
+        # Use the snapshot of the queue shared by all the tasks (if supported).
+        snapshot = get_queue_snapshot(self.QTYPE, username=username)
+        if snapshot is not None:
+            return len(snapshot)
+
         njobs, process = self._get_njobs_in_queue(username=username)
 
         if process is not None and process.returncode != 0:
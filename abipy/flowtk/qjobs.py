@@ -9,6 +9,9 @@ having to rely on external libraries.
 from __future__ import annotations
 
 import shlex
+import time
+import getpass
+import threading
 
 from collections import OrderedDict, defaultdict
 from subprocess import Popen, PIPE
@@ -441,6 +444,174 @@ class PbsProJob(QueueJob):
         self.set_status_exitcode_signal(status, None, None)
 
 
+class QueueSnapshot:
+    """
+    Status of all the jobs of the user obtained with a single call to squeue/qstat.
+    """
+
+    def __init__(self, qtype: str, username: str, statuses: dict, ctime=None):
+        """
+        Args:
+            qtype: String specifying the Resource manager type.
+            username: Name of the user.
+            statuses: dict mapping the job id (int) to the |JobStatus|.
+            ctime: Creation time. Use time.time() if None.
+        """
+        self.qtype, self.username = qtype, username
+        self.statuses = statuses
+        self.ctime = time.time() if ctime is None else ctime
+
+    def __repr__(self):
+        return "<%s: qtype=%s, username=%s, njobs=%d>" % (
+            self.__class__.__name__, self.qtype, self.username, len(self))
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def __contains__(self, qid) -> bool:
+        return self.get_status(qid) is not None
+
+    @property
+    def age(self) -> float:
+        """Seconds elapsed since the creation of the snapshot."""
+        return time.time() - self.ctime
+
+    def get_status(self, qid) -> JobStatus | None:
+        """Return the status of the job with id `qid`. None if the job is not in the snapshot."""
+        try:
+            return self.statuses.get(int(qid))
+        except (TypeError, ValueError):
+            return None
+
+
+# Mapping Slurm state (squeue %T) --> JobStatus.
+_SLURM_STATE_TO_STATUS = {
+    "PENDING": QueueJob.S_PENDING,
+    "CONFIGURING": QueueJob.S_PENDING,
+    "REQUEUED": QueueJob.S_PENDING,
+    "RUNNING": QueueJob.S_RUNNING,
+    "COMPLETING": QueueJob.S_RUNNING,
+    "RESIZING": QueueJob.S_RESIZING,
+    "SUSPENDED": QueueJob.S_SUSPENDED,
+    "COMPLETED": QueueJob.S_COMPLETED,
+    "CANCELLED": QueueJob.S_CANCELLED,
+    "FAILED": QueueJob.S_FAILED,
+    "BOOT_FAIL": QueueJob.S_FAILED,
+    "TIMEOUT": QueueJob.S_TIMEOUT,
+    "PREEMPTED": QueueJob.S_PREEMPTED,
+    "NODE_FAIL": QueueJob.S_NODEFAIL,
+}
+
+
+def _parse_slurm_snapshot(out: str) -> dict:
+    """Parse the output of `squeue -h -o %i|%T`."""
+    statuses = {}
+    for line in out.splitlines():
+        tokens = line.strip().split("|")
+        if len(tokens) != 2: continue
+        try:
+            qid = int(tokens[0].split("_")[0])
+        except ValueError:
+            continue
+        state = tokens[1].strip().rstrip("+")
+        statuses[qid] = _SLURM_STATE_TO_STATUS.get(state, QueueJob.S_UNKNOWN)
+
+    return statuses
+
+
+def _parse_pbs_snapshot(out: str) -> dict:
+    """
+    Parse the output of `qstat -u username`. Lines have the form:
+
+    5666289.frontal username main_ivy MorfeoTChk  57546   1   4    --  08:00 R 00:17
+    """
+    statuses = {}
+    for line in out.splitlines():
+        tokens = line.split()
+        if len(tokens) < 3: continue
+        try:
+            qid = int(tokens[0].split(".")[0].split("[")[0])
+        except ValueError:
+            # Header lines
+            continue
+        statuses[qid] = PbsProJob.PBSSTAT_TO_SLURM.get(tokens[-2], QueueJob.S_UNKNOWN)
+
+    return statuses
+
+
+# Command and parser used to get the status of all the jobs of the user for the different resource managers.
+_SNAPSHOT_COMMANDS = {
+    "slurm": (lambda username: ["squeue", "-h", "-u", username, "-o", "%i|%T"], _parse_slurm_snapshot),
+    "pbspro": (lambda username: ["qstat", "-u", username], _parse_pbs_snapshot),
+    "torque": (lambda username: ["qstat", "-u", username], _parse_pbs_snapshot),
+}
+
+# Time To Live of the snapshots in seconds.
+_SNAPSHOT_TTL = 30.0
+
+_SNAPSHOTS = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def set_queue_snapshot_ttl(ttl: float) -> float:
+    """
+    Set the time to live (in seconds) of the snapshots returned by get_queue_snapshot.
+    Return the previous value.
+    """
+    global _SNAPSHOT_TTL
+    old, _SNAPSHOT_TTL = _SNAPSHOT_TTL, float(ttl)
+    return old
+
+
+def clear_queue_snapshots() -> None:
+    """
+    Invalidate the snapshots so that the next call to get_queue_snapshot contacts the resource manager.
+    Called by the scheduler at the beginning of each iteration.
+    """
+    with _SNAPSHOTS_LOCK:
+        _SNAPSHOTS.clear()
+
+
+def get_queue_snapshot(qtype: str, username: str | None = None, ttl: float | None = None) -> QueueSnapshot | None:
+    """
+    Return a :class:`QueueSnapshot` with the status of all the jobs of the user.
+    The resource manager is contacted only if the previous snapshot is older than `ttl` seconds
+    so that all the jobs share the result of a single call to squeue/qstat.
+    Return None if the resource manager is not supported or the command fails.
+
+    Args:
+        qtype: String specifying the Resource manager type.
+        username: Name of the user. Use getpass.getuser() if None.
+        ttl: Time to live in seconds. Use the value set with set_queue_snapshot_ttl if None.
+    """
+    if qtype not in _SNAPSHOT_COMMANDS: return None
+    if username is None: username = getpass.getuser()
+    if ttl is None: ttl = _SNAPSHOT_TTL
+
+    key = (qtype, username)
+    with _SNAPSHOTS_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is not None and snapshot.age <= ttl:
+            return snapshot
+
+        # Keep the lock while calling the resource manager so that other threads wait for the result.
+        get_cmd, parser = _SNAPSHOT_COMMANDS[qtype]
+        try:
+            process = Popen(get_cmd(username), stdout=PIPE, stderr=PIPE, universal_newlines=True)
+            out, err = process.communicate()
+        except OSError as exc:
+            logger.critical("Cannot get queue snapshot: %s" % str(exc))
+            return None
+
+        if process.returncode != 0:
+            logger.critical(err)
+            return None
+
+        snapshot = QueueSnapshot(qtype, username, parser(out))
+        _SNAPSHOTS[key] = snapshot
+        return snapshot
+
+
 #################################
 # Unsupported resource managers #
 #################################
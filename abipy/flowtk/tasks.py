@@ -32,6 +32,7 @@ from abipy.tools.typing import TYPE_CHECKING
 from abipy.abio.enums import GWR_TASK
 from .utils import File, Directory, irdvars_for_ext, abi_splitext, FilepathFixer, Condition, SparseHistogram
 from .qadapters import make_qadapter, QueueAdapter, QueueAdapterError
+from .qjobs import get_queue_snapshot
 from .nodes import Status, Node, NodeError, NodeResults, FileNode #, check_spectator
 from .abitimer import AbinitTimerParser
 from . import qutils as qu
@@ -1498,6 +1499,7 @@ class Task(Node, metaclass=abc.ABCMeta):
         Also, change the limits in the QueueAdapters if task class is found in `limits_for_task_class`.
         """
         self.manager = manager.deepcopy()
+        self.set_store_dirty()
 
         cls_name = self.__class__.__name__
         for qad in self.manager.qads:
@@ -1661,6 +1663,7 @@ class Task(Node, metaclass=abc.ABCMeta):
         """
         manager = self.manager if hasattr(self, "manager") else self.flow.manager
         self.manager = manager.new_with_fixed_mpi_omp(mpi_procs, omp_threads)
+        self.set_store_dirty()
 
     #def set_max_ncores(self, max_ncores, om_threads):
     #    """
@@ -1989,6 +1992,71 @@ class Task(Node, metaclass=abc.ABCMeta):
 
         return status
 
+    def get_status_signature(self) -> tuple:
+        """
+        Return tuple with the (size, mtime_ns) of the files inspected by check_status.
+        None is used for files that do not exist.
+        """
+        sig = []
+        for f in (self.mpiabort_file, self.stderr_file, self.qerr_file, self.qout_file, self.output_file, self.log_file):
+            try:
+                stat = os.stat(f.path)
+                sig.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                sig.append(None)
+
+        return tuple(sig)
+
+    def set_status_signature(self, signature: tuple) -> None:
+        """Save the signature of the files obtained before calling check_status."""
+        self._status_signature = (signature, self.status)
+
+    def can_skip_check_status(self, signature: tuple) -> bool:
+        """
+        True if check_status can be skipped because the files inspected by check_status did not change
+        since the last call and the task is in a terminal status or did not produce any file
+        while the job is still alive.
+        """
+        if getattr(self, "_status_signature", None) != (signature, self.status):
+            return False
+
+        if self.status in (self.S_DONE, self.S_UNCONVERGED, self.S_ERROR, self.S_ABICRITICAL, self.S_QCRITICAL):
+            return True
+
+        return all(s is None for s in signature) and not self.job_has_exited()
+
+    def job_has_exited(self) -> bool:
+        """
+        True if the task has been submitted and the job is not alive anymore i.e. the shell process
+        terminated or the job is not in the snapshot of the queue taken after the submission.
+        False if this cannot be determined.
+        """
+        if self.status not in (self.S_SUB, self.S_RUN): return False
+
+        if not self.has_queue:
+            return self.process.poll() is not None
+
+        if self.queue_id is None or self.datetimes.submission is None: return False
+        snapshot = get_queue_snapshot(self.manager.qadapter.QTYPE)
+        # Jobs submitted after the snapshot are not listed.
+        return (snapshot is not None and snapshot.ctime > self.datetimes.submission.timestamp()
+                and self.queue_id not in snapshot)
+
+    def prefetch_event_report(self) -> None:
+        """
+        Parse the log file with the incremental parser so that the next call to get_event_report
+        only needs to read the cached results. Can be called from threads.
+        If an exception is raised, the cached state is removed so that check_status parses the file
+        from scratch in the main thread and handles the error.
+        """
+        try:
+            if self.log_file.exists:
+                events.EventsParser(incremental=True).parse(self.log_file.path)
+        except Exception:
+            logger.warning("Exception while prefetching the event report of %s.\n"
+                           "The log file will be parsed by check_status." % repr(self), exc_info=True)
+            events.EventsParser.clear_incremental_states(self.log_file.path)
+
     def check_status(self) -> Status:
         """
         This function checks the status of the task by inspecting the output and the
@@ -2010,6 +2078,11 @@ class Task(Node, metaclass=abc.ABCMeta):
         #if self.status in black_list: return self.status
 
         # 2) Check the returncode of the job script
+        # The returncode of the shell process is available only after its termination.
+        if not self.has_queue and self.status in (self.S_SUB, self.S_RUN):
+            returncode = self.process.poll()
+            if returncode is not None: self._returncode = returncode
+
         if self.returncode != 0:
             msg = "job.sh return code: %s\nPerhaps the job was not submitted properly?" % self.returncode
             return self.set_status(self.S_QCRITICAL, msg=msg)
@@ -2086,6 +2159,8 @@ class Task(Node, metaclass=abc.ABCMeta):
         if not self.output_file.exists:
             #self.history.debug("output_file does not exists")
             if not self.stderr_file.exists and not self.qerr_file.exists:
+                if self.job_has_exited():
+                    return self.set_status(self.S_QCRITICAL, msg="Job terminated without producing any output file")
                 # No output at allThe job is still in the queue.
                 return self.status
 
@@ -2281,7 +2356,8 @@ class Task(Node, metaclass=abc.ABCMeta):
             "output": self.output_file,
             "log": self.log_file}[source]
 
-        parser = events.EventsParser()
+        # Use the incremental parser so that only the new lines are scanned at each call.
+        parser = events.EventsParser(incremental=True)
 
         if not ofile.exists:
             if not self.mpiabort_file.exists:
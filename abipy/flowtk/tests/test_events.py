@@ -62,6 +62,80 @@ class EventsParserTest(AbipyTest):
         assert len(report.get_events_of_type(events.AbinitYamlWarning)) == 1
         assert len(report.get_events_of_type(events.AbinitYamlError)) == 1
 
+    def test_incremental_parser(self):
+        """Testing incremental parsing of a log file that is being written."""
+        with open(ref_file("mgb2_nscf.log"), "rb") as fh:
+            data = fh.read()
+        ref = events.EventsParser().parse(ref_file("mgb2_nscf.log"))
+
+        def assert_same_report(report, ref):
+            assert len(report) == len(ref)
+            assert all(ev == ref_ev and type(ev) is type(ref_ev) and ev.lineno == ref_ev.lineno
+                       for ev, ref_ev in zip(report, ref))
+            assert report.run_completed == ref.run_completed
+            assert report.end_datetime == ref.end_datetime
+
+        parser = events.EventsParser(incremental=True)
+        path = self.get_tmpname(text=True, suffix=".log")
+
+        # Write the file in chunks. Chunks may end in the middle of a line or of a YAML document.
+        nchunks = 7
+        for i in range(nchunks):
+            with open(path, "ab") as fh:
+                fh.write(data[i * len(data) // nchunks: (i + 1) * len(data) // nchunks])
+            report = parser.parse(path)
+            assert_same_report(report, events.EventsParser().parse(path))
+
+        assert_same_report(report, ref)
+        assert report.num_warnings == 2
+        # The state is shared among instances and reports are not shared.
+        report.append(events.AbinitError(src_file="Unknown", src_line=0, message="foo"))
+        assert_same_report(events.EventsParser(incremental=True).parse(path), ref)
+
+        # Truncated file.
+        with open(path, "wb") as fh:
+            fh.write(data[:len(data) // 3])
+        assert_same_report(parser.parse(path), events.EventsParser().parse(path))
+
+        # File rewritten in place by a different run of equal or greater length with the same banner.
+        assert_same_report(parser.parse(path), events.EventsParser().parse(path))
+        other = data.replace(b"--- !WARNING", b"--- !COMMENT").replace(b"wall=         14.9", b"wall=         15.3")
+        assert len(other) == len(data) and other[:1024] == data[:1024]
+        for new_data in (other, other + b"\n" * 1000):
+            with open(path, "wb") as fh:
+                fh.write(data)
+            st = os.stat(path)
+            parser.parse(path)
+            with open(path, "r+b") as fh:
+                fh.write(new_data)
+            # Make sure the mtime changed even if the resolution of the file system is low.
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            assert_same_report(parser.parse(path), events.EventsParser().parse(path))
+
+        # Document far from the end changed and mtime restored to an older value.
+        with open(path, "wb") as fh:
+            fh.write(data)
+        st = os.stat(path)
+        parser.parse(path)
+        with open(path, "r+b") as fh:
+            fh.write(data.replace(b"--- !WARNING", b"--- !COMMENT", 1))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+        assert_same_report(parser.parse(path), events.EventsParser().parse(path))
+
+        # File replaced by another one.
+        os.remove(path)
+        with open(ref_file("badyaml.log"), "rb") as src, open(path, "wb") as fh:
+            fh.write(src.read())
+        report = parser.parse(path)
+        assert (report.num_errors, report.num_warnings, report.num_comments) == (1, 1, 0)
+
+        assert os.path.abspath(path) in events.EventsParser._incremental_states
+        events.EventsParser.clear_incremental_states(path)
+        assert os.path.abspath(path) not in events.EventsParser._incremental_states
+        events.EventsParser.clear_incremental_states()
+        with self.assertRaises(IOError):
+            parser.parse(path + ".missing")
+
 
 class EventHandlersTest(AbipyTest):
     def test_events(self):
@@ -359,6 +359,179 @@ class FlowTest(FlowUnitTest):
         assert len(hello_flow) == 3
 
 
+    def test_sqlite_store(self):
+        """Testing Flow with SQLite store."""
+        from abipy.flowtk.flowstore import FlowStore
+        flow = Flow(workdir=self.workdir, manager=self.manager)
+        work0 = flow.register_scf_task(self.fake_input)
+        work1 = Work()
+        work1.register_nscf_task(self.fake_input, deps={work0[0]: "DEN"})
+        work1.register_scf_task(self.fake_input)
+        flow.register_work(work1)
+        flow.build_and_pickle_dump()
+
+        # Migrate the pickle file.
+        flow = Flow.migrate_pickle_to_store(self.workdir)
+        assert flow.use_sqlite_store and os.path.exists(flow.store_file)
+        assert len(flow.get_store_journal()) == 1 + len(flow.works) + len(list(flow.iflat_tasks()))
+
+        # The database has precedence over the pickle file.
+        same_flow = Flow.pickle_load(self.workdir)
+        assert same_flow == flow and same_flow.use_sqlite_store
+        assert [n.node_id for n in same_flow.iflat_nodes()] == [n.node_id for n in flow.iflat_nodes()]
+        # References among nodes are preserved.
+        same_nscf = same_flow[1][0]
+        assert same_nscf.work is same_flow[1] and same_nscf.flow is same_flow
+        assert same_nscf.deps[0].node is same_flow[0][0]
+        assert same_flow[0][0].input.structure == flow[0][0].input.structure
+        # Objects shared by different nodes are duplicated as each node is pickled separately.
+        assert flow[0][0].input.structure is flow[1][1].input.structure
+        assert same_flow[0][0].input.structure is not same_flow[1][1].input.structure
+
+        # Only the nodes that changed are written.
+        store = FlowStore(flow.store_file)
+        flow.set_spectator_mode(False)
+        assert store.dump(flow) == 0
+        nscf_task = flow[1][0]
+        nscf_task.set_status(nscf_task.S_ERROR, msg="foo")
+        # The task, its work and the flow whose status changed.
+        assert store.dump(flow) == 3
+        journal = flow.get_store_journal(node_id=nscf_task.node_id)
+        assert len(journal) == 2 and journal[-1][-1] == str(nscf_task.S_ERROR)
+
+        # Only the dirty nodes are pickled.
+        from unittest import mock
+        with mock.patch.object(FlowStore, "_pickle_node", wraps=FlowStore._pickle_node) as pickle_node:
+            assert store.dump(flow) == 0
+            assert pickle_node.call_count == 0
+            nscf_task.history.info("foo")
+            assert store.dump(flow) == 1
+            assert pickle_node.call_count == 1
+            # All the nodes are pickled in full mode but only the rows that changed are written.
+            assert store.dump(flow, only_dirty=False) == 0
+            assert pickle_node.call_count == 1 + len(list(flow.iflat_nodes()))
+        # The nodes are clean after load.
+        with mock.patch.object(FlowStore, "_pickle_node", wraps=FlowStore._pickle_node) as pickle_node:
+            same_flow = store.load()
+            assert store.dump(same_flow) == 0 and pickle_node.call_count == 0
+        assert flow.pickle_dump() == 0
+        assert Flow.pickle_load(self.workdir)[1][0].status == nscf_task.S_ERROR
+
+        # Changes that do not add records to the history are saved if the node is marked as dirty.
+        new_manager = self.manager.new_with_fixed_mpi_omp(3, 2)
+        nscf_task.set_manager(new_manager)
+        flow.set_garbage_collector(exts="WFK")
+        assert nscf_task.history.num_records == Flow.pickle_load(self.workdir)[1][0].history.num_records
+        assert store.dump(flow) == 1 + len(list(flow.iflat_tasks()))
+        same_flow = Flow.pickle_load(self.workdir)
+        assert same_flow[1][0].manager.qads[0].mpi_procs == 3
+        assert same_flow.gc.exts == {"WFK"} and same_flow[0][0].gc.exts == {"WFK"}
+        assert store.dump(flow) == 0
+
+        # Other changes are saved by the full dump performed every full_dump_every dumps.
+        nscf_task.datetimes.submission = "foo"
+        ndumps = 1
+        while store.dump(flow) == 0:
+            ndumps += 1
+        assert ndumps <= FlowStore.full_dump_every
+        assert Flow.pickle_load(self.workdir)[1][0].datetimes.submission == "foo"
+
+    def test_check_status_skip_unchanged(self):
+        """Testing change-driven Flow.check_status."""
+        flow = Flow(workdir=self.workdir, manager=self.manager)
+        for i in range(3):
+            flow.register_scf_task(self.fake_input)
+        flow.build()
+        ntasks = len(list(flow.iflat_tasks()))
+
+        timing = flow.check_status(nprocs=2)
+        assert timing.num_tasks == ntasks and timing.num_skipped == 0
+        # Nothing changed on disk, all the tasks are skipped.
+        timing = flow.check_status()
+        assert timing.num_skipped == ntasks
+
+        # Task with ABINIT abort file.
+        task = flow[1][0]
+        task.mpiabort_file.write("foo")
+        flow.check_status()
+        assert task.status == task.S_ABICRITICAL
+        timing = flow.check_status()
+        assert timing.num_skipped == ntasks and task.status == task.S_ABICRITICAL
+
+        # The status is recomputed if the task is reset or the files change.
+        task.mpiabort_file.remove()
+        task.set_status(task.S_INIT, msg="reset")
+        timing = flow.check_status()
+        assert timing.num_skipped == ntasks - 1 and task.status == task.S_READY
+
+        # Submitted task whose job script dies without writing any file (shell adapter).
+        from unittest import mock
+        task = flow[2][0]
+        task._process = mock.Mock(**{"poll.return_value": None})
+        task.set_status(task.S_SUB, msg="submitted")
+        with mock.patch.object(type(task), "has_queue", new_callable=mock.PropertyMock, return_value=False):
+            flow.check_status()
+            timing = flow.check_status()
+            assert timing.num_skipped == ntasks and task.status == task.S_SUB
+            task._process.poll.return_value = 1
+            timing = flow.check_status()
+            assert timing.num_skipped == ntasks - 1 and task.status == task.S_QCRITICAL
+
+        # Submitted task whose job disappears from the queue without writing any file.
+        from abipy.flowtk.qjobs import QueueSnapshot, QueueJob
+        task = flow[0][0]
+        task.set_qjob(mock.Mock(qid=123))
+        task.set_status(task.S_SUB, msg="submitted")
+        with mock.patch("abipy.flowtk.tasks.get_queue_snapshot") as get_snapshot:
+            get_snapshot.return_value = QueueSnapshot("slurm", "user", {123: QueueJob.S_RUNNING})
+            flow.check_status()
+            timing = flow.check_status()
+            assert timing.num_skipped == ntasks and task.status == task.S_SUB
+            # Snapshots taken before the submission are ignored.
+            get_snapshot.return_value = QueueSnapshot("slurm", "user", {}, ctime=0)
+            timing = flow.check_status()
+            assert timing.num_skipped == ntasks and task.status == task.S_SUB
+            get_snapshot.return_value = QueueSnapshot("slurm", "user", {})
+            timing = flow.check_status()
+            assert timing.num_skipped == ntasks - 1 and task.status == task.S_QCRITICAL
+
+    def test_multiflow_tasks_table(self):
+        """Testing tasks table of MultiFlowScheduler database."""
+        from abipy.flowtk.launcher import MultiFlowScheduler
+        flow = Flow(workdir=self.workdir, manager=self.manager)
+        for i in range(3):
+            flow.register_scf_task(self.fake_input)
+        flow.build()
+        flow.check_status()
+
+        sched = MultiFlowScheduler(seconds=2, sqldb_path=os.path.join(self.workdir, "flows.db"))
+        assert sched.update_tasks_sqldb([flow]) == 3
+        # Nothing changed --> no row is written.
+        assert sched.update_tasks_sqldb([flow]) == 0
+
+        task = flow[1][0]
+        task.mpiabort_file.write("foo")
+        flow.check_status()
+        assert sched.update_tasks_sqldb([flow]) == 1
+
+        df = sched.get_tasks_dataframe()
+        assert len(df) == 3 and set(df["flow_id"]) == {flow.node_id}
+        assert list(df["node_id"]) == [t.node_id for t in flow.iflat_tasks()]
+        df = sched.get_tasks_dataframe(status=task.S_ABICRITICAL, columns=["node_id", "task_class"])
+        assert list(df["node_id"]) == [task.node_id] and df["task_class"][0] == "ScfTask"
+        assert len(sched.get_tasks_dataframe(flow_id=[flow.node_id], task_class="ScfTask")) == 3
+        assert len(sched.get_tasks_dataframe(flow_id=-1)) == 0
+
+        summary = sched.get_tasks_status_summary()
+        assert summary.loc[flow.node_id, str(task.S_ABICRITICAL)] == 1
+        assert summary.loc[flow.node_id].sum() == 3
+        with self.assertRaises(ValueError):
+            sched.get_tasks_status_summary(by="foo")
+
+        # Reopen the database created by another scheduler.
+        other = MultiFlowScheduler(seconds=2, sqldb_path=sched.sqldb_path)
+        assert len(other.get_tasks_dataframe()) == 3
+
 
 class TestFlowInSpectatorMode(FlowUnitTest):
 
@@ -1,7 +1,11 @@
 # coding: utf-8
+import os
+import time
+import asyncio
+import tempfile
 
 from abipy.core.testing import AbipyTest
-from abipy.flowtk.launcher import ScriptEditor, PyFlowScheduler, MultiFlowScheduler
+from abipy.flowtk.launcher import ScriptEditor, PyFlowScheduler, MultiFlowScheduler, FileChangeWatcher
 
 
 def test_script_editor():
@@ -38,6 +42,17 @@ class PyFlowSchedulerTest(AbipyTest):
         assert int(sched.pid) > 0
         assert sched.num_excs == 0
         assert not sched.rmflow
+        assert not sched.use_asyncio and sched.sched_interval == 2
+        assert sched.get_flows() == [] and sched.get_watched_dirs() == []
+
+        sched = PyFlowScheduler(minutes=1, use_asyncio="yes", max_concurrency=4)
+        assert sched.use_asyncio and sched.max_concurrency == 4
+        assert sched.sched_interval == 60
+        assert sched.min_period is None
+
+        # The iterations triggered by file changes are rate-limited.
+        sched = PyFlowScheduler(seconds=10, use_asyncio="yes", min_period=2)
+        assert sched.min_period == 2.0
 
         #sched.start()
         #assert sched.get_delta_etime()
@@ -58,3 +73,35 @@ class PyFlowSchedulerTest(AbipyTest):
         #assert sched.get_delta_etime()
         #assert thread.is_alive()
 
+
+
+class FileChangeWatcherTest(AbipyTest):
+
+    def test_polling(self):
+        """Testing FileChangeWatcher in polling mode."""
+        workdir = tempfile.mkdtemp()
+        path = os.path.join(workdir, "run.log")
+        with open(path, "wt") as fh:
+            fh.write("start\n")
+
+        watcher = FileChangeWatcher(poll_interval=0.05, debounce=0.01, use_inotify=False)
+        assert watcher.mode == "polling"
+        watcher.set_dirpaths([workdir, os.path.join(workdir, "non_existent")])
+        assert watcher.dirpaths == [workdir]
+        assert repr(watcher)
+
+        async def append_later():
+            await asyncio.sleep(0.2)
+            with open(path, "at") as fh:
+                fh.write("more output\n")
+
+        async def main():
+            # No change --> timeout.
+            assert not await watcher.wait(timeout=0.2)
+            # Change in the file --> wait returns before the timeout.
+            start = time.time()
+            changed, _ = await asyncio.gather(watcher.wait(timeout=10), append_later())
+            assert changed and time.time() - start < 5
+
+        asyncio.run(main())
+        watcher.close()
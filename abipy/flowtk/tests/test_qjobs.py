@@ -0,0 +1,85 @@
+# coding: utf-8
+"""Tests for qjobs module."""
+import os
+import sys
+import stat
+import tempfile
+import unittest
+
+from abipy.core.testing import AbipyTest
+from abipy.flowtk.qjobs import (QueueJob, get_queue_snapshot, clear_queue_snapshots,
+    _parse_slurm_snapshot, _parse_pbs_snapshot)
+
+
+SQUEUE_OUT = """\
+101|RUNNING
+102|PENDING
+103_4|COMPLETING
+104|TIMEOUT
+"""
+
+QSTAT_OUT = """\
+
+frontal:
+                                                            Req'd  Req'd   Elap
+Job ID          Username Queue    Jobname    SessID NDS TSK Memory Time  S Time
+--------------- -------- -------- ---------- ------ --- --- ------ ----- - -----
+5666289.frontal username main_ivy MorfeoTChk  57546   1   4    --  08:00 R 00:17
+5666290.frontal username main_ivy MorfeoTChk     --   1   4    --  08:00 Q   --
+"""
+
+
+@unittest.skipIf(sys.platform.startswith("win"), "Skipping for Windows")
+class QueueSnapshotTest(AbipyTest):
+
+    def setUp(self):
+        # Fake squeue script that counts the number of invocations.
+        self.tmpdir = tempfile.mkdtemp()
+        self.counter = os.path.join(self.tmpdir, "ncalls")
+        script = os.path.join(self.tmpdir, "squeue")
+        with open(script, "wt") as fh:
+            fh.write("#!/bin/sh\necho call >> %s\ncat <<EOF\n%sEOF\n" % (self.counter, SQUEUE_OUT))
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.tmpdir + os.pathsep + self.old_path
+        clear_queue_snapshots()
+
+    def tearDown(self):
+        os.environ["PATH"] = self.old_path
+        clear_queue_snapshots()
+
+    def get_ncalls(self):
+        if not os.path.exists(self.counter): return 0
+        with open(self.counter) as fh:
+            return len(fh.readlines())
+
+    def test_parsers(self):
+        """Testing parsers for squeue and qstat output."""
+        statuses = _parse_slurm_snapshot(SQUEUE_OUT)
+        assert statuses == {101: QueueJob.S_RUNNING, 102: QueueJob.S_PENDING,
+                            103: QueueJob.S_RUNNING, 104: QueueJob.S_TIMEOUT}
+
+        statuses = _parse_pbs_snapshot(QSTAT_OUT)
+        assert statuses == {5666289: QueueJob.S_RUNNING, 5666290: QueueJob.S_PENDING}
+
+    def test_shared_snapshot(self):
+        """Testing get_queue_snapshot with fake squeue."""
+        snap = get_queue_snapshot("slurm", username="user")
+        assert snap is not None and len(snap) == 4
+        repr(snap)
+        assert 101 in snap and "102" in snap and 999 not in snap
+        assert snap.get_status(104) == QueueJob.S_TIMEOUT
+
+        # The second call reuses the snapshot.
+        assert get_queue_snapshot("slurm", username="user") is snap
+        assert self.get_ncalls() == 1
+
+        # Expired and cleared snapshots trigger a new call.
+        assert get_queue_snapshot("slurm", username="user", ttl=0) is not snap
+        assert self.get_ncalls() == 2
+        clear_queue_snapshots()
+        get_queue_snapshot("slurm", username="user")
+        assert self.get_ncalls() == 3
+
+        # Unsupported resource managers.
+        assert get_queue_snapshot("shell") is None
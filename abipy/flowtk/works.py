@@ -601,6 +601,7 @@ class Work(BaseWork, NodeContainer):
     def set_manager(self, manager: TaskManager) -> None:
         """Set the |TaskManager| to be used to launch the |Task|."""
         self.manager = manager.deepcopy()
+        self.set_store_dirty()
         for task in self:
             task.set_manager(manager)
 
@@ -884,12 +885,18 @@ class Work(BaseWork, NodeContainer):
         else:
             return status_list
 
-    def check_status(self) -> None:
-        """Check the status of the tasks."""
+    def check_status(self, skip_tasks=None) -> None:
+        """
+        Check the status of the tasks.
+
+        Args:
+            skip_tasks: Optional set of tasks whose status should not be recomputed.
+        """
         # Recompute the status of the tasks
         # Ignore OK and LOCKED tasks.
         for task in self:
             if task.status in (task.S_OK, task.S_LOCKED): continue
+            if skip_tasks and task in skip_tasks: continue
             task.check_status()
 
         # Take into account possible dependencies.
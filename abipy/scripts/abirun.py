@@ -56,7 +56,10 @@ def flowdir_wname_tname(dirname: str):
     """
     if dirname is None: dirname = os.getcwd()
     dirname = os.path.abspath(dirname)
-    if os.path.exists(os.path.join(dirname, flowtk.Flow.PICKLE_FNAME)):
+    def has_database(dirpath):
+        return any(os.path.exists(os.path.join(dirpath, f)) for f in (flowtk.Flow.PICKLE_FNAME, flowtk.Flow.STORE_FNAME))
+
+    if has_database(dirname):
         return dirname, None, None
 
     # Handle works or tasks.
@@ -65,7 +68,7 @@ def flowdir_wname_tname(dirname: str):
     for i in range(2):
         head, tail = os.path.split(head)
         if i == 0: tail_1 = tail
-        if os.path.exists(os.path.join(head, flowtk.Flow.PICKLE_FNAME)):
+        if has_database(head):
             if i == 0:
                 # We have a work: /root/flow_dir/w[num]
                 wname = tail
@@ -708,6 +711,12 @@ Default: o
     p_reset_jobids = subparsers.add_parser('reset_jobids', parents=[copts_parser, flow_selector_parser],
         help="Analyze error files and log files produced by reset tasks for possible error messages.")
 
+    # Subparser for migrate_store.
+    p_migrate = subparsers.add_parser('migrate_store', parents=[copts_parser],
+        help="Convert the pickle file into the SQLite database in which only the nodes that changed are saved.")
+    p_migrate.add_argument("--remove-pickle", default=False, action="store_true",
+        help="Remove the pickle file after the migration.")
+
     # Subparser for clone_task.
     #p_clone_task = subparsers.add_parser('clone_task', parents=[copts_parser, flow_selector_parser],
     #    help="Clone task, change input variables and add new tasks to the flow. Requires clone_task.py.")
@@ -1306,6 +1315,14 @@ def main():
 
         return flow.build_and_pickle_dump()
 
+    elif options.command == "migrate_store":
+        if os.path.exists(flow.store_file):
+            cprint("SQLite database %s already exists" % flow.store_file, color="magenta")
+            return 1
+        flowtk.Flow.migrate_pickle_to_store(flow.pickle_file, remove_pickle=options.remove_pickle)
+        print("Status of the flow saved in:", flow.store_file)
+        return 0
+
     # TODO
     #elif options.command == "debug_restart":
     #    flow_debug_restart_tasks(flow, nids=select_nids(flow, options), verbose=options.verbose)
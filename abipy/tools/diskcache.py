@@ -0,0 +1,236 @@
+"""
+Persistent on-disk cache with content-based keys and LRU eviction.
+"""
+from __future__ import annotations
+
+import os
+import hashlib
+import pickle
+import shutil
+import tempfile
+import numpy as np
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def get_default_cache_topdir() -> Path:
+    """
+    Return the top-level directory used to store the AbiPy caches.
+    Use $ABIPY_CACHE_DIR if defined else ~/.abinit/abipy/cache.
+    """
+    topdir = os.environ.get("ABIPY_CACHE_DIR")
+    if topdir is not None:
+        return Path(topdir).expanduser()
+    return Path(os.path.expanduser("~")) / ".abinit" / "abipy" / "cache"
+
+
+def _update_hash(h, obj: Any) -> None:
+    """Feed `obj` to the hash object `h`. Supports nested containers of numbers, strings and arrays."""
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes, np.number, np.bool_)):
+        h.update(type(obj).__name__.encode())
+        h.update(obj if isinstance(obj, bytes) else repr(obj).encode())
+
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(("ndarray%s%s" % (arr.dtype.str, arr.shape)).encode())
+        if arr.dtype == object:
+            for item in arr.ravel(): _update_hash(h, item)
+        else:
+            h.update(arr.tobytes())
+
+    elif isinstance(obj, (list, tuple)):
+        h.update(("%s%d" % (type(obj).__name__, len(obj))).encode())
+        for item in obj: _update_hash(h, item)
+
+    elif isinstance(obj, dict):
+        h.update(("dict%d" % len(obj)).encode())
+        for k in sorted(obj, key=str):
+            _update_hash(h, str(k))
+            _update_hash(h, obj[k])
+
+    elif isinstance(obj, Path):
+        _update_hash(h, str(obj))
+
+    elif hasattr(obj, "__array__"):
+        _update_hash(h, np.asarray(obj))
+
+    else:
+        raise TypeError("Don't know how to hash object of type: %s" % type(obj))
+
+
+def hash_key(*args) -> str:
+    """
+    Compute a hexadecimal key from a sequence of python objects.
+    Numpy arrays are hashed using dtype, shape and raw data.
+    """
+    h = hashlib.sha256()
+    _update_hash(h, args)
+    return h.hexdigest()
+
+
+def hash_file(filepath, chunk_size=2 ** 20) -> str:
+    """Compute a hexadecimal key from the content of a file."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent cache stored in a directory. Each entry is a sub-directory whose name is
+    the key and may contain an arbitrary number of files.
+    The modification time of the entry is updated at each access and is used to
+    remove the least recently used entries when the total size exceeds `max_nbytes`.
+
+    .. example::
+
+        cache = DiskCache("skw")
+        key = hash_key(kpts, eigens)
+        arrays = cache.load_arrays(key)
+        if arrays is None:
+            cache.save_arrays(key, eigens=compute_eigens())
+    """
+
+    def __init__(self, name: str, topdir=None, max_nbytes: int = 1024 ** 3):
+        """
+        Args:
+            name: Name of the cache. Used to build the directory name.
+            topdir: Top-level directory. If None, use `get_default_cache_topdir`.
+            max_nbytes: Max size of the cache in bytes. None for unbounded cache.
+        """
+        self.name = name
+        self.topdir = get_default_cache_topdir() if topdir is None else Path(topdir)
+        self.dirpath = self.topdir / name
+        self.max_nbytes = max_nbytes
+
+    def __repr__(self):
+        return "<%s: %s, max_nbytes: %s>" % (self.__class__.__name__, self.dirpath, self.max_nbytes)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __contains__(self, key: str) -> bool:
+        return (self.dirpath / key).is_dir()
+
+    def keys(self) -> list[str]:
+        """List with the keys in the cache."""
+        if not self.dirpath.is_dir(): return []
+        return [p.name for p in self.dirpath.iterdir() if p.is_dir() and not p.name.startswith(".")]
+
+    def get_entry_path(self, key: str) -> Path | None:
+        """
+        Return the directory associated to `key` or None if key is not in the cache.
+        The access time used for LRU eviction is updated.
+        """
+        path = self.dirpath / key
+        if not path.is_dir(): return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Entry removed by another process.
+            return None
+        return path
+
+    @contextmanager
+    def new_entry(self, key: str) -> Iterator[Path]:
+        """
+        Context manager returning a temporary directory in which files can be written.
+        The directory is moved to the final location only if no exception is raised
+        so that other processes never see incomplete entries.
+        """
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        tmpdir = Path(tempfile.mkdtemp(prefix=".tmp_", dir=self.dirpath))
+        try:
+            yield tmpdir
+            path = self.dirpath / key
+            if path.exists(): shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rename(tmpdir, path)
+            except OSError:
+                # Another process created the same entry in the meantime.
+                pass
+        finally:
+            if tmpdir.exists(): shutil.rmtree(tmpdir, ignore_errors=True)
+
+        self.evict()
+
+    def save_arrays(self, key: str, **arrays) -> None:
+        """Save numpy arrays in the entry `key` in npz format. None values are ignored."""
+        with self.new_entry(key) as tmpdir:
+            np.savez(tmpdir / "data.npz", **{k: v for k, v in arrays.items() if v is not None})
+
+    def load_arrays(self, key: str) -> dict | None:
+        """Return dict with the arrays stored in the entry `key`. None if not in the cache."""
+        path = self.get_entry_path(key)
+        if path is None: return None
+        try:
+            with np.load(path / "data.npz", allow_pickle=False) as data:
+                return {k: data[k] for k in data.files}
+        except Exception:
+            # Corrupted entry.
+            self.remove(key)
+            return None
+
+    def save_object(self, key: str, obj: Any) -> None:
+        """Save a python object in pickle format in the entry `key`."""
+        with self.new_entry(key) as tmpdir:
+            with open(tmpdir / "object.pickle", "wb") as fh:
+                pickle.dump(obj, fh)
+
+    def load_object(self, key: str) -> Any:
+        """Return the python object stored in the entry `key`. None if not in the cache."""
+        path = self.get_entry_path(key)
+        if path is None: return None
+        try:
+            with open(path / "object.pickle", "rb") as fh:
+                return pickle.load(fh)
+        except Exception:
+            self.remove(key)
+            return None
+
+    def remove(self, key: str) -> None:
+        """Remove entry `key` from the cache."""
+        shutil.rmtree(self.dirpath / key, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        if self.dirpath.is_dir(): shutil.rmtree(self.dirpath, ignore_errors=True)
+
+    def get_entries(self) -> list[tuple[float, int, str]]:
+        """
+        Return list of (mtime, nbytes, key) tuples sorted by access time (least recently used first).
+        """
+        entries = []
+        for key in self.keys():
+            path = self.dirpath / key
+            try:
+                nbytes = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+                entries.append((path.stat().st_mtime, nbytes, key))
+            except OSError:
+                continue
+        return sorted(entries)
+
+    def get_nbytes(self) -> int:
+        """Total size of the cache in bytes."""
+        return sum(e[1] for e in self.get_entries())
+
+    def evict(self) -> list[str]:
+        """
+        Remove the least recently used entries until the size of the cache is below `max_nbytes`.
+        Return list with the keys that have been removed.
+        """
+        if self.max_nbytes is None: return []
+        entries = self.get_entries()
+        nbytes = sum(e[1] for e in entries)
+        removed = []
+        for _, size, key in entries:
+            if nbytes <= self.max_nbytes: break
+            self.remove(key)
+            nbytes -= size
+            removed.append(key)
+
+        return removed
@@ -292,6 +292,115 @@ def lorentzian(x, width, center=0.0, height=None):
 
     return height * width**2 / ((x - center) ** 2 + width ** 2)
 
+
+_DOS_KERNELS = {
+    "gaussian": gaussian,
+    "lorentzian": lorentzian,
+}
+
+
+def broadened_dos(mesh, energies, width, weights=None, kernel="gaussian", method="auto",
+                  cutoff=None, max_nbytes=2 ** 27) -> np.ndarray:
+    """
+    Compute sum_i weights_i K(mesh - energies_i) on a linear mesh where K is a normalized
+    gaussian or lorentzian. This is the vectorized version of the python loop:
+
+        for e, w in zip(energies, weights):
+            dos += w * gaussian(mesh, width, center=e)
+
+    Several sets of weights sharing the same energies (e.g. projections) can be passed at once.
+
+    Args:
+        mesh: Linear mesh.
+        energies: Array with energies. The shape is flattened.
+        width: Standard deviation of the gaussian or half-width at half-maximum of the lorentzian.
+        weights: Array with weights. Either with the same number of entries as `energies`
+            or with shape [nsets, len(energies)]. None is equivalent to weights = 1.
+        kernel: "gaussian" or "lorentzian".
+        method: "binned" to deposit the weights on the mesh with linear interpolation and convolve
+            with the kernel using FFT. Cost is independent of width/step but results are approximated
+            with an error of the order of (step/width)**2.
+            "exact" to evaluate the kernel exactly in a window of `cutoff * width` around each energy.
+            "auto" selects "binned" if step <= width / 5 else "exact".
+        cutoff: Kernel is truncated beyond cutoff * width. None to use 6 for the gaussian
+            and the full mesh for the lorentzian.
+        max_nbytes: Max memory in bytes used for the workspace arrays in the "exact" method.
+
+    Return:
+        numpy array with shape [nw] if weights is None or has the same number of entries as energies,
+        [nsets, nw] otherwise.
+    """
+    mesh = np.asarray(mesh, dtype=float)
+    nw = len(mesh)
+    energies = np.ravel(energies)
+    ne = len(energies)
+
+    squeeze = weights is None or np.size(weights) == ne
+    weights = np.ones(ne) if weights is None else np.asarray(weights)
+    weights = np.reshape(weights, (-1, ne))
+    nsets = len(weights)
+
+    kernel_func = _DOS_KERNELS.get(kernel)
+    if kernel_func is None:
+        raise ValueError(f"Invalid {kernel=}, should be in {list(_DOS_KERNELS.keys())}")
+
+    if nw < 2:
+        raise ValueError("mesh should contain at least two points.")
+    step = mesh[1] - mesh[0]
+    if not np.allclose(np.diff(mesh), step, rtol=1e-6, atol=0):
+        raise ValueError("broadened_dos requires a linear mesh")
+
+    if cutoff is None and kernel == "gaussian": cutoff = 6.0
+    # Number of points in half window.
+    half = nw if cutoff is None else min(nw, int(np.ceil(cutoff * width / abs(step))))
+
+    if method == "auto":
+        method = "binned" if abs(step) <= width / 5 else "exact"
+
+    out = np.zeros((nsets, nw), dtype=np.result_type(weights, float))
+
+    if method == "binned":
+        from scipy.signal import fftconvolve
+        # Pad the mesh so that the tails of energies outside the mesh are taken into account.
+        ntot = nw + 2 * half
+        x = (energies - mesh[0]) / step + half
+        i0 = np.floor(x).astype(int)
+        frac = x - i0
+        ok = (i0 >= 0) & (i0 < ntot - 1)
+        i0, frac, wok = i0[ok], frac[ok], weights[:, ok]
+
+        hist = np.empty((nsets, ntot), dtype=out.dtype)
+        for iset in range(nsets):
+            hist[iset] = np.bincount(i0, weights=wok[iset] * (1.0 - frac), minlength=ntot)
+            hist[iset] += np.bincount(i0 + 1, weights=wok[iset] * frac, minlength=ntot)
+
+        kvals = kernel_func(np.arange(-half, half + 1) * step, width)
+        out[:] = fftconvolve(hist, kvals[None, :], mode="same", axes=-1)[:, half:half + nw]
+
+    elif method == "exact":
+        nwin = min(nw, 2 * half + 1)
+        chunk = max(1, int(max_nbytes // (8 * nwin * max(nsets, 2))))
+        for start in range(0, ne, chunk):
+            ee, ww = energies[start:start + chunk], weights[:, start:start + chunk]
+            if nwin == nw:
+                # Dense evaluation: [nsets, ne] x [ne, nw]
+                out += ww @ kernel_func(mesh[None, :] - ee[:, None], width)
+            else:
+                # Evaluate the kernel only in a window around each energy.
+                first = np.rint((ee - mesh[0]) / step).astype(int) - half
+                idx = first[:, None] + np.arange(nwin)[None, :]
+                mask = (idx >= 0) & (idx < nw)
+                kvals = kernel_func(mesh[np.clip(idx, 0, nw - 1)] - ee[:, None], width)
+                idx, kvals = idx[mask], kvals[mask]
+                rows = np.broadcast_to(np.arange(len(ee))[:, None], mask.shape)[mask]
+                for iset in range(nsets):
+                    out[iset] += np.bincount(idx, weights=kvals * ww[iset, rows], minlength=nw)
+
+    else:
+        raise ValueError(f"Invalid {method=}, should be in ['auto', 'binned', 'exact']")
+
+    return out[0] if squeeze else out
+
 #=====================================
 # === Data Interpolation/Smoothing ===
 #=====================================
@@ -0,0 +1,74 @@
+# coding: utf-8
+"""Tests for diskcache module."""
+import os
+import time
+import tempfile
+import numpy as np
+
+from abipy.core.testing import AbipyTest
+from abipy.tools.diskcache import DiskCache, hash_key, hash_file
+
+
+class TestDiskCache(AbipyTest):
+
+    def test_hash_key(self):
+        """Testing hash_key"""
+        arr = np.arange(6).reshape(2, 3)
+        assert hash_key(arr, 1, "foo") == hash_key(arr.copy(), 1, "foo")
+        assert hash_key(arr, 1, "foo") != hash_key(arr.T, 1, "foo")
+        assert hash_key(arr) != hash_key(arr.astype(float))
+        assert hash_key([1, 2], None) != hash_key((1, 2), None)
+        assert hash_key({"a": 1, "b": 2}) == hash_key({"b": 2, "a": 1})
+        with self.assertRaises(TypeError):
+            hash_key(object())
+
+        tmpname = self.get_tmpname(text=True)
+        with open(tmpname, "wt") as fh:
+            fh.write("hello")
+        assert hash_file(tmpname) == hash_file(tmpname)
+
+    def test_api(self):
+        """Testing DiskCache API"""
+        topdir = tempfile.mkdtemp()
+        cache = DiskCache("test", topdir=topdir, max_nbytes=None)
+        repr(cache)
+        assert len(cache) == 0 and cache.load_arrays("foo") is None
+        cache.save_arrays("foo", a=np.ones(10), b=None)
+        assert "foo" in cache and len(cache) == 1
+        d = cache.load_arrays("foo")
+        assert list(d.keys()) == ["a"]
+        self.assert_equal(d["a"], np.ones(10))
+
+        cache.save_object("obj", {"x": 1})
+        assert cache.load_object("obj") == {"x": 1}
+        assert cache.load_object("foo") is None and "foo" not in cache
+
+        # Test LRU eviction.
+        cache.clear()
+        assert len(cache) == 0
+        cache.max_nbytes = int(3.5 * 8 * 1000)
+        for i in range(3):
+            cache.save_arrays("k%d" % i, a=np.zeros(1000))
+            # Make sure mtimes are different.
+            past = time.time() - 100 + 10 * i
+            os.utime(cache.dirpath / ("k%d" % i), (past, past))
+
+        # k0 is accessed so k1 becomes the least recently used entry.
+        assert cache.load_arrays("k0") is not None
+        cache.save_arrays("k3", a=np.zeros(1000))
+        assert "k1" not in cache
+        assert all(k in cache for k in ("k0", "k3"))
+        assert cache.get_nbytes() <= cache.max_nbytes
+
+        # Entries with nested directories are evicted as well.
+        cache.clear()
+        cache.max_nbytes = 12000
+        for i in range(3):
+            with cache.new_entry("d%d" % i) as tmpdir:
+                (tmpdir / "outdata").mkdir()
+                (tmpdir / "outdata" / "out_PHBST.nc").write_bytes(b"x" * 5000)
+            past = time.time() - 100 + 10 * i
+            os.utime(cache.dirpath / ("d%d" % i), (past, past))
+
+        assert cache.get_nbytes() == 10000
+        assert "d0" not in cache and "d1" in cache and "d2" in cache
@@ -67,3 +67,34 @@ class TestNumTools(AbipyTest):
 
         assert lorentzian(x=0.0, width=1.0, center=0.0, height=1.0) == 1.0
         self.assert_almost_equal(lorentzian(x=0.0, width=1.0, center=0.0, height=None), 1/np.pi)
+
+    def test_broadened_dos(self):
+        """Testing broadened_dos."""
+        rng = np.random.default_rng(0)
+        energies = rng.uniform(-2, 2, size=(10, 5))
+        weights = rng.random((10, 5))
+        mesh = np.linspace(-3, 3, 601)
+        width = 0.1
+
+        for kernel, func in [("gaussian", gaussian), ("lorentzian", lorentzian)]:
+            ref = sum(w * func(mesh, width, center=e) for e, w in zip(energies.ravel(), weights.ravel()))
+            exact = broadened_dos(mesh, energies, width, weights=weights, kernel=kernel, method="exact")
+            assert exact.shape == mesh.shape
+            self.assert_almost_equal(exact, ref, decimal=6)
+            binned = broadened_dos(mesh, energies, width, weights=weights, kernel=kernel, method="binned")
+            assert np.abs(binned - ref).max() < 1e-3 * ref.max()
+
+        # Multiple sets of weights.
+        wsets = rng.random((3, energies.size))
+        values = broadened_dos(mesh, energies, width, weights=wsets)
+        assert values.shape == (3, len(mesh))
+        self.assert_almost_equal(values[1], broadened_dos(mesh, energies, width, weights=wsets[1]))
+        # Unit weights.
+        self.assert_almost_equal(broadened_dos(mesh, [0.0], width, method="exact"), gaussian(mesh, width))
+
+        with self.assertRaises(ValueError):
+            broadened_dos(mesh, energies, width, kernel="foo")
+        with self.assertRaises(ValueError):
+            broadened_dos(mesh, energies, width, method="foo")
+        with self.assertRaises(ValueError):
+            broadened_dos(mesh ** 2, energies, width)
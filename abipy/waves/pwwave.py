@@ -186,8 +186,9 @@ class WaveFunction:
             :math:`u(r)` on the real space FFT box.
         """
         mesh = self.mesh if mesh is None else mesh
-        ug_mesh = self.get_ug_mesh(mesh=mesh)
-        return mesh.fft_g2r(ug_mesh, fg_ishifted=False)
+        ur = self.gsphere.get_fft_engine(mesh).g2r(self.ug)
+        # Reinstate the shape of the mesh if nspinor == 1
+        return ur[0] if len(ur) == 1 else ur
 
     def to_string(self, verbose=0) -> str:
         """String representation."""
@@ -257,10 +258,8 @@ class PWWaveFunction(WaveFunction):
         """
         space = space.lower()
 
-        if space == "g":
-            return np.real(np.vdot(self.ug, self.ug))
-        elif space == "gsphere":
-            return np.real(np.vdot(self.ug, self.ug))
+        if space in ("g", "gsphere"):
+            return np.real(self._sphere_vdot(self.ug, self.ug))
         elif space == "r":
             return np.vdot(self.ur, self.ur) / self.mesh.size
         else:
@@ -286,12 +285,24 @@ class PWWaveFunction(WaveFunction):
             ug2_mesh = other.gsphere.tofftmesh(self.mesh, other.ug) if other is not self else ug1_mesh
             return np.vdot(ug1_mesh, ug2_mesh)
         elif space == "gsphere":
-            return np.vdot(self.ug, other.ug)
+            return self._sphere_vdot(self.ug, other.ug)
         elif space == "r":
             return np.vdot(self.ur, other.ur) / self.mesh.size
         else:
             raise ValueError("Wrong space: %s" % str(space))
 
+    def _sphere_vdot(self, ug1, ug2) -> complex:
+        """
+        Scalar product of two arrays given on the G-sphere.
+        Take into account the G-vectors that are not stored if istwfk == 2.
+        """
+        cdot = np.vdot(ug1, ug2)
+        if self.gsphere.istwfk == 2:
+            # Add the contribution of -G and remove the double counting of G = 0.
+            ig0 = np.nonzero(np.all(self.gsphere.gvecs == 0, axis=1))[0]
+            cdot = 2 * cdot.real - np.vdot(ug1[:, ig0], ug2[:, ig0]).real
+        return cdot
+
     def get_interpolator(self):
         """
         Return an interpolator object that interpolates periodic functions in real space.
@@ -98,3 +98,51 @@ class TestWFKFile(AbipyTest):
             wfk.write_notebook(nbpath=self.get_tmpname(text=True))
 
         wfk.close()
+
+    def test_block_reader(self):
+        """Testing block reader and caches of WfkFile."""
+        with WfkFile(abidata.ref_file("si_nscf_WFK.nc")) as wfk:
+            r = wfk.r
+            spin, nkpt, nband = 0, wfk.nkpt, wfk.nband_sk[0, 0]
+            var = r.rootgrp.variables["coefficients_of_wavefunctions"]
+
+            ug_block = r.read_ug_block(spin, range(nkpt), (1, 3))
+            assert ug_block.shape == (nkpt, 2, wfk.nspinor, wfk.npwarr.max())
+            for ik in range(nkpt):
+                npw_k = wfk.npwarr[ik]
+                for ib, band in enumerate(range(1, 3)):
+                    value = var[spin, ik, band, :, :npw_k, :]
+                    self.assert_equal(ug_block[ik, ib, :, :npw_k], value[..., 0] + 1j * value[..., 1])
+
+            # Cache with a single block of two bands.
+            r.clear_cache()
+            r.max_block_nbytes = 2 * 16 * wfk.nspinor * wfk.npwarr.max()
+            r.max_cache_nbytes = r.max_block_nbytes
+            ug = r.read_ug(spin, 0, 1)
+            assert not ug.flags.writeable
+            self.assert_equal(ug, ug_block[0, 0, :, :wfk.npwarr[0]])
+            assert r.read_ug(spin, 0, 0).base is ug.base
+            r.read_ug(spin, 1, 0)
+            assert len(r._block_cache) == 1
+
+            # Read all the bands at once.
+            waves = wfk.get_waves(spin, 0)
+            assert len(waves) == nband
+            for wave in waves:
+                assert wave == wfk.get_wave(spin, 0, wave.band)
+            with self.assertRaises(ValueError):
+                wfk.get_waves(spin, 0, bands=(0, nband + 1))
+
+            # Batched FFTs.
+            urs = wfk.get_urs(spin, 0, bands=range(1, 4))
+            assert urs.shape == (3, wfk.nspinor) + wfk.fft_mesh.shape
+            for ib, band in enumerate(range(1, 4)):
+                self.assert_almost_equal(urs[ib, 0], waves[band].ur)
+
+            # LRU cache with G-spheres.
+            wfk.max_cached_gspheres = 2
+            gsph = wfk.get_gsphere(0)
+            assert gsph is wfk.get_gsphere(0)
+            assert len(wfk.gspheres) == nkpt
+            assert len(wfk._gsphere_cache) == 2
+            assert gsph == wfk.get_gsphere(0)
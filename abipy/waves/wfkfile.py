@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import numpy as np
 
+from collections import OrderedDict
 from monty.functools import lazy_property
 from monty.string import marquee
 from abipy.core import Mesh3D, GSphere
+from abipy.core.gsphere import GSphereFFT
 from abipy.core.structure import Structure
 from abipy.core.mixins import AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, NotebookWriter
 from abipy.iotools import Visualizer
@@ -45,6 +47,10 @@ class WfkFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
     .. rubric:: Inheritance Diagram
     .. inheritance-diagram:: WfkFile
     """
+
+    # Max number of G-spheres kept in memory.
+    max_cached_gspheres = 64
+
     def __init__(self, filepath: str):
         """
         Initialize the object from a Netcdf file.
@@ -62,14 +68,8 @@ class WfkFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
         # FFT mesh (augmented divisions reported in the WFK file)
         self.fft_mesh = Mesh3D(r.fft_divs, self.structure.lattice.matrix)
 
-        # Build G-spheres for each k-point
-        gspheres = len(self.kpoints) * [None]
-        ecut = r.ecut
-        for k, kpoint in enumerate(self.kpoints):
-            gvec_k, istwfk = r.read_gvecs_istwfk(k)
-            gspheres[k] = GSphere(ecut, self.structure.reciprocal_lattice, kpoint, gvec_k, istwfk=istwfk)
-
-        self._gspheres = tuple(gspheres)
+        # G-spheres are built on demand and stored in a LRU cache (see get_gsphere).
+        self._gsphere_cache = OrderedDict()
 
     def close(self) -> None:
         self.r.close()
@@ -96,9 +96,28 @@ class WfkFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
         return len(self.kpoints)
 
     @property
-    def gspheres(self) -> list:
-        """List of :class:`GSphere` objects ordered by k-points."""
-        return self._gspheres
+    def gspheres(self) -> tuple:
+        """Tuple of :class:`GSphere` objects ordered by k-points."""
+        return tuple(self.get_gsphere(ik) for ik in range(self.nkpt))
+
+    def get_gsphere(self, kpoint) -> GSphere:
+        """
+        Return the :class:`GSphere` for the given k-point. Accepts :class:`Kpoint` object or integer.
+        G-spheres are stored in a LRU cache with at most `max_cached_gspheres` entries.
+        """
+        ik = self.kindex(kpoint)
+        cache = self._gsphere_cache
+        if ik in cache:
+            cache.move_to_end(ik)
+            return cache[ik]
+
+        gvec_k, istwfk = self.r.read_gvecs_istwfk(ik)
+        gsphere = GSphere(self.r.ecut, self.structure.reciprocal_lattice, self.kpoints[ik], gvec_k, istwfk=istwfk)
+        cache[ik] = gsphere
+        while len(cache) > self.max_cached_gspheres:
+            cache.popitem(last=False)
+
+        return gsphere
 
     def __str__(self) -> str:
         return self.to_string()
@@ -146,15 +165,65 @@ class WfkFile(AbinitNcFile, Has_Header, Has_Structure, Has_ElectronBands, Notebo
             band not in range(self.nband_sk[spin, ik])):
             raise ValueError("Wrong (spin, band, kpt) indices")
 
-        ug_skb = self.r.read_ug(spin, kpoint, band)
+        ug_skb = self.r.read_ug(spin, ik, band)
 
         # Istantiate the wavefunction object and set the FFT mesh
         # using the divisions reported in the WFK file.
-        wave = PWWaveFunction(self.structure, self.nspinor, spin, band, self.gspheres[ik], ug_skb)
+        wave = PWWaveFunction(self.structure, self.nspinor, spin, band, self.get_gsphere(ik), ug_skb)
         wave.set_mesh(self.fft_mesh)
 
         return wave
 
+    def get_waves(self, spin, kpoint, bands=None) -> list[PWWaveFunction]:
+        """
+        Read a set of bands for the given spin and k-point with a single read operation.
+
+        Args:
+            spin: spin index. Must be in (0, 1)
+            kpoint: Either :class:`Kpoint` instance or integer giving the sequential index in the IBZ (C-convention).
+            bands: range object or (start, stop) tuple with the band indices. None for all bands.
+
+        Returns: list of :class:`PWWaveFunction` objects.
+        """
+        ik = self.kindex(kpoint)
+        bstart, bstop = (0, self.nband_sk[spin, ik]) if bands is None else _as_start_stop(bands)
+        if (spin not in range(self.nsppol) or ik not in range(self.nkpt) or
+            not 0 <= bstart < bstop <= self.nband_sk[spin, ik]):
+            raise ValueError("Wrong (spin, bands, kpt) indices")
+
+        npw_k = self.npwarr[ik]
+        ug_block = self.r.read_ug_block(spin, (ik, ik + 1), (bstart, bstop))[0]
+        gsphere = self.get_gsphere(ik)
+
+        waves = []
+        for ib, band in enumerate(range(bstart, bstop)):
+            wave = PWWaveFunction(self.structure, self.nspinor, spin, band, gsphere, ug_block[ib, :, :npw_k])
+            wave.set_mesh(self.fft_mesh)
+            waves.append(wave)
+
+        return waves
+
+    def get_urs(self, spin, kpoint, bands=None, mesh=None) -> np.ndarray:
+        """
+        Compute the periodic part of the wavefunctions in real space for a set of bands.
+        Wavefunctions are read with a single read operation and transformed with batched FFTs.
+
+        Args:
+            spin: spin index. Must be in (0, 1)
+            kpoint: Either :class:`Kpoint` instance or integer giving the sequential index in the IBZ (C-convention).
+            bands: range object or (start, stop) tuple with the band indices. None for all bands.
+            mesh: |Mesh3D| object. If None, the FFT mesh reported in the WFK file is used.
+
+        Returns: array of shape [nb, nspinor, n1, n2, n3]
+        """
+        ik = self.kindex(kpoint)
+        bstart, bstop = (0, self.nband_sk[spin, ik]) if bands is None else _as_start_stop(bands)
+        mesh = self.fft_mesh if mesh is None else mesh
+
+        ug_block = self.r.read_ug_block(spin, (ik, ik + 1), (bstart, bstop))[0]
+        engine = GSphereFFT(self.get_gsphere(ik), mesh)
+        return engine.g2r(ug_block[..., :self.npwarr[ik]])
+
     def export_ur2(self, filepath, spin, kpoint, band, visu=None):
         """
         Export :math:`|u(r)|^2` on file filename.
@@ -320,13 +389,24 @@ class WFK_Reader(ElectronsReader):
     """
     This object reads data from the WFK file.
 
+    Wavefunctions are read in blocks of bands and the decoded blocks are stored in a LRU cache
+    whose size is limited by `max_cache_nbytes`.
+
     .. rubric:: Inheritance Diagram
     .. inheritance-diagram:: Wfk_Reader
     """
 
+    # Max size in bytes of a block of bands read by read_ug.
+    max_block_nbytes = 32 * 1024 ** 2
+
+    # Max size in bytes of the cache with the blocks.
+    max_cache_nbytes = 256 * 1024 ** 2
+
     def __init__(self, filepath: str):
         """Initialize the object from a filename."""
         super().__init__(filepath)
+        self._block_cache = OrderedDict()
+        self._block_cache_nbytes = 0
 
         self.kpoints = self.read_kpoints()
         self.nfft1 = self.read_dimvalue("number_of_grid_points_vector1")
@@ -384,18 +464,81 @@ class WFK_Reader(ElectronsReader):
         npw_k, istwfk = self.npwarr[ik], self.istwfk[ik]
         return self._kg[ik, :npw_k, :], istwfk
 
-    def read_ug(self, spin, kpoint, band):
-        """Read the Fourier components of the wavefunction."""
-        ik = self.kindex(kpoint)
-        npw_k, istwfk = self.npwarr[ik], self.istwfk[ik]
+    def read_ug_block(self, spin, kpoints, bands) -> np.ndarray:
+        """
+        Read the Fourier components of the wavefunctions for a range of k-points and bands
+        with a single netcdf hyperslab.
+
+        Args:
+            spin: Spin index.
+            kpoints: range object or (start, stop) tuple with the k-point indices.
+            bands: range object or (start, stop) tuple with the band indices.
+
+        Return:
+            Complex array of shape [nk, nb, nspinor, npw_max] where npw_max is the max number of
+            G-vectors in the k-point range. Note that the array is a view of the real data read from file
+            and that the entries with ig >= npwarr[ik] are not initialized.
+        """
         if self.cplex_ug != 2:
             raise NotImplementedError("")
 
-        # Read data from file (we don't store the full block full block in memory!).
+        kstart, kstop = _as_start_stop(kpoints)
+        bstart, bstop = _as_start_stop(bands)
+        npw_max = self.npwarr[kstart:kstop].max()
+
         var = self.rootgrp.variables["coefficients_of_wavefunctions"]
-        value = var[spin, ik, band, :, :npw_k, :]
-        return value[..., 0] + 1j*value[..., 1]  # Build complex array
+        value = np.ma.getdata(var[spin, kstart:kstop, bstart:bstop, :, :npw_max, :])
+
+        # Reinterpret the (real, imag) pairs as complex numbers without copying the data.
+        value = np.ascontiguousarray(value, dtype=np.float64)
+        return value.view(np.complex128)[..., 0]
+
+    def read_ug(self, spin, kpoint, band):
+        """
+        Read the Fourier components of the wavefunction.
+        The block of bands containing `band` is read from file and stored in the cache.
+        Return read-only array of shape [nspinor, npw_k].
+        """
+        ik = self.kindex(kpoint)
+        npw_k = self.npwarr[ik]
+
+        # Number of bands in the block.
+        bsize = max(1, self.max_block_nbytes // (16 * self.nspinor * npw_k))
+        bstart = (band // bsize) * bsize
+        key = (spin, ik, bstart)
 
+        cache = self._block_cache
+        if key in cache:
+            cache.move_to_end(key)
+            block = cache[key]
+        else:
+            bstop = min(bstart + bsize, self.nband_sk[spin, ik])
+            block = self.read_ug_block(spin, (ik, ik + 1), (bstart, bstop))[0]
+            block.flags.writeable = False
+            cache[key] = block
+            self._block_cache_nbytes += block.nbytes
+            # Remove the least recently used blocks (the last one is always kept).
+            while self._block_cache_nbytes > self.max_cache_nbytes and len(cache) > 1:
+                _, old_block = cache.popitem(last=False)
+                self._block_cache_nbytes -= old_block.nbytes
+
+        return block[band - bstart]
+
+    def clear_cache(self) -> None:
+        """Remove all the blocks stored in the cache."""
+        self._block_cache.clear()
+        self._block_cache_nbytes = 0
+
+
+def _as_start_stop(obj) -> tuple[int, int]:
+    """Convert range object or (start, stop) tuple to (start, stop) integers."""
+    if isinstance(obj, range):
+        if obj.step != 1:
+            raise ValueError("Only ranges with step 1 are supported, got: %s" % str(obj))
+        return obj.start, obj.stop
+
+    start, stop = obj
+    return int(start), int(stop)
 
 
 def get_h1mat_same_qpt(prefix: str):
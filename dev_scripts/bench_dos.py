@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Benchmark the vectorized DOS engine (abipy.tools.numtools.broadened_dos)
+against the python loop over eigenvalues used in the previous implementation.
+
+Usage: bench_dos.py [NENE] [WIDTH] [STEP]
+"""
+import sys
+import time
+import numpy as np
+
+from abipy.tools.numtools import gaussian, broadened_dos
+
+
+def main():
+    nene = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    width = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    step = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+
+    energies = np.random.default_rng(0).uniform(-10, 10, nene)
+    weights = np.full(nene, 1.0 / nene)
+    e_min, e_max = energies.min() - 3 * width, energies.max() + 3 * width
+    mesh = np.linspace(e_min, e_max, num=int(1 + (e_max - e_min) / step))
+    print("nene:", nene, "nw:", len(mesh), "width:", width, "step:", step)
+
+    start = time.time()
+    ref = np.zeros(len(mesh))
+    for e, w in zip(energies, weights):
+        ref += w * gaussian(mesh, width, center=e)
+    t_ref = time.time() - start
+    print("python loop: %.3f (s)" % t_ref)
+
+    for method in ("exact", "binned"):
+        # Warm-up to exclude import time.
+        broadened_dos(mesh, energies[:10], width, method=method)
+        start = time.time()
+        values = broadened_dos(mesh, energies, width, weights=weights, method=method)
+        t_new = time.time() - start
+        print("%s: %.3f (s), speedup: %.1f, max_rel_err: %.2e" % (
+              method, t_new, t_ref / t_new, np.abs(values - ref).max() / ref.max()))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Benchmark the batched FFTs between the G-sphere and the real space mesh (GSphereFFT)
+against the band-by-band version based on GSphere.tofftmesh and Mesh3D.fft_g2r.
+Use the ABIPY_FFT_WORKERS env variable to set the number of threads used for the FFTs.
+"""
+import sys
+import numpy as np
+
+from abipy.core.mesh3d import Mesh3D
+from abipy.core.gsphere import GSphere, GSphereFFT
+from abipy.tools.context_managers import Timer
+
+
+def main():
+    ngfft = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    nband = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    mesh = Mesh3D((ngfft, ngfft, ngfft), np.eye(3) * 10)
+    gmax = ngfft // 4
+    gs = np.arange(-gmax, gmax + 1)
+    gvecs = np.array(np.meshgrid(gs, gs, gs, indexing="ij")).reshape(3, -1).T
+    gvecs = gvecs[np.sum(gvecs ** 2, axis=1) <= gmax ** 2]
+    half = (gvecs[:, 2] > 0) | ((gvecs[:, 2] == 0) & (gvecs[:, 1] > 0)) | \
+           ((gvecs[:, 2] == 0) & (gvecs[:, 1] == 0) & (gvecs[:, 0] >= 0))
+    print(f"FFT mesh: {mesh.shape}, npw: {len(gvecs)}, nband: {nband}")
+
+    rng = np.random.default_rng(0)
+    for istwfk, gv in [(1, gvecs), (2, gvecs[half])]:
+        gsphere = GSphere(1, np.eye(3), [0, 0, 0], gv, istwfk=istwfk)
+        ug = rng.random((nband, 1, len(gv))) + 1j * rng.random((nband, 1, len(gv)))
+
+        with Timer(footer=f"istwfk {istwfk}: band-by-band FFTs"):
+            urs = [mesh.fft_g2r(gsphere.tofftmesh(mesh, ug_b)) for ug_b in ug]
+
+        with Timer(footer=f"istwfk {istwfk}: batched FFTs"):
+            GSphereFFT(gsphere, mesh).g2r(ug)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
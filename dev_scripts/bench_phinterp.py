@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Validate and benchmark the in-process phonon interpolator (PhononInterpolator)
+against the anaddb results stored in the abipy reference files.
+If anaddb is in $PATH, the wall-time of DdbFile.anaget_phbst_and_phdos_files is reported as well.
+
+Usage: bench_phinterp.py [NQSMALL]
+"""
+import sys
+import time
+import shutil
+import numpy as np
+import abipy.data as abidata
+import abipy.core.abinit_units as abu
+
+from abipy.dfpt.ddb import DdbFile
+from abipy.dfpt.phonons import PhbstFile
+
+
+def main():
+    nqsmall = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    ddb = DdbFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_qpt_DDB"))
+    with PhbstFile(abidata.ref_file("refs/znse_phonons/ZnSe_hex_886.out_PHBST.nc")) as phbst:
+        ref_phbands = phbst.phbands
+
+    start = time.time()
+    interp = ddb.get_phonon_interpolator(asr=2, chneut=1, dipdip=1, ngqpt=[8, 8, 6])
+    t_ifc = time.time() - start
+    print(interp)
+
+    start = time.time()
+    phbands = interp.get_phbands(qpoints=ref_phbands.qpoints.frac_coords, lo_to_splitting=False)
+    t_bands = time.time() - start
+    err = np.abs(phbands.phfreqs - ref_phbands.phfreqs).max() * abu.eV_to_cm1
+    print("IFCs: %.3f (s), phbands with %d q-points: %.3f (s), max_diff wrt anaddb: %.3f (cm-1)" % (
+          t_ifc, ref_phbands.num_qpoints, t_bands, err))
+
+    ngqpt = ddb.structure.calc_ngkpt(nqsmall)
+    start = time.time()
+    interp.get_phdos(ngqpt=ngqpt)
+    t_dos = time.time() - start
+    print("phdos with ngqpt %s (%d q-points): %.3f (s)" % (ngqpt, np.prod(ngqpt), t_dos))
+
+    if shutil.which("anaddb") is None:
+        print("anaddb not in $PATH. Skipping comparison with anaddb timings.")
+        return 0
+
+    start = time.time()
+    with ddb.anaget_phbst_and_phdos_files(nqsmall=nqsmall, ndivsm=20, asr=2, chneut=1, dipdip=1,
+                                          dos_method="gaussian", ngqpt=[8, 8, 6]) as g:
+        t_anaddb = time.time() - start
+        phbst_file = g[0]
+        qpoints = phbst_file.phbands.qpoints.frac_coords
+
+    start = time.time()
+    interp = ddb.get_phonon_interpolator(asr=2, chneut=1, dipdip=1, ngqpt=[8, 8, 6])
+    interp.get_phbands(qpoints=qpoints)
+    interp.get_phdos(nqsmall=nqsmall)
+    t_interp = time.time() - start
+    print("anaddb: %.3f (s), in-process: %.3f (s), speedup: %.1f" % (t_anaddb, t_interp, t_anaddb / t_interp))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Benchmark the harmonic thermodynamics computed for all the volumes at once with get_harmonic_thermo
+against one PhononDos.get_free_energy call per volume.
+
+Usage: bench_phthermo.py [NTEMPS] [NVOLS]
+"""
+import os
+import sys
+import time
+import numpy as np
+import abipy.data as abidata
+
+from abipy.dfpt.phonons import PhononDos, get_harmonic_thermo
+
+
+def main():
+    ntemps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    nvols = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    dirpath = os.path.join(abidata.dirpath, "refs", "si_qha")
+    strains = [-4, -2, 0, 2, 4, 6]
+    doses = [PhononDos.as_phdos(os.path.join(dirpath, "mp-149_{:+d}_PHDOS.nc".format(s))) for s in strains]
+    doses = [doses[i % len(doses)] for i in range(nvols)]
+    tmesh = np.linspace(0, 1500, ntemps)
+
+    start = time.time()
+    ref = np.array([dos.get_free_energy(0, 1500, ntemps).values for dos in doses[:len(strains)]])
+    t_loop = (time.time() - start) * nvols / len(strains)
+
+    start = time.time()
+    f = get_harmonic_thermo(doses, tmesh, what="free_energy")
+    t_batch = time.time() - start
+
+    print("nvols: %d, ntemps: %d, nw: %d" % (nvols, ntemps, len(doses[0].mesh)))
+    print("one call per volume (estimated): %.3f (s), batched: %.3f (s), max_diff: %.2e (eV)" % (
+          t_loop, t_batch, np.abs(f[:len(strains)] - ref).max()))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Benchmark the batched SKW interpolation engine (SkwInterpolator.eval_kpts)
+against the reference implementation that calls eval_sk for each k-point.
+
+Usage: bench_skw.py [NKPT] [LPRATIO]
+"""
+import sys
+import time
+import numpy as np
+import abipy.data as abidata
+
+from abipy.abilab import abiopen
+from abipy.core.skw import ElectronInterpolator
+
+
+def main():
+    nkpt = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    lpratio = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with abiopen(abidata.ref_file("si_scf_GSR.nc")) as gsr:
+        skw = gsr.ebands.interpolate(lpratio=lpratio, verbose=0).interpolator
+
+    kpts = np.random.default_rng(0).random((nkpt, 3))
+    print("nkpt:", nkpt, "nband:", skw.nband, "nr:", skw.nr, "ptg_nsym:", skw.ptg_nsym)
+
+    for dk1, dk2 in [(False, False), (True, False), (True, True)]:
+        start = time.time()
+        ref = ElectronInterpolator.eval_kpts(skw, kpts, dk1=dk1, dk2=dk2)
+        t_ref = time.time() - start
+
+        start = time.time()
+        new = skw.eval_kpts(kpts, dk1=dk1, dk2=dk2)
+        t_new = time.time() - start
+
+        err = max(np.abs(r - n).max() for r, n in zip(ref, new) if r is not None)
+        print("dk1: %s, dk2: %s --> per-k: %.3f (s), batched: %.3f (s), speedup: %.1f, max_diff: %.2e" % (
+              dk1, dk2, t_ref, t_new, t_ref / t_new, err))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())